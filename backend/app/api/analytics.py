@@ -0,0 +1,81 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Optional
+import numpy as np
+from app import schemas
+from app.core import compute, fast_json
+from app.core.clustering import FEATURES, cluster_cache
+from app.core.config import settings
+from app.core.sharding import router as shard_router
+from app.core.trends import TrendReport, trend_cache
+from app.core.village_store import get_store
+
+router = APIRouter()
+
+def _report() -> TrendReport:
+    try:
+        return trend_cache.get()
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail="Historical dataset (coastal_risk.db) not available")
+
+@router.get("/trends/villages", response_model=List[schemas.VillageTrend])
+def read_village_trends(district: Optional[str] = None):
+    """
+    Per-village trend statistics for every yearly metric: linear slope,
+    acceleration, year-over-year change and anomaly z-score of the latest year.
+    """
+    villages = _report().villages
+    if district is not None:
+        villages = [v for v in villages if v["district"].lower() == district.lower()]
+    return villages
+
+@router.get("/trends/villages/{village_id}", response_model=schemas.VillageTrend)
+def read_village_trend(village_id: int):
+    """Trend statistics for one village of the historical dataset"""
+    village = _report().village(village_id)
+    if village is None:
+        raise HTTPException(status_code=404, detail="Village not found in historical dataset")
+    return village
+
+@router.get("/trends/districts", response_model=List[schemas.DistrictTrend])
+def read_district_trends():
+    """Trend statistics of each district's average series"""
+    return _report().districts
+
+@router.get("/clusters", response_model=schemas.ClusterReport)
+def read_village_clusters(
+    k: int = Query(settings.CLUSTER_DEFAULT_K, ge=1, le=settings.CLUSTER_MAX_K),
+    state_id: Optional[int] = None,
+    district_id: Optional[int] = None,
+):
+    """
+    Villages grouped by hazard signature: k-means over every village's component
+    risks and indicators. Centroids are in the features' own units; each cluster is
+    labelled with its dominant hazard. Assignments can be filtered to a state/district
+    (the clustering itself always covers every village).
+    """
+    result = cluster_cache.get(shard_router.scatter(get_store), k, executor=compute.executor)
+    rows = result.select(state_id=state_id, district_id=district_id)
+    report = {
+        "k": result.k,
+        "features": list(FEATURES),
+        "iterations": result.iterations,
+        "inertia": round(result.inertia, 4),
+        "warm_start": result.warm,
+        "clusters": [
+            {
+                "cluster": c,
+                "size": int(result.sizes[c]),
+                "dominant_hazard": result.dominant_hazard(c),
+                "centroid": {name: round(float(value), 4) for name, value in zip(FEATURES, result.centroids[c])},
+            }
+            for c in range(result.k)
+        ],
+        "villages": [
+            {"village_id": v, "cluster": c, "distance": d}
+            for v, c, d in zip(result.village_ids[rows].tolist(), result.labels[rows].tolist(),
+                               np.round(result.distances[rows], 4).tolist())
+        ],
+    }
+    if fast_json.enabled():
+        return fast_json.FastJSONResponse(report)
+    return report
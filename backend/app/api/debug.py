@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from app.core import lifecycle, profiling
+from app.core.config import settings
+
+router = APIRouter()
+
+def require_profile_token(request: Request):
+    """Profiles contain SQL text: only clients holding PROFILE_HEADER_TOKEN may read them"""
+    if not profiling.token_matches(request.headers.get(settings.PROFILE_HEADER)):
+        raise HTTPException(status_code=403, detail=f"Send the profiling token in the {settings.PROFILE_HEADER} header")
+
+@router.get("/profiles", dependencies=[Depends(require_profile_token)])
+def read_profiles():
+    """Summaries of captured request profiles, newest first"""
+    return profiling.list_profiles()
+
+@router.get("/profiles/{name}", dependencies=[Depends(require_profile_token)])
+def read_profile(name: str):
+    """Full profile: SQL statements grouped by shape, N+1 suspects and sampled stacks"""
+    profile = profiling.read_profile(name)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Profile '{name}' not found")
+    return profile
+
+@router.get("/startup")
+def read_startup_report():
+    """Cold-start timings of this worker: import and each warmup step"""
+    report = lifecycle.startup_report
+    if report is None:
+        raise HTTPException(status_code=404, detail="Worker has not completed start-up")
+    return report.as_dict()
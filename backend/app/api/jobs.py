@@ -0,0 +1,85 @@
+import json
+import os
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app import models, schemas
+from app.core import job_types
+from app.core.jobs import JOB_TYPES, SUCCEEDED, runner
+from app.database import get_db
+
+router = APIRouter()
+
+def _job_out(job: models.Job) -> dict:
+    return {
+        "id": job.id,
+        "type": job.type,
+        "status": job.status,
+        "params": json.loads(job.params or "{}"),
+        "progress_done": job.progress_done or 0,
+        "progress_total": job.progress_total or 0,
+        "progress_percent": round(100.0 * (job.progress_done or 0) / job.progress_total, 1) if job.progress_total else 0.0,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error,
+        "cancel_requested": bool(job.cancel_requested),
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+def _get_job(db: Session, job_id: int) -> models.Job:
+    job = db.get(models.Job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/types")
+def list_job_types():
+    """Available job types with their parameter schemas and concurrency limits"""
+    return {
+        name: {"max_concurrency": spec.max_concurrency, "params": spec.params_model.model_json_schema()}
+        for name, spec in JOB_TYPES.items()
+    }
+
+@router.post("", response_model=schemas.Job, status_code=202)
+def submit_job(job: schemas.JobCreate, db: Session = Depends(get_db)):
+    """Queue a region-wide job; poll GET /api/jobs/{id} for progress"""
+    if job.type not in JOB_TYPES:
+        raise HTTPException(status_code=422, detail=f"Unknown job type '{job.type}'. Available: {sorted(JOB_TYPES)}")
+    try:
+        created = runner.submit(db, job.type, job.params)
+    except ValidationError as exc:
+        raise HTTPException(status_code=422, detail=json.loads(exc.json(include_url=False)))
+    return _job_out(created)
+
+@router.get("", response_model=List[schemas.Job])
+def list_jobs(status: Optional[str] = None, type: Optional[str] = None, limit: int = 50, db: Session = Depends(get_db)):
+    """Most recent jobs first"""
+    query = db.query(models.Job)
+    if status is not None:
+        query = query.filter(models.Job.status == status)
+    if type is not None:
+        query = query.filter(models.Job.type == type)
+    return [_job_out(j) for j in query.order_by(models.Job.id.desc()).limit(min(limit, 500))]
+
+@router.get("/{job_id}", response_model=schemas.Job)
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    """Status, progress and (once finished) result of a job"""
+    return _job_out(_get_job(db, job_id))
+
+@router.post("/{job_id}/cancel", response_model=schemas.Job)
+def cancel_job(job_id: int, db: Session = Depends(get_db)):
+    """Cancel a queued job, or stop a running one at its next checkpoint"""
+    _get_job(db, job_id)
+    return _job_out(runner.cancel(db, job_id))
+
+@router.get("/{job_id}/download")
+def download_job_output(job_id: int, db: Session = Depends(get_db)):
+    """File produced by a finished export job"""
+    job = _get_job(db, job_id)
+    path = job_types.export_path(job_id)
+    if job.type != "export_history" or job.status != SUCCEEDED or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="No output available for this job")
+    return FileResponse(path, media_type="text/csv", filename=os.path.basename(path))
@@ -1,32 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from typing import List
 from app import crud, schemas
+from app.core import fast_json, snapshot
 from app.database import get_db
 
 router = APIRouter()
 
+def _snapshot_response(key: str):
+    """Serve a pre-serialized hierarchy list from the shared snapshot, if one is mapped"""
+    current = snapshot.current()
+    if current is None:
+        return None
+    return Response(content=current.location_json(key) or b"[]", media_type="application/json")
+
 @router.get("/states", response_model=List[schemas.State])
 def read_states(db: Session = Depends(get_db)):
     """Return all states"""
+    cached = _snapshot_response("states")
+    if cached is not None:
+        return cached
+    if fast_json.enabled():
+        return fast_json.FastJSONResponse(crud.get_state_rows(db))
     return crud.get_states(db)
 
 @router.get("/districts/{state_id}", response_model=List[schemas.District])
 def read_districts(state_id: int, db: Session = Depends(get_db)):
     """Return districts for a state"""
+    cached = _snapshot_response(f"districts/{state_id}")
+    if cached is not None:
+        return cached
+    if fast_json.enabled():
+        return fast_json.FastJSONResponse(crud.get_district_rows_by_state(db, state_id=state_id))
     districts = crud.get_districts_by_state(db, state_id=state_id)
     return districts
 
+@router.get("/locations/tree", response_model=List[schemas.StateTree])
+def read_location_tree(db: Session = Depends(get_db)):
+    """Return every state with its districts and their villages"""
+    tree = crud.get_location_tree(db)
+    if fast_json.enabled():
+        return fast_json.FastJSONResponse(tree)
+    return tree
+
 @router.get("/villages/search", response_model=schemas.Village)
 def search_village(name: str, db: Session = Depends(get_db)):
     """Search village by name"""
     db_village = crud.get_village_by_name(db, name=name)
     if db_village is None:
         raise HTTPException(status_code=404, detail=f"Village with name '{name}' not found")
+    if fast_json.enabled():
+        return fast_json.FastJSONResponse(fast_json.shape(schemas.Village, db_village))
     return db_village
 
 @router.get("/villages/{district_id}", response_model=List[schemas.Village])
 def read_villages_by_district(district_id: int, db: Session = Depends(get_db)):
     """Return villages for a district"""
+    cached = _snapshot_response(f"villages/{district_id}")
+    if cached is not None:
+        return cached
+    if fast_json.enabled():
+        return fast_json.FastJSONResponse(crud.get_village_rows_by_district(db, district_id=district_id))
     villages = crud.get_villages_by_district(db, district_id=district_id)
     return villages
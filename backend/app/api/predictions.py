@@ -1,19 +1,24 @@
-import math
-import random
+import time
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import date, timedelta
 from app import crud, schemas
-from app.database import get_db
-from app.core.risk_calculator import RiskCalculator
+from app.core import compute, fast_json, forecaster, snapshot
+from app.core.forecast import FORECAST_DAYS, simulate_forecast, summarize_forecast
+from app.core.metrics import FORECAST_GENERATION
+from app.core.sharding import get_village_db
+from app.core.singleflight import SingleFlight, normalize_param
+from app.core.village_store import get_store
 
 router = APIRouter()
 
+forecast_flight = SingleFlight("predictions.village")
+
 @router.get("/village/{village_id}", response_model=schemas.PredictionForecast)
 def get_prediction_forecast(
     village_id: int, 
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_village_db),
     slr: float = None,
     rainfall: float = None,
     population: float = None,
@@ -30,72 +35,55 @@ def get_prediction_forecast(
     # If simulation parameters are provided, we ALWAYS generate a dynamic forecast
     # instead of pulling from historical records.
     is_simulation = any(v is not None for v in [slr, rainfall, population, surge])
+    current_snapshot = snapshot.current()
+
+    # Baseline forecasts precomputed in the shared snapshot skip the database entirely
+    if not is_simulation and current_snapshot is not None:
+        cached = current_snapshot.forecast(village_id, start_date)
+        if cached is not None:
+            return _respond(summarize_forecast(start_date, cached))
     
-    predictions = [] if is_simulation else crud.get_predictions(db, village_id=village_id, start_date=start_date, end_date=end_date)
+    # Concurrent identical requests (e.g. after a cyclone warning) share one computation
+    key = (village_id, start_date) + tuple(normalize_param(v) for v in (slr, rainfall, population, surge))
+    return _respond(forecast_flight.do(key, lambda: _compute_forecast(
+        db, village_id, start_date, end_date, is_simulation, slr, rainfall, population, surge)))
+
+
+def _respond(forecast):
+    if fast_json.enabled():
+        return fast_json.FastJSONResponse(fast_json.shape(schemas.PredictionForecast, forecast))
+    return forecast
+
+
+def _compute_forecast(db, village_id, start_date, end_date, is_simulation, slr, rainfall, population, surge):
+    predictions = [] if is_simulation else crud.get_forecast(db, village_id=village_id, start_date=start_date, end_date=end_date)
     
     if not predictions:
         # Generate dynamic predictions based on latest village data
-        env_data = crud.get_latest_environmental_data(db, village_id=village_id)
-        settlement_data = crud.get_latest_settlement_data(db, village_id=village_id)
-        
-        if not env_data or not settlement_data:
+        record = get_store(db).get(village_id)
+        baseline = (record.environmental(), record.settlement()) if record is not None else (None, None)
+        if None in baseline:
             raise HTTPException(status_code=404, detail="Village baseline data not found to generate predictions")
+        env, settlement = baseline
         
         # Apply Simulation Overrides
-        base_slr = slr if slr is not None else env_data.sea_level_rise
-        base_rainfall = rainfall if rainfall is not None else env_data.extreme_rainfall
-        base_surge = surge if surge is not None else env_data.storm_surge_height
-        base_population = population if population is not None else settlement_data.population_density
-
-        predictions = []
-        for i in range(15): # 14-day forecast + today
-            for_date = start_date + timedelta(days=i)
-            
-            # Simulate environmental fluctuations (sinusoidal + noise)
-            variation = math.sin(i / 2.0) * 1.5 + (random.random() - 0.5) * 1.0
-            
-            simulated_env = {
-                "sea_level_rise": max(1, min(10, base_slr + variation * 0.2)),
-                "cyclone_frequency": max(1, min(10, env_data.cyclone_frequency + (variation if i % 4 == 0 else 0))),
-                "storm_surge_height": max(1, min(10, base_surge + variation * 0.5)),
-                "erosion_rate": max(1, min(10, env_data.erosion_rate + variation * 0.1)),
-                "extreme_rainfall": max(1, min(10, base_rainfall + variation * 1.2))
-            }
-            
-            simulated_settlement = {
-                "population_density": base_population,
-                "households": settlement_data.households,
-                "distance_from_shore": settlement_data.distance_from_shore,
-                "infrastructure_score": settlement_data.infrastructure_score
-            }
-            
-            risk_profile = RiskCalculator.calculate_risk_profile(simulated_env, simulated_settlement)
-            
-            predictions.append({
-                "id": 999000 + i, # Mock ID for dynamic generation
-                "village_id": village_id,
-                "prediction_date": start_date,
-                "for_date": for_date,
-                "predicted_risk_score": risk_profile["overall_risk_score"],
-                "flood_probability": risk_profile["flood_risk"] / 10.0,
-                "cyclone_probability": risk_profile["cyclone_risk"] / 10.0,
-                "rainfall_probability": risk_profile["rainfall_risk"] / 10.0,
-                "erosion_probability": risk_profile["erosion_risk"] / 10.0
-            })
+        env_overrides = {name: value for name, value in (
+            ("sea_level_rise", slr), ("extreme_rainfall", rainfall), ("storm_surge_height", surge)
+        ) if value is not None}
+        settlement_overrides = {"population_density": population} if population is not None else {}
 
-    # Calculate impact scores based on average risk in forecast
-    avg_risk = sum(p["predicted_risk_score"] if isinstance(p, dict) else p.predicted_risk_score for p in predictions) / len(predictions)
-    
-    high_risk_days = sum(1 for p in predictions if (p["predicted_risk_score"] if isinstance(p, dict) else p.predicted_risk_score) > 60)
-    
-    # Impact calculation (normalized 0-10)
-    eco_impact = min(10.0, avg_risk / 8.0)
-    comm_impact = min(10.0, avg_risk / 9.0)
+        generation_start = time.perf_counter()
+        # Villages with fitted history parameters use them; others fall back to the simulation
+        predictions = forecaster.forecast(db, village_id, start_date, FORECAST_DAYS, env, settlement,
+                                          env_overrides, settlement_overrides)
+        mode = "simulation" if is_simulation else "baseline"
+        if predictions is None:
+            env.update(env_overrides)
+            settlement.update(settlement_overrides)
+            # CPU-bound: runs on the compute executor, off the request threadpool
+            predictions = compute.executor.run("forecast", simulate_forecast, village_id, env, settlement, start_date)
+        else:
+            mode = f"fitted_{mode}"
+        FORECAST_GENERATION.observe(time.perf_counter() - generation_start, mode=mode)
 
-    return {
-        "prediction_date": start_date,
-        "forecast": predictions,
-        "economic_impact_score": round(eco_impact, 1),
-        "community_impact_score": round(comm_impact, 1),
-        "high_risk_days": high_risk_days
-    }
+    return summarize_forecast(start_date, predictions)
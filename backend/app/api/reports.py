@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import HTMLResponse, StreamingResponse
+from sqlalchemy.orm import Session
+from app import models
+from app.core import reports
+from app.core.sharding import get_district_db, get_state_db, get_village_db
+
+router = APIRouter()
+
+def _zip_response(profiles, filename: str):
+    if not profiles:
+        raise HTTPException(status_code=404, detail="No assessed villages in this region")
+    return StreamingResponse(
+        reports.stream_zip(profiles),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.get("/village/{village_id}", response_class=HTMLResponse)
+def get_village_report(village_id: int, db: Session = Depends(get_village_db)):
+    """Risk report and safety guide for one village as an HTML page"""
+    profiles = reports.load_profiles(db, village_id=village_id)
+    if not profiles:
+        raise HTTPException(status_code=404, detail="Village or risk assessment not found")
+    _, html = next(reports.iter_reports(profiles))
+    return HTMLResponse(content=html)
+
+@router.get("/district/{district_id}")
+def get_district_reports(district_id: int, db: Session = Depends(get_district_db)):
+    """
+    ZIP of safety reports for every assessed village of a district.
+    Villages whose assessment is unchanged since the last export come from the cache.
+    """
+    district = db.get(models.District, district_id)
+    if district is None:
+        raise HTTPException(status_code=404, detail="District not found")
+    return _zip_response(reports.load_profiles(db, district_id=district_id), f"{district.code}_safety_reports.zip")
+
+@router.get("/state/{state_id}")
+def get_state_reports(state_id: int, db: Session = Depends(get_state_db)):
+    """ZIP of safety reports for every assessed village of a state, one folder per district"""
+    state = db.get(models.State, state_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="State not found")
+    return _zip_response(reports.load_profiles(db, state_id=state_id), f"{state.code}_safety_reports.zip")
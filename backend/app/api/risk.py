@@ -1,52 +1,222 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+import numpy as np
 from app import crud, schemas, models
 from app.database import get_db
+from app.core import compute, fast_json, sensitivity
 from app.core.risk_calculator import RiskCalculator
+from app.core.singleflight import SingleFlight
+from app.core.spatial import RESOLUTIONS, risk_surface
+from app.core.config import settings
+from app.core.sharding import get_village_db, router as shard_router
+from app.core.village_store import get_store
 
 router = APIRouter()
 
+profile_flight = SingleFlight("risk.village")
+
+
+def _region_results(fn, state_id: Optional[int] = None, district_id: Optional[int] = None):
+    """fn(store) on the store of every shard holding the region, results concatenated key by key."""
+    results = shard_router.scatter(lambda db: fn(get_store(db)), shard_router.shards_for_region(state_id, district_id))
+    if len(results) == 1:
+        return results[0]
+    return {key: np.concatenate([r[key] for r in results]) for key in results[0]}
+
+
+def _all_stores():
+    return shard_router.scatter(get_store)
+
 @router.get("/village/{village_id}", response_model=schemas.DetailedRiskProfile)
-def get_village_risk_profile(village_id: int, db: Session = Depends(get_db)):
+def get_village_risk_profile(village_id: int, db: Session = Depends(get_village_db)):
     """
     Return current risk assessment with detailed breakdown.
     Includes overall score, component scores, environmental factors, and settlement data.
     """
-    village = crud.get_village(db, village_id=village_id)
-    if not village:
+    profile = risk_profile(db, village_id)
+    if fast_json.enabled():
+        return fast_json.FastJSONResponse(fast_json.shape(schemas.DetailedRiskProfile, profile))
+    return profile
+
+
+def risk_profile(db: Session, village_id: int, coalesce: bool = True):
+    """
+    DetailedRiskProfile payload of a village; raises 404 if it has no assessment.
+    With `coalesce`, concurrent requests for the same village share one computation,
+    which may have read the database before the caller's request started.
+    """
+    if not coalesce:
+        return _build_risk_profile(db, village_id)
+    return profile_flight.do(village_id, lambda: _build_risk_profile(db, village_id))
+
+
+def _build_risk_profile(db: Session, village_id: int):
+    row = crud.get_village_profile_row(db, village_id=village_id)
+    if row is None:
         raise HTTPException(status_code=404, detail="Village not found")
+    village, district, state = row
 
-    assessment = crud.get_latest_risk_assessment(db, village_id=village_id)
-    env_data = crud.get_latest_environmental_data(db, village_id=village_id)
-    settlement_data = crud.get_latest_settlement_data(db, village_id=village_id)
+    # Read from the database, not the village store: this life-safety lookup must never lag a write
+    assessment = crud.get_latest_risk_assessment_row(db, village_id=village_id)
 
     if not assessment:
         raise HTTPException(status_code=404, detail="Risk assessment data unavailable")
 
     return {
         "village": village,
-        "district": village.district.name if village.district else "N/A",
-        "state": village.district.state.name if village.district and village.district.state else "N/A",
-        "overall_risk_score": assessment.overall_risk_score,
+        "district": district or "N/A",
+        "state": state or "N/A",
+        "overall_risk_score": assessment["overall_risk_score"],
         "risk_scores": {
-            "flood": assessment.flood_risk,
-            "cyclone": assessment.cyclone_risk,
-            "rainfall": assessment.rainfall_risk,
-            "erosion": assessment.erosion_risk
+            "flood": assessment["flood_risk"],
+            "cyclone": assessment["cyclone_risk"],
+            "rainfall": assessment["rainfall_risk"],
+            "erosion": assessment["erosion_risk"]
         },
-        "risk_category": assessment.risk_category,
-        "environmental": env_data,
-        "settlement": settlement_data,
-        "last_updated": assessment.date
+        "risk_category": assessment["risk_category"],
+        "environmental": crud.get_latest_environmental_row(db, village_id=village_id),
+        "settlement": crud.get_latest_settlement_row(db, village_id=village_id),
+        "last_updated": assessment["date"]
     }
 
 @router.get("/village/{village_id}/history", response_model=List[schemas.RiskAssessment])
-def get_village_risk_history(village_id: int, db: Session = Depends(get_db)):
+def get_village_risk_history(village_id: int, db: Session = Depends(get_village_db)):
     """Return historical risk data (last 30 days)"""
+    if fast_json.enabled():
+        return fast_json.FastJSONResponse(crud.get_risk_history_rows(db, village_id=village_id, days=30))
     history = crud.get_risk_history(db, village_id=village_id, days=30)
     return history
 
+@router.get("/scores", response_model=List[schemas.VillageRiskScore])
+def get_region_risk_scores(
+    state_id: Optional[int] = None,
+    district_id: Optional[int] = None
+):
+    """
+    Score every village of a state/district (or all villages) from their latest
+    indicators in one vectorized RiskCalculator pass. Highest risk first.
+    """
+    scores = _region_results(lambda store: store.score(
+        store.select(state_id=state_id, district_id=district_id), executor=compute.executor), state_id, district_id)
+    # Ties by village id, so the order does not depend on how shards are gathered
+    order = np.lexsort((scores["village_id"], -scores["overall_risk_score"]))
+    return [
+        {
+            "village_id": int(scores["village_id"][i]),
+            "overall_risk_score": round(float(scores["overall_risk_score"][i]), 1),
+            "flood_risk": round(float(scores["flood_risk"][i]), 1),
+            "cyclone_risk": round(float(scores["cyclone_risk"][i]), 1),
+            "rainfall_risk": round(float(scores["rainfall_risk"][i]), 1),
+            "erosion_risk": round(float(scores["erosion_risk"][i]), 1),
+            "risk_category": scores["risk_category"][i],
+        }
+        for i in order.tolist()
+    ]
+
+@router.get("/sensitivity", response_model=schemas.SensitivityReport)
+def get_region_risk_sensitivity(
+    state_id: Optional[int] = None,
+    district_id: Optional[int] = None,
+    target: str = "overall_risk_score",
+    actionable: List[str] = Query(list(sensitivity.DEFAULT_ACTIONABLE)),
+    improvement: Optional[float] = Query(None, gt=0),
+    limit: Optional[int] = Query(None, ge=1),
+    db: Session = Depends(get_db)
+):
+    """
+    Per-indicator contribution to each risk score for every village of a region,
+    the marginal effect of each indicator on each score, and the reduction of
+    `target` achievable by improving the `actionable` indicators by up to
+    `improvement` points (fully, when omitted). Biggest achievable reduction first.
+    """
+    if target not in RiskCalculator.SCORES:
+        raise HTTPException(status_code=422, detail=f"target must be one of {', '.join(RiskCalculator.SCORES)}")
+    unknown = sorted(set(actionable) - set(RiskCalculator.INDICATORS))
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown indicator(s): {', '.join(unknown)}")
+
+    result = _region_results(lambda store: sensitivity.analyze(
+        store, store.select(state_id=state_id, district_id=district_id),
+        target=target, actionable=actionable, improvement=improvement, executor=compute.executor),
+        state_id, district_id)
+    order = np.lexsort((result["village_id"], -result["total_reduction"]))[:limit]
+    village_ids = result["village_id"][order].tolist()
+    names = dict(db.query(models.Village.id, models.Village.name).filter(models.Village.id.in_(village_ids)))
+
+    indicators = RiskCalculator.INDICATORS
+    villages = []
+    for i, village_id in zip(order.tolist(), village_ids):
+        reduction = result["reduction"][i]
+        villages.append({
+            "village_id": village_id,
+            "name": names.get(village_id, ""),
+            "scores": {s: round(float(v), 2) for s, v in zip(RiskCalculator.SCORES, result["scores"][i])},
+            "contributions": {
+                s: {ind: round(float(v), 3) for ind, v in zip(indicators, row)}
+                for s, row in zip(RiskCalculator.SCORES, result["contributions"][i])
+            },
+            "reductions": {ind: round(float(reduction[j]), 3) for j, ind in enumerate(indicators) if ind in actionable},
+            "total_reduction": round(float(result["total_reduction"][i]), 3),
+            "best_indicator": indicators[int(np.argmax(reduction))] if reduction.max() > 0 else None,
+        })
+    return {
+        "target": target,
+        "actionable": list(actionable),
+        "improvement": improvement,
+        "marginal_effects": sensitivity.marginal_effects(),
+        "villages": villages,
+    }
+
+@router.get("/point", response_model=schemas.PointRisk)
+def get_point_risk(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180)
+):
+    """
+    Risk scores at an arbitrary location, interpolated (inverse-distance weighted)
+    from the latest assessments of the nearest villages. Estimates are null when
+    no assessed village is within range.
+    """
+    result = risk_surface.point(_all_stores(), lat, lng)
+    return {"latitude": lat, "longitude": lng, **result}
+
+@router.get("/raster", response_class=Response, responses={200: {"content": {"application/octet-stream": {}}}})
+def get_risk_raster(
+    south: float = Query(..., ge=-90, le=90),
+    west: float = Query(..., ge=-180, le=180),
+    north: float = Query(..., ge=-90, le=90),
+    east: float = Query(..., ge=-180, le=180),
+    resolution: float = 0.01,
+    score: str = "overall_risk_score"
+):
+    """
+    Interpolated risk surface over a bounding box as a little-endian float32 grid,
+    northernmost row first, NaN where no village is within range. The box is
+    snapped outward to whole cells; X-Raster-Width/Height and X-Raster-Bounds
+    (west,south,east,north) describe the returned grid.
+    """
+    if score not in RiskCalculator.SCORES:
+        raise HTTPException(status_code=422, detail=f"score must be one of {', '.join(RiskCalculator.SCORES)}")
+    if resolution not in RESOLUTIONS:
+        raise HTTPException(status_code=422, detail=f"resolution must be one of {', '.join(map(str, RESOLUTIONS))}")
+    if south >= north or west >= east:
+        raise HTTPException(status_code=422, detail="Bounding box must have south < north and west < east")
+    if (north - south) * (east - west) / resolution ** 2 > settings.RASTER_MAX_CELLS:
+        raise HTTPException(status_code=422, detail="Bounding box too large for this resolution")
+
+    grid, bounds = risk_surface.raster(_all_stores(), score, resolution, south, west, north, east)
+    return Response(
+        content=grid.astype("<f4", copy=False).tobytes(),
+        media_type="application/octet-stream",
+        headers={
+            "X-Raster-Width": str(grid.shape[1]),
+            "X-Raster-Height": str(grid.shape[0]),
+            "X-Raster-Bounds": ",".join(f"{b:.6f}" for b in bounds),
+            "X-Raster-Resolution": str(resolution),
+        },
+    )
+
 @router.post("/calculate")
 def calculate_custom_risk(
     environmental: dict = Body(..., example={"sea_level_rise": 5, "cyclone_frequency": 2, "storm_surge_height": 3, "erosion_rate": 4, "extreme_rainfall": 6}),
@@ -1,12 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app import crud, schemas
-from app.database import get_db
+from app.core.sharding import get_village_db
 
 router = APIRouter()
 
 @router.get("/{village_id}", response_model=schemas.RiskAssessment)
-def read_risk_assessment(village_id: int, db: Session = Depends(get_db)):
+def read_risk_assessment(village_id: int, db: Session = Depends(get_village_db)):
     assessment = crud.get_latest_risk_assessment(db, village_id=village_id)
     if assessment is None:
         raise HTTPException(status_code=404, detail="Risk Assessment not found for this village")
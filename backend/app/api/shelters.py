@@ -0,0 +1,106 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List
+from app import crud, schemas
+from app.core.sharding import get_district_db, get_village_db, router as shard_router
+from app.core.shelters import planner_for
+
+router = APIRouter()
+
+
+def _allocations(planner, plan: dict) -> dict:
+    """A village's plan with each allocated shelter's details."""
+    shelters = []
+    for allocation in plan["shelters"]:
+        shelter = planner.shelters[allocation["shelter_id"]]
+        shelters.append({
+            "shelter_id": allocation["shelter_id"],
+            "name": shelter["name"],
+            "latitude": shelter["latitude"],
+            "longitude": shelter["longitude"],
+            "distance_km": allocation["distance_km"],
+            "evacuees": allocation["evacuees"],
+            "contact": shelter["contact"],
+            "facilities": shelter["facilities"],
+        })
+    return {**plan, "shelters": shelters}
+
+
+def _shelter(planner, shelter_id: int, assigned: int) -> dict:
+    return {**planner.shelters[shelter_id], "assigned": assigned}
+
+
+def _held_by_other_shard(shelter_id: int, shard: str) -> bool:
+    others = [name for name in shard_router.names() if name != shard]
+    return bool(others) and any(shard_router.scatter(lambda db: crud.get_shelter(db, shelter_id) is not None, others))
+
+
+@router.get("/village/{village_id}", response_model=schemas.VillageShelterPlan)
+def read_village_shelters(village_id: int, db: Session = Depends(get_village_db)):
+    """
+    Shelters this village evacuates to, nearest first, with the number of its
+    evacuees each one takes. `unassigned` evacuees found no shelter with room
+    within SHELTER_MAX_DISTANCE_KM.
+    """
+    planner = planner_for(db)
+    plan = planner.village_plan(db, village_id)
+    if plan is None:
+        raise HTTPException(status_code=404, detail="Village not found")
+    return _allocations(planner, plan)
+
+
+@router.get("/district/{district_id}", response_model=schemas.DistrictShelterPlan)
+def read_district_shelters(district_id: int, db: Session = Depends(get_district_db)):
+    """The district's shelter plan: every shelter with its load and every village's allocation."""
+    planner = planner_for(db)
+    plan = planner.district_plan(db, district_id)
+    villages = [_allocations(planner, village) for village in plan.villages.values()]
+    return {
+        "district_id": district_id,
+        "evacuees": sum(v["evacuees"] for v in villages),
+        "unassigned": sum(v["unassigned"] for v in villages),
+        "planned_at": plan.planned_at,
+        "shelters": [_shelter(planner, shelter_id, assigned) for shelter_id, assigned in plan.assigned.items()],
+        "villages": villages,
+    }
+
+
+@router.post("/", response_model=schemas.Shelter)
+def create_shelter(shelter: schemas.ShelterCreate):
+    """Register a shelter; the district is replanned on its next lookup."""
+    db = shard_router.session(shard_router.shard_for_district(shelter.district_id))
+    try:
+        db_shelter = crud.create_shelter(db, shelter)
+        return {**shelter.model_dump(), "id": db_shelter.id, "assigned": 0}
+    finally:
+        db.close()
+
+
+@router.put("/{shelter_id}", response_model=schemas.Shelter)
+def update_shelter(shelter_id: int, shelter: schemas.ShelterCreate):
+    """
+    Update a shelter (e.g. its capacity); the district is replanned on its next
+    lookup. Shelters live in their state's shard, so a shelter cannot be moved
+    to a district of a state on another shard (409); register it there instead.
+    """
+    shard = shard_router.shard_for_district(shelter.district_id)
+    db = shard_router.session(shard)
+    try:
+        db_shelter = crud.update_shelter(db, shelter_id, shelter)
+        if db_shelter is None:
+            if _held_by_other_shard(shelter_id, shard):
+                raise HTTPException(status_code=409, detail="Shelter belongs to another state's shard; "
+                                                            "register it in the new district instead")
+            raise HTTPException(status_code=404, detail="Shelter not found")
+        plan = planner_for(db).district_plan(db, shelter.district_id)
+        return {**shelter.model_dump(), "id": shelter_id, "assigned": plan.assigned.get(shelter_id, 0)}
+    finally:
+        db.close()
+
+
+@router.get("/", response_model=List[schemas.Shelter])
+def read_shelters(district_id: int, db: Session = Depends(get_district_db)):
+    """A district's shelters with the number of evacuees currently assigned to each."""
+    planner = planner_for(db)
+    plan = planner.district_plan(db, district_id)
+    return [_shelter(planner, shelter_id, assigned) for shelter_id, assigned in plan.assigned.items()]
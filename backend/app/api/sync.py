@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from app import schemas
+from app.api.risk import risk_profile
+from app.core import changelog
+from app.core.config import settings
+from app.core.sharding import CATALOG, router as shard_router
+from app.database import get_db
+
+router = APIRouter()
+
+@router.get("/sync", response_model=schemas.SyncPage)
+def sync_changes(
+    since: Optional[int] = Query(None, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    db: Session = Depends(get_db)
+):
+    """
+    Villages whose indicators, assessment or forecast changed after change
+    version `since`, with their current risk profile. Call again with the
+    returned `version` while `more` is true. A client that has never synced
+    (no `since`), or whose `since` predates the compacted log, gets
+    `full_resync` and no villages: it refetches everything, then syncs from
+    `version`. Profiles are read from the database, so they are never older
+    than the version they are returned with.
+    """
+    # Publish shard entries that a failed or interrupted post-commit move left in an outbox
+    for name, shard_engine in shard_router.engines.items():
+        if name != CATALOG:
+            changelog.drain(shard_engine)
+
+    current = changelog.current_version(db)
+    if since is None or since < changelog.floor(db) or since > current:
+        return {"since": since or 0, "version": current, "full_resync": True, "more": False, "villages": []}
+
+    changed, version, more = changelog.changes_since(db, since, limit or settings.SYNC_PAGE_SIZE)
+    profiles = {}
+    for shard, village_ids in shard_router.group_villages([c[0] for c in changed]).items():
+        shard_db = shard_router.session(shard)
+        try:
+            for village_id in village_ids:
+                try:
+                    # Not coalesced: a computation started before `version` was read could predate the change
+                    profiles[village_id] = risk_profile(shard_db, village_id, coalesce=False)
+                except HTTPException:
+                    profiles[village_id] = None
+        finally:
+            shard_db.close()
+
+    return {
+        "since": since,
+        "version": version,
+        "full_resync": False,
+        "more": more,
+        "villages": [
+            {"village_id": village_id, "version": village_version, "changed": kinds, "profile": profiles[village_id]}
+            for village_id, village_version, kinds in changed
+        ],
+    }
@@ -0,0 +1,247 @@
+"""
+Admission control for surge traffic.
+
+Every request is put in a priority class by its route template:
+  - critical: life-safety lookups (village risk profile, shelter assignment,
+    location lists, /api/sync) and health/metrics;
+  - low: expensive work (forecast simulations, region-wide scoring and
+    sensitivity, rasters, clustering, batch reports, legacy routes);
+  - normal: everything else.
+ROUTE_PRIORITIES holds the defaults and ADMISSION_ROUTE_PRIORITIES adds or
+overrides patterns (fnmatch over route templates, checked first).
+
+Each class runs at most ADMISSION_LIMITS[class] requests at a time. Requests
+over the limit wait in the class's queue, which holds at most
+ADMISSION_QUEUE_LIMITS[class] requests. Queue time drives shedding, CoDel-style:
+a class is overloaded once the shortest queue wait seen during an
+ADMISSION_INTERVAL_MS window exceeded ADMISSION_TARGET_DELAY_MS, i.e. its queue
+never drained in that window. While a class is overloaded:
+  - its waiting normal/low requests are shed after the target delay instead
+    of after a full interval, and the queue is served newest first (requests
+    that have waited longest are the likeliest to have been abandoned);
+  - every lower class sheds new requests outright, so cheap critical lookups
+    are not starved by expensive work.
+Critical requests are only refused when their queue is full or after
+ADMISSION_CRITICAL_MAX_WAIT_SECONDS. Refused requests get 503 with
+Retry-After. Every decision is counted in hydro_admission_decisions_total.
+"""
+import asyncio
+import fnmatch
+import json
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.instrumentation import RouteTemplates
+from app.core.metrics import REGISTRY
+
+ADMISSION_DECISIONS = REGISTRY.counter(
+    "hydro_admission_decisions_total",
+    "Admission decisions by priority class: admitted, queued (admitted after waiting) or shed (by reason).",
+    ("priority", "decision"))
+ADMISSION_QUEUE_WAIT = REGISTRY.histogram(
+    "hydro_admission_queue_wait_seconds", "Time admitted requests waited for a slot in their class.", ("priority",))
+ADMISSION_IN_FLIGHT = REGISTRY.gauge(
+    "hydro_admission_in_flight", "Requests running per priority class.", ("priority",))
+ADMISSION_QUEUED = REGISTRY.gauge(
+    "hydro_admission_queue_length", "Requests waiting for a slot per priority class.", ("priority",))
+ADMISSION_OVERLOADED = REGISTRY.gauge(
+    "hydro_admission_overloaded", "1 while a priority class is shedding on queue time.", ("priority",))
+
+# Highest first
+PRIORITIES = ("critical", "normal", "low")
+
+# (route template pattern, class); the first match wins, unmatched routes are "normal"
+ROUTE_PRIORITIES: Tuple[Tuple[str, str], ...] = (
+    ("/", "critical"),
+    ("/metrics", "critical"),
+    ("/api/risk/village/{village_id}", "critical"),
+    ("/api/shelters/village/{village_id}", "critical"),
+    ("/api/states", "critical"),
+    ("/api/districts/*", "critical"),
+    ("/api/villages/*", "critical"),
+    ("/api/locations/*", "critical"),
+    ("/api/sync", "critical"),
+    ("/api/predictions/*", "low"),
+    ("/api/risk/scores", "low"),
+    ("/api/risk/sensitivity", "low"),
+    ("/api/risk/raster", "low"),
+    ("/api/analytics/clusters", "low"),
+    ("/api/reports/*", "low"),
+    ("/api/villages-legacy/*", "low"),
+    ("/debug/*", "low"),
+)
+
+
+class Shed(Exception):
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class PriorityClass:
+    """Concurrency limit, wait queue and CoDel state of one priority class."""
+
+    def __init__(self, name: str, limit: int, queue_limit: int, sheddable: bool):
+        self.name = name
+        self.limit = limit
+        self.queue_limit = queue_limit
+        self.sheddable = sheddable
+        self.in_flight = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.overloaded = False
+        self._interval_start = time.monotonic()
+        self._min_delay: Optional[float] = None
+
+    def _observe_delay(self, delay: float, now: float):
+        """CoDel: overloaded iff the smallest queue wait in the last interval was above the target."""
+        self._min_delay = delay if self._min_delay is None else min(self._min_delay, delay)
+        if now - self._interval_start >= settings.ADMISSION_INTERVAL_MS / 1000.0:
+            self.overloaded = self._min_delay > settings.ADMISSION_TARGET_DELAY_MS / 1000.0
+            ADMISSION_OVERLOADED.set(1.0 if self.overloaded else 0.0, priority=self.name)
+            self._interval_start = now
+            self._min_delay = None
+
+    def refresh(self, now: float) -> bool:
+        """Clear a stale overload once the queue is empty and a full interval passed without waits."""
+        if self.overloaded and not self.waiters and \
+                now - self._interval_start >= settings.ADMISSION_INTERVAL_MS / 1000.0:
+            self.overloaded = False
+            ADMISSION_OVERLOADED.set(0.0, priority=self.name)
+            self._interval_start = now
+            self._min_delay = None
+        return self.overloaded
+
+    def _max_wait(self) -> float:
+        if not self.sheddable:
+            return settings.ADMISSION_CRITICAL_MAX_WAIT_SECONDS
+        if self.overloaded:
+            return settings.ADMISSION_TARGET_DELAY_MS / 1000.0
+        return settings.ADMISSION_INTERVAL_MS / 1000.0
+
+    async def acquire(self) -> str:
+        """Wait for a slot; returns "admitted" or "queued", raises Shed when refused."""
+        now = time.monotonic()
+        if self.in_flight < self.limit and not self.waiters:
+            self.in_flight += 1
+            self._observe_delay(0.0, now)
+            return "admitted"
+        if len(self.waiters) >= self.queue_limit:
+            raise Shed("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        ADMISSION_QUEUED.set(len(self.waiters), priority=self.name)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self._max_wait())
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                waiter.cancel()
+                raise Shed("queue_timeout")
+            # Handed a slot just as the wait timed out: keep it
+        except asyncio.CancelledError:
+            # Client went away while waiting; pass on a slot it was handed
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            try:
+                self.waiters.remove(waiter)
+            except ValueError:
+                pass
+            ADMISSION_QUEUED.set(len(self.waiters), priority=self.name)
+        now_after = time.monotonic()
+        ADMISSION_QUEUE_WAIT.observe(now_after - now, priority=self.name)
+        self._observe_delay(now_after - now, now_after)
+        return "queued"
+
+    def release(self):
+        # Hand the slot straight to a waiter: oldest first normally, newest first while overloaded
+        while self.waiters:
+            waiter = self.waiters.pop() if self.overloaded else self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+
+class AdmissionController:
+    def __init__(self, limits: Optional[Dict[str, int]] = None, queue_limits: Optional[Dict[str, int]] = None,
+                 routes: Optional[Dict[str, str]] = None):
+        limits = limits or settings.ADMISSION_LIMITS
+        queue_limits = queue_limits or settings.ADMISSION_QUEUE_LIMITS
+        self.classes = {
+            name: PriorityClass(name, limits[name], queue_limits[name], sheddable=name != "critical")
+            for name in PRIORITIES
+        }
+        routes = settings.ADMISSION_ROUTE_PRIORITIES if routes is None else routes
+        self.patterns = tuple(routes.items()) + ROUTE_PRIORITIES
+        self._by_route: Dict[str, str] = {}
+
+    def priority(self, route: str) -> str:
+        priority = self._by_route.get(route)
+        if priority is None:
+            priority = next((p for pattern, p in self.patterns if fnmatch.fnmatchcase(route, pattern)), "normal")
+            self._by_route[route] = priority
+        return priority
+
+    def higher_overloaded(self, priority: str) -> bool:
+        now = time.monotonic()
+        return any(self.classes[p].refresh(now) for p in PRIORITIES[:PRIORITIES.index(priority)])
+
+    async def acquire(self, priority: str) -> str:
+        cls = self.classes[priority]
+        if cls.sheddable and self.higher_overloaded(priority):
+            raise Shed("priority")
+        decision = await cls.acquire()
+        ADMISSION_IN_FLIGHT.set(cls.in_flight, priority=priority)
+        return decision
+
+    def release(self, priority: str):
+        cls = self.classes[priority]
+        cls.release()
+        ADMISSION_IN_FLIGHT.set(cls.in_flight, priority=priority)
+
+
+async def _send_busy(send, retry_after: float):
+    body = json.dumps({"detail": "Server busy, retry shortly"}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, round(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware applying per-route priority admission control."""
+
+    def __init__(self, app, router_app=None, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.routes = RouteTemplates(router_app or app)
+        self.controller = controller or AdmissionController()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        priority = self.controller.priority(self.routes.resolve(scope["path"]))
+        try:
+            decision = await self.controller.acquire(priority)
+        except Shed as shed:
+            ADMISSION_DECISIONS.inc(priority=priority, decision=f"shed_{shed.reason}")
+            await _send_busy(send, settings.ADMISSION_RETRY_AFTER_SECONDS)
+            return
+        ADMISSION_DECISIONS.inc(priority=priority, decision=decision)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(priority)
@@ -0,0 +1,269 @@
+"""
+Change log behind /api/sync.
+
+Every commit that writes indicator, assessment or forecast rows appends one
+entry per (village, kind) to change_log. Entries get a monotonically increasing
+version, so a client that remembers the last version it saw can ask for the
+villages changed after it. Writes are captured by session events, not in crud:
+  - ORM objects are collected at flush;
+  - bulk insert/update/delete statements executed through a session are
+    attributed from their parameters or their `village_id` filter.
+A statement that cannot be attributed to villages appends a reset entry and
+raises the floor, so clients synced before it are told to resync fully.
+
+Entries live in the catalog database. A catalog session appends them in its
+own transaction. A shard session writes them to its own change_outbox table in
+the same transaction as the data, and once that commits they are moved to the
+catalog (`drain`). An entry therefore never becomes visible before its data,
+and a rolled-back shard write never records one. If the move fails (or the
+process dies), the entries stay in the outbox and are published by the next
+drain of that shard, which /api/sync runs before reading: a change can be
+published late, never missed.
+
+`compact` keeps only the newest entry per (village, kind), which loses
+nothing. It also drops entries older than CHANGE_LOG_RETENTION_DAYS and
+raises the floor to the newest version it dropped.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import BindParameter, delete, event, func, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.elements import BinaryExpression
+
+from app import models
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.database import SessionLocal, engine
+
+logger = logging.getLogger("hydro_hub.changelog")
+
+CHANGES_RECORDED = REGISTRY.counter(
+    "hydro_change_log_entries_total", "Change log entries appended, by kind.", ("kind",))
+
+# Tracked tables and the kind their writes are recorded as
+TRACKED = {
+    models.EnvironmentalData.__table__: "environmental",
+    models.SettlementData.__table__: "settlement",
+    models.RiskAssessment.__table__: "assessment",
+    models.Prediction.__table__: "forecast",
+    models.ForecastRun.__table__: "forecast",
+}
+
+RESET = "reset"
+
+_PENDING = "changelog.pending"
+_OUTBOX = "changelog.outbox"
+
+
+def _pending(session: Session) -> Set[Tuple[Optional[int], str]]:
+    return session.info.setdefault(_PENDING, set())
+
+
+def _filtered_villages(statement) -> Optional[Set[int]]:
+    """Village ids an UPDATE/DELETE is restricted to by `village_id == x` / `village_id IN (...)`."""
+    if statement.whereclause is None:
+        return None
+    villages: Set[int] = set()
+    for element in visitors.iterate(statement.whereclause):
+        if isinstance(element, BinaryExpression) and getattr(element.left, "name", None) == "village_id" \
+                and isinstance(element.right, BindParameter):
+            value = element.right.effective_value
+            villages.update(value if isinstance(value, (list, tuple, set)) else [value])
+    return villages or None
+
+
+def _statement_villages(session: Session, table, statement, parameters) -> Optional[Set[int]]:
+    rows = parameters if isinstance(parameters, list) else [parameters] if parameters else []
+    if rows and all("village_id" in row for row in rows):
+        return {row["village_id"] for row in rows}
+    if rows and all("id" in row for row in rows) and "id" in table.c:
+        # Bulk update by primary key without the village column
+        ids = [row["id"] for row in rows]
+        return set(session.execute(select(table.c.village_id).where(table.c.id.in_(ids))).scalars())
+    if not statement.is_insert:
+        return _filtered_villages(statement)
+    return None
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_statement(state):
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    table = getattr(state.statement, "table", None)
+    kind = TRACKED.get(table)
+    if kind is None:
+        return
+    villages = _statement_villages(state.session, table, state.statement, state.parameters)
+    pending = _pending(state.session)
+    if villages is None:
+        pending.add((None, RESET))
+    else:
+        pending.update((village_id, kind) for village_id in villages)
+
+
+@event.listens_for(Session, "before_flush")
+def _record_objects(session, flush_context, instances):
+    pending = None
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        kind = TRACKED.get(getattr(type(obj), "__table__", None))
+        if kind is not None and obj.village_id is not None:
+            pending = pending if pending is not None else _pending(session)
+            pending.add((obj.village_id, kind))
+
+
+@event.listens_for(Session, "before_commit")
+def _write_entries(session):
+    if session.info.get(_PENDING) is None and not session.new and not session.dirty and not session.deleted:
+        return
+    # Commit flushes after this hook; flush now so pending objects are recorded in this transaction
+    session.flush()
+    pending = session.info.pop(_PENDING, None)
+    if not pending:
+        return
+    if session.get_bind() is engine:
+        append(session, pending)
+        return
+    # Shard: commit the entries with the data, publish them to the catalog after the commit
+    session.execute(insert(models.ChangeOutbox), [{"village_id": v, "kind": k} for v, k in _ordered(pending)])
+    session.info[_OUTBOX] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_entries(session):
+    if session.info.pop(_OUTBOX, None):
+        try:
+            drain(session.get_bind())
+        except Exception:
+            logger.exception("Publishing change log entries failed; they stay in the outbox until the next drain")
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_entries(session, previous_transaction):
+    session.info.pop(_PENDING, None)
+    session.info.pop(_OUTBOX, None)
+
+
+def drain(bind) -> int:
+    """Move a shard's committed outbox entries to the catalog change log; returns how many."""
+    outbox = models.ChangeOutbox.__table__
+    with bind.connect() as connection:
+        rows = connection.execute(select(outbox.c.id, outbox.c.village_id, outbox.c.kind)
+                                  .order_by(outbox.c.id)).all()
+    if not rows:
+        return 0
+    catalog = SessionLocal()
+    try:
+        append(catalog, {(row.village_id, row.kind) for row in rows})
+        catalog.commit()
+    finally:
+        catalog.close()
+    # A failure from here on only re-publishes these entries: a spurious refetch, not a missed change
+    with bind.begin() as connection:
+        connection.execute(delete(outbox).where(outbox.c.id <= rows[-1].id))
+    return len(rows)
+
+
+def _state(db: Session) -> models.ChangeLogState:
+    state = db.get(models.ChangeLogState, 1)
+    if state is None:
+        state = models.ChangeLogState(id=1, floor=0)
+        db.add(state)
+    return state
+
+
+def _ordered(changes: Iterable[Tuple[Optional[int], str]]) -> List[Tuple[Optional[int], str]]:
+    return sorted(changes, key=lambda c: (c[0] is None, c[0] or 0, c[1]))
+
+
+def append(db: Session, changes: Iterable[Tuple[Optional[int], str]]):
+    """Append entries (village id, kind) to the change log in `db`'s transaction."""
+    changes = _ordered(changes)
+    village_changes = [{"village_id": v, "kind": k} for v, k in changes if k != RESET]
+    if village_changes:
+        db.execute(insert(models.ChangeLog), village_changes)
+        for change in village_changes:
+            CHANGES_RECORDED.inc(kind=change["kind"])
+    if any(k == RESET for _, k in changes):
+        reset = models.ChangeLog(village_id=None, kind=RESET)
+        db.add(reset)
+        db.flush()
+        _state(db).floor = reset.version
+        CHANGES_RECORDED.inc(kind=RESET)
+
+
+def current_version(db: Session) -> int:
+    return db.execute(select(func.coalesce(func.max(models.ChangeLog.version), 0))).scalar()
+
+
+def floor(db: Session) -> int:
+    state = db.get(models.ChangeLogState, 1)
+    return state.floor if state is not None else 0
+
+
+def villages_changed_after(since: int, kinds: Iterable[str]) -> Tuple[Optional[Set[int]], int]:
+    """
+    Villages with entries of `kinds` after version `since` and the newest version
+    read, from the catalog. None instead of the villages when a reset entry was
+    appended or compaction dropped entries after `since`: the reader reloads fully.
+    """
+    catalog = SessionLocal()
+    try:
+        version = current_version(catalog)
+        if since < floor(catalog):
+            return None, version
+        rows = catalog.execute(
+            select(models.ChangeLog.village_id, models.ChangeLog.kind)
+            .where(models.ChangeLog.version > since, models.ChangeLog.version <= version,
+                   models.ChangeLog.kind.in_([*kinds, RESET]))
+        ).all()
+    finally:
+        catalog.close()
+    if any(row.kind == RESET for row in rows):
+        return None, version
+    return {row.village_id for row in rows}, version
+
+
+def changes_since(db: Session, since: int, limit: int) -> Tuple[List[Tuple[int, int, List[str]]], int, bool]:
+    """
+    Villages changed after `since`, oldest change first: ([(village_id, version, kinds)], version, more).
+    At most `limit` entries are read; `version` is the last one read, from which to continue when `more`.
+    """
+    rows = db.execute(
+        select(models.ChangeLog.version, models.ChangeLog.village_id, models.ChangeLog.kind)
+        .where(models.ChangeLog.version > since)
+        .order_by(models.ChangeLog.version)
+        .limit(limit)
+    ).all()
+    villages: Dict[int, Dict[str, Any]] = {}
+    for version, village_id, kind in rows:
+        if village_id is None:
+            continue
+        entry = villages.setdefault(village_id, {"version": version, "kinds": set()})
+        entry["version"] = version
+        entry["kinds"].add(kind)
+    changed = sorted(((v, e["version"], sorted(e["kinds"])) for v, e in villages.items()), key=lambda c: c[1])
+    return changed, rows[-1].version if rows else since, len(rows) == limit
+
+
+def compact(db: Session, retention_days: Optional[int] = None) -> Dict[str, int]:
+    """Drop superseded entries and entries older than the retention; returns counts and the new floor."""
+    retention_days = settings.CHANGE_LOG_RETENTION_DAYS if retention_days is None else retention_days
+    newest = select(func.max(models.ChangeLog.version)).group_by(models.ChangeLog.village_id, models.ChangeLog.kind)
+    superseded = db.execute(
+        delete(models.ChangeLog).where(models.ChangeLog.version.not_in(newest.scalar_subquery()))
+    ).rowcount
+
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    expired_floor = db.execute(
+        select(func.max(models.ChangeLog.version)).where(models.ChangeLog.changed_at < cutoff)).scalar()
+    expired = 0
+    state = _state(db)
+    if expired_floor is not None:
+        expired = db.execute(delete(models.ChangeLog).where(models.ChangeLog.version <= expired_floor)).rowcount
+        state.floor = max(state.floor or 0, expired_floor)
+    state.compacted_at = datetime.utcnow()
+    db.commit()
+    return {"superseded": superseded, "expired": expired, "floor": state.floor}
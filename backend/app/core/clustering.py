@@ -0,0 +1,249 @@
+"""
+Clustering of villages by hazard signature.
+
+Every village with complete inputs is described by its component risks
+(flood, cyclone, rainfall, erosion, as scored from its latest indicators)
+and the indicators themselves. Features are z-scored so that no single
+unit (people/km², metres, events/year) dominates the distances, then grouped
+with k-means:
+  - Lloyd iterations over the whole (villages x features) matrix, with
+    distances from ||x||² - 2 x·c + ||c||² as one matrix product;
+  - mini-batch k-means (Sculley 2010) once there are more than
+    CLUSTER_MINIBATCH_THRESHOLD villages, followed by one full assignment pass.
+
+Results are cached per k and keyed on the village stores' versions. When
+indicators or assessments change, the next request restarts k-means from the
+previous centroids (in original units, re-standardized), which usually
+converges in a few iterations and keeps cluster numbers stable. Cold starts use
+k-means++ seeding and number clusters from the highest mean component risk down.
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.core.village_store import ENVIRONMENTAL_COLUMNS, SETTLEMENT_COLUMNS, VillageStore
+
+COMPONENT_RISKS = ("flood_risk", "cyclone_risk", "rainfall_risk", "erosion_risk")
+FEATURES = COMPONENT_RISKS + ENVIRONMENTAL_COLUMNS + SETTLEMENT_COLUMNS
+
+CLUSTER_RUNS = REGISTRY.counter(
+    "hydro_cluster_runs_total", "k-means runs of the village clustering, by start.", ("start",))
+CLUSTER_SECONDS = REGISTRY.histogram(
+    "hydro_cluster_seconds", "Time to (re)cluster every village.", ("start",))
+
+
+def features(stores: Sequence[VillageStore]) -> Dict[str, np.ndarray]:
+    """Feature matrix of every scoreable village across the stores, with ids and regions."""
+    parts = []
+    for store in stores:
+        rows = store.complete_rows(store.select())
+        scores = store.score(rows)
+        parts.append({
+            "village_id": scores["village_id"],
+            "state_id": store.columns["state_id"][rows],
+            "district_id": store.columns["district_id"][rows],
+            "x": np.column_stack(
+                [scores[c] for c in COMPONENT_RISKS] + [store.columns[c][rows] for c in FEATURES[len(COMPONENT_RISKS):]]
+            ) if len(rows) else np.zeros((0, len(FEATURES))),
+        })
+    return {key: np.concatenate([p[key] for p in parts]) for key in parts[0]} if parts else \
+        {"village_id": np.zeros(0, np.int64), "state_id": np.zeros(0, np.int64),
+         "district_id": np.zeros(0, np.int64), "x": np.zeros((0, len(FEATURES)))}
+
+
+# --- k-means (pure array functions; picklable for the compute executor) ---
+
+def _sq_distances(x: np.ndarray, x_sq: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    d = x_sq[:, None] - 2.0 * (x @ centroids.T) + (centroids * centroids).sum(axis=1)[None, :]
+    return np.maximum(d, 0.0)
+
+
+def _assign(x: np.ndarray, x_sq: np.ndarray, centroids: np.ndarray, chunk: int = 65536) -> Tuple[np.ndarray, np.ndarray]:
+    """Nearest centroid and squared distance per row, in chunks to bound the distance matrix."""
+    labels = np.empty(len(x), dtype=np.int64)
+    distances = np.empty(len(x))
+    for start in range(0, len(x), chunk):
+        d = _sq_distances(x[start:start + chunk], x_sq[start:start + chunk], centroids)
+        labels[start:start + chunk] = d.argmin(axis=1)
+        distances[start:start + chunk] = d[np.arange(len(d)), labels[start:start + chunk]]
+    return labels, distances
+
+
+def _sums(x: np.ndarray, labels: np.ndarray, k: int) -> np.ndarray:
+    """Per-cluster sums of the rows of x."""
+    return np.column_stack([np.bincount(labels, weights=x[:, f], minlength=k) for f in range(x.shape[1])])
+
+
+def _kmeans_plus_plus(x: np.ndarray, x_sq: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    sample = x if len(x) <= 20000 else x[rng.choice(len(x), 20000, replace=False)]
+    sample_sq = (sample * sample).sum(axis=1)
+    centroids = [sample[rng.integers(len(sample))]]
+    closest = _sq_distances(sample, sample_sq, np.array(centroids))[:, 0]
+    for _ in range(1, k):
+        total = closest.sum()
+        pick = rng.choice(len(sample), p=closest / total) if total > 0 else rng.integers(len(sample))
+        centroids.append(sample[pick])
+        closest = np.minimum(closest, _sq_distances(sample, sample_sq, sample[pick][None, :])[:, 0])
+    return np.array(centroids)
+
+
+def _reseed_empty(x: np.ndarray, centroids: np.ndarray, counts: np.ndarray, distances: np.ndarray) -> np.ndarray:
+    """Move centroids that lost every point onto the points farthest from their centroid."""
+    empty = np.flatnonzero(counts == 0)
+    if len(empty):
+        far = np.argsort(distances)[::-1][:len(empty)]
+        centroids[empty[:len(far)]] = x[far]
+    return centroids
+
+
+def kmeans(x: np.ndarray, k: int, init: Optional[np.ndarray] = None, seed: int = 0,
+           max_iterations: int = 100, tolerance: float = 1e-4,
+           minibatch_threshold: int = 20000, batch_size: int = 4096) -> Dict[str, np.ndarray]:
+    """
+    k-means of the rows of `x` (already standardized), started from `init` when given.
+    Returns centroids (k x F), labels (N), distances (N; Euclidean), inertia and iterations.
+    """
+    rng = np.random.default_rng(seed)
+    x_sq = (x * x).sum(axis=1)
+    centroids = init.copy() if init is not None else _kmeans_plus_plus(x, x_sq, k, rng)
+    iterations = 0
+
+    if len(x) > minibatch_threshold:
+        # A warm start counts as one batch already seen, so the first batches refine rather than replace it
+        counts = np.full(k, batch_size / k) if init is not None else np.zeros(k)
+        for iterations in range(1, max_iterations + 1):
+            batch = rng.choice(len(x), min(batch_size, len(x)), replace=False)
+            labels, _ = _assign(x[batch], x_sq[batch], centroids)
+            previous = centroids.copy()
+            batch_counts = np.bincount(labels, minlength=k)
+            sums = _sums(x[batch], labels, k)
+            counts += batch_counts
+            moved = batch_counts > 0
+            # Per-centre learning rate 1/count: each centroid is the running mean of the points it has seen
+            rate = batch_counts[moved] / counts[moved]
+            centroids[moved] += rate[:, None] * (sums[moved] / batch_counts[moved, None] - centroids[moved])
+            if np.abs(centroids - previous).max() <= tolerance:
+                break
+        labels, distances = _assign(x, x_sq, centroids)
+    else:
+        labels, distances = _assign(x, x_sq, centroids)
+        for iterations in range(1, max_iterations + 1):
+            counts = np.bincount(labels, minlength=k)
+            sums = _sums(x, labels, k)
+            previous = centroids
+            centroids = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], previous)
+            centroids = _reseed_empty(x, centroids, counts, distances)
+            new_labels, distances = _assign(x, x_sq, centroids)
+            converged = np.array_equal(new_labels, labels) or np.abs(centroids - previous).max() <= tolerance
+            labels = new_labels
+            if converged:
+                break
+
+    return {
+        "centroids": centroids,
+        "labels": labels,
+        "distances": np.sqrt(distances),
+        "inertia": float(distances.sum()),
+        "iterations": iterations,
+    }
+
+
+# --- Cached clustering of every village ---
+
+class Clustering:
+    """One k-means result over every village: centroids in original units plus per-village assignments."""
+
+    def __init__(self, k: int, key: tuple, data: Dict[str, np.ndarray], result: Dict[str, np.ndarray],
+                 mean: np.ndarray, scale: np.ndarray, warm: bool):
+        self.k = k
+        self.key = key
+        self.warm = warm
+        self.iterations = result["iterations"]
+        self.inertia = result["inertia"]
+        self.centroids = result["centroids"] * scale + mean
+        self.labels = result["labels"]
+        self.distances = result["distances"]
+        self.village_ids = data["village_id"]
+        self.state_ids = data["state_id"]
+        self.district_ids = data["district_id"]
+        self.sizes = np.bincount(self.labels, minlength=k) if len(self.labels) else np.zeros(k, dtype=np.int64)
+
+    def dominant_hazard(self, cluster: int) -> str:
+        risks = self.centroids[cluster, :len(COMPONENT_RISKS)]
+        return COMPONENT_RISKS[int(np.argmax(risks))].replace("_risk", "")
+
+    def select(self, state_id: Optional[int] = None, district_id: Optional[int] = None) -> np.ndarray:
+        mask = np.ones(len(self.village_ids), dtype=bool)
+        if state_id is not None:
+            mask &= self.state_ids == state_id
+        if district_id is not None:
+            mask &= self.district_ids == district_id
+        rows = np.flatnonzero(mask)
+        return rows[np.argsort(self.village_ids[rows], kind="stable")]
+
+
+def _standardize(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    mean = x.mean(axis=0) if len(x) else np.zeros(x.shape[1])
+    scale = x.std(axis=0) if len(x) else np.ones(x.shape[1])
+    scale = np.where(scale > 0, scale, 1.0)
+    return (x - mean) / scale, mean, scale
+
+
+def cluster(stores: Sequence[VillageStore], k: int, previous: Optional[Clustering] = None,
+            executor=None) -> Clustering:
+    """Cluster every village of the stores, warm-started from `previous` (same k) when given."""
+    key = tuple(store.version for store in stores)
+    data = features(stores)
+    k = max(1, min(k, len(data["x"]))) if len(data["x"]) else k
+    z, mean, scale = _standardize(data["x"])
+    warm = previous is not None and previous.k == k and len(z) > 0
+    init = (previous.centroids - mean) / scale if warm else None
+    start = "warm" if warm else "cold"
+
+    started = time.perf_counter()
+    if len(z) == 0:
+        result = {"centroids": np.zeros((k, len(FEATURES))), "labels": np.zeros(0, np.int64),
+                  "distances": np.zeros(0), "inertia": 0.0, "iterations": 0}
+    else:
+        args = (z, k, init, settings.CLUSTER_SEED, settings.CLUSTER_MAX_ITERATIONS, 1e-4,
+                settings.CLUSTER_MINIBATCH_THRESHOLD, settings.CLUSTER_BATCH_SIZE)
+        result = executor.run("clusters", kmeans, *args) if executor is not None else kmeans(*args)
+        if not warm:
+            # Stable numbering for a cold start: highest mean component risk first
+            order = np.argsort(-result["centroids"][:, :len(COMPONENT_RISKS)].mean(axis=1), kind="stable")
+            result["centroids"] = result["centroids"][order]
+            result["labels"] = np.argsort(order)[result["labels"]]
+    CLUSTER_RUNS.inc(start=start)
+    CLUSTER_SECONDS.observe(time.perf_counter() - started, start=start)
+    return Clustering(k, key, data, result, mean, scale, warm)
+
+
+class ClusterCache:
+    """Latest clustering per k; recomputed (warm-started) when any store's version changes."""
+
+    def __init__(self):
+        self._results: Dict[int, Clustering] = {}
+        self._lock = threading.Lock()
+
+    def get(self, stores: Sequence[VillageStore], k: int, executor=None) -> Clustering:
+        key = tuple(store.version for store in stores)
+        current = self._results.get(k)
+        if current is not None and current.key == key:
+            return current
+        with self._lock:
+            current = self._results.get(k)
+            if current is None or current.key != key:
+                current = cluster(stores, k, previous=current, executor=executor)
+                self._results[k] = current
+            return current
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+
+cluster_cache = ClusterCache()
@@ -0,0 +1,116 @@
+"""
+Negotiated response compression.
+
+Responses of a compressible type of at least COMPRESSION_MIN_BYTES are
+compressed with the best encoding the client accepts: brotli, then gzip.
+Content-Length, Content-Encoding and Vary are updated to match. Streamed
+responses (zip downloads, job exports), responses that already carry a
+Content-Encoding, and clients that send no Accept-Encoding are passed through
+untouched.
+"""
+import gzip
+from typing import Dict, Optional
+
+import brotli
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+
+COMPRESSED_BYTES = REGISTRY.counter(
+    "hydro_compressed_response_bytes_total", "Response body bytes before and after compression.", ("encoding", "stage"))
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+
+
+def _accepted(header: str) -> Dict[str, float]:
+    """Accept-Encoding codings and their q-values."""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(header: str) -> Optional[str]:
+    accepted = _accepted(header)
+    best, best_q = None, 0.0
+    for coding in ("br", "gzip"):
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_BYTES if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Hold the headers until the body shows whether it is worth compressing
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            held, start = start, None
+            body = message.get("body", b"")
+            headers = [(k, v) for k, v in held.get("headers", [])]
+            content_type = next((v.decode("latin-1") for k, v in headers if k == b"content-type"), "")
+            eligible = (
+                not message.get("more_body", False)
+                and len(body) >= self.minimum_size
+                and content_type.startswith(COMPRESSIBLE_TYPES)
+                and not any(k == b"content-encoding" for k, _ in headers)
+            )
+            if eligible:
+                compressed = compress(body, encoding)
+                COMPRESSED_BYTES.inc(len(body), encoding=encoding, stage="identity")
+                COMPRESSED_BYTES.inc(len(compressed), encoding=encoding, stage="encoded")
+                headers = [(k, v) for k, v in headers if k not in (b"content-length", b"vary")]
+                vary = [v for k, v in held.get("headers", []) if k == b"vary"]
+                headers += [
+                    (b"content-encoding", encoding.encode()),
+                    (b"content-length", str(len(compressed)).encode()),
+                    (b"vary", b", ".join(vary + [b"Accept-Encoding"])),
+                ]
+                body = compressed
+                message = {**message, "body": body}
+            await send({**held, "headers": headers})
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
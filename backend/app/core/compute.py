@@ -0,0 +1,170 @@
+"""
+Dedicated executor for CPU-bound work (forecast simulations, batch risk
+scoring, sensitivity sweeps).
+
+Request handlers run in Starlette's shared threadpool, where CPU-heavy Python
+holds the GIL and starves cheap lookups. Such work is submitted here instead:
+  - COMPUTE_MODE=process (default on GIL builds): a spawn-context process pool
+    of COMPUTE_WORKERS processes. Tasks and results must be picklable, so
+    tasks are plain functions over dicts and numpy arrays.
+    COMPUTE_WORKERS=0 sizes the pool as this server worker's share of the
+    CPUs (cpu_count / WEB_CONCURRENCY), so N server workers do not start
+    N x cpu_count compute processes between them.
+  - COMPUTE_MODE=thread (default on free-threaded builds): a thread pool.
+  - COMPUTE_MODE=inline: run in the calling thread (tests, debugging).
+
+At most COMPUTE_WORKERS + COMPUTE_QUEUE_SIZE tasks may be queued or running.
+Past that, submit() fails fast with ComputeSaturated, which the app answers
+with 503 and Retry-After rather than letting callers pile up. A task still
+running after COMPUTE_TIMEOUT_SECONDS raises ComputeTimeout (504). Queue wait
+and compute time are recorded separately per task name.
+"""
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+
+COMPUTE_QUEUE_WAIT = REGISTRY.histogram(
+    "hydro_compute_queue_wait_seconds", "Time a compute task waited for a worker.", ("task",))
+COMPUTE_TIME = REGISTRY.histogram(
+    "hydro_compute_seconds", "Time a compute task spent running on a worker.", ("task",))
+COMPUTE_IN_FLIGHT = REGISTRY.gauge(
+    "hydro_compute_tasks_in_flight", "Compute tasks queued or running in this worker's executor.")
+COMPUTE_REJECTED = REGISTRY.counter(
+    "hydro_compute_rejected_total", "Compute tasks refused because the executor was saturated.", ("task",))
+COMPUTE_TIMEOUTS = REGISTRY.counter(
+    "hydro_compute_timeouts_total", "Compute tasks the caller stopped waiting for after the timeout.", ("task",))
+
+
+class ComputeSaturated(Exception):
+    """The executor's queue is full; the caller should retry later."""
+
+    def __init__(self, task: str, retry_after: float):
+        super().__init__(f"Compute executor saturated ({task})")
+        self.task = task
+        self.retry_after = retry_after
+
+
+class ComputeTimeout(Exception):
+    """The task did not finish within the timeout; the caller gave up waiting."""
+
+    def __init__(self, task: str, timeout: float):
+        super().__init__(f"Compute task {task} timed out after {timeout:g}s")
+        self.task = task
+        self.timeout = timeout
+
+
+def default_workers() -> int:
+    """This server worker's share of the host's CPUs."""
+    return max(1, (os.cpu_count() or 1) // max(1, settings.WEB_CONCURRENCY))
+
+
+def _free_threaded() -> bool:
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def _timed(fn: Callable, args: tuple, kwargs: dict) -> Tuple[Any, float, float]:
+    """Runs on the worker: (result, wall-clock start, compute seconds)."""
+    started = time.time()
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, started, time.perf_counter() - t0
+
+
+class ComputeExecutor:
+    def __init__(self, mode: Optional[str] = None, workers: Optional[int] = None, queue_size: Optional[int] = None):
+        mode = mode or settings.COMPUTE_MODE
+        if mode == "auto":
+            mode = "thread" if _free_threaded() else "process"
+        self.mode = mode
+        self.workers = workers or settings.COMPUTE_WORKERS or default_workers()
+        self.capacity = self.workers + (settings.COMPUTE_QUEUE_SIZE if queue_size is None else queue_size)
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                if self.mode == "process":
+                    # spawn: forking a threaded server process is unsafe
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+                else:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="compute")
+            return self._pool
+
+    def start(self):
+        """Create the pool and spin its workers up before the first request needs them."""
+        if self.mode == "inline":
+            return
+        pool = self._executor()
+        for future in [pool.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+
+    def shutdown(self, pool: Optional[Executor] = None):
+        """Stop the pool (only if it is still `pool`, when given; a later call may have replaced it)."""
+        with self._lock:
+            if pool is not None and self._pool is not pool:
+                return
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self):
+        COMPUTE_IN_FLIGHT.inc(-1)
+        self._slots.release()
+
+    def run(self, task: str, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) on the executor and wait for its result; raises
+        ComputeSaturated when full and ComputeTimeout when the result is late.
+        """
+        if self.mode == "inline":
+            result, _, seconds = _timed(fn, args, kwargs)
+            COMPUTE_QUEUE_WAIT.observe(0.0, task=task)
+            COMPUTE_TIME.observe(seconds, task=task)
+            return result
+
+        if not self._slots.acquire(blocking=False):
+            COMPUTE_REJECTED.inc(task=task)
+            raise ComputeSaturated(task, settings.COMPUTE_RETRY_AFTER_SECONDS)
+        COMPUTE_IN_FLIGHT.inc()
+        submitted = time.time()
+        pool = None
+        try:
+            pool = self._executor()
+            future = pool.submit(_timed, fn, args, kwargs)
+        except BaseException as exc:
+            self._release()
+            if isinstance(exc, BrokenProcessPool):
+                self.shutdown(pool)
+            raise
+        # The slot is held until the task finishes, even if the caller stops waiting
+        future.add_done_callback(lambda _: self._release())
+        timeout = timeout if timeout is not None else settings.COMPUTE_TIMEOUT_SECONDS
+        try:
+            result, started, seconds = future.result(timeout=timeout)
+        except FutureTimeout:
+            future.cancel()
+            COMPUTE_TIMEOUTS.inc(task=task)
+            raise ComputeTimeout(task, timeout) from None
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); the next task gets a fresh pool
+            self.shutdown(pool)
+            raise
+        COMPUTE_QUEUE_WAIT.observe(max(0.0, started - submitted), task=task)
+        COMPUTE_TIME.observe(seconds, task=task)
+        return result
+
+
+executor = ComputeExecutor()
@@ -1,8 +1,113 @@
+from typing import Dict, Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
-    DATABASE_URL: str
-    SECRET_KEY: str
+    # Defaults keep a worker bootable without an .env file; override in production
+    DATABASE_URL: str = "sqlite:///./hydro_hub.db"
+    SECRET_KEY: Optional[str] = None
+
+    # Observability
+    METRICS_ENABLED: bool = True
+
+    # Profiling
+    PROFILING_ENABLED: bool = True
+    SLOW_QUERY_MS: float = 100.0
+    SLOW_QUERY_EXPLAIN: bool = True
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_HEADER: str = "X-Profile"
+    PROFILE_HEADER_TOKEN: Optional[str] = None
+    PROFILE_DIR: str = "./profiles"
+    PROFILE_MAX_FILES: int = 200
+    PROFILE_SAMPLE_INTERVAL_MS: float = 2.0
+    PROFILE_N_PLUS_ONE_THRESHOLD: int = 3
+
+    # Shared read-only snapshot (production server mode)
+    SNAPSHOT_DIR: Optional[str] = None
+    SNAPSHOT_CHECK_SECONDS: float = 5.0
+    SNAPSHOT_KEEP: int = 3
+    SNAPSHOT_REFRESH_SECONDS: float = 300.0
+
+    # Pre-compressed static copies of the public read-only responses (manage.py bundle)
+    STATIC_BUNDLE_DIR: str = "./static"
+    STATIC_BUNDLE_KEEP: int = 3
+
+    # Per-state shards: state code -> database URL (states not listed stay in DATABASE_URL)
+    SHARD_URLS: Dict[str, str] = {}
+
+    # Yearly historical series built by init_db.py (read-only)
+    COASTAL_RISK_DB_PATH: str = "../coastal_risk.db"
+
+    # Trusted read endpoints skip response_model validation; responses above the threshold are compressed
+    FAST_RESPONSES: bool = True
+    COMPRESSION_MIN_BYTES: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Server worker processes on this host (uvicorn --workers; run.py --prod sets it). Pools sized
+    # "0 workers" split the CPUs between the server workers instead of each taking every CPU
+    WEB_CONCURRENCY: int = 1
+
+    # Executor for CPU-bound simulation and scoring (mode: auto, process, thread or inline;
+    # 0 workers = cpu_count / WEB_CONCURRENCY)
+    COMPUTE_MODE: str = "auto"
+    COMPUTE_WORKERS: int = 0
+    COMPUTE_QUEUE_SIZE: int = 64
+    COMPUTE_TIMEOUT_SECONDS: float = 30.0
+    COMPUTE_RETRY_AFTER_SECONDS: float = 1.0
+
+    # Admission control: concurrency and queue limits per priority class (critical, normal, low),
+    # CoDel-style queue-time shedding, and extra route template -> class patterns checked before the defaults
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_LIMITS: Dict[str, int] = {"critical": 64, "normal": 24, "low": 4}
+    ADMISSION_QUEUE_LIMITS: Dict[str, int] = {"critical": 512, "normal": 128, "low": 16}
+    ADMISSION_TARGET_DELAY_MS: float = 50.0
+    ADMISSION_INTERVAL_MS: float = 500.0
+    ADMISSION_CRITICAL_MAX_WAIT_SECONDS: float = 10.0
+    ADMISSION_RETRY_AFTER_SECONDS: float = 2.0
+    ADMISSION_ROUTE_PRIORITIES: Dict[str, str] = {}
+
+    # Change log behind /api/sync (older entries are dropped by `manage.py compact-changes`)
+    CHANGE_LOG_RETENTION_DAYS: int = 30
+    SYNC_PAGE_SIZE: int = 500
+
+    # Columnar store of latest village indicators; how often to pick up other workers' writes
+    VILLAGE_STORE_SYNC_SECONDS: float = 5.0
+
+    # Longest a coalesced request waits on another request's in-flight computation
+    SINGLEFLIGHT_TIMEOUT_SECONDS: float = 10.0
+
+    # k-means clustering of villages by hazard signature (mini-batch above the threshold)
+    CLUSTER_DEFAULT_K: int = 6
+    CLUSTER_MAX_K: int = 20
+    CLUSTER_MAX_ITERATIONS: int = 100
+    CLUSTER_MINIBATCH_THRESHOLD: int = 20000
+    CLUSTER_BATCH_SIZE: int = 4096
+    CLUSTER_SEED: int = 0
+
+    # Evacuation shelter assignment (evacuees per point of a village's 0-10 household/density indicators)
+    SHELTER_EVACUEES_PER_POINT: int = 100
+    SHELTER_CANDIDATES: int = 8
+    SHELTER_MAX_DISTANCE_KM: float = 50.0
+
+    # Batch safety reports (0 workers = cpu_count / WEB_CONCURRENCY)
+    REPORT_CACHE_DIR: str = "./reports"
+    REPORT_WORKERS: int = 0
+
+    # Background jobs (limits per job type are declared with the type)
+    JOBS_ENABLED: bool = True
+    JOBS_MAX_WORKERS: int = 2
+    JOBS_POLL_SECONDS: float = 2.0
+    JOBS_LEASE_SECONDS: float = 60.0
+    JOBS_CHUNK_SIZE: int = 200
+    JOBS_EXPORT_DIR: str = "./exports"
+
+    # Spatial interpolation of risk between villages (inverse-distance weighting)
+    INTERPOLATION_NEIGHBORS: int = 8
+    INTERPOLATION_POWER: float = 2.0
+    INTERPOLATION_MAX_DISTANCE_KM: float = 50.0
+    RASTER_TILE_CELLS: int = 64
+    RASTER_CACHE_TILES: int = 512
+    RASTER_MAX_CELLS: int = 1048576
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,221 @@
+"""
+Incremental ETL from the raw yearly measurements in coastal_risk.db into the
+0-10 EnvironmentalData / SettlementData scoring tables.
+
+Each source table is streamed in rowid order with fetchmany(). A first pass
+computes the min/max of every indicator over the new rows at once; a second
+pass normalizes each chunk with RiskCalculator.normalize_batch and bulk-upserts
+it keyed on (village, date) into the village's shard (the catalog for states
+without one). The last rowid loaded and the bounds used are kept in etl_state,
+so a rerun only reads rows appended since. If new rows widen the stored bounds,
+every row is renormalized so all loaded values share one scale.
+"""
+import json
+import logging
+import sqlite3
+from datetime import date, datetime
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.core.risk_calculator import RiskCalculator
+from app.core.sharding import CATALOG, router
+
+logger = logging.getLogger("hydro_hub.etl")
+
+# target column -> (raw column, inverted: a larger raw value means lower risk)
+ENVIRONMENTAL_INDICATORS = {
+    "sea_level_rise": ("sea_level_rise", False),
+    "cyclone_frequency": ("cyclone_frequency", False),
+    "storm_surge_height": ("storm_surge_height", False),
+    "erosion_rate": ("erosion_rate", False),
+    "extreme_rainfall": ("extreme_rainfall", False),
+}
+SETTLEMENT_INDICATORS = {
+    "population_density": ("population_density", False),
+    "households": ("households", False),
+    "distance_from_shore": ("distance_from_shore", True),
+    "infrastructure_score": ("infrastructure_score", True),
+}
+SOURCES = {
+    "environmental_data": (models.EnvironmentalData, ENVIRONMENTAL_INDICATORS),
+    "settlement_data": (models.SettlementData, SETTLEMENT_INDICATORS),
+}
+INTEGER_COLUMNS = {"households"}
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def observation_date(year: int) -> date:
+    """Yearly raw figures are stored as of January 1st of their year."""
+    return date(int(year), 1, 1)
+
+
+def _stream(conn: sqlite3.Connection, table: str, columns, after_rowid: int, chunk_size: int) -> Iterator[np.ndarray]:
+    cursor = conn.execute(
+        f"SELECT rowid, village_id, year, {', '.join(columns)} FROM {table} WHERE rowid > ? ORDER BY rowid",
+        (after_rowid,),
+    )
+    while True:
+        chunk = cursor.fetchmany(chunk_size)
+        if not chunk:
+            break
+        yield np.array(chunk, dtype=np.float64)
+
+
+def compute_bounds(chunks: Iterator[np.ndarray], names) -> Dict[str, Tuple[float, float]]:
+    """Running per-indicator (min, max) over a stream of chunks, in one pass."""
+    lo = np.full(len(names), np.inf)
+    hi = np.full(len(names), -np.inf)
+    for chunk in chunks:
+        values = chunk[:, 3:]
+        with np.errstate(invalid="ignore"):
+            lo = np.fmin(lo, np.nanmin(np.where(np.isnan(values), np.inf, values), axis=0))
+            hi = np.fmax(hi, np.nanmax(np.where(np.isnan(values), -np.inf, values), axis=0))
+    return {n: (float(lo[i]), float(hi[i])) for i, n in enumerate(names) if lo[i] <= hi[i]}
+
+
+def merge_bounds(stored: Dict[str, Tuple[float, float]], new: Dict[str, Tuple[float, float]]):
+    merged = dict(stored)
+    for name, (lo, hi) in new.items():
+        old = merged.get(name)
+        merged[name] = (min(lo, old[0]), max(hi, old[1])) if old else (lo, hi)
+    return merged
+
+
+def _unique_code(db: Session, model, code: str) -> str:
+    candidate, n = code, 1
+    while db.query(model.id).filter(model.code == candidate).first() is not None:
+        n += 1
+        candidate = f"{code}{n}"
+    return candidate
+
+
+def map_villages(db: Session, conn: sqlite3.Connection) -> Dict[int, int]:
+    """
+    Raw village id -> villages.id, matched by state, district and name.
+    Missing states, districts and villages are created with the seed_db code scheme.
+    """
+    mapping = {}
+    for raw_id, name, latitude, longitude, district_name, state_name in conn.execute(
+        "SELECT id, name, latitude, longitude, district, state FROM villages"
+    ):
+        state = db.query(models.State).filter(models.State.name == state_name).first()
+        if state is None:
+            state = models.State(name=state_name, code=_unique_code(db, models.State, state_name[:2].upper()))
+            db.add(state)
+            db.flush()
+        district = db.query(models.District).filter(
+            models.District.state_id == state.id, models.District.name == district_name).first()
+        if district is None:
+            code = _unique_code(db, models.District, f"{state.code}_{district_name[:3].upper()}")
+            district = models.District(name=district_name, code=code, state_id=state.id)
+            db.add(district)
+            db.flush()
+            logger.info("Created district %s (%s)", district_name, code)
+        village = db.query(models.Village).filter(
+            models.Village.district_id == district.id, models.Village.name == name).first()
+        if village is None:
+            code = _unique_code(db, models.Village, f"{district.code}_{name[:3].upper()}")
+            village = models.Village(name=name, code=code, district_id=district.id,
+                                     latitude=latitude, longitude=longitude)
+            db.add(village)
+            db.flush()
+            logger.info("Created village %s (%s)", name, code)
+        mapping[raw_id] = village.id
+    return mapping
+
+
+def run_source(db: Session, conn: sqlite3.Connection, table: str, village_map: Dict[int, int],
+               chunk_size: int = DEFAULT_CHUNK_SIZE, full: bool = False) -> Dict[str, object]:
+    model, indicators = SOURCES[table]
+    targets = list(indicators)
+    raw_columns = [indicators[t][0] for t in targets]
+    key = f"coastal_risk.{table}"
+
+    state = db.get(models.EtlState, key)
+    if state is None:
+        state = models.EtlState(source=key, high_water=0)
+        db.add(state)
+    stored = {k: tuple(v) for k, v in json.loads(state.bounds).items()} if state.bounds and not full else {}
+    high_water = 0 if full else state.high_water or 0
+
+    # Pass 1: bounds of the new rows; a widened range invalidates earlier normalized values
+    bounds = merge_bounds(stored, compute_bounds(_stream(conn, table, raw_columns, high_water, chunk_size), targets))
+    full_refresh = full or (bool(stored) and bounds != stored)
+    if full_refresh:
+        high_water = 0
+
+    # Pass 2: normalize and upsert chunk by chunk, advancing the high-water mark with each commit
+    summary = {"source": key, "read": 0, "inserted": 0, "updated": 0, "skipped": 0, "full_refresh": full_refresh}
+    for chunk in _stream(conn, table, raw_columns, high_water, chunk_size):
+        normalized = {}
+        for i, target in enumerate(targets):
+            lo, hi = bounds.get(target, (0.0, 0.0))
+            values = np.round(RiskCalculator.normalize_batch(chunk[:, 3 + i], lo, hi, inverted=indicators[target][1]), 2)
+            normalized[target] = np.round(values) if target in INTEGER_COLUMNS else values
+
+        rows = {}
+        for j, (raw_village, year) in enumerate(chunk[:, 1:3].astype(np.int64).tolist()):
+            village_id = village_map.get(raw_village)
+            if village_id is None:
+                summary["skipped"] += 1
+                continue
+            day = observation_date(year)
+            values = {t: None if np.isnan(normalized[t][j]) else normalized[t][j].item() for t in targets}
+            for t in INTEGER_COLUMNS & values.keys():
+                values[t] = None if values[t] is None else int(values[t])
+            # Later rowids win if the source repeats a village/year
+            rows[(village_id, day)] = {"village_id": village_id, "date": day, **values}
+
+        # Rows go to their village's shard (committed before the high-water mark, so a rerun only re-upserts)
+        for shard, village_ids in router.group_villages({village_id for village_id, _ in rows}).items():
+            villages = set(village_ids)
+            shard_rows = {row_key: values for row_key, values in rows.items() if row_key[0] in villages}
+            target = db if shard == CATALOG else router.session(shard)
+            try:
+                inserted, updated = crud.upsert_daily_rows(target, model, shard_rows)
+                if target is not db:
+                    target.commit()
+            finally:
+                if target is not db:
+                    target.close()
+            summary["inserted"] += inserted
+            summary["updated"] += updated
+        summary["read"] += len(chunk)
+        state.high_water = int(chunk[-1, 0])
+        state.bounds = json.dumps(bounds)
+        state.updated_at = datetime.utcnow()
+        db.commit()
+
+    state.bounds = json.dumps(bounds)
+    state.updated_at = datetime.utcnow()
+    db.commit()
+    summary["high_water"] = state.high_water
+    return summary
+
+
+def run_etl(db: Session, source_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, full: bool = False):
+    """Load new raw rows of every source table; returns one summary per table."""
+    conn = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True)
+    try:
+        village_map = map_villages(db, conn)
+        db.commit()
+        if router.sharded:
+            # Villages created above must exist in their shard before their rows are loaded there
+            router.replicate_hierarchy()
+        summaries = [run_source(db, conn, table, village_map, chunk_size, full) for table in SOURCES]
+    finally:
+        conn.close()
+
+    # Bulk writes bypass the crud hooks; reload this process's stores that are in use
+    from app.core.village_store import store_for
+
+    def reload(shard_db):
+        store = store_for(shard_db)
+        if store.loaded:
+            store.load(shard_db)
+
+    router.scatter(reload)
+    return summaries
@@ -0,0 +1,109 @@
+"""
+Fast JSON responses for trusted read endpoints.
+
+FastAPI validates every returned object against the route's response_model
+and then serializes the validated copy. For hot read endpoints whose payloads
+we build ourselves (from SQL tuples selected in schema field order, or from
+the village store) that validation is pure overhead. These endpoints keep
+their response_model, so the OpenAPI schema is unchanged. They return a
+FastJSONResponse, which FastAPI sends as-is.
+
+`shape` lays a payload out exactly as the response model would: keys in field
+order (nested models and lists included), extra keys dropped, and int/float
+fields coerced the way pydantic's lax mode does. `dumps` then encodes it with
+orjson when installed, whose output matches pydantic's JSON byte for byte
+(compact separators, UTF-8, ISO dates). Without orjson it falls back to the
+standard library with the same settings. FAST_RESPONSES=false routes every
+request through response_model validation again.
+"""
+import json
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Callable, Iterable, List, Optional, Tuple, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel
+from starlette.responses import Response
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def enabled() -> bool:
+    return settings.FAST_RESPONSES
+
+
+def _default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+                      default=_default).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return content if isinstance(content, bytes) else dumps(content)
+
+
+# --- Shaping payloads like the response model ---
+
+Converter = Optional[Callable[[Any], Any]]
+
+
+def _converter(annotation) -> Converter:
+    origin = get_origin(annotation)
+    if origin is Union:
+        args = [a for a in get_args(annotation) if a is not type(None)]
+        inner = _converter(args[0]) if len(args) == 1 else None
+        return None if inner is None else (lambda v: None if v is None else inner(v))
+    if origin in (list, List):
+        inner = _converter(get_args(annotation)[0])
+        return None if inner is None else (lambda v: [inner(x) for x in v])
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return lambda v: shape(annotation, v)
+    if annotation is float:
+        return float
+    if annotation is int:
+        return int
+    return None
+
+
+@lru_cache(maxsize=None)
+def _plan(schema: Type[BaseModel]) -> Tuple[Tuple[str, Converter], ...]:
+    return tuple((name, _converter(field.annotation)) for name, field in schema.model_fields.items())
+
+
+def fields(schema: Type[BaseModel]) -> Tuple[str, ...]:
+    """Field names of a response model, in serialization order."""
+    return tuple(name for name, _ in _plan(schema))
+
+
+def shape(schema: Type[BaseModel], data: Any) -> dict:
+    """`data` (a dict or an object with attributes) laid out as `schema` would serialize it."""
+    if isinstance(data, dict):
+        get = data.get
+    else:
+        def get(name):
+            return getattr(data, name, None)
+    out = {}
+    for name, convert in _plan(schema):
+        value = get(name)
+        out[name] = value if convert is None or value is None else convert(value)
+    return out
+
+
+def rows(schema: Type[BaseModel], result: Iterable[tuple]) -> List[dict]:
+    """SQL tuples selected in `fields(schema)` order, as response rows (no per-row conversion)."""
+    names = fields(schema)
+    return [dict(zip(names, row)) for row in result]
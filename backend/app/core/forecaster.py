@@ -0,0 +1,356 @@
+"""
+Fitted per-village forecaster: AR(1) around a linear trend.
+
+For every village and series (the five environmental indicators and the five
+assessed risk scores) the model is the regression over consecutive observations
+
+    y[k] = c + b * t[k] + phi * y[k-1] + e[k]        (t in years since FIT_EPOCH)
+
+Its sufficient statistics (X'X, X'y, y'y with x = [1, t, y[k-1]]) are additive,
+so a refit folds in only the observations dated after each series' stored
+last_date and then re-solves the 3x3 systems of every village in one batched
+call. Parameters live in `forecast_params`, one row per village and series.
+
+Inference needs no history queries: the deviation from the long-run trend line
+decays geometrically from the last observation,
+
+    y(D) = trend(D) + phi_day ** (D - last_date) * (last_value - trend(last_date))
+
+where phi_day is phi converted from the observed spacing to one day. A
+non-stationary fit persists its last value; series with fewer than
+MIN_TRANSITIONS transitions are stored but not used, and callers fall back to
+the simulation in app.core.forecast.
+"""
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.core.forecast import MOCK_ID_BASE
+from app.core.metrics import REGISTRY
+from app.core.risk_calculator import RiskCalculator
+from app.core.village_store import ASSESSMENT_COLUMNS, ENVIRONMENTAL_COLUMNS
+from app.database import engine
+
+FORECASTER_FITS = REGISTRY.counter(
+    "hydro_forecaster_fits_total", "Forecaster refits, by mode (full or incremental).", ("mode",))
+
+FIT_EPOCH = date(2000, 1, 1).toordinal()
+DAYS_PER_YEAR = 365.25
+MIN_TRANSITIONS = 6
+PHI_MAX = 0.995
+
+# Series -> (source model, column); value range used to clip forecasts
+SERIES = {
+    **{name: (models.EnvironmentalData, name) for name in ENVIRONMENTAL_COLUMNS},
+    **{name: (models.RiskAssessment, name) for name in ASSESSMENT_COLUMNS},
+}
+SERIES_RANGE = {name: (0.0, 100.0 if name == "overall_risk_score" else 10.0) for name in SERIES}
+
+# Layout of the stats blob: X'X upper triangle over (1, t, p), X'y, y'y
+N_STATS = 10
+_XTX = ((0, 1, 2), (1, 3, 4), (2, 4, 5))
+
+
+def _years(ordinals: np.ndarray) -> np.ndarray:
+    return (np.asarray(ordinals, dtype=np.float64) - FIT_EPOCH) / DAYS_PER_YEAR
+
+
+def _observations(db: Session, model, since: Optional[int]):
+    """(village_ids, ordinals, {column: values}) with one row per village and day (latest id wins)."""
+    columns = [column for _, (m, column) in SERIES.items() if m is model]
+    query = select(model.village_id, model.date, *[getattr(model, c) for c in columns])
+    if since is not None:
+        query = query.where(model.date > date.fromordinal(since))
+    rows = db.execute(query.order_by(model.village_id, model.date, model.id)).all()
+    if not rows:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, {c: np.zeros(0) for c in columns}
+    data = list(zip(*rows))
+    village_ids = np.array(data[0], dtype=np.int64)
+    ordinals = np.array([d.toordinal() for d in data[1]], dtype=np.int64)
+    keep = np.ones(len(rows), dtype=bool)
+    keep[:-1] = (village_ids[1:] != village_ids[:-1]) | (ordinals[1:] != ordinals[:-1])
+    values = {c: np.array(data[2 + i], dtype=np.float64)[keep] for i, c in enumerate(columns)}
+    return village_ids[keep], ordinals[keep], values
+
+
+def _accumulate(stats: np.ndarray, groups: np.ndarray, t: np.ndarray, prev: np.ndarray, y: np.ndarray):
+    """Add each transition's contribution to its group's sufficient statistics (in place)."""
+    for slot, term in enumerate((np.ones_like(t), t, prev, t * t, t * prev, prev * prev,
+                                 y, t * y, prev * y, y * y)):
+        np.add.at(stats[:, slot], groups, term)
+
+
+def solve(stats: np.ndarray, transitions: np.ndarray, first: np.ndarray, last: np.ndarray,
+          last_value: np.ndarray) -> Dict[str, np.ndarray]:
+    """Batched fit of every row of `stats`; returns alpha, beta, phi (daily) and residual_std arrays."""
+    n = len(stats)
+    xtx = np.empty((n, 3, 3))
+    for i in range(3):
+        for j in range(3):
+            xtx[:, i, j] = stats[:, _XTX[i][j]]
+    xty = stats[:, 6:9]
+    coef = np.einsum("nij,nj->ni", np.linalg.pinv(xtx), xty) if n else np.zeros((0, 3))
+    c, b, phi = coef[:, 0], coef[:, 1], coef[:, 2]
+
+    sse = stats[:, 9] - 2 * (coef * xty).sum(axis=1) + np.einsum("ni,nij,nj->n", coef, xtx, coef)
+    residual_std = np.sqrt(np.maximum(sse, 0.0) / np.maximum(transitions - 3, 1))
+
+    step_days = np.where(transitions > 0, (last - first) / np.maximum(transitions, 1), 1.0)
+    stable = (transitions >= MIN_TRANSITIONS) & (phi > -1.0) & (phi < PHI_MAX) & (step_days > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta = b / (1.0 - phi)
+        # The fixed point of the recurrence lags the trend by one observation step
+        alpha = (c - phi * beta * step_days / DAYS_PER_YEAR) / (1.0 - phi)
+        phi_day = np.power(np.clip(phi, 0.0, None), 1.0 / step_days)
+
+    return {
+        "alpha": np.where(stable, alpha, last_value),
+        "beta": np.where(stable, beta, 0.0),
+        "phi": np.where(stable, phi_day, 1.0),
+        "residual_std": np.where(stable, residual_std, 0.0),
+    }
+
+
+def fit(db: Session, full: bool = False) -> Dict[str, Any]:
+    """
+    Refit every village's series. Incremental by default: only observations
+    dated after a series' last fitted day are read and added to its stored
+    statistics. Returns a summary of observations read and series refitted.
+    """
+    stored: Dict[str, Dict[int, models.ForecastParam]] = {name: {} for name in SERIES}
+    if not full:
+        for param in db.query(models.ForecastParam):
+            if param.series in stored:
+                stored[param.series][param.village_id] = param
+
+    summary = {"mode": "full" if full else "incremental", "observations": 0, "series_refitted": 0}
+    now = datetime.utcnow()
+    for model in (models.EnvironmentalData, models.RiskAssessment):
+        names = [name for name, (m, _) in SERIES.items() if m is model]
+        since = None
+        if not full:
+            # Read only days after the oldest stored fit, unless some village has never been fitted
+            observed = {v for (v,) in db.execute(select(model.village_id).distinct())}
+            fitted = [stored[name] for name in names]
+            if observed and all(observed <= params.keys() for params in fitted):
+                since = min(p.last_date.toordinal() for params in fitted for p in params.values())
+        village_ids, ordinals, values = _observations(db, model, since)
+        summary["observations"] += len(village_ids)
+
+        for name in names:
+            rows = _fold_series(name, stored[name], village_ids, ordinals, values[SERIES[name][1]])
+            if not rows:
+                continue
+            db.execute(delete(models.ForecastParam).where(
+                models.ForecastParam.series == name,
+                models.ForecastParam.village_id.in_([r["village_id"] for r in rows])))
+            for r in rows:
+                r["fitted_at"] = now
+            db.execute(insert(models.ForecastParam), rows)
+            summary["series_refitted"] += len(rows)
+    db.commit()
+    FORECASTER_FITS.inc(mode=summary["mode"])
+
+    store = parameters_for(db)
+    if store.loaded:
+        store.load(db)
+    return summary
+
+
+def _fold_series(name: str, stored: Dict[int, models.ForecastParam], village_ids: np.ndarray, ordinals: np.ndarray,
+                 values: np.ndarray) -> List[Dict[str, Any]]:
+    """Fold new observations of one series into the stored fits; returns the rows to write."""
+    valid = ~np.isnan(values)
+    village_ids, ordinals, values = village_ids[valid], ordinals[valid], values[valid]
+    last_stored = np.array([stored[v].last_date.toordinal() if v in stored and stored[v].last_date else 0
+                            for v in village_ids.tolist()], dtype=np.int64)
+    new = ordinals > last_stored
+    village_ids, ordinals, values = village_ids[new], ordinals[new], values[new]
+    if not len(village_ids):
+        return []
+
+    groups_ids, groups = np.unique(village_ids, return_inverse=True)
+    g = len(groups_ids)
+    stats = np.zeros((g, N_STATS))
+    transitions = np.zeros(g, dtype=np.int64)
+    first = np.zeros(g, dtype=np.int64)
+    seed_value = np.full(g, np.nan)
+    seed_date = np.zeros(g, dtype=np.int64)
+    for i, village_id in enumerate(groups_ids.tolist()):
+        param = stored.get(village_id)
+        if param is not None and param.stats is not None:
+            stats[i] = np.frombuffer(param.stats, dtype=np.float64)
+            transitions[i] = param.transitions or 0
+            seed_value[i] = param.last_value
+            seed_date[i] = param.last_date.toordinal()
+            first[i] = param.first_date.toordinal()
+    starts = np.r_[0, np.flatnonzero(np.diff(groups)) + 1]
+
+    # Previous observation within the village; the first new one continues from the stored last value
+    prev = np.r_[np.nan, values[:-1]]
+    prev[starts] = seed_value
+    has_prev = ~np.isnan(prev)
+    _accumulate(stats, groups[has_prev], _years(ordinals[has_prev]), prev[has_prev], values[has_prev])
+    transitions += np.bincount(groups[has_prev], minlength=g)
+
+    ends = np.r_[starts[1:], len(values)] - 1
+    first = np.where(seed_date > 0, first, ordinals[starts])
+    last = ordinals[ends]
+    last_value = values[ends]
+    params = solve(stats, transitions, first.astype(np.float64), last.astype(np.float64), last_value)
+
+    return [
+        {
+            "village_id": int(village_id),
+            "series": name,
+            "transitions": int(transitions[i]),
+            "first_date": date.fromordinal(int(first[i])),
+            "last_date": date.fromordinal(int(last[i])),
+            "last_value": float(last_value[i]),
+            "stats": stats[i].tobytes(),
+            "alpha": float(params["alpha"][i]),
+            "beta": float(params["beta"][i]),
+            "phi": float(params["phi"][i]),
+            "residual_std": float(params["residual_std"][i]),
+        }
+        for i, village_id in enumerate(groups_ids.tolist())
+    ]
+
+
+class ParameterStore:
+    """In-process copy of `forecast_params` as arrays per series, for query-free inference."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.loaded = False
+        self._marker = None
+        self._checked_at = 0.0
+        self.index: Dict[int, int] = {}
+        self.params: Dict[str, Dict[str, np.ndarray]] = {}
+
+    @staticmethod
+    def _current_marker(db: Session):
+        return db.execute(select(func.count(), func.max(models.ForecastParam.fitted_at))).one()
+
+    def load(self, db: Session):
+        marker = self._current_marker(db)
+        rows = db.execute(select(
+            models.ForecastParam.village_id, models.ForecastParam.series, models.ForecastParam.last_date,
+            models.ForecastParam.last_value, models.ForecastParam.alpha, models.ForecastParam.beta,
+            models.ForecastParam.phi,
+        ).where(models.ForecastParam.transitions >= MIN_TRANSITIONS)).all()
+        village_ids = sorted({r[0] for r in rows})
+        index = {v: i for i, v in enumerate(village_ids)}
+        params = {
+            name: {field: np.full(len(village_ids), np.nan) for field in ("last_date", "last_value", "alpha", "beta", "phi")}
+            for name in SERIES
+        }
+        for village_id, series, last_date, last_value, alpha, beta, phi in rows:
+            if series not in params:
+                continue
+            p, i = params[series], index[village_id]
+            p["last_date"][i] = last_date.toordinal()
+            p["last_value"][i], p["alpha"][i], p["beta"][i], p["phi"][i] = last_value, alpha, beta, phi
+        with self._lock:
+            self.index, self.params, self._marker = index, params, tuple(marker)
+            self.loaded = True
+            self._checked_at = time.monotonic()
+
+    def ensure_loaded(self, db: Session):
+        if not self.loaded:
+            self.load(db)
+        elif time.monotonic() - self._checked_at >= settings.VILLAGE_STORE_SYNC_SECONDS:
+            self._checked_at = time.monotonic()
+            if tuple(self._current_marker(db)) != self._marker:
+                self.load(db)
+
+    def paths(self, village_id: int, start: date, days: int) -> Optional[Dict[str, np.ndarray]]:
+        """Daily forecast of every fitted series from `start`; None when no series of the village is usable."""
+        row = self.index.get(village_id)
+        if row is None:
+            return None
+        ordinals = start.toordinal() + np.arange(days)
+        paths = {}
+        for name, p in self.params.items():
+            if np.isnan(p["alpha"][row]):
+                continue
+            last = p["last_date"][row]
+            trend = lambda o: p["alpha"][row] + p["beta"][row] * _years(o)
+            deviation = p["last_value"][row] - trend(last)
+            lo, hi = SERIES_RANGE[name]
+            steps = np.maximum(ordinals - last, 0)
+            paths[name] = np.clip(trend(ordinals) + p["phi"][row] ** steps * deviation, lo, hi)
+        return paths
+
+
+parameter_store = ParameterStore()
+
+# One parameter store per database (the catalog and each shard), keyed by URL
+_parameter_stores: Dict[str, ParameterStore] = {str(engine.url): parameter_store}
+_parameter_stores_lock = threading.Lock()
+
+
+def parameters_for(db: Session) -> ParameterStore:
+    key = str(db.get_bind().url)
+    store = _parameter_stores.get(key)
+    if store is None:
+        with _parameter_stores_lock:
+            store = _parameter_stores.setdefault(key, ParameterStore())
+    return store
+
+
+def forecast(db: Session, village_id: int, start_date: date, days: int,
+             environmental: Optional[Dict[str, float]] = None, settlement: Optional[Dict[str, float]] = None,
+             environmental_overrides: Optional[Dict[str, float]] = None,
+             settlement_overrides: Optional[Dict[str, float]] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Daily forecast rows (same shape as simulate_forecast) from the fitted
+    parameters, or None when the village has no fitted risk scores.
+
+    "What-If" overrides pin an environmental indicator (or settlement value) for
+    the whole horizon; the fitted score paths are shifted by how much that
+    changes RiskCalculator's scores along the forecast environmental path.
+    """
+    store = parameters_for(db)
+    store.ensure_loaded(db)
+    paths = store.paths(village_id, start_date, days)
+    if paths is None or any(name not in paths for name in ASSESSMENT_COLUMNS):
+        return None
+
+    scores = {name: paths[name] for name in ASSESSMENT_COLUMNS}
+    if (environmental_overrides or settlement_overrides) and environmental is not None and settlement is not None:
+        env_path = {name: paths.get(name, np.full(days, environmental[name])) for name in ENVIRONMENTAL_COLUMNS}
+        settlement_path = {name: np.full(days, settlement[name]) for name in settlement}
+        base = RiskCalculator.calculate_risk_profiles_batch(env_path, settlement_path)
+        for name, value in (environmental_overrides or {}).items():
+            env_path[name] = np.full(days, value)
+        for name, value in (settlement_overrides or {}).items():
+            settlement_path[name] = np.full(days, value)
+        shifted = RiskCalculator.calculate_risk_profiles_batch(env_path, settlement_path)
+        for name in ASSESSMENT_COLUMNS:
+            lo, hi = SERIES_RANGE[name]
+            scores[name] = np.clip(scores[name] + shifted[name] - base[name], lo, hi)
+
+    start = start_date.toordinal()
+    return [
+        {
+            "id": MOCK_ID_BASE + i,
+            "village_id": village_id,
+            "prediction_date": start_date,
+            "for_date": date.fromordinal(start + i),
+            "predicted_risk_score": round(float(scores["overall_risk_score"][i]), 1),
+            "flood_probability": round(float(scores["flood_risk"][i]) / 10.0, 3),
+            "cyclone_probability": round(float(scores["cyclone_risk"][i]) / 10.0, 3),
+            "rainfall_probability": round(float(scores["rainfall_risk"][i]) / 10.0, 3),
+            "erosion_probability": round(float(scores["erosion_risk"][i]) / 10.0, 3),
+        }
+        for i in range(days)
+    ]
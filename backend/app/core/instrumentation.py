@@ -0,0 +1,137 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Mount, compile_path
+
+from app.core import metrics
+
+UNMATCHED_ROUTE = "<unmatched>"
+BACKGROUND_ROUTE = "<background>"
+
+
+class RequestStats:
+    """Per-request counters shared between the middleware and SQLAlchemy events."""
+    __slots__ = ("route", "statements", "statement_seconds")
+
+    def __init__(self, route: str):
+        self.route = route
+        self.statements = 0
+        self.statement_seconds = 0.0
+
+
+# Copied into the threadpool with the request context, so sync endpoints see it too
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+class RouteTemplates:
+    """
+    Maps request paths to route templates (e.g. /api/risk/village/{village_id}).
+    Built lazily from the OpenAPI schema so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._table = None
+
+    def _build(self):
+        table = []
+        for path in self.app.openapi().get("paths", {}):
+            regex, _, _ = compile_path(path)
+            table.append((regex, path))
+        # Static paths win over parameterised ones, as in declaration order
+        table.sort(key=lambda entry: entry[1].count("{"))
+        # Mounted sub-applications (e.g. lazily loaded routers) are not in the schema
+        for route in self.app.routes:
+            if isinstance(route, Mount):
+                regex, _, _ = compile_path(route.path + "/{path:path}")
+                table.append((regex, route.path + "/{path}"))
+        return table
+
+    def reset(self):
+        self._table = None
+
+    def resolve(self, path: str) -> str:
+        if self._table is None:
+            self._table = self._build()
+        for regex, template in self._table:
+            if regex.match(path):
+                return template
+        return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, in-flight requests, response size
+    and SQL statement counts per route template.
+    """
+
+    def __init__(self, app, router_app=None):
+        self.app = app
+        # The FastAPI instance whose routes are matched; defaults to the wrapped app
+        self.routes = RouteTemplates(router_app or app)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self.routes.resolve(scope["path"])
+        stats = RequestStats(route)
+        token = current_request.set(stats)
+        status = {"code": 500, "size": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            elif message["type"] == "http.response.body":
+                status["size"] += len(message.get("body", b""))
+            await send(message)
+
+        metrics.HTTP_IN_FLIGHT.inc(method=method, route=route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request.reset(token)
+            metrics.HTTP_IN_FLIGHT.dec(method=method, route=route)
+            metrics.HTTP_REQUESTS.inc(method=method, route=route, status=status["code"])
+            metrics.HTTP_LATENCY.observe(elapsed, method=method, route=route)
+            metrics.HTTP_RESPONSE_SIZE.observe(status["size"], method=method, route=route)
+            metrics.DB_STATEMENTS_PER_REQUEST.observe(stats.statements, route=route)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = current_request.get()
+    route = BACKGROUND_ROUTE
+    if stats is not None:
+        stats.statements += 1
+        stats.statement_seconds += elapsed
+        route = stats.route
+    metrics.DB_STATEMENTS.inc(route=route)
+    metrics.DB_STATEMENT_SECONDS.inc(elapsed, route=route)
+
+
+def _handle_error(context):
+    # after_cursor_execute is skipped for failed statements; drop their start time
+    if context.connection is not None:
+        starts = context.connection.info.get("query_start")
+        if starts:
+            starts.pop()
+
+
+def instrument_engine(engine: Engine):
+    """Attach statement timing listeners to an engine (idempotent)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
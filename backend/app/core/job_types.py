@@ -0,0 +1,214 @@
+"""
+Built-in job types. Each works through the villages of a region in id order,
+JOBS_CHUNK_SIZE at a time, checkpointing the last village id it finished.
+Village ids come from the catalog; each chunk's rows are read from and written
+to the shards holding those villages, and committed there before the
+checkpoint is reported (a resumed job may redo its last chunk, so every write
+is idempotent).
+"""
+import csv
+import os
+import random
+from datetime import date
+from typing import Iterator, List, Optional, Set, Tuple
+
+from pydantic import BaseModel, Field, model_validator
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.core import forecaster
+from app.core.config import settings
+from app.core.forecast import FORECAST_DAYS, simulate_forecast
+from app.core.jobs import JobContext, register_job
+from app.core.risk_calculator import RiskCalculator
+from app.core.sharding import router
+from app.core.village_store import ASSESSMENT_COLUMNS, get_store, store_for
+
+
+class RegionParams(BaseModel):
+    state_id: Optional[int] = None
+    district_id: Optional[int] = None
+    chunk_size: Optional[int] = Field(default=None, ge=1, le=10000)
+
+
+class ForecastParams(RegionParams):
+    days: int = Field(default=FORECAST_DAYS, ge=1, le=60)
+    seed: Optional[int] = None
+
+
+class ExportParams(RegionParams):
+    since: Optional[date] = None
+
+    @model_validator(mode="after")
+    def require_region(self):
+        if self.state_id is None and self.district_id is None:
+            raise ValueError("state_id or district_id is required")
+        return self
+
+
+def region_village_ids(db, params: RegionParams) -> List[int]:
+    query = db.query(models.Village.id).join(models.District, models.Village.district_id == models.District.id)
+    if params.state_id is not None:
+        query = query.filter(models.District.state_id == params.state_id)
+    if params.district_id is not None:
+        query = query.filter(models.Village.district_id == params.district_id)
+    return [v for (v,) in query.order_by(models.Village.id)]
+
+
+def _chunks(ctx: JobContext, params: RegionParams, village_ids: List[int]) -> Iterator[List[int]]:
+    """Remaining chunks of village ids after the checkpoint."""
+    after = ctx.checkpoint.get("after_village_id", 0)
+    remaining = [v for v in village_ids if v > after]
+    size = params.chunk_size or settings.JOBS_CHUNK_SIZE
+    for i in range(0, len(remaining), size):
+        yield remaining[i:i + size]
+
+
+def _by_shard(chunk: List[int], touched: Optional[Set[str]] = None) -> Iterator[Tuple[Session, List[int]]]:
+    """(session, village ids) for each shard holding part of the chunk; commits each shard when resumed."""
+    for shard, village_ids in router.group_villages(chunk).items():
+        db = router.session(shard)
+        try:
+            yield db, village_ids
+            db.commit()
+            if touched is not None:
+                touched.add(shard)
+        finally:
+            db.close()
+
+
+@register_job("recalculate_assessments", RegionParams, max_concurrency=1)
+def recalculate_assessments(ctx: JobContext, params: RegionParams):
+    """Re-score every village of the region from its latest indicators into today's RiskAssessment."""
+    village_ids = region_village_ids(ctx.db, params)
+    today = date.today()
+    done = ctx.checkpoint.get("done", 0)
+    assessed = ctx.checkpoint.get("assessed", 0)
+    touched: Set[str] = set()
+    ctx.report(done, len(village_ids))
+
+    for chunk in _chunks(ctx, params, village_ids):
+        for db, shard_villages in _by_shard(chunk, touched):
+            store = get_store(db)
+            scores = store.score(store.select(village_ids=shard_villages))
+            rows = {}
+            for i, village_id in enumerate(scores["village_id"].tolist()):
+                values = {c: round(float(scores[c][i]), 1) for c in ASSESSMENT_COLUMNS}
+                values["risk_category"] = RiskCalculator.categorize_risk(values["overall_risk_score"])
+                rows[(village_id, today)] = {"village_id": village_id, "date": today, **values}
+            if rows:
+                crud.upsert_daily_rows(db, models.RiskAssessment, rows)
+            assessed += len(rows)
+        done += len(chunk)
+        ctx.report(done, checkpoint={"after_village_id": chunk[-1], "done": done, "assessed": assessed})
+
+    # Bulk writes bypass the crud hooks
+    if touched:
+        router.scatter(lambda db: store_for(db).load(db), shards=sorted(touched))
+    return {"villages": len(village_ids), "assessed": assessed, "skipped": len(village_ids) - assessed,
+            "date": today.isoformat()}
+
+
+@register_job("regenerate_forecasts", ForecastParams, max_concurrency=1)
+def regenerate_forecasts(ctx: JobContext, params: ForecastParams):
+    """Replace the stored forecast from today for every village of the region (one packed run per village)."""
+    village_ids = region_village_ids(ctx.db, params)
+    start = date.today()
+    rng = random.Random(params.seed)
+    done = ctx.checkpoint.get("done", 0)
+    written = ctx.checkpoint.get("forecasts", 0)
+    ctx.report(done, len(village_ids))
+
+    for chunk in _chunks(ctx, params, village_ids):
+        for db, shard_villages in _by_shard(chunk):
+            store = get_store(db)
+            runs = []
+            for village_id in shard_villages:
+                record = store.get(village_id)
+                env, settlement = (record.environmental(), record.settlement()) if record is not None else (None, None)
+                if env is None or settlement is None:
+                    continue
+                # Fitted parameters first, the simulation only for villages without them
+                days = forecaster.forecast(db, village_id, start, params.days, env, settlement)
+                if days is None:
+                    days = simulate_forecast(village_id, env, settlement, start, days=params.days, rng=rng)
+                runs.append(crud.forecast_run_values(village_id, start, days))
+            db.execute(delete(models.ForecastRun).where(
+                models.ForecastRun.village_id.in_(shard_villages), models.ForecastRun.prediction_date == start))
+            if runs:
+                db.execute(insert(models.ForecastRun), runs)
+            written += len(runs)
+        done += len(chunk)
+        ctx.report(done, checkpoint={"after_village_id": chunk[-1], "done": done, "forecasts": written})
+
+    return {"villages": len(village_ids), "forecasts": written, "start_date": start.isoformat(), "days": params.days}
+
+
+class FitParams(BaseModel):
+    full: bool = False
+
+
+@register_job("fit_forecaster", FitParams, max_concurrency=1)
+def fit_forecaster(ctx: JobContext, params: FitParams):
+    """Refit the per-village forecaster of every shard (incrementally unless `full`)."""
+    ctx.report(0, 1)
+    summaries = router.scatter(lambda db: forecaster.fit(db, full=params.full))
+    return dict(zip(router.names(), summaries))
+
+
+EXPORT_SOURCES = (
+    ("environmental", models.EnvironmentalData, ("sea_level_rise", "cyclone_frequency", "storm_surge_height",
+                                                 "erosion_rate", "extreme_rainfall")),
+    ("settlement", models.SettlementData, ("population_density", "households", "distance_from_shore",
+                                           "infrastructure_score")),
+    ("assessment", models.RiskAssessment, ASSESSMENT_COLUMNS),
+)
+
+
+def export_path(job_id: int) -> str:
+    return os.path.join(settings.JOBS_EXPORT_DIR, f"job-{job_id}-history.csv")
+
+
+@register_job("export_history", ExportParams, max_concurrency=2)
+def export_history(ctx: JobContext, params: ExportParams):
+    """
+    Write the full indicator and assessment history of a region to a long-format
+    CSV (village, date, record, indicator, value). Resuming truncates the file
+    back to the checkpointed size.
+    """
+    db = ctx.db
+    village_ids = region_village_ids(db, params)
+    villages = {v.id: v for v in db.query(models.Village).filter(models.Village.id.in_(village_ids))}
+    path = export_path(ctx.job_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    offset = ctx.checkpoint.get("offset", 0)
+    done = ctx.checkpoint.get("done", 0)
+    rows_written = ctx.checkpoint.get("rows", 0)
+    ctx.report(done, len(village_ids))
+
+    with open(path, "r+" if offset else "w", newline="") as f:
+        f.seek(offset)
+        f.truncate()
+        writer = csv.writer(f)
+        if not offset:
+            writer.writerow(["village_id", "village_code", "village_name", "date", "record", "indicator", "value"])
+        for chunk in _chunks(ctx, params, village_ids):
+            for shard_db, shard_villages in _by_shard(chunk):
+                for record, model, columns in EXPORT_SOURCES:
+                    query = shard_db.query(model.village_id, model.date, *[getattr(model, c) for c in columns])\
+                                    .filter(model.village_id.in_(shard_villages))
+                    if params.since is not None:
+                        query = query.filter(model.date >= params.since)
+                    for village_id, day, *values in query.order_by(model.village_id, model.date, model.id):
+                        village = villages[village_id]
+                        for column, value in zip(columns, values):
+                            writer.writerow([village_id, village.code, village.name, day, record, column, value])
+                            rows_written += 1
+            f.flush()
+            done += len(chunk)
+            ctx.report(done, checkpoint={"after_village_id": chunk[-1], "done": done,
+                                         "rows": rows_written, "offset": f.tell()})
+        size = f.tell()
+
+    return {"villages": len(village_ids), "rows": rows_written, "bytes": size, "file": os.path.basename(path)}
@@ -0,0 +1,280 @@
+"""
+Persistent background jobs for region-wide work that does not fit in a request.
+
+Jobs live in the `jobs` table, so they survive restarts and every worker
+process sees the same queue. Each process runs a JobRunner: a dispatcher
+thread that claims queued jobs with an atomic UPDATE (which also enforces the
+per-type concurrency limit across all processes) and hands them to a bounded
+thread pool. Handlers work in chunks and call `ctx.report()` after each one,
+which commits the chunk together with its progress and checkpoint. A job whose
+process dies stops heartbeating; once its lease expires it is re-queued and
+resumes from the last checkpoint.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Type
+
+from pydantic import BaseModel
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session, aliased
+
+from app import models
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+
+logger = logging.getLogger("hydro_hub.jobs")
+
+JOBS_FINISHED = REGISTRY.counter(
+    "hydro_jobs_finished_total", "Jobs finished in this worker, by type and final status.", ("type", "status"))
+JOBS_RUNNING = REGISTRY.gauge(
+    "hydro_jobs_running", "Jobs currently running in this worker, by type.", ("type",))
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = "queued", "running", "succeeded", "failed", "cancelled"
+TERMINAL_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when cancellation was requested."""
+
+
+class JobInterrupted(Exception):
+    """Raised inside a handler when this worker shuts down; the job is re-queued."""
+
+
+class JobType:
+    def __init__(self, name: str, handler: Callable, params_model: Type[BaseModel], max_concurrency: int):
+        self.name = name
+        self.handler = handler
+        self.params_model = params_model
+        self.max_concurrency = max_concurrency
+
+
+JOB_TYPES: Dict[str, JobType] = {}
+
+
+def register_job(name: str, params_model: Type[BaseModel], max_concurrency: int = 1):
+    """Decorator registering handler(ctx, params) as job type `name`."""
+    def decorator(handler: Callable):
+        JOB_TYPES[name] = JobType(name, handler, params_model, max_concurrency)
+        return handler
+    return decorator
+
+
+def validate_params(job_type: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalized params for `job_type`; raises KeyError / pydantic.ValidationError."""
+    return JOB_TYPES[job_type].params_model(**params).model_dump(mode="json")
+
+
+class JobContext:
+    """What a running handler sees: its session, checkpoint and a progress/cancellation hook."""
+
+    def __init__(self, runner: "JobRunner", job: models.Job, db: Session):
+        self.runner = runner
+        self.job_id = job.id
+        self.db = db
+        self.checkpoint: Dict[str, Any] = json.loads(job.checkpoint) if job.checkpoint else {}
+
+    def report(self, done: int, total: Optional[int] = None, checkpoint: Optional[Dict[str, Any]] = None):
+        """Commit the chunk just written together with progress and checkpoint, then check for cancellation."""
+        values = {"progress_done": done, "heartbeat_at": datetime.utcnow()}
+        if total is not None:
+            values["progress_total"] = total
+        if checkpoint is not None:
+            self.checkpoint = checkpoint
+            values["checkpoint"] = json.dumps(checkpoint)
+        self.db.execute(update(models.Job).where(models.Job.id == self.job_id).values(**values))
+        self.db.commit()
+        self.check()
+
+    def check(self):
+        if self.runner.stopping:
+            raise JobInterrupted()
+        cancel = self.db.execute(select(models.Job.cancel_requested).where(models.Job.id == self.job_id)).scalar()
+        if cancel:
+            raise JobCancelled()
+
+
+def _set(job: models.Job, **values):
+    for name, value in values.items():
+        setattr(job, name, value)
+
+
+class JobRunner:
+    def __init__(self, session_factory, max_workers: int, poll_seconds: float, lease_seconds: float):
+        self.session_factory = session_factory
+        self.max_workers = max_workers
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.stopping = False
+        self._running: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # --- Lifecycle ---
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.stopping = False
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        self._thread = threading.Thread(target=self._loop, name="job-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop claiming jobs; running handlers stop at their next report() and are re-queued."""
+        if self._thread is None:
+            return
+        self.stopping = True
+        self._wake.set()
+        self._thread.join()
+        self._pool.shutdown(wait=True)
+        self._thread = self._pool = None
+
+    # --- API ---
+
+    def submit(self, db: Session, job_type: str, params: Dict[str, Any]) -> models.Job:
+        job = models.Job(type=job_type, status=QUEUED, params=json.dumps(validate_params(job_type, params)),
+                         progress_done=0, progress_total=0, cancel_requested=False)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        self._wake.set()
+        return job
+
+    def cancel(self, db: Session, job_id: int) -> Optional[models.Job]:
+        # A queued job is cancelled outright; a running one stops at its next checkpoint
+        db.execute(update(models.Job).where(models.Job.id == job_id, models.Job.status == QUEUED)
+                   .values(status=CANCELLED, cancel_requested=True, finished_at=datetime.utcnow()))
+        db.execute(update(models.Job).where(models.Job.id == job_id, models.Job.status == RUNNING)
+                   .values(cancel_requested=True))
+        db.commit()
+        job = db.get(models.Job, job_id)
+        if job is not None:
+            db.refresh(job)
+        return job
+
+    # --- Dispatching ---
+
+    def _loop(self):
+        while not self.stopping:
+            try:
+                self._tick()
+            except Exception:
+                logger.exception("Job dispatcher tick failed")
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def _tick(self):
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            with self._lock:
+                running_ids = list(self._running)
+            if running_ids:
+                db.execute(update(models.Job).where(models.Job.id.in_(running_ids), models.Job.owner == self.owner)
+                           .values(heartbeat_at=now))
+            # Jobs of processes that died stop heartbeating; re-queue them to resume from their checkpoint
+            stale = db.execute(
+                update(models.Job)
+                .where(models.Job.status == RUNNING,
+                       models.Job.heartbeat_at < now - timedelta(seconds=self.lease_seconds))
+                .values(status=QUEUED, owner=None)
+            ).rowcount
+            if stale:
+                logger.warning("Re-queued %d job(s) with expired leases", stale)
+            db.commit()
+            self._dispatch(db)
+        finally:
+            db.close()
+
+    def _dispatch(self, db: Session):
+        free = self.max_workers - len(self._running)
+        if free <= 0:
+            return
+        queued = db.execute(
+            select(models.Job.id, models.Job.type).where(models.Job.status == QUEUED).order_by(models.Job.id).limit(100)
+        ).all()
+        for job_id, job_type in queued:
+            if free <= 0 or self.stopping:
+                break
+            spec = JOB_TYPES.get(job_type)
+            if spec is None:
+                db.execute(update(models.Job).where(models.Job.id == job_id)
+                           .values(status=FAILED, error=f"Unknown job type '{job_type}'", finished_at=datetime.utcnow()))
+                db.commit()
+                continue
+            if self._claim(db, job_id, spec):
+                with self._lock:
+                    self._running[job_id] = job_type
+                free -= 1
+                self._pool.submit(self._execute, job_id)
+
+    def _claim(self, db: Session, job_id: int, spec: JobType) -> bool:
+        # One UPDATE: SQLite serializes writers, so the per-type limit holds across processes
+        other = aliased(models.Job)
+        running_of_type = select(func.count(other.id)).where(
+            other.type == spec.name, other.status == RUNNING).scalar_subquery()
+        now = datetime.utcnow()
+        claimed = db.execute(
+            update(models.Job)
+            .where(models.Job.id == job_id, models.Job.status == QUEUED, running_of_type < spec.max_concurrency)
+            .values(status=RUNNING, owner=self.owner, heartbeat_at=now,
+                    started_at=func.coalesce(models.Job.started_at, now))
+        ).rowcount
+        db.commit()
+        return claimed == 1
+
+    def _execute(self, job_id: int):
+        db = self.session_factory()
+        job = db.get(models.Job, job_id)
+        spec = JOB_TYPES[job.type]
+        JOBS_RUNNING.inc(type=spec.name)
+        status = FAILED
+        try:
+            ctx = JobContext(self, job, db)
+            ctx.check()
+            result = spec.handler(ctx, spec.params_model(**json.loads(job.params or "{}")))
+            db.refresh(job)
+            _set(job, status=SUCCEEDED, result=json.dumps(result), progress_done=job.progress_total)
+            status = SUCCEEDED
+        except JobCancelled:
+            db.rollback()
+            _set(job, status=CANCELLED)
+            status = CANCELLED
+        except JobInterrupted:
+            db.rollback()
+            _set(job, status=QUEUED, owner=None)
+            status = None
+            logger.info("Job %d interrupted by shutdown; re-queued at its checkpoint", job_id)
+        except Exception as exc:
+            db.rollback()
+            logger.exception("Job %d (%s) failed", job_id, spec.name)
+            _set(job, status=FAILED, error=f"{type(exc).__name__}: {exc}")
+        finally:
+            if status is not None:
+                job.finished_at = datetime.utcnow()
+                JOBS_FINISHED.inc(type=spec.name, status=status)
+            db.commit()
+            db.close()
+            JOBS_RUNNING.dec(type=spec.name)
+            with self._lock:
+                self._running.pop(job_id, None)
+            self._wake.set()
+
+
+def _create_runner() -> JobRunner:
+    from app.database import SessionLocal
+
+    return JobRunner(SessionLocal, settings.JOBS_MAX_WORKERS, settings.JOBS_POLL_SECONDS, settings.JOBS_LEASE_SECONDS)
+
+
+runner = _create_runner()
@@ -0,0 +1,219 @@
+import importlib
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+
+from app.core.metrics import REGISTRY
+
+logger = logging.getLogger("hydro_hub.startup")
+
+STARTUP_PHASE_SECONDS = REGISTRY.gauge(
+    "hydro_startup_phase_seconds", "Duration of each startup phase of this worker.", ("phase",))
+
+# Warmup steps run once per worker before it accepts traffic, in registration order
+_warmup_steps: List[Tuple[str, Callable[[FastAPI], None]]] = []
+
+# Shutdown steps run once per worker after it stops accepting traffic, in reverse order
+_shutdown_steps: List[Tuple[str, Callable[[FastAPI], None]]] = []
+
+# Report of the most recent start-up in this process (served at /debug/startup)
+startup_report = None
+
+
+def register_warmup(name: str):
+    """Decorator registering fn(app) as a named warmup step."""
+    def decorator(fn: Callable[[FastAPI], None]):
+        _warmup_steps.append((name, fn))
+        return fn
+    return decorator
+
+
+def register_shutdown(name: str):
+    """Decorator registering fn(app) as a named shutdown step."""
+    def decorator(fn: Callable[[FastAPI], None]):
+        _shutdown_steps.append((name, fn))
+        return fn
+    return decorator
+
+
+class StartupReport:
+    """Timings for one worker's cold start: module import plus each warmup step."""
+
+    def __init__(self, import_seconds: float):
+        self.phases: Dict[str, float] = {"import": import_seconds}
+        self.errors: Dict[str, str] = {}
+
+    def record(self, phase: str, seconds: float, error: Optional[str] = None):
+        self.phases[phase] = seconds
+        STARTUP_PHASE_SECONDS.set(seconds, phase=phase)
+        if error:
+            self.errors[phase] = error
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.phases.values())
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "total_ms": round(self.total_seconds * 1000, 2),
+            "phases_ms": {k: round(v * 1000, 2) for k, v in self.phases.items()},
+            "errors": self.errors,
+        }
+
+
+async def run_warmup(app: FastAPI, report: StartupReport):
+    for name, step in _warmup_steps:
+        start = time.perf_counter()
+        error = None
+        try:
+            await run_in_threadpool(step, app)
+        except Exception as exc:  # a failed warmup only costs latency later
+            error = f"{type(exc).__name__}: {exc}"
+            logger.warning("Warmup step '%s' failed: %s", name, error)
+        report.record(name, time.perf_counter() - start, error)
+
+
+async def run_shutdown(app: FastAPI):
+    for name, step in reversed(_shutdown_steps):
+        try:
+            await run_in_threadpool(step, app)
+        except Exception as exc:
+            logger.warning("Shutdown step '%s' failed: %s: %s", name, type(exc).__name__, exc)
+
+
+def build_lifespan(import_started: float):
+    """Create the app lifespan; `import_started` is perf_counter() at the top of app.main."""
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        global startup_report
+        report = StartupReport(time.perf_counter() - import_started)
+        STARTUP_PHASE_SECONDS.set(report.phases["import"], phase="import")
+        await run_warmup(app, report)
+        app.state.startup_report = startup_report = report
+        logger.info("Worker ready in %.1f ms: %s", report.total_seconds * 1000, report.as_dict()["phases_ms"])
+        yield
+        await run_shutdown(app)
+
+    return lifespan
+
+
+class LazyApp:
+    """
+    ASGI sub-application that imports its router module on the first request.
+    Keeps rarely used routers (and their dependencies) out of worker start-up.
+    """
+
+    def __init__(self, import_path: str, **app_kwargs):
+        self.import_path = import_path
+        self.app_kwargs = app_kwargs
+        self._app = None
+
+    def _load(self):
+        module_name, attr = self.import_path.split(":")
+        router = getattr(importlib.import_module(module_name), attr)
+        sub_app = FastAPI(**self.app_kwargs)
+        sub_app.include_router(router)
+        return sub_app
+
+    async def __call__(self, scope, receive, send):
+        if self._app is None:
+            self._app = self._load()
+        await self._app(scope, receive, send)
+
+
+# --- Default warmup steps ---
+
+@register_warmup("openapi")
+def warm_openapi(app: FastAPI):
+    # Generates and caches the schema; also used for metrics route templates
+    app.openapi()
+
+
+@register_warmup("queries")
+def warm_queries(app: FastAPI):
+    """Execute each hot read once to fill SQLAlchemy's compiled cache and SQLite's page cache."""
+    from datetime import date, timedelta
+    from app import crud, models
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        village = db.query(models.Village).first()
+        if village is None:
+            return
+        crud.get_states(db)
+        crud.get_districts_by_state(db, state_id=village.district.state_id)
+        crud.get_villages_by_district(db, district_id=village.district_id)
+        crud.get_village(db, village_id=village.id)
+        crud.get_village_by_code(db, code=village.code)
+        crud.get_village_by_name(db, name=village.name)
+        crud.get_latest_risk_assessment(db, village_id=village.id)
+        crud.get_risk_history(db, village_id=village.id)
+        crud.get_latest_environmental_data(db, village_id=village.id)
+        crud.get_latest_settlement_data(db, village_id=village.id)
+        crud.get_forecast(db, village_id=village.id, start_date=date.today(), end_date=date.today() + timedelta(days=14))
+    finally:
+        db.close()
+
+
+@register_warmup("village_store")
+def warm_village_store(app: FastAPI):
+    """Bulk-load the columnar store of latest village indicators of every shard."""
+    from app.core.sharding import router
+    from app.core.village_store import store_for
+
+    router.scatter(lambda db: store_for(db).load(db))
+
+
+@register_warmup("forecaster")
+def warm_forecaster(app: FastAPI):
+    """Load the fitted forecaster parameters so the first forecast does not query them."""
+    from app.core.forecaster import parameters_for
+    from app.core.sharding import router
+
+    router.scatter(lambda db: parameters_for(db).load(db))
+
+
+@register_warmup("compute")
+def start_compute(app: FastAPI):
+    """Spin up the compute executor's workers so the first simulation does not pay for process startup."""
+    from app.core.compute import executor
+
+    executor.start()
+
+
+@register_warmup("jobs")
+def start_jobs(app: FastAPI):
+    """Start this worker's job dispatcher; it resumes queued and orphaned jobs."""
+    from app.core.config import settings
+
+    if settings.JOBS_ENABLED:
+        from app.core import job_types  # noqa: F401 (registers the built-in job types)
+        from app.core.jobs import runner
+        runner.start()
+
+
+@register_shutdown("jobs")
+def stop_jobs(app: FastAPI):
+    from app.core.jobs import runner
+
+    runner.stop()
+
+
+@register_shutdown("compute")
+def stop_compute(app: FastAPI):
+    from app.core.compute import executor
+
+    executor.shutdown()
+
+
+@register_shutdown("reports")
+def stop_reports(app: FastAPI):
+    from app.core import reports
+
+    reports.shutdown()
@@ -0,0 +1,226 @@
+import math
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, tuned for an API whose hot paths are a few ms
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metric:
+    """
+    Base class for in-process metrics.
+    Values are kept per label tuple and only formatted when scraped.
+    """
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _label_str(self, key: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in pairs) + "}"
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, self._label_str(k), v) for k, v in items]
+
+
+class Gauge(Metric):
+    type_name = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, self._label_str(k), v) for k, v in items]
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [per-bucket counts..., sum, count]
+                state = [0] * len(self.buckets) + [0.0, 0]
+                self._values[key] = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def snapshot(self, **labels) -> Optional[Dict[str, object]]:
+        """Return cumulative buckets, sum and count for one label set."""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            state = list(state) if state else None
+        if state is None:
+            return None
+        cumulative, running = [], 0
+        for i, bound in enumerate(self.buckets):
+            running += state[i]
+            cumulative.append((bound, running))
+        return {"buckets": cumulative, "sum": state[-2], "count": state[-1]}
+
+    def samples(self):
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        out = []
+        for key, state in items:
+            running = 0
+            for i, bound in enumerate(self.buckets):
+                running += state[i]
+                out.append((f"{self.name}_bucket", self._label_str(key, ("le", _format_value(bound))), running))
+            out.append((f"{self.name}_bucket", self._label_str(key, ("le", "+Inf")), state[-1]))
+            out.append((f"{self.name}_sum", self._label_str(key), state[-2]))
+            out.append((f"{self.name}_count", self._label_str(key), state[-1]))
+        return out
+
+
+class Registry:
+    """Collection of metrics rendered together in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+# --- HTTP ---
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "hydro_http_requests_total", "HTTP requests by route template and status code.",
+    ("method", "route", "status"))
+HTTP_LATENCY = REGISTRY.histogram(
+    "hydro_http_request_duration_seconds", "HTTP request latency by route template.",
+    ("method", "route"))
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "hydro_http_requests_in_flight", "Requests currently being served by route template.",
+    ("method", "route"))
+HTTP_RESPONSE_SIZE = REGISTRY.histogram(
+    "hydro_http_response_size_bytes", "Response body size by route template.",
+    ("method", "route"), buckets=SIZE_BUCKETS)
+
+# --- Database ---
+
+DB_STATEMENTS = REGISTRY.counter(
+    "hydro_db_statements_total", "SQL statements executed, attributed to the calling route.",
+    ("route",))
+DB_STATEMENT_SECONDS = REGISTRY.counter(
+    "hydro_db_statement_seconds_total", "Total time spent executing SQL statements per route.",
+    ("route",))
+DB_STATEMENTS_PER_REQUEST = REGISTRY.histogram(
+    "hydro_db_statements_per_request", "Number of SQL statements issued by a single request.",
+    ("route",), buckets=COUNT_BUCKETS)
+
+# --- Risk engine ---
+
+RISK_CALCULATIONS = REGISTRY.counter(
+    "hydro_risk_calculator_invocations_total", "Calls to RiskCalculator.calculate_risk_profile.")
+FORECAST_GENERATION = REGISTRY.histogram(
+    "hydro_forecast_generation_seconds", "Time spent generating a dynamic forecast.",
+    ("mode",))
@@ -0,0 +1,303 @@
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter as FrameCounter
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger("hydro_hub.slow_query")
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def normalize_statement(statement: str) -> str:
+    """Collapse whitespace and literals so repeated query shapes group together."""
+    return _LITERAL_RE.sub("?", " ".join(statement.split()))
+
+
+class RequestProfile:
+    """Statements and stack samples collected for one profiled request."""
+
+    def __init__(self, method: str, path: str, route: str):
+        self.method = method
+        self.path = path
+        self.route = route
+        self.started_at = datetime.utcnow()
+        self.statements: Dict[str, List[float]] = {}
+        self.stacks: FrameCounter = FrameCounter()
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def record_statement(self, statement: str, elapsed: float):
+        key = normalize_statement(statement)
+        with self._lock:
+            self.statements.setdefault(key, []).append(elapsed)
+
+    def summary(self, status: int, duration: float) -> Dict[str, Any]:
+        statements = sorted(
+            (
+                {
+                    "sql": sql,
+                    "count": len(times),
+                    "total_ms": round(sum(times) * 1000, 3),
+                    "max_ms": round(max(times) * 1000, 3),
+                }
+                for sql, times in self.statements.items()
+            ),
+            key=lambda s: (-s["count"], -s["total_ms"]),
+        )
+        functions = FrameCounter()
+        for stack, count in self.stacks.items():
+            # Inclusive samples per function; each function counted once per stack
+            for frame in {f.rsplit(":", 1)[0] for f in stack.split(";")}:
+                functions[frame] += count
+        return {
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "started_at": self.started_at.isoformat(),
+            "status": status,
+            "duration_ms": round(duration * 1000, 3),
+            "sql": {
+                "count": sum(s["count"] for s in statements),
+                "total_ms": round(sum(s["total_ms"] for s in statements), 3),
+                "statements": statements,
+                "n_plus_one_suspects": [
+                    s["sql"] for s in statements if s["count"] >= settings.PROFILE_N_PLUS_ONE_THRESHOLD
+                ],
+            },
+            "stack_samples": self.samples,
+            "sample_interval_ms": settings.PROFILE_SAMPLE_INTERVAL_MS,
+            "top_functions": [
+                {"frame": frame, "samples": count} for frame, count in functions.most_common(25)
+            ],
+            "stacks": [
+                {"stack": stack, "samples": count} for stack, count in self.stacks.most_common(50)
+            ],
+        }
+
+
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+class StackSampler(threading.Thread):
+    """
+    Periodically samples the stacks of all threads running application code.
+    Sync endpoints execute on threadpool workers, so sampling every thread is
+    what makes their frames visible; under concurrency the samples of other
+    requests are mixed in, while the SQL section stays exact per request.
+    """
+
+    def __init__(self, profile: RequestProfile, interval: float):
+        super().__init__(name="request-profiler", daemon=True)
+        self.profile = profile
+        self.interval = interval
+        self._done = threading.Event()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self._done.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                in_app = False
+                while frame is not None:
+                    code = frame.f_code
+                    if code.co_filename.startswith(APP_ROOT):
+                        in_app = True
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                if in_app:
+                    self.profile.stacks[";".join(reversed(stack))] += 1
+                    self.profile.samples += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+# --- Profile storage ---
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", value).strip("_")[:60] or "root"
+
+
+def write_profile(summary: Dict[str, Any]) -> str:
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    name = f"{stamp}-{summary['method']}-{_slug(summary['route'])}.json"
+    path = os.path.join(settings.PROFILE_DIR, name)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(summary, f)
+    os.replace(tmp_path, path)
+    rotate_profiles()
+    return name
+
+
+def rotate_profiles():
+    """Keep only the newest PROFILE_MAX_FILES profiles."""
+    names = sorted(n for n in os.listdir(settings.PROFILE_DIR) if n.endswith(".json"))
+    for name in names[:-settings.PROFILE_MAX_FILES or None]:
+        try:
+            os.remove(os.path.join(settings.PROFILE_DIR, name))
+        except FileNotFoundError:
+            pass
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    if not os.path.isdir(settings.PROFILE_DIR):
+        return []
+    summaries = []
+    for name in sorted(os.listdir(settings.PROFILE_DIR), reverse=True):
+        if not name.endswith(".json"):
+            continue
+        data = read_profile(name)
+        if data is None:
+            continue
+        summaries.append({
+            "name": name,
+            "route": data["route"],
+            "path": data["path"],
+            "method": data["method"],
+            "status": data["status"],
+            "started_at": data["started_at"],
+            "duration_ms": data["duration_ms"],
+            "sql_count": data["sql"]["count"],
+            "sql_total_ms": data["sql"]["total_ms"],
+            "n_plus_one_suspects": len(data["sql"]["n_plus_one_suspects"]),
+            "top_function": data["top_functions"][0]["frame"] if data["top_functions"] else None,
+        })
+    return summaries
+
+
+def token_matches(value: Optional[str]) -> bool:
+    """True iff PROFILE_HEADER_TOKEN is configured and `value` is it."""
+    token = settings.PROFILE_HEADER_TOKEN
+    return bool(token) and value is not None and hmac.compare_digest(value.encode(), token.encode())
+
+
+def read_profile(name: str) -> Optional[Dict[str, Any]]:
+    if os.path.basename(name) != name or not name.endswith(".json"):
+        return None
+    try:
+        with open(os.path.join(settings.PROFILE_DIR, name)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+# --- Middleware ---
+
+class ProfilingMiddleware:
+    """
+    Profiles a random PROFILE_SAMPLE_RATE fraction of requests, plus any request
+    whose PROFILE_HEADER header carries PROFILE_HEADER_TOKEN, and writes the result
+    to PROFILE_DIR. Without a configured token the header is ignored: profiling a
+    request is expensive, so anonymous clients must not be able to trigger it.
+    """
+
+    def __init__(self, app, route_resolver=None):
+        self.app = app
+        self.route_resolver = route_resolver
+        self.header = settings.PROFILE_HEADER.lower().encode()
+
+    def _requested(self, scope) -> bool:
+        for name, value in scope.get("headers", []):
+            if name == self.header:
+                return token_matches(value.decode("latin-1"))
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith("/debug/profiles"):
+            await self.app(scope, receive, send)
+            return
+        if not self._requested(scope) and random.random() >= settings.PROFILE_SAMPLE_RATE:
+            await self.app(scope, receive, send)
+            return
+
+        route = self.route_resolver.resolve(scope["path"]) if self.route_resolver else scope["path"]
+        profile = RequestProfile(scope["method"], scope["path"], route)
+        token = current_profile.set(profile)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        sampler = StackSampler(profile, settings.PROFILE_SAMPLE_INTERVAL_MS / 1000.0)
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            sampler.stop()
+            current_profile.reset(token)
+            await run_in_threadpool(write_profile, profile.summary(status["code"], duration))
+
+
+# --- Slow query log ---
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["profile_query_start"].pop()
+    profile = current_profile.get()
+    if profile is not None:
+        profile.record_statement(statement, elapsed)
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        log_slow_query(cursor, statement, parameters, elapsed, executemany)
+
+
+def _handle_error(context):
+    if context.connection is not None:
+        starts = context.connection.info.get("profile_query_start")
+        if starts:
+            starts.pop()
+
+
+def explain_query_plan(cursor, statement: str, parameters) -> List[str]:
+    """Run EXPLAIN QUERY PLAN on the raw DBAPI connection (SQLite only)."""
+    dbapi_conn = getattr(cursor, "connection", None)
+    if dbapi_conn is None or type(dbapi_conn).__module__ != "sqlite3":
+        return []
+    try:
+        rows = dbapi_conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ()).fetchall()
+    except Exception as exc:  # plan capture must never break the request
+        return [f"<unavailable: {exc}>"]
+    return [row[-1] for row in rows]
+
+
+def log_slow_query(cursor, statement: str, parameters, elapsed: float, executemany: bool):
+    plan = [] if executemany or not settings.SLOW_QUERY_EXPLAIN else explain_query_plan(cursor, statement, parameters)
+    logger.warning(
+        "Slow query (%.1f ms): %s | params=%r | plan=%s",
+        elapsed * 1000, " ".join(statement.split()), parameters, " / ".join(plan) or "n/a",
+    )
+
+
+def instrument_engine(engine: Engine):
+    """Attach slow-query and per-request statement capture listeners (idempotent)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,106 @@
+"""
+Per-village HTML safety report, the server-side counterpart of the risk report
+and safety guide built in frontend/src/services/pdfGenerator.js.
+
+Pure stdlib so report worker processes start without importing the app.
+"""
+from html import escape
+from typing import Any, Dict, List, Tuple
+
+# Bump when the markup changes so cached reports are re-rendered
+TEMPLATE_VERSION = 1
+
+RISK_ROWS = (("Flood Risk", "flood_risk"), ("Cyclone Risk", "cyclone_risk"),
+             ("Rainfall Risk", "rainfall_risk"), ("Erosion Risk", "erosion_risk"))
+ENVIRONMENTAL_ROWS = (("Sea Level Rise", "sea_level_rise"), ("Cyclone Frequency", "cyclone_frequency"),
+                      ("Storm Surge Height", "storm_surge_height"), ("Erosion Rate", "erosion_rate"),
+                      ("Extreme Rainfall", "extreme_rainfall"))
+SETTLEMENT_ROWS = (("Population Density", "population_density"), ("Households", "households"),
+                   ("Distance from Shore", "distance_from_shore"), ("Infrastructure Score", "infrastructure_score"))
+EMERGENCY_CONTACTS = (("Disaster Management", "1078"), ("Police", "100"), ("Ambulance", "108"),
+                      ("Fire Service", "101"), ("Coast Guard", "1554"))
+RECOMMENDATIONS = (
+    "Monitor weather forecasts regularly",
+    "Review evacuation routes with family members",
+    "Maintain emergency kit with essential supplies",
+    "Register for SMS weather alerts",
+    "Stay informed about local disaster management plans",
+)
+KIT_ITEMS = (
+    "First aid supplies", "Flashlights and batteries", "Important documents (waterproof bag)", "Cash",
+    "Medications (7-day supply)", "Non-perishable food", "Drinking water", "Mobile phone + charger",
+    "Whistle", "Blankets",
+)
+
+STYLE = """
+body{font-family:Helvetica,Arial,sans-serif;margin:0;color:#111}
+header{padding:16px 24px;color:#fff}
+header.risk{background:#0ea5e9} header.safety{background:#ef4444}
+section{padding:0 24px} h1{margin:0;font-size:24px} h2{font-size:16px;margin-top:24px}
+table{border-collapse:collapse;min-width:360px} th,td{border:1px solid #ccc;padding:4px 8px;text-align:left}
+th{background:#14b8a6;color:#fff} .EXTREME{color:#dc2626} .HIGH{color:#d97706}
+footer{color:#808080;font-size:12px;text-align:center;margin:24px 0}
+"""
+
+
+def risk_label(score: float) -> str:
+    # Same thresholds as the frontend report
+    if score >= 76:
+        return "EXTREME"
+    if score >= 51:
+        return "HIGH"
+    if score >= 26:
+        return "MODERATE"
+    return "LOW"
+
+
+def _table(head: Tuple[str, str], rows: List[Tuple[str, Any]]) -> str:
+    body = "".join(f"<tr><td>{escape(str(a))}</td><td>{escape(str(b))}</td></tr>" for a, b in rows)
+    return f"<table><tr><th>{escape(head[0])}</th><th>{escape(head[1])}</th></tr>{body}</table>"
+
+
+def _values(data: Dict[str, Any], rows) -> List[Tuple[str, Any]]:
+    data = data or {}
+    return [(label, data.get(key) if data.get(key) is not None else 0) for label, key in rows]
+
+
+def render_report(profile: Dict[str, Any]) -> bytes:
+    """Render one village's risk report and safety guide as a standalone HTML page."""
+    village = profile["village"]
+    assessment = profile["assessment"]
+    score = assessment["overall_risk_score"]
+    label = risk_label(score)
+    name = escape(village["name"])
+    district = escape(profile.get("district") or "N/A")
+    state = escape(profile.get("state") or "N/A")
+
+    recommendations = "".join(f"<li>{escape(r)}</li>" for r in RECOMMENDATIONS)
+    kit = "".join(f"<li>[ ] {escape(item)}</li>" for item in KIT_ITEMS)
+    page = f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{name} - Risk Report &amp; Safety Guide</title>
+<style>{STYLE}</style></head><body>
+<header class="risk"><h1>Hydro Hub</h1><div>Coastal Risk Assessment Report</div></header>
+<section>
+<h2>Village Information</h2>
+<p>Village: {name}<br>District: {district}<br>State: {state}<br>Assessment date: {escape(str(assessment["date"]))}</p>
+<h2>Overall Risk Assessment</h2>
+<p>Risk Score: <b>{escape(str(score))}/100</b><br>Risk Category: <b class="{label}">{label}</b></p>
+{_table(("Risk Type", "Score (0-100)"), _values(assessment, RISK_ROWS))}
+<h2>Environmental Indicators</h2>
+{_table(("Indicator", "Value (0-10 scale)"), _values(profile.get("environmental"), ENVIRONMENTAL_ROWS))}
+<h2>Settlement Indicators</h2>
+{_table(("Indicator", "Value (0-10 scale)"), _values(profile.get("settlement"), SETTLEMENT_ROWS))}
+<h2>Recommendations</h2>
+<ol>{recommendations}</ol>
+</section>
+<header class="safety"><h1>Safety &amp; Preparedness Guide</h1><div>{name}, {district}</div></header>
+<section>
+<h2>Emergency Contact Numbers</h2>
+{_table(("Service", "Contact Number"), list(EMERGENCY_CONTACTS))}
+<h2>Emergency Kit Checklist</h2>
+<ul style="list-style:none">{kit}</ul>
+</section>
+<footer>Generated by Hydro Hub</footer>
+</body></html>
+"""
+    return page.encode("utf-8")
@@ -0,0 +1,208 @@
+"""
+Batch generation of per-village safety reports for a district or state.
+
+Reports are rendered on a process pool and streamed back as a ZIP archive as
+they complete. Rendered pages are cached on disk under REPORT_CACHE_DIR, keyed
+by village, assessment date and a fingerprint of the values shown, so villages
+whose data has not changed since the last export are not re-rendered. Each
+village's pages live in their own subdirectory, so replacing one only lists
+that village's files. The disk cache is shared by every worker process.
+"""
+import csv
+import hashlib
+import io
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core import compute
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.core.report_templates import TEMPLATE_VERSION, render_report, risk_label
+from app.core.village_store import get_store
+
+REPORTS_GENERATED = REGISTRY.counter(
+    "hydro_reports_generated_total", "Village reports served, by source (cache or render).", ("source",))
+
+# Below this many cache misses rendering inline beats shipping work to the pool
+INLINE_RENDER_MAX = 4
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _executor() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a threaded server process is unsafe
+            _pool = ProcessPoolExecutor(max_workers=settings.REPORT_WORKERS or compute.default_workers(),
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown():
+    """Stop the render pool's worker processes (a later export starts a new pool)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def load_profiles(db: Session, state_id: Optional[int] = None, district_id: Optional[int] = None,
+                  village_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Plain-dict DetailedRiskProfile equivalents for every assessed village in the region."""
+    query = db.query(
+        models.Village.id, models.Village.name, models.Village.code, models.District.name, models.State.name
+    ).join(models.District, models.Village.district_id == models.District.id
+    ).join(models.State, models.District.state_id == models.State.id)
+    if state_id is not None:
+        query = query.filter(models.District.state_id == state_id)
+    if district_id is not None:
+        query = query.filter(models.Village.district_id == district_id)
+    if village_id is not None:
+        query = query.filter(models.Village.id == village_id)
+
+    store = get_store(db)
+    profiles = []
+    for vid, name, code, district, state in query.order_by(models.District.name, models.Village.name):
+        record = store.get(vid)
+        assessment = record.assessment_row() if record is not None else None
+        if assessment is None:
+            continue
+        profiles.append({
+            "village": {"id": vid, "name": name, "code": code},
+            "district": district,
+            "state": state,
+            "assessment": assessment,
+            "environmental": record.environmental_row(),
+            "settlement": record.settlement_row(),
+        })
+    return profiles
+
+
+def _fingerprint(row: Optional[Dict[str, Any]]):
+    return None if row is None else tuple(sorted(row.items()))
+
+
+class ReportCache:
+    """One rendered HTML file per village; a newer assessment or any changed value replaces the older file."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    @staticmethod
+    def key(profile: Dict[str, Any]) -> str:
+        parts = (
+            TEMPLATE_VERSION, profile["village"]["name"], profile["district"], profile["state"],
+            profile["village"]["code"], _fingerprint(profile["assessment"]),
+            _fingerprint(profile["environmental"]), _fingerprint(profile["settlement"]),
+        )
+        digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:12]
+        return f"{profile['village']['id']}-{profile['assessment']['date']}-{digest}"
+
+    def _village_dir(self, key: str) -> str:
+        return os.path.join(self.directory, key.split("-", 1)[0])
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._village_dir(key), f"{key}.html")
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, data: bytes):
+        village_dir = self._village_dir(key)
+        os.makedirs(village_dir, exist_ok=True)
+        tmp = self._path(key) + f".{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._path(key))
+        for name in os.listdir(village_dir):
+            if name.endswith(".html") and name != f"{key}.html":
+                try:
+                    os.remove(os.path.join(village_dir, name))
+                except FileNotFoundError:
+                    pass
+
+
+cache = ReportCache(settings.REPORT_CACHE_DIR)
+
+
+def iter_reports(profiles: List[Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], bytes]]:
+    """Yield (profile, html): cached reports first, then fresh renders as they complete."""
+    misses = []
+    for profile in profiles:
+        key = cache.key(profile)
+        data = cache.get(key)
+        if data is None:
+            misses.append((key, profile))
+            continue
+        REPORTS_GENERATED.inc(source="cache")
+        yield profile, data
+
+    if len(misses) <= INLINE_RENDER_MAX:
+        rendered = ((key, profile, render_report(profile)) for key, profile in misses)
+    else:
+        futures = {_executor().submit(render_report, profile): (key, profile) for key, profile in misses}
+        rendered = ((*futures[f], f.result()) for f in as_completed(futures))
+
+    for key, profile, data in rendered:
+        cache.put(key, data)
+        REPORTS_GENERATED.inc(source="render")
+        yield profile, data
+
+
+def report_filename(profile: Dict[str, Any]) -> str:
+    slug = lambda s: re.sub(r"[^A-Za-z0-9]+", "_", s).strip("_")
+    return f"{slug(profile['district'])}/{slug(profile['village']['code'])}_{slug(profile['village']['name'])}_Safety_Report.html"
+
+
+class _ZipSink(io.RawIOBase):
+    """Non-seekable sink for zipfile; the streaming generator drains it after each member."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(profiles: List[Dict[str, Any]]) -> Iterator[bytes]:
+    """ZIP archive of every report plus an index.csv summary, produced incrementally."""
+    sink = _ZipSink()
+    index = io.StringIO()
+    writer = csv.writer(index)
+    writer.writerow(["village_id", "village", "district", "state", "assessment_date",
+                     "overall_risk_score", "risk_category", "file"])
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for profile, data in iter_reports(profiles):
+            name = report_filename(profile)
+            archive.writestr(name, data)
+            assessment = profile["assessment"]
+            writer.writerow([profile["village"]["id"], profile["village"]["name"], profile["district"],
+                             profile["state"], assessment["date"], assessment["overall_risk_score"],
+                             risk_label(assessment["overall_risk_score"]), name])
+            yield sink.drain()
+        archive.writestr("index.csv", index.getvalue())
+    yield sink.drain()
@@ -1,4 +1,5 @@
 from typing import Dict, Any
+from app.core.metrics import RISK_CALCULATIONS
 
 class RiskCalculator:
     """
@@ -6,6 +7,12 @@ class RiskCalculator:
     Calculates detailed risk profiles based on environmental and settlement indicators.
     """
 
+    ENVIRONMENTAL_INDICATORS = ("sea_level_rise", "cyclone_frequency", "storm_surge_height", "erosion_rate", "extreme_rainfall")
+    SETTLEMENT_INDICATORS = ("population_density", "households", "distance_from_shore", "infrastructure_score")
+    INDICATORS = ENVIRONMENTAL_INDICATORS + SETTLEMENT_INDICATORS
+    SCORES = ("overall_risk_score", "flood_risk", "cyclone_risk", "rainfall_risk", "erosion_risk")
+    _jacobian = None
+
     @staticmethod
     def calculate_risk_profile(
         environmental: Dict[str, float], 
@@ -31,6 +38,7 @@ class RiskCalculator:
         Returns:
             Dict containing calculated scores and risk category.
         """
+        RISK_CALCULATIONS.inc()
         
         # 1. Component Risk Calculations (0-10 scale)
         
@@ -96,6 +104,75 @@ class RiskCalculator:
         
         return result
 
+    @staticmethod
+    def calculate_risk_profiles_batch(
+        environmental: Dict[str, Any],
+        settlement: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Vectorized calculate_risk_profile over NumPy arrays (one element per village/day).
+        Uses the same weights as the scalar path; scores are left unrounded.
+        """
+        import numpy as np
+
+        slr = np.asarray(environmental["sea_level_rise"], dtype=np.float64)
+        cyclone = np.asarray(environmental["cyclone_frequency"], dtype=np.float64)
+        surge = np.asarray(environmental["storm_surge_height"], dtype=np.float64)
+        erosion = np.asarray(environmental["erosion_rate"], dtype=np.float64)
+        rainfall = np.asarray(environmental["extreme_rainfall"], dtype=np.float64)
+        distance = np.asarray(settlement["distance_from_shore"], dtype=np.float64)
+        RISK_CALCULATIONS.inc(slr.size)
+
+        environmental_score = (slr + cyclone + surge + erosion + rainfall) / 5 * 10
+        settlement_score = (
+            np.asarray(settlement["population_density"], dtype=np.float64) +
+            np.asarray(settlement["households"], dtype=np.float64) +
+            distance +
+            np.asarray(settlement["infrastructure_score"], dtype=np.float64)
+        ) / 4 * 10
+        overall_score = environmental_score * 0.60 + settlement_score * 0.40
+
+        return {
+            "flood_risk": slr * 0.4 + surge * 0.3 + rainfall * 0.3,
+            "cyclone_risk": cyclone * 0.6 + surge * 0.4,
+            "rainfall_risk": rainfall,
+            "erosion_risk": erosion * 0.6 + distance * 0.4,
+            "overall_risk_score": overall_score,
+            "environmental_score": environmental_score,
+            "settlement_score": settlement_score,
+            "risk_category": RiskCalculator.categorize_risk_batch(overall_score)
+        }
+
+    @staticmethod
+    def jacobian() -> Any:
+        """
+        (len(SCORES) x len(INDICATORS)) matrix of d score / d indicator.
+        The model is linear with no intercept, so score = J @ indicators exactly.
+        Derived by evaluating the batch path on unit vectors, so it always matches the weights above.
+        """
+        import numpy as np
+
+        if RiskCalculator._jacobian is None:
+            n = len(RiskCalculator.INDICATORS)
+            basis = np.eye(n)
+            columns = dict(zip(RiskCalculator.INDICATORS, basis.T))
+            profiles = RiskCalculator.calculate_risk_profiles_batch(
+                {k: columns[k] for k in RiskCalculator.ENVIRONMENTAL_INDICATORS},
+                {k: columns[k] for k in RiskCalculator.SETTLEMENT_INDICATORS},
+            )
+            jacobian = np.stack([profiles[s] for s in RiskCalculator.SCORES])
+            jacobian.setflags(write=False)
+            RiskCalculator._jacobian = jacobian
+        return RiskCalculator._jacobian
+
+    @staticmethod
+    def categorize_risk_batch(scores: Any) -> Any:
+        """Vectorized categorize_risk; returns an array of category labels."""
+        import numpy as np
+
+        labels = np.array(["Low", "Moderate", "High", "Extreme"], dtype=object)
+        return labels[np.searchsorted([25, 50, 75], scores, side="left")]
+
     @staticmethod
     def categorize_risk(score: float) -> str:
         if score <= 25:
@@ -123,3 +200,20 @@ class RiskCalculator:
         if inverted:
             return 10.0 - normalized
         return normalized
+
+    @staticmethod
+    def normalize_batch(values: Any, min_val: float, max_val: float, inverted: bool = False) -> Any:
+        """
+        Vectorized normalize_input over a NumPy array (NaN stays NaN).
+        """
+        import numpy as np
+
+        values = np.asarray(values, dtype=np.float64)
+        if max_val == min_val:
+            return np.where(np.isnan(values), np.nan, 5.0)
+
+        normalized = np.clip((values - min_val) / (max_val - min_val) * 10, 0.0, 10.0)
+
+        if inverted:
+            return 10.0 - normalized
+        return normalized
@@ -0,0 +1,65 @@
+"""
+Sensitivity of risk scores to each indicator, for every village of a region.
+
+RiskCalculator is linear, so with J = RiskCalculator.jacobian() and the
+(villages x indicators) matrix X of latest inputs:
+  contributions  C[v, s, i] = J[s, i] * X[v, i]    (sum over i is the score)
+  marginal effect          = J[s, i]               (same for every village)
+  reduction if indicator i improves by up to `improvement` points (not below 0):
+                 R[v, i] = J[target, i] * min(X[v, i], improvement)
+"""
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from app.core.risk_calculator import RiskCalculator
+from app.core.village_store import VillageStore
+
+# Indicators a planner can change locally (infrastructure, relocation, density, coastal protection)
+DEFAULT_ACTIONABLE = ("infrastructure_score", "distance_from_shore", "population_density", "erosion_rate")
+
+
+def marginal_effects() -> Dict[str, Dict[str, float]]:
+    jacobian = RiskCalculator.jacobian()
+    return {
+        score: {ind: round(float(jacobian[s, i]), 4) for i, ind in enumerate(RiskCalculator.INDICATORS)}
+        for s, score in enumerate(RiskCalculator.SCORES)
+    }
+
+
+def analyze(store: VillageStore, rows: np.ndarray, target: str = "overall_risk_score",
+            actionable: Sequence[str] = DEFAULT_ACTIONABLE, improvement: Optional[float] = None,
+            executor=None) -> Dict[str, np.ndarray]:
+    """
+    Batch sensitivity for the given store rows (rows lacking inputs are dropped),
+    computed on `executor` when one is given.
+    Returns arrays: village_id (V), scores (V x S), contributions (V x S x I),
+    reduction (V x I; zero for non-actionable indicators) and total_reduction (V).
+    """
+    rows = store.complete_rows(rows)
+    x = np.column_stack([store.columns[c][rows] for c in RiskCalculator.INDICATORS]) if len(rows) \
+        else np.zeros((0, len(RiskCalculator.INDICATORS)))
+    args = (x, target, tuple(actionable), improvement)
+    result = executor.run("sensitivity", analyze_inputs, *args) if executor is not None else analyze_inputs(*args)
+    result["village_id"] = store.village_ids[rows]
+    return result
+
+
+def analyze_inputs(x: np.ndarray, target: str, actionable: Sequence[str],
+                   improvement: Optional[float]) -> Dict[str, np.ndarray]:
+    """analyze() on a (villages x indicators) input matrix; picklable for the compute executor."""
+    jacobian = RiskCalculator.jacobian()
+
+    contributions = x[:, None, :] * jacobian[None, :, :]
+    scores = contributions.sum(axis=2)
+
+    mask = np.isin(np.array(RiskCalculator.INDICATORS), list(actionable))
+    headroom = np.clip(x, 0.0, None) if improvement is None else np.clip(np.minimum(x, improvement), 0.0, None)
+    reduction = headroom * jacobian[RiskCalculator.SCORES.index(target)] * mask
+
+    return {
+        "scores": scores,
+        "contributions": contributions,
+        "reduction": reduction,
+        "total_reduction": reduction.sum(axis=1),
+    }
@@ -0,0 +1,294 @@
+"""
+Per-state database shards.
+
+The default database (DATABASE_URL) is the catalog: it owns the full location
+hierarchy (states, districts, villages) and their ids, the job queue, and the
+data of every state without a shard. SHARD_URLS maps a state code to its own
+database; that database has the full schema, a replica of its state's
+hierarchy rows under the catalog ids, and all of the state's indicator,
+assessment and forecast rows. Writes for different shards therefore never
+contend on the same SQLite lock, and joins inside a shard keep working.
+
+Requests are routed by village, district or state id through the FastAPI
+dependencies below; cross-state reads use `router.scatter`, which runs a
+function against every shard concurrently and returns the per-shard results.
+With no SHARD_URLS configured every route resolves to the catalog session and
+behaviour is unchanged.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import create_engine, delete, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import models
+from app.core import changelog  # noqa: F401 - registers the change log session hooks
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.database import SessionLocal, engine
+
+SHARD_QUERIES = REGISTRY.counter(
+    "hydro_shard_sessions_total", "Sessions opened per shard (routed and scatter-gather).", ("shard",))
+
+CATALOG = "catalog"
+
+# Tables replicated from the catalog into every shard, parents first
+HIERARCHY = (models.State, models.District, models.Village)
+
+# Per-village tables that live in the village's shard
+DATA_TABLES = (models.EnvironmentalData, models.SettlementData, models.RiskAssessment,
+               models.Prediction, models.ForecastRun, models.ForecastParam)
+
+# Natural keys of the data tables with surrogate ids (ForecastParam's primary key is natural)
+NATURAL_KEYS = {
+    models.EnvironmentalData: ("village_id", "date"),
+    models.SettlementData: ("village_id", "date"),
+    models.RiskAssessment: ("village_id", "date"),
+    models.Prediction: ("village_id", "prediction_date", "for_date"),
+    models.ForecastRun: ("village_id", "prediction_date", "start_date"),
+}
+
+
+class ShardRouter:
+    def __init__(self, catalog_engine: Engine, catalog_sessions: sessionmaker, shard_urls: Dict[str, str]):
+        self.engines: Dict[str, Engine] = {CATALOG: catalog_engine}
+        self._sessions: Dict[str, sessionmaker] = {CATALOG: catalog_sessions}
+        for code, url in shard_urls.items():
+            shard_engine = create_engine(url, connect_args={"check_same_thread": False}) \
+                if url.startswith("sqlite") else create_engine(url)
+            self.engines[code] = shard_engine
+            self._sessions[code] = sessionmaker(autocommit=False, autoflush=False, bind=shard_engine)
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._state_shard: Dict[int, str] = {}
+        self._district_state: Dict[int, int] = {}
+        self._village_state: Dict[int, int] = {}
+
+    @property
+    def sharded(self) -> bool:
+        return len(self.engines) > 1
+
+    def names(self) -> List[str]:
+        return list(self.engines)
+
+    # --- Catalog lookups ---
+
+    def refresh(self):
+        """Reload the state/district/village -> shard maps from the catalog."""
+        db = self._sessions[CATALOG]()
+        try:
+            state_shard = {state_id: code if code in self.engines else CATALOG
+                           for state_id, code in db.execute(select(models.State.id, models.State.code))}
+            district_state = dict(db.execute(select(models.District.id, models.District.state_id)).all())
+            village_state = {
+                village_id: district_state.get(district_id)
+                for village_id, district_id in db.execute(select(models.Village.id, models.Village.district_id))
+            }
+        finally:
+            db.close()
+        with self._lock:
+            self._state_shard, self._district_state, self._village_state = state_shard, district_state, village_state
+            self._loaded = True
+
+    def _fetch(self, mapping_name: str, key: int) -> Optional[Any]:
+        """One id's entry of a routing map, read from the catalog (None if the id does not exist)."""
+        db = self._sessions[CATALOG]()
+        try:
+            if mapping_name == "_state_shard":
+                code = db.execute(select(models.State.code).where(models.State.id == key)).scalar()
+                return None if code is None else code if code in self.engines else CATALOG
+            if mapping_name == "_district_state":
+                return db.execute(select(models.District.state_id).where(models.District.id == key)).scalar()
+            return db.execute(
+                select(models.District.state_id)
+                .join(models.Village, models.Village.district_id == models.District.id)
+                .where(models.Village.id == key)
+            ).scalar()
+        finally:
+            db.close()
+
+    def _lookup(self, mapping_name: str, key: int) -> Optional[Any]:
+        if not self._loaded:
+            self.refresh()
+        mapping = getattr(self, mapping_name)
+        if key in mapping:
+            return mapping[key]
+        # New ids are rare and unknown ones (bogus requests) common: look up just this id, never reload
+        value = self._fetch(mapping_name, key)
+        if value is not None:
+            with self._lock:
+                getattr(self, mapping_name)[key] = value
+        return value
+
+    def shard_for_state(self, state_id: Optional[int]) -> str:
+        if not self.sharded or state_id is None:
+            return CATALOG
+        return self._lookup("_state_shard", state_id) or CATALOG
+
+    def shard_for_district(self, district_id: int) -> str:
+        if not self.sharded:
+            return CATALOG
+        return self.shard_for_state(self._lookup("_district_state", district_id))
+
+    def shard_for_village(self, village_id: int) -> str:
+        if not self.sharded:
+            return CATALOG
+        return self.shard_for_state(self._lookup("_village_state", village_id))
+
+    def shard_for_bind(self, bind: Engine) -> Optional[str]:
+        """Name of the shard whose engine is `bind`, or None for a database the router does not know."""
+        for name, shard_engine in self.engines.items():
+            if shard_engine is bind:
+                return name
+        return None
+
+    def shards_for_region(self, state_id: Optional[int] = None, district_id: Optional[int] = None) -> List[str]:
+        """Shards holding a region's data; every shard when the region spans all states."""
+        if district_id is not None:
+            return [self.shard_for_district(district_id)]
+        if state_id is not None:
+            return [self.shard_for_state(state_id)]
+        return self.names()
+
+    def group_villages(self, village_ids: Iterable[int]) -> Dict[str, List[int]]:
+        groups: Dict[str, List[int]] = {}
+        for village_id in village_ids:
+            groups.setdefault(self.shard_for_village(village_id), []).append(village_id)
+        return groups
+
+    # --- Sessions ---
+
+    def session(self, shard: str = CATALOG) -> Session:
+        SHARD_QUERIES.inc(shard=shard)
+        return self._sessions[shard]()
+
+    def scatter(self, fn: Callable[[Session], Any], shards: Optional[List[str]] = None) -> List[Any]:
+        """Run fn(session) on each shard (all by default) concurrently; results in shard order."""
+        shards = shards or self.names()
+
+        def run(shard: str):
+            db = self.session(shard)
+            try:
+                return fn(db)
+            finally:
+                db.close()
+
+        if len(shards) == 1:
+            return [run(shards[0])]
+        with ThreadPoolExecutor(max_workers=len(shards), thread_name_prefix="shard") as pool:
+            return list(pool.map(run, shards))
+
+    # --- Hierarchy replication ---
+
+    def replicate_hierarchy(self) -> Dict[str, int]:
+        """Copy each sharded state's hierarchy rows from the catalog into its shard (insert or update)."""
+        self.refresh()
+        copied = {}
+        catalog = self.session(CATALOG)
+        try:
+            for shard in self.names():
+                if shard == CATALOG:
+                    continue
+                state_ids = [s for s, name in self._state_shard.items() if name == shard]
+                target = self.session(shard)
+                try:
+                    count = 0
+                    for model in HIERARCHY:
+                        query = catalog.query(model)
+                        if model is models.State:
+                            query = query.filter(models.State.id.in_(state_ids))
+                        elif model is models.District:
+                            query = query.filter(models.District.state_id.in_(state_ids))
+                        else:
+                            query = query.join(models.District).filter(models.District.state_id.in_(state_ids))
+                        for obj in query:
+                            values = {c.name: getattr(obj, c.name) for c in model.__table__.columns}
+                            target.merge(model(**values))
+                            count += 1
+                    target.commit()
+                    copied[shard] = count
+                finally:
+                    target.close()
+        finally:
+            catalog.close()
+        return copied
+
+    def move_data(self, batch_size: int = 1000) -> Dict[str, int]:
+        """
+        Move rows of sharded states still held by the catalog (e.g. loaded before
+        the shard existed) into their shards. Rows are upserted on their natural
+        key, so moving again (after a crash, or rows reloaded into the catalog)
+        updates the shard's rows instead of duplicating them. Surrogate ids are
+        assigned by the shard.
+        """
+        from app import crud
+
+        self.refresh()
+        moved = {}
+        catalog = self.session(CATALOG)
+        try:
+            for shard in self.names():
+                if shard == CATALOG:
+                    continue
+                village_ids = [v for v, state_id in self._village_state.items()
+                               if self._state_shard.get(state_id) == shard]
+                target = self.session(shard)
+                try:
+                    count = 0
+                    for model in DATA_TABLES:
+                        table = model.__table__
+                        key = NATURAL_KEYS.get(model)
+                        columns = [c for c in table.columns if not (key and c.name == "id")]
+                        for i in range(0, len(village_ids), batch_size):
+                            chunk = village_ids[i:i + batch_size]
+                            rows = [dict(r._mapping) for r in catalog.execute(
+                                select(*columns).where(table.c.village_id.in_(chunk)).order_by(*table.primary_key))]
+                            if not rows:
+                                continue
+                            if key:
+                                # Later catalog rows win on a repeated key
+                                crud.upsert_rows(target, model, {tuple(r[k] for k in key): r for r in rows}, key)
+                            else:
+                                for row in rows:
+                                    target.merge(model(**row))
+                            count += len(rows)
+                    # Commit the shard before deleting from the catalog: a crash leaves rows to move again, never losses
+                    target.commit()
+                    for model in DATA_TABLES:
+                        for i in range(0, len(village_ids), batch_size):
+                            catalog.execute(delete(model.__table__).where(
+                                model.__table__.c.village_id.in_(village_ids[i:i + batch_size])))
+                    catalog.commit()
+                    moved[shard] = count
+                finally:
+                    target.close()
+        finally:
+            catalog.close()
+        return moved
+
+
+router = ShardRouter(engine, SessionLocal, settings.SHARD_URLS)
+
+
+# --- FastAPI dependencies ---
+
+def _session(shard: str) -> Iterator[Session]:
+    db = router.session(shard)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_village_db(village_id: int) -> Iterator[Session]:
+    yield from _session(router.shard_for_village(village_id))
+
+
+def get_district_db(district_id: int) -> Iterator[Session]:
+    yield from _session(router.shard_for_district(district_id))
+
+
+def get_state_db(state_id: int) -> Iterator[Session]:
+    yield from _session(router.shard_for_state(state_id))
@@ -0,0 +1,253 @@
+"""
+Evacuation shelter assignment.
+
+Shelters (coordinates, capacity) are registered per district, in the database
+holding the district (the catalog or its state's shard). Each district is
+planned on its own with a greedy capacity-aware assignment:
+  - every village's evacuees are estimated from its 0-10 settlement indicators:
+    SHELTER_EVACUEES_PER_POINT per point of the mean of households and
+    population density;
+  - villages are served in priority order (risk category, then overall risk
+    score, highest first), so that when capacity runs short it is the
+    lowest-risk villages that are left unassigned;
+  - each village takes the nearest of its SHELTER_CANDIDATES nearest shelters
+    (within SHELTER_MAX_DISTANCE_KM, found with the spatial index) that can
+    hold all of its evacuees. When no candidate can, the evacuees are split
+    across the candidates in order of distance.
+
+Plans are kept per district with the inputs they were computed from. A village
+store or registry change only triggers a comparison of the district's inputs
+(risk category, evacuees and coordinates of each village; its shelters). Only
+districts whose inputs differ are replanned, and each is replanned lazily, on
+the first lookup after the change. A lookup for a village in an unchanged
+district is a dictionary read.
+"""
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import func, select
+
+from app import models
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.core.spatial import SpatialIndex
+from app.core.village_store import VillageStore, get_store
+from app.database import engine
+
+SHELTER_REPLANS = REGISTRY.counter(
+    "hydro_shelter_replans_total", "District shelter plans checked after a change, by outcome.", ("outcome",))
+SHELTER_REPLAN_SECONDS = REGISTRY.histogram(
+    "hydro_shelter_replan_seconds", "Time to replan one district's shelter assignment.")
+
+# Highest priority first when capacity runs short; villages without an assessment come last
+CATEGORY_PRIORITY = {"Extreme": 3, "High": 2, "Moderate": 1, "Low": 0}
+
+
+class DistrictPlan:
+    """Assignment of one district's villages to its shelters, with the inputs it was computed from."""
+
+    def __init__(self, district_id: int, key: tuple, inputs: Dict[str, np.ndarray],
+                 villages: Dict[int, dict], assigned: Dict[int, int]):
+        self.district_id = district_id
+        self.key = key
+        self.inputs = inputs
+        self.villages = villages
+        self.assigned = assigned
+        self.planned_at = datetime.utcnow()
+
+    def same_inputs(self, inputs: Dict[str, np.ndarray]) -> bool:
+        return all(np.array_equal(self.inputs[name], inputs[name], equal_nan=inputs[name].dtype.kind == "f")
+                   for name in inputs)
+
+
+def evacuees(store: VillageStore, rows: np.ndarray) -> np.ndarray:
+    households = np.nan_to_num(store.columns["households"][rows])
+    density = np.nan_to_num(store.columns["population_density"][rows])
+    return np.rint(settings.SHELTER_EVACUEES_PER_POINT * (households + density) / 2.0).astype(np.int64)
+
+
+def assign(inputs: Dict[str, np.ndarray], shelters: Dict[str, np.ndarray]) -> Dict[str, object]:
+    """
+    Greedy assignment of villages to shelters; returns per-village allocations
+    [(shelter row, evacuees, distance km)], unassigned evacuees and shelter loads.
+    """
+    n, s = len(inputs["village_id"]), len(shelters["id"])
+    allocations: List[List[tuple]] = [[] for _ in range(n)]
+    unassigned = inputs["evacuees"].copy()
+    remaining = shelters["capacity"].copy()
+    if n and s:
+        index = SpatialIndex(shelters["latitude"], shelters["longitude"], {}, shelters["id"])
+        located = np.isfinite(inputs["latitude"]) & np.isfinite(inputs["longitude"])
+        k = min(settings.SHELTER_CANDIDATES, s)
+        distances = np.full((n, k), np.inf)
+        candidates = np.zeros((n, k), dtype=np.int64)
+        if located.any():
+            distances[located], candidates[located] = index.nearest(
+                index.project(inputs["latitude"][located], inputs["longitude"][located]), k)
+        in_range = distances <= settings.SHELTER_MAX_DISTANCE_KM
+
+        order = np.lexsort((inputs["village_id"], -np.nan_to_num(inputs["score"], nan=-1.0), -inputs["priority"]))
+        for i in order.tolist():
+            need = int(unassigned[i])
+            if need <= 0:
+                continue
+            options = candidates[i][in_range[i]].tolist()
+            option_distances = distances[i][in_range[i]].tolist()
+            # The nearest shelter that takes the whole village keeps it together
+            whole = next((j for j, row in enumerate(options) if remaining[row] >= need), None)
+            picks = [whole] if whole is not None else range(len(options))
+            for j in picks:
+                row = options[j]
+                take = min(need, int(remaining[row]))
+                if take <= 0:
+                    continue
+                remaining[row] -= take
+                need -= take
+                allocations[i].append((row, take, option_distances[j]))
+                if need == 0:
+                    break
+            unassigned[i] = need
+    return {"allocations": allocations, "unassigned": unassigned, "load": shelters["capacity"] - remaining}
+
+
+class ShelterPlanner:
+    """Shelter registry and per-district plans of one database."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.version = 0
+        self._signature = None
+        self._checked_at = 0.0
+        self.shelters: Dict[int, dict] = {}
+        self.by_district: Dict[int, Dict[str, np.ndarray]] = {}
+        self.plans: Dict[int, DistrictPlan] = {}
+
+    # --- Registry ---
+
+    def invalidate(self):
+        """Force a registry check on the next lookup (after a shelter was written)."""
+        self._checked_at = 0.0
+
+    def sync(self, db):
+        """Reload the registry if shelters changed (checked at most every VILLAGE_STORE_SYNC_SECONDS)."""
+        if time.monotonic() - self._checked_at < settings.VILLAGE_STORE_SYNC_SECONDS:
+            return
+        with self._lock:
+            shelter = models.Shelter
+            signature = tuple(db.execute(
+                select(func.count(shelter.id), func.max(shelter.id), func.max(shelter.updated_at))).one())
+            self._checked_at = time.monotonic()
+            if signature == self._signature:
+                return
+            shelters, by_district = {}, {}
+            for row in db.query(shelter).order_by(shelter.id):
+                shelters[row.id] = {
+                    "id": row.id, "district_id": row.district_id, "name": row.name,
+                    "latitude": row.latitude, "longitude": row.longitude, "capacity": row.capacity or 0,
+                    "contact": row.contact, "facilities": json.loads(row.facilities) if row.facilities else [],
+                }
+                by_district.setdefault(row.district_id, []).append(shelters[row.id])
+            self.shelters = shelters
+            self.by_district = {
+                district_id: {
+                    "id": np.array([r["id"] for r in rows], dtype=np.int64),
+                    "latitude": np.array([r["latitude"] for r in rows], dtype=np.float64),
+                    "longitude": np.array([r["longitude"] for r in rows], dtype=np.float64),
+                    "capacity": np.array([r["capacity"] for r in rows], dtype=np.int64),
+                }
+                for district_id, rows in by_district.items()
+            }
+            self._signature = signature
+            self.version += 1
+
+    # --- Plans ---
+
+    def _shelters(self, district_id: int) -> Dict[str, np.ndarray]:
+        return self.by_district.get(district_id) or {
+            "id": np.zeros(0, np.int64), "latitude": np.zeros(0), "longitude": np.zeros(0),
+            "capacity": np.zeros(0, np.int64)}
+
+    def _inputs(self, store: VillageStore, district_id: int) -> Dict[str, np.ndarray]:
+        """Everything a district's plan depends on: its villages and its shelters."""
+        rows = store.select(district_id=district_id)
+        rows = rows[np.argsort(store.village_ids[rows], kind="stable")]
+        categories = store.columns["risk_category"][rows]
+        return {
+            **{f"shelter_{name}": values for name, values in self._shelters(district_id).items()},
+            "village_id": store.village_ids[rows],
+            "risk_category": categories,
+            "priority": np.array([CATEGORY_PRIORITY.get(c, -1) for c in categories], dtype=np.int64),
+            "score": store.columns["overall_risk_score"][rows],
+            "evacuees": evacuees(store, rows),
+            "latitude": store.columns["latitude"][rows],
+            "longitude": store.columns["longitude"][rows],
+        }
+
+    def _plan(self, district_id: int, key: tuple, inputs: Dict[str, np.ndarray]) -> DistrictPlan:
+        started = time.perf_counter()
+        shelters = {name[len("shelter_"):]: values for name, values in inputs.items() if name.startswith("shelter_")}
+        result = assign(inputs, shelters)
+        villages = {}
+        for i, village_id in enumerate(inputs["village_id"].tolist()):
+            villages[village_id] = {
+                "village_id": village_id,
+                "district_id": district_id,
+                "risk_category": inputs["risk_category"][i],
+                "evacuees": int(inputs["evacuees"][i]),
+                "unassigned": int(result["unassigned"][i]),
+                "shelters": [
+                    {"shelter_id": int(shelters["id"][row]), "distance_km": round(distance, 2), "evacuees": take}
+                    for row, take, distance in result["allocations"][i]
+                ],
+            }
+        assigned = dict(zip(shelters["id"].tolist(), result["load"].tolist()))
+        SHELTER_REPLAN_SECONDS.observe(time.perf_counter() - started)
+        return DistrictPlan(district_id, key, inputs, villages, assigned)
+
+    def district_plan(self, db, district_id: int) -> DistrictPlan:
+        """The current plan of a district, replanned only if its inputs changed."""
+        store = get_store(db)
+        self.sync(db)
+        key = (self.version, store.version)
+        plan = self.plans.get(district_id)
+        if plan is not None and plan.key == key:
+            return plan
+        with self._lock:
+            plan = self.plans.get(district_id)
+            if plan is not None and plan.key == key:
+                return plan
+            inputs = self._inputs(store, district_id)
+            if plan is not None and plan.same_inputs(inputs):
+                plan.key = key
+                SHELTER_REPLANS.inc(outcome="unchanged")
+                return plan
+            plan = self._plan(district_id, key, inputs)
+            self.plans[district_id] = plan
+            SHELTER_REPLANS.inc(outcome="replanned")
+            return plan
+
+    def village_plan(self, db, village_id: int) -> Optional[dict]:
+        store = get_store(db)
+        row = store.index.get(village_id)
+        if row is None:
+            return None
+        plan = self.district_plan(db, int(store.columns["district_id"][row]))
+        return plan.villages.get(village_id)
+
+
+# One planner per database (the catalog and each shard), keyed by URL
+_planners: Dict[str, ShelterPlanner] = {str(engine.url): ShelterPlanner()}
+_planners_lock = threading.Lock()
+
+
+def planner_for(db) -> ShelterPlanner:
+    key = str(db.get_bind().url)
+    planner = _planners.get(key)
+    if planner is None:
+        with _planners_lock:
+            planner = _planners.setdefault(key, ShelterPlanner())
+    return planner
@@ -0,0 +1,98 @@
+"""
+Single-flight coalescing of identical concurrent computations.
+
+Sync endpoints run on the threadpool, so when many clients ask for the same
+village at once the first caller for a key (the leader) runs the computation
+and every concurrent caller with the same key waits for and shares its result
+(or exception). Each flight has a deadline; followers still waiting when it
+passes stop waiting, evict the flight so later callers start afresh, and
+compute the result themselves.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+
+SINGLEFLIGHT_EXECUTIONS = REGISTRY.counter(
+    "hydro_singleflight_executions_total", "Computations actually executed, by coalescing group.", ("group",))
+SINGLEFLIGHT_COALESCED = REGISTRY.counter(
+    "hydro_singleflight_coalesced_total", "Duplicate computations avoided by sharing an in-flight result.",
+    ("group",))
+SINGLEFLIGHT_TIMEOUTS = REGISTRY.counter(
+    "hydro_singleflight_timeouts_total", "Waiters that gave up on a flight past its deadline.", ("group",))
+SINGLEFLIGHT_IN_FLIGHT = REGISTRY.gauge(
+    "hydro_singleflight_in_flight", "Keys currently being computed, by coalescing group.", ("group",))
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "deadline", "waiters")
+
+    def __init__(self, deadline: float):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.deadline = deadline
+        self.waiters = 0
+
+
+class SingleFlight:
+    """A named group of coalesced computations (one group per endpoint)."""
+
+    def __init__(self, name: str, timeout: Optional[float] = None):
+        self.name = name
+        self.timeout = timeout if timeout is not None else settings.SINGLEFLIGHT_TIMEOUT_SECONDS
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """Return fn(), sharing one execution among concurrent callers with an equal key."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight(time.monotonic() + (timeout or self.timeout))
+            else:
+                flight.waiters += 1
+
+        if leader:
+            return self._run(key, flight, fn)
+
+        SINGLEFLIGHT_COALESCED.inc(group=self.name)
+        if not flight.done.wait(max(0.0, flight.deadline - time.monotonic())):
+            SINGLEFLIGHT_TIMEOUTS.inc(group=self.name)
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            SINGLEFLIGHT_EXECUTIONS.inc(group=self.name)
+            return fn()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def _run(self, key: Hashable, flight: _Flight, fn: Callable[[], Any]) -> Any:
+        SINGLEFLIGHT_EXECUTIONS.inc(group=self.name)
+        SINGLEFLIGHT_IN_FLIGHT.inc(group=self.name)
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            SINGLEFLIGHT_IN_FLIGHT.dec(group=self.name)
+            flight.done.set()
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+
+def normalize_param(value: Any) -> Any:
+    """Canonical form of a query parameter for a coalescing key; float noise below 1e-6 is ignored."""
+    if isinstance(value, float):
+        return round(value, 6)
+    return value
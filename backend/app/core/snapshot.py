@@ -0,0 +1,288 @@
+"""
+Shared read-only snapshot of hot reference data.
+
+A snapshot is a versioned directory holding the pre-serialized location
+hierarchy, the latest indicators of every village and its precomputed baseline
+forecast. Workers memory-map the files, so N workers share one copy of the
+pages in the OS cache instead of each building private caches. Publishing a new
+version is an atomic swap of the CURRENT pointer file; workers notice the swap
+on their next check and remap.
+"""
+import json
+import logging
+import mmap
+import os
+import random
+import shutil
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app import crud, schemas
+from app.core import forecaster
+from app.core.config import settings
+from app.core.forecast import FORECAST_COLUMNS, FORECAST_DAYS, MOCK_ID_BASE, simulate_forecast
+from app.core.sharding import router
+from app.core.village_store import (
+    ENVIRONMENTAL_COLUMNS, INDICATOR_COLUMNS, SETTLEMENT_COLUMNS, VillageStore,
+)
+
+logger = logging.getLogger("hydro_hub.snapshot")
+
+POINTER_FILE = "CURRENT"
+
+
+def _dumps(payload: Any) -> bytes:
+    # Same compact encoding FastAPI uses for JSON responses
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+# --- Building ---
+
+def _location_blobs(db) -> Dict[str, bytes]:
+    states = crud.get_states(db, limit=None)
+    villages = crud.get_all_villages(db)
+    blobs = {"states": _dumps([schemas.State.model_validate(s).model_dump(mode="json") for s in states])}
+    for state in states:
+        districts = crud.get_districts_by_state(db, state_id=state.id)
+        blobs[f"districts/{state.id}"] = _dumps(
+            [schemas.District.model_validate(d).model_dump(mode="json") for d in districts])
+    by_district: Dict[int, List[Dict]] = {}
+    for village in villages:
+        by_district.setdefault(village.district_id, []).append(
+            schemas.Village.model_validate(village).model_dump(mode="json"))
+    for district_id, rows in by_district.items():
+        blobs[f"villages/{district_id}"] = _dumps(rows)
+    return blobs
+
+
+def _village_data(db, forecast_start: date, seed: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Village ids, latest indicators and baseline forecasts as held by one shard."""
+    store = VillageStore()
+    store.load(db)
+    village_ids = store.village_ids[:store.size]
+    indicators = np.column_stack([store.columns[c][:store.size] for c in INDICATOR_COLUMNS])
+
+    # Baseline forecasts, from the fitted parameters where the village has them (as served
+    # without a snapshot); villages with stored predictions keep NaN and are served from the DB
+    forecasts = np.full((len(village_ids), FORECAST_DAYS, len(FORECAST_COLUMNS)), np.nan, dtype=np.float32)
+    end_date = date.fromordinal(forecast_start.toordinal() + FORECAST_DAYS - 1)
+    stored = crud.get_forecast_village_ids(db, forecast_start, end_date)
+    rng = random.Random(seed)
+    for i, village_id in enumerate(village_ids.tolist()):
+        values = indicators[i]
+        if village_id in stored or np.isnan(values[:len(ENVIRONMENTAL_COLUMNS) + len(SETTLEMENT_COLUMNS)]).any():
+            continue
+        env = dict(zip(ENVIRONMENTAL_COLUMNS, values[:5].tolist()))
+        settlement = dict(zip(SETTLEMENT_COLUMNS, values[5:9].tolist()))
+        days = forecaster.forecast(db, village_id, forecast_start, FORECAST_DAYS, env, settlement)
+        if days is None:
+            days = simulate_forecast(village_id, env, settlement, forecast_start, rng=rng)
+        forecasts[i] = [[d[c] for c in FORECAST_COLUMNS] for d in days]
+    return village_ids, indicators, forecasts
+
+
+def _merge_shards(shards: List[str], parts: List[Tuple[np.ndarray, np.ndarray, np.ndarray]]):
+    """Each village's rows from the shard holding its state (the catalog keeps NaN for the others), by id."""
+    keep = []
+    for shard, (village_ids, indicators, forecasts) in zip(shards, parts):
+        owned = np.array([router.shard_for_village(v) == shard for v in village_ids.tolist()], dtype=bool)
+        keep.append((village_ids[owned], indicators[owned], forecasts[owned]))
+    village_ids, indicators, forecasts = (np.concatenate(arrays) for arrays in zip(*keep))
+    order = np.argsort(village_ids, kind="stable")
+    return village_ids[order], indicators[order], forecasts[order]
+
+
+def build_snapshot(db, directory: str, forecast_start: Optional[date] = None, seed: int = 0) -> str:
+    """
+    Write a new snapshot version under `directory` and atomically publish it.
+    `db` is a catalog session; village data is gathered from every shard.
+    """
+    forecast_start = forecast_start or date.today()
+    version = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    target = os.path.join(directory, version)
+    staging = target + ".tmp"
+    os.makedirs(staging, exist_ok=True)
+
+    # 1. Location hierarchy, pre-serialized into one blob with an offset index
+    index, offset = {}, 0
+    with open(os.path.join(staging, "locations.bin"), "wb") as f:
+        for key, blob in _location_blobs(db).items():
+            f.write(blob)
+            index[key] = [offset, len(blob)]
+            offset += len(blob)
+
+    # 2. Latest indicators and baseline forecasts, from every shard
+    village_ids, indicators, forecasts = _merge_shards(
+        router.names(), router.scatter(lambda shard_db: _village_data(shard_db, forecast_start, seed)))
+
+    np.save(os.path.join(staging, "village_ids.npy"), village_ids)
+    np.save(os.path.join(staging, "indicators.npy"), indicators)
+    np.save(os.path.join(staging, "forecasts.npy"), forecasts)
+    with open(os.path.join(staging, "meta.json"), "w") as f:
+        json.dump({
+            "version": version,
+            "created_at": datetime.utcnow().isoformat(),
+            "forecast_start": forecast_start.isoformat(),
+            "indicator_columns": INDICATOR_COLUMNS,
+            "forecast_columns": FORECAST_COLUMNS,
+            "locations": index,
+        }, f)
+
+    os.replace(staging, target)
+    publish(directory, version)
+    prune(directory, keep=settings.SNAPSHOT_KEEP)
+    return version
+
+
+def publish(directory: str, version: str):
+    """Atomically point CURRENT at `version`."""
+    pointer = os.path.join(directory, POINTER_FILE)
+    with open(pointer + ".tmp", "w") as f:
+        f.write(version)
+    os.replace(pointer + ".tmp", pointer)
+
+
+def prune(directory: str, keep: int):
+    # Workers may still map an older version for a few seconds; on POSIX the
+    # mapped pages stay valid after the directory is removed
+    versions = sorted(
+        name for name in os.listdir(directory)
+        if os.path.isdir(os.path.join(directory, name)) and not name.endswith(".tmp")
+    )
+    for name in versions[:-keep]:
+        shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+
+# --- Reading ---
+
+class Snapshot:
+    """One memory-mapped snapshot version."""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.version = self.meta["version"]
+        self.forecast_start = date.fromisoformat(self.meta["forecast_start"])
+        self.village_ids = np.load(os.path.join(path, "village_ids.npy"), mmap_mode="r")
+        self.indicators = np.load(os.path.join(path, "indicators.npy"), mmap_mode="r")
+        self.forecasts = np.load(os.path.join(path, "forecasts.npy"), mmap_mode="r")
+        with open(os.path.join(path, "locations.bin"), "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self._locations = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self._index = self.meta["locations"]
+
+    def location_json(self, key: str) -> Optional[bytes]:
+        """Pre-serialized response body for states, districts/{id} or villages/{id}."""
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+        offset, length = entry
+        return self._locations[offset:offset + length]
+
+    def row(self, village_id: int) -> Optional[int]:
+        i = int(np.searchsorted(self.village_ids, village_id))
+        if i < len(self.village_ids) and self.village_ids[i] == village_id:
+            return i
+        return None
+
+    def forecast(self, village_id: int, start_date: date) -> Optional[List[Dict[str, Any]]]:
+        """Precomputed baseline forecast starting at `start_date`, if this snapshot has it."""
+        if start_date != self.forecast_start:
+            return None
+        i = self.row(village_id)
+        if i is None or np.isnan(self.forecasts[i, 0, 0]):
+            return None
+        days = []
+        for d, values in enumerate(self.forecasts[i].tolist()):
+            day = {
+                "id": MOCK_ID_BASE + d,
+                "village_id": village_id,
+                "prediction_date": start_date,
+                "for_date": date.fromordinal(start_date.toordinal() + d),
+            }
+            day.update((c, round(v, 4)) for c, v in zip(FORECAST_COLUMNS, values))
+            days.append(day)
+        return days
+
+
+class SnapshotReader:
+    """
+    Per-worker handle on the current snapshot. The pointer file is stat'ed at
+    most every SNAPSHOT_CHECK_SECONDS, so reads cost no I/O in between.
+    """
+
+    def __init__(self, directory: Optional[str], check_seconds: float = 5.0):
+        self.directory = directory
+        self.check_seconds = check_seconds
+        self._snapshot: Optional[Snapshot] = None
+        self._pointer_stat = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def current(self) -> Optional[Snapshot]:
+        if not self.directory:
+            return None
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_seconds:
+            with self._lock:
+                if now - self._checked_at >= self.check_seconds:
+                    self._refresh()
+                    self._checked_at = now
+        return self._snapshot
+
+    def _refresh(self):
+        pointer = os.path.join(self.directory, POINTER_FILE)
+        try:
+            stat = os.stat(pointer)
+        except FileNotFoundError:
+            self._snapshot = None
+            return
+        key = (stat.st_ino, stat.st_mtime_ns)
+        if key == self._pointer_stat:
+            return
+        with open(pointer) as f:
+            version = f.read().strip()
+        try:
+            self._snapshot = Snapshot(os.path.join(self.directory, version))
+            self._pointer_stat = key
+            logger.info("Mapped snapshot %s", version)
+        except (FileNotFoundError, ValueError) as exc:
+            # Keep serving the previous version; retry on the next check
+            logger.warning("Could not load snapshot %s: %s", version, exc)
+
+
+reader = SnapshotReader(settings.SNAPSHOT_DIR, settings.SNAPSHOT_CHECK_SECONDS)
+
+
+def current() -> Optional[Snapshot]:
+    return reader.current()
+
+
+class SnapshotRefresher(threading.Thread):
+    """Rebuilds and publishes the snapshot periodically (runs in the supervisor process)."""
+
+    def __init__(self, directory: str, interval: float):
+        super().__init__(name="snapshot-refresher", daemon=True)
+        self.directory = directory
+        self.interval = interval
+        self._done = threading.Event()
+
+    def run(self):
+        from app.database import SessionLocal
+
+        while not self._done.wait(self.interval):
+            db = SessionLocal()
+            try:
+                version = build_snapshot(db, self.directory)
+                logger.info("Published snapshot %s", version)
+            except Exception:
+                logger.exception("Snapshot refresh failed; workers keep the previous version")
+            finally:
+                db.close()
+
+    def stop(self):
+        self._done.set()
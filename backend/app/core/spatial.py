@@ -0,0 +1,251 @@
+"""
+Spatial interpolation of risk between villages.
+
+Risk is only assessed at village points. The interpolator projects village
+coordinates onto a local equirectangular plane (km), indexes them in a KD-tree
+(scipy's cKDTree when installed, otherwise a brute-force k-nearest search in
+memory-bounded blocks) and estimates any location by inverse-distance weighting of its
+INTERPOLATION_NEIGHBORS nearest villages. Locations further than
+INTERPOLATION_MAX_DISTANCE_KM from every village have no estimate.
+
+Rasters are laid out on a global lattice of `resolution`-degree cells grouped
+into RASTER_TILE_CELLS x RASTER_TILE_CELLS tiles. Each tile is interpolated in
+one vectorized pass and cached per (score, resolution, tile); a bounding box is
+assembled from the tiles it overlaps. The index and the tile cache are rebuilt
+whenever any of the village stores (the catalog's and each shard's) changes.
+"""
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.core.village_store import ASSESSMENT_COLUMNS, VillageStore
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # pragma: no cover - optional dependency
+    cKDTree = None
+
+RASTER_TILES = REGISTRY.counter(
+    "hydro_raster_tiles_total", "Risk raster tiles served, by source (cache or compute).", ("source",))
+
+KM_PER_DEGREE_LAT = 110.574
+KM_PER_DEGREE_LNG = 111.320
+
+# Allowed raster cell sizes (degrees); a fixed set keeps the tile cache shareable between clients
+RESOLUTIONS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+
+# Brute-force distance block size, in (query x village) float64 cells (32 MB)
+_BRUTE_FORCE_CELLS = 1 << 22
+
+
+class SpatialIndex:
+    """Nearest-village lookups and IDW estimates over the villages that have an assessment."""
+
+    def __init__(self, latitudes: np.ndarray, longitudes: np.ndarray, values: Dict[str, np.ndarray],
+                 village_ids: np.ndarray, version=0):
+        self.version = version
+        self.village_ids = village_ids
+        self.values = values
+        self.lat0 = float(np.mean(latitudes)) if len(latitudes) else 0.0
+        self._lng_scale = KM_PER_DEGREE_LNG * math.cos(math.radians(self.lat0))
+        self.points = self.project(latitudes, longitudes)
+        self._tree = cKDTree(self.points) if cKDTree is not None and len(self.points) else None
+
+    @classmethod
+    def from_store(cls, store: VillageStore) -> "SpatialIndex":
+        return cls.from_stores([store])
+
+    @classmethod
+    def from_stores(cls, stores: Sequence[VillageStore]) -> "SpatialIndex":
+        """One index over the assessed villages of several stores; its version is the tuple of theirs."""
+        version = tuple(store.version for store in stores)
+        parts = []
+        for store in stores:
+            n = store.size
+            lat, lng = store.columns["latitude"][:n], store.columns["longitude"][:n]
+            scores = np.column_stack([store.columns[c][:n] for c in ASSESSMENT_COLUMNS]) if n else np.zeros((0, 1))
+            rows = np.flatnonzero(~np.isnan(lat) & ~np.isnan(lng) & ~np.isnan(scores).any(axis=1))
+            parts.append((lat[rows], lng[rows], {c: store.columns[c][rows] for c in ASSESSMENT_COLUMNS},
+                          store.village_ids[rows]))
+        return cls(np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts]),
+                   {c: np.concatenate([p[2][c] for p in parts]) for c in ASSESSMENT_COLUMNS},
+                   np.concatenate([p[3] for p in parts]), version)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def project(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        return np.column_stack([
+            np.asarray(longitudes, dtype=np.float64) * self._lng_scale,
+            np.asarray(latitudes, dtype=np.float64) * KM_PER_DEGREE_LAT,
+        ])
+
+    def nearest(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(distances, indices), each (Q x k) sorted by distance, for projected query points."""
+        k = min(k, len(self.points))
+        if self._tree is not None:
+            distances, indices = self._tree.query(queries, k=k)
+            return distances.reshape(len(queries), k), indices.reshape(len(queries), k)
+
+        # Without scipy: squared distances as |q|^2 - 2 q.p + |p|^2, in query blocks sized so the
+        # (block x villages) matrix stays within _BRUTE_FORCE_CELLS; centered to keep the expansion precise
+        center = self.points.mean(axis=0)
+        points = self.points - center
+        points_sq = (points * points).sum(axis=1)
+        block_size = max(1, _BRUTE_FORCE_CELLS // len(points))
+        distances = np.empty((len(queries), k))
+        indices = np.empty((len(queries), k), dtype=np.int64)
+        for start in range(0, len(queries), block_size):
+            block = queries[start:start + block_size] - center
+            d2 = (block * block).sum(axis=1)[:, None] - 2.0 * (block @ points.T) + points_sq[None, :]
+            nearest = np.argpartition(d2, k - 1, axis=1)[:, :k] if k < len(points) \
+                else np.broadcast_to(np.arange(k), d2.shape).copy()
+            # Exact distances of the k candidates (the expansion cancels badly for a query on a village)
+            d2_nearest = ((block[:, None, :] - points[nearest]) ** 2).sum(axis=2)
+            order = np.argsort(d2_nearest, axis=1)
+            indices[start:start + len(block)] = np.take_along_axis(nearest, order, axis=1)
+            distances[start:start + len(block)] = np.sqrt(np.take_along_axis(d2_nearest, order, axis=1))
+        return distances, indices
+
+    def interpolate(self, latitudes: np.ndarray, longitudes: np.ndarray, score: str,
+                    neighbors: Optional[int] = None, max_distance_km: Optional[float] = None,
+                    power: Optional[float] = None) -> np.ndarray:
+        """IDW estimate of `score` at each location; NaN where no village is within range."""
+        neighbors = neighbors or settings.INTERPOLATION_NEIGHBORS
+        max_distance_km = max_distance_km if max_distance_km is not None else settings.INTERPOLATION_MAX_DISTANCE_KM
+        power = power if power is not None else settings.INTERPOLATION_POWER
+
+        queries = self.project(latitudes, longitudes)
+        if not len(self.points):
+            return np.full(len(queries), np.nan)
+        distances, indices = self.nearest(queries, neighbors)
+        values = self.values[score][indices]
+
+        in_range = distances <= max_distance_km
+        with np.errstate(divide="ignore"):
+            weights = np.where(in_range, 1.0 / np.maximum(distances, 1e-9) ** power, 0.0)
+        total = weights.sum(axis=1)
+        with np.errstate(invalid="ignore"):
+            estimate = (weights * values).sum(axis=1) / total
+        # A query on top of a village takes its value exactly
+        exact = distances[:, 0] < 1e-6
+        estimate[exact] = values[exact, 0]
+        estimate[total == 0] = np.nan
+        return estimate
+
+
+class RasterCache:
+    """LRU of interpolated tiles, keyed by (store version, score, resolution, tile row, tile column)."""
+
+    def __init__(self, max_tiles: int):
+        self.max_tiles = max_tiles
+        self._tiles: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[np.ndarray]:
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+            return tile
+
+    def put(self, key, tile: np.ndarray):
+        with self._lock:
+            self._tiles[key] = tile
+            self._tiles.move_to_end(key)
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._tiles.clear()
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+
+class RiskSurface:
+    """Process-wide interpolator tied to the versions of the village stores it covers."""
+
+    def __init__(self):
+        self._version = None
+        self._index: Optional[SpatialIndex] = None
+        self._lock = threading.Lock()
+        self.tiles = RasterCache(settings.RASTER_CACHE_TILES)
+
+    def index(self, stores: Sequence[VillageStore]) -> SpatialIndex:
+        version = tuple(store.version for store in stores)
+        if self._version != version:
+            with self._lock:
+                if self._version != version:
+                    self._index = SpatialIndex.from_stores(stores)
+                    self.tiles.clear()
+                    self._version = self._index.version
+        return self._index
+
+    def point(self, stores: Sequence[VillageStore], lat: float, lng: float) -> Dict[str, object]:
+        index = self.index(stores)
+        estimates = {}
+        for score in ASSESSMENT_COLUMNS:
+            value = float(index.interpolate(np.array([lat]), np.array([lng]), score)[0])
+            estimates[score] = None if math.isnan(value) else round(value, 2)
+        nearest_id, nearest_km = None, None
+        if len(index):
+            distances, indices = index.nearest(index.project(np.array([lat]), np.array([lng])), 1)
+            nearest_id, nearest_km = int(index.village_ids[indices[0, 0]]), float(distances[0, 0])
+        return {"estimates": estimates, "nearest_village_id": nearest_id, "nearest_distance_km": nearest_km}
+
+    def _tile(self, index: SpatialIndex, score: str, resolution: float, row: int, col: int) -> np.ndarray:
+        """(cells x cells) float32 tile; rows run south to north from lattice row `row`."""
+        # The store version guards against a stale index's tiles landing after a rebuild
+        key = (index.version, score, resolution, row, col)
+        tile = self.tiles.get(key)
+        if tile is not None:
+            RASTER_TILES.inc(source="cache")
+            return tile
+        cells = settings.RASTER_TILE_CELLS
+        centers = (np.arange(cells) + 0.5) * resolution
+        lats = -90.0 + row * cells * resolution + centers
+        lngs = -180.0 + col * cells * resolution + centers
+        grid_lat, grid_lng = np.meshgrid(lats, lngs, indexing="ij")
+        tile = index.interpolate(grid_lat.ravel(), grid_lng.ravel(), score).reshape(cells, cells).astype(np.float32)
+        tile.setflags(write=False)
+        self.tiles.put(key, tile)
+        RASTER_TILES.inc(source="compute")
+        return tile
+
+    def raster(self, stores: Sequence[VillageStore], score: str, resolution: float, south: float, west: float,
+               north: float, east: float) -> Tuple[np.ndarray, Tuple[float, float, float, float]]:
+        """
+        Grid of `score` covering the bounding box, snapped outward to whole cells.
+        Returns (float32 array with the northernmost row first, (west, south, east, north) of the grid).
+        """
+        index = self.index(stores)
+        cells = settings.RASTER_TILE_CELLS
+        # Global cell coordinates of the covered range (half-open)
+        r0 = math.floor((south + 90.0) / resolution + 1e-9)
+        r1 = math.ceil((north + 90.0) / resolution - 1e-9)
+        c0 = math.floor((west + 180.0) / resolution + 1e-9)
+        c1 = math.ceil((east + 180.0) / resolution - 1e-9)
+        r1, c1 = max(r1, r0 + 1), max(c1, c0 + 1)
+
+        grid = np.empty((r1 - r0, c1 - c0), dtype=np.float32)
+        for tile_row in range(r0 // cells, (r1 - 1) // cells + 1):
+            for tile_col in range(c0 // cells, (c1 - 1) // cells + 1):
+                tile = self._tile(index, score, resolution, tile_row, tile_col)
+                tr0, tc0 = tile_row * cells, tile_col * cells
+                rs, re = max(r0, tr0), min(r1, tr0 + cells)
+                cs, ce = max(c0, tc0), min(c1, tc0 + cells)
+                grid[rs - r0:re - r0, cs - c0:ce - c0] = tile[rs - tr0:re - tr0, cs - tc0:ce - tc0]
+
+        bounds = (-180.0 + c0 * resolution, -90.0 + r0 * resolution,
+                  -180.0 + c1 * resolution, -90.0 + r1 * resolution)
+        return grid[::-1], bounds
+
+
+risk_surface = RiskSurface()
@@ -0,0 +1,169 @@
+"""
+Static bundle of the public read-only API responses.
+
+`python manage.py bundle` renders the location tree and, for every village,
+its risk profile and baseline forecast into a versioned directory under
+STATIC_BUNDLE_DIR. The files sit at their API path plus ".json", e.g.
+risk/village/17.json for /api/risk/village/17. Each file is stored as-is,
+gzipped and brotli-compressed, so a plain file server or CDN can serve the
+hot lookups with the matching Content-Encoding. The API is then only needed
+for simulations and writes.
+
+manifest.json maps each path to the sha256 and size of its body. A build
+renders every body, which is cheap next to compressing and writing it. A body
+whose hash matches the previous version's manifest is hard-linked from that
+version instead of being compressed and written again. CURRENT is swapped
+atomically, the same way as for the shared snapshot.
+"""
+import gzip
+import hashlib
+import json
+import os
+import random
+import shutil
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import brotli
+from fastapi import HTTPException
+
+from app import crud, schemas
+from app.core import forecaster
+from app.core.config import settings
+from app.core.forecast import FORECAST_DAYS, simulate_forecast, summarize_forecast
+from app.core.metrics import REGISTRY
+from app.core.snapshot import POINTER_FILE, _dumps, prune, publish
+from app.core.village_store import get_store
+
+BUNDLE_FILES = REGISTRY.counter(
+    "hydro_static_bundle_files_total", "Static bundle files, by outcome (rendered or reused).", ("outcome",))
+
+MANIFEST_FILE = "manifest.json"
+
+
+def _encodings() -> Dict[str, Any]:
+    return {
+        # mtime=0 keeps gzip output a pure function of the body
+        ".gz": lambda body: gzip.compress(body, compresslevel=9, mtime=0),
+        ".br": lambda body: brotli.compress(body, quality=11),
+    }
+
+
+def _forecast_payload(db, village_id: int, start_date: date) -> Optional[Dict[str, Any]]:
+    """Baseline forecast as served by /api/predictions/village/{id} with no overrides."""
+    days = crud.get_forecast(db, village_id=village_id, start_date=start_date,
+                             end_date=start_date + timedelta(days=14))
+    if not days:
+        record = get_store(db).get(village_id)
+        env, settlement = (record.environmental(), record.settlement()) if record is not None else (None, None)
+        if env is None or settlement is None:
+            return None
+        days = forecaster.forecast(db, village_id, start_date, FORECAST_DAYS, env, settlement)
+        if days is None:
+            # Seeded per village and day so that an unchanged baseline renders an unchanged file
+            rng = random.Random(f"{village_id}:{start_date.isoformat()}")
+            days = simulate_forecast(village_id, env, settlement, start_date, rng=rng)
+    return schemas.PredictionForecast.model_validate(summarize_forecast(start_date, days)).model_dump(mode="json")
+
+
+def render(db, start_date: Optional[date] = None) -> Iterator[Tuple[str, bytes]]:
+    """(path, JSON body) for every response in the bundle."""
+    from app.api.risk import risk_profile
+    from app.core.sharding import router
+
+    start_date = start_date or date.today()
+    tree = [schemas.StateTree.model_validate(state).model_dump(mode="json") for state in crud.get_location_tree(db)]
+    yield "locations/tree.json", _dumps(tree)
+
+    village_ids = [v["id"] for state in tree for district in state["districts"] for v in district["villages"]]
+    for shard, shard_villages in router.group_villages(village_ids).items():
+        shard_db = router.session(shard)
+        try:
+            for village_id in shard_villages:
+                try:
+                    profile = risk_profile(shard_db, village_id)
+                except HTTPException:
+                    profile = None
+                if profile is not None:
+                    yield f"risk/village/{village_id}.json", _dumps(
+                        schemas.DetailedRiskProfile.model_validate(profile).model_dump(mode="json"))
+                forecast = _forecast_payload(shard_db, village_id, start_date)
+                if forecast is not None:
+                    yield f"predictions/village/{village_id}.json", _dumps(forecast)
+        finally:
+            shard_db.close()
+
+
+def _previous(directory: str) -> Tuple[Optional[str], Dict[str, Dict[str, Any]]]:
+    """Path and manifest entries of the current version, if there is one."""
+    try:
+        with open(os.path.join(directory, POINTER_FILE)) as f:
+            path = os.path.join(directory, f.read().strip())
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            return path, json.load(f)["files"]
+    except (OSError, ValueError, KeyError):
+        return None, {}
+
+
+def _reuse(source: str, target: str):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+def _write_files(db, staging: str, previous_path: Optional[str], previous: Dict[str, Dict[str, Any]],
+                 start_date: Optional[date]) -> Tuple[Dict[str, Dict[str, Any]], int, int]:
+    """Render every file into `staging`, reusing the previous version's copies of unchanged bodies."""
+    encodings = _encodings()
+    files, rendered, reused = {}, 0, 0
+    for path, body in render(db, start_date):
+        digest = hashlib.sha256(body).hexdigest()
+        entry = previous.get(path)
+        suffixes = [""] + list(encodings)
+        if entry is not None and entry["sha256"] == digest and entry["encodings"] == list(encodings) \
+                and all(os.path.exists(os.path.join(previous_path, path + s)) for s in suffixes):
+            for suffix in suffixes:
+                _reuse(os.path.join(previous_path, path + suffix), os.path.join(staging, path + suffix))
+            files[path] = entry
+            reused += 1
+            continue
+
+        os.makedirs(os.path.dirname(os.path.join(staging, path)), exist_ok=True)
+        sizes = {}
+        for suffix, compress in [("", lambda b: b)] + list(encodings.items()):
+            data = compress(body)
+            with open(os.path.join(staging, path + suffix), "wb") as f:
+                f.write(data)
+            sizes[suffix or "identity"] = len(data)
+        files[path] = {"sha256": digest, "bytes": sizes, "encodings": list(encodings)}
+        rendered += 1
+
+    return files, rendered, reused
+
+
+def build_bundle(db, directory: str, full: bool = False, start_date: Optional[date] = None) -> Dict[str, Any]:
+    """Write a new bundle version under `directory`, publish it and return its summary."""
+    version = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    target = os.path.join(directory, version)
+    staging = target + ".tmp"
+    os.makedirs(staging, exist_ok=True)
+    previous_path, previous = (None, {}) if full else _previous(directory)
+
+    try:
+        files, rendered, reused = _write_files(db, staging, previous_path, previous, start_date)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    BUNDLE_FILES.inc(rendered, outcome="rendered")
+    BUNDLE_FILES.inc(reused, outcome="reused")
+    with open(os.path.join(staging, MANIFEST_FILE), "w") as f:
+        json.dump({"version": version, "created_at": datetime.utcnow().isoformat(), "files": files},
+                  f, sort_keys=True)
+
+    os.replace(staging, target)
+    publish(directory, version)
+    prune(directory, keep=settings.STATIC_BUNDLE_KEEP)
+    return {"version": version, "files": len(files), "rendered": rendered, "reused": reused}
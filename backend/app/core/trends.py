@@ -0,0 +1,197 @@
+"""
+Historical trend analytics over the yearly per-village series in coastal_risk.db.
+
+All series (every village and every district average, every metric) are
+stacked into one (series x years x metrics) cube and fitted in a single
+vectorized pass. Results are cached until the database file changes.
+"""
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+
+ENVIRONMENTAL_METRICS = (
+    "sea_level_rise", "wind_speed", "humidity_level", "cyclone_frequency", "flood_frequency",
+    "storm_surge_height", "erosion_rate", "extreme_rainfall",
+)
+SETTLEMENT_METRICS = ("population_density", "households", "distance_from_shore", "infrastructure_score")
+METRICS = ENVIRONMENTAL_METRICS + SETTLEMENT_METRICS
+STATISTICS = ("latest", "slope", "acceleration", "yoy_change", "yoy_pct", "zscore")
+
+TREND_COMPUTATIONS = REGISTRY.counter(
+    "hydro_trend_computations_total", "Full recomputations of the historical trend cache.")
+
+
+def _load_cube(path: str):
+    """Villages plus a (villages x years x metrics) cube; missing observations are NaN."""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        villages = conn.execute("SELECT id, name, district, state FROM villages ORDER BY id").fetchall()
+        env = conn.execute(
+            f"SELECT village_id, year, {', '.join(ENVIRONMENTAL_METRICS)} FROM environmental_data").fetchall()
+        settlement = conn.execute(
+            f"SELECT village_id, year, {', '.join(SETTLEMENT_METRICS)} FROM settlement_data").fetchall()
+    finally:
+        conn.close()
+
+    ids = np.array([v[0] for v in villages], dtype=np.int64)
+    env_arr = np.array(env, dtype=np.float64).reshape(-1, 2 + len(ENVIRONMENTAL_METRICS))
+    settlement_arr = np.array(settlement, dtype=np.float64).reshape(-1, 2 + len(SETTLEMENT_METRICS))
+    all_years = np.concatenate([env_arr[:, 1], settlement_arr[:, 1]])
+    years = np.arange(int(all_years.min()), int(all_years.max()) + 1) if len(all_years) else np.zeros(0, int)
+
+    cube = np.full((len(ids), len(years), len(METRICS)), np.nan)
+    for arr, offset in ((env_arr, 0), (settlement_arr, len(ENVIRONMENTAL_METRICS))):
+        rows = np.searchsorted(ids, arr[:, 0].astype(np.int64))
+        known = (rows < len(ids)) & (ids[np.minimum(rows, len(ids) - 1)] == arr[:, 0])
+        cols = arr[known, 1].astype(np.int64) - years[0] if len(years) else arr[known, 1]
+        cube[rows[known], cols, offset:offset + arr.shape[1] - 2] = arr[known, 2:]
+    return villages, years, cube
+
+
+def _district_means(districts: List[Tuple[Optional[str], str]], cube: np.ndarray):
+    """
+    Mean series of each (state, district), ordered by district then state, and the
+    number of villages in each. Districts are keyed by state too, as names repeat across states.
+    """
+    keys = sorted(set(districts), key=lambda k: (k[1], k[0] or ""))
+    index = {key: i for i, key in enumerate(keys)}
+    group = np.array([index[key] for key in districts], dtype=np.int64)
+    valid = ~np.isnan(cube)
+    totals = np.zeros((len(keys),) + cube.shape[1:])
+    counts = np.zeros_like(totals)
+    np.add.at(totals, group, np.where(valid, cube, 0.0))
+    np.add.at(counts, group, valid)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return keys, totals / counts, np.bincount(group, minlength=len(keys))
+
+
+def compute_statistics(years: np.ndarray, cube: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Per-series trend statistics for a (series x years x metrics) cube, each of
+    shape (series x metrics):
+      slope         least-squares linear trend (units / year)
+      acceleration  2 * quadratic coefficient of a least-squares quadratic fit (units / year^2)
+      yoy_change    last observed year minus the previous year; yoy_pct relative to the previous year
+      zscore        anomaly of the latest value against the series' earlier years
+    """
+    valid = ~np.isnan(cube)
+    y = np.where(valid, cube, 0.0)
+    x = (years - years.mean()).astype(np.float64)[None, :, None] if len(years) else np.zeros((1, 0, 1))
+    w = valid.astype(np.float64)
+
+    # Moments of x and x*y over the observed points only
+    s = [np.sum(w * x ** k, axis=1) for k in range(5)]
+    t = [np.sum(w * y * x ** k, axis=1) for k in range(3)]
+    n = s[0]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = (n * t[1] - s[1] * t[0]) / (n * s[2] - s[1] ** 2)
+        slope[n < 2] = np.nan
+
+        normal = np.stack([
+            np.stack([s[0], s[1], s[2]], -1),
+            np.stack([s[1], s[2], s[3]], -1),
+            np.stack([s[2], s[3], s[4]], -1),
+        ], -2)
+        rhs = np.stack([t[0], t[1], t[2]], -1)
+        solvable = (n >= 3) & (np.abs(np.linalg.det(normal)) > 1e-9)
+        normal[~solvable] = np.eye(3)
+        rhs[~solvable] = 0.0
+        coefficients = np.linalg.solve(normal, rhs[..., None])[..., 0]
+        acceleration = np.where(solvable, 2 * coefficients[..., 2], np.nan)
+
+        # Latest and previous observation of each series
+        position = np.arange(cube.shape[1])[None, :, None]
+        last = np.where(valid, position, -1).max(axis=1)
+        prev = np.where(valid & (position < last[:, None, :]), position, -1).max(axis=1)
+        series, metric = np.indices(last.shape)
+        latest = np.where(last >= 0, cube[series, np.maximum(last, 0), metric], np.nan)
+        previous = np.where(prev >= 0, cube[series, np.maximum(prev, 0), metric], np.nan)
+        yoy_change = latest - previous
+        yoy_pct = np.where(previous != 0, yoy_change / np.abs(previous) * 100, np.nan)
+
+        # Anomaly of the latest value against all earlier observations
+        earlier = valid & (position < last[:, None, :])
+        m = earlier.sum(axis=1)
+        mean = np.where(earlier, cube, 0.0).sum(axis=1) / m
+        var = np.where(earlier, (cube - mean[:, None, :]) ** 2, 0.0).sum(axis=1) / (m - 1)
+        std = np.sqrt(var)
+        zscore = np.where((m >= 2) & (std > 0), (latest - mean) / std, np.nan)
+
+    return {
+        "latest": latest, "slope": slope, "acceleration": acceleration,
+        "yoy_change": yoy_change, "yoy_pct": yoy_pct, "zscore": zscore,
+    }
+
+
+def _as_dict(stats: Dict[str, np.ndarray], i: int) -> Dict[str, Dict[str, Optional[float]]]:
+    result = {}
+    for j, metric in enumerate(METRICS):
+        result[metric] = {}
+        for name in STATISTICS:
+            value = float(stats[name][i, j])
+            result[metric][name] = None if np.isnan(value) else round(value, 4) + 0.0
+    return result
+
+
+class TrendReport:
+    """Computed statistics for every village and district of one version of the source data."""
+
+    def __init__(self, villages, years: np.ndarray, cube: np.ndarray):
+        districts, district_cube, village_counts = _district_means([(v[3], v[2]) for v in villages], cube)
+        stats = compute_statistics(years, np.concatenate([cube, district_cube]))
+        self.years = [int(years[0]), int(years[-1])] if len(years) else []
+        self.villages = [
+            {"village_id": v[0], "name": v[1], "district": v[2], "state": v[3], "trends": _as_dict(stats, i)}
+            for i, v in enumerate(villages)
+        ]
+        self.districts = [
+            {"district": name, "state": state, "village_count": int(village_counts[i]),
+             "trends": _as_dict(stats, len(villages) + i)}
+            for i, (state, name) in enumerate(districts)
+        ]
+        self._by_village = {v["village_id"]: v for v in self.villages}
+
+    def village(self, village_id: int) -> Optional[Dict[str, Any]]:
+        return self._by_village.get(village_id)
+
+
+class TrendCache:
+    """Recomputes the report only when the database file (or its WAL) changes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._key = None
+        self._report: Optional[TrendReport] = None
+        self._lock = threading.Lock()
+
+    def _source_key(self):
+        key = []
+        for suffix in ("", "-wal"):
+            try:
+                stat = os.stat(self.path + suffix)
+                key.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                key.append(None)
+        if key[0] is None:
+            raise FileNotFoundError(self.path)
+        return tuple(key)
+
+    def get(self) -> TrendReport:
+        key = self._source_key()
+        if key != self._key:
+            with self._lock:
+                if key != self._key:
+                    self._report = TrendReport(*_load_cube(self.path))
+                    self._key = key
+                    TREND_COMPUTATIONS.inc()
+        return self._report
+
+
+trend_cache = TrendCache(settings.COASTAL_RISK_DB_PATH)
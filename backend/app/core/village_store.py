@@ -0,0 +1,406 @@
+"""
+Columnar in-process store of the latest indicators of every village.
+
+One NumPy array per indicator plus a village-id -> row index replaces
+per-request ORM hydration for forecast baselines and is the data source for
+batch / region-wide scoring. The store loads with a single bulk query, applies
+writes made through `crud` immediately, and picks up writes by other processes
+every VILLAGE_STORE_SYNC_SECONDS: new rows by polling each table for ids above
+its high-water mark, in-place updates and deletes by re-reading the villages
+the change log records as changed. Reads that must never be stale (the
+per-village risk profile) go to the database instead.
+"""
+import threading
+import time
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+from sqlalchemy import func, select
+
+from app import models
+from app.core import changelog
+from app.core.config import settings
+from app.core.sharding import router
+from app.database import SessionLocal, engine
+
+ENVIRONMENTAL_COLUMNS = ("sea_level_rise", "cyclone_frequency", "storm_surge_height", "erosion_rate", "extreme_rainfall")
+SETTLEMENT_COLUMNS = ("population_density", "households", "distance_from_shore", "infrastructure_score")
+ASSESSMENT_COLUMNS = ("overall_risk_score", "flood_risk", "cyclone_risk", "rainfall_risk", "erosion_risk")
+INDICATOR_COLUMNS = ENVIRONMENTAL_COLUMNS + SETTLEMENT_COLUMNS + ASSESSMENT_COLUMNS
+
+# Villages re-read per query when the change log reports them changed
+RELOAD_BATCH_SIZE = 500
+
+# Source table -> (model, prefix for its id/date columns, stored columns)
+SOURCES = {
+    "environmental": (models.EnvironmentalData, "env", ENVIRONMENTAL_COLUMNS),
+    "settlement": (models.SettlementData, "settlement", SETTLEMENT_COLUMNS),
+    "assessment": (models.RiskAssessment, "assessment", ASSESSMENT_COLUMNS + ("risk_category",)),
+}
+
+
+def _ordinal(value) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    return value.toordinal()
+
+
+def _change_version() -> int:
+    catalog = SessionLocal()
+    try:
+        return changelog.current_version(catalog)
+    finally:
+        catalog.close()
+
+
+class VillageRecord:
+    """Array-backed read-only view of one village's row in the store."""
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: "VillageStore", row: int):
+        self._store = store
+        self._row = row
+
+    def __getattr__(self, name: str):
+        column = self._store.columns.get(name)
+        if column is None:
+            raise AttributeError(name)
+        return column[self._row].item()
+
+    @property
+    def village_id(self) -> int:
+        return int(self._store.village_ids[self._row])
+
+    def _values(self, names) -> Optional[Dict[str, float]]:
+        values = {n: float(self._store.columns[n][self._row]) for n in names}
+        if any(v != v for v in values.values()):  # NaN: no data yet
+            return None
+        return values
+
+    def _source_row(self, source: str) -> Optional[Dict[str, object]]:
+        _, prefix, names = SOURCES[source]
+        columns = self._store.columns
+        row_id = int(columns[f"{prefix}_id"][self._row])
+        if not row_id:
+            return None
+        values = {n: columns[n][self._row] for n in names}
+        values = {n: v.item() if hasattr(v, "item") else v for n, v in values.items()}
+        values.update(id=row_id, village_id=self.village_id,
+                      date=date.fromordinal(int(columns[f"{prefix}_date"][self._row])))
+        return values
+
+    def environmental(self) -> Optional[Dict[str, float]]:
+        """RiskCalculator input: latest environmental indicators, or None."""
+        return self._values(ENVIRONMENTAL_COLUMNS)
+
+    def settlement(self) -> Optional[Dict[str, float]]:
+        """RiskCalculator input: latest settlement indicators, or None."""
+        return self._values(SETTLEMENT_COLUMNS)
+
+    # Full latest rows (id, village_id, date and values) shaped like the response schemas
+
+    def environmental_row(self) -> Optional[Dict[str, object]]:
+        return self._source_row("environmental")
+
+    def settlement_row(self) -> Optional[Dict[str, object]]:
+        row = self._source_row("settlement")
+        if row is not None:
+            row["households"] = int(row["households"])
+        return row
+
+    def assessment_row(self) -> Optional[Dict[str, object]]:
+        return self._source_row("assessment")
+
+
+class VillageStore:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.loaded = False
+        self.version = 0
+        self.size = 0
+        self.index: Dict[int, int] = {}
+        self.village_ids = np.zeros(0, dtype=np.int64)
+        self.columns: Dict[str, np.ndarray] = {}
+        self.high_water: Dict[str, int] = {name: 0 for name in SOURCES}
+        self.change_version = 0
+        self._synced_at = 0.0
+        self._allocate(0)
+
+    # --- Storage ---
+
+    def _allocate(self, capacity: int):
+        def grow(old, dtype, fill):
+            new = np.full(capacity, fill, dtype=dtype)
+            if old is not None:
+                new[:len(old)] = old[:capacity]
+            return new
+
+        ids = grow(self.village_ids if self.size else None, np.int64, 0)
+        columns = {}
+        for name in INDICATOR_COLUMNS:
+            columns[name] = grow(self.columns.get(name), np.float64, np.nan)
+        for name in ("district_id", "state_id", "env_id", "settlement_id", "assessment_id",
+                     "env_date", "settlement_date", "assessment_date"):
+            columns[name] = grow(self.columns.get(name), np.int64, 0)
+        for name in ("latitude", "longitude"):
+            columns[name] = grow(self.columns.get(name), np.float64, np.nan)
+        columns["risk_category"] = grow(self.columns.get("risk_category"), object, None)
+        self.village_ids = ids
+        self.columns = columns
+
+    def _row_for(self, village_id: int) -> int:
+        row = self.index.get(village_id)
+        if row is None:
+            if self.size == len(self.village_ids):
+                self._allocate(max(16, self.size * 2))
+            row = self.size
+            self.size += 1
+            self.village_ids[row] = village_id
+            self.index[village_id] = row
+        return row
+
+    # --- Loading ---
+
+    @staticmethod
+    def _latest_statement(village_ids: Optional[Iterable[int]] = None):
+        """Every village (or the given ones) joined with the latest row of each source."""
+        village = models.Village
+        stmt = select(
+            village.id, village.district_id, models.District.state_id, village.latitude, village.longitude
+        ).outerjoin(models.District, models.District.id == village.district_id)
+        if village_ids is not None:
+            village_ids = list(village_ids)
+            stmt = stmt.where(village.id.in_(village_ids))
+
+        for name, (model, prefix, value_columns) in SOURCES.items():
+            ranked = select(
+                model.id.label("id"), model.village_id.label("village_id"), model.date.label("date"),
+                *[getattr(model, c).label(c) for c in value_columns],
+                func.row_number().over(
+                    partition_by=model.village_id, order_by=(model.date.desc(), model.id.desc())
+                ).label("rn"),
+            )
+            if village_ids is not None:
+                ranked = ranked.where(model.village_id.in_(village_ids))
+            ranked = ranked.subquery(f"latest_{name}")
+            stmt = stmt.outerjoin(ranked, (ranked.c.village_id == village.id) & (ranked.c.rn == 1))
+            stmt = stmt.add_columns(ranked.c.id, ranked.c.date, *[ranked.c[c] for c in value_columns])
+        return stmt.order_by(village.id)
+
+    def _write(self, targets: np.ndarray, rows):
+        """Overwrite the given store rows with rows of `_latest_statement`."""
+        data = list(zip(*rows))
+        self.village_ids[targets] = np.array(data[0], dtype=np.int64)
+        position = 1
+        for name in ("district_id", "state_id"):
+            self.columns[name][targets] = [v or 0 for v in data[position]]
+            position += 1
+        for name in ("latitude", "longitude"):
+            self.columns[name][targets] = np.array(data[position], dtype=np.float64)
+            position += 1
+        for _, (_, prefix, value_columns) in SOURCES.items():
+            self.columns[f"{prefix}_id"][targets] = [v or 0 for v in data[position]]
+            self.columns[f"{prefix}_date"][targets] = [_ordinal(v) for v in data[position + 1]]
+            position += 2
+            for c in value_columns:
+                values = data[position]
+                if self.columns[c].dtype != object:
+                    values = np.array(values, dtype=np.float64)
+                self.columns[c][targets] = values
+                position += 1
+
+    def load(self, db):
+        """(Re)load every village with one bulk query joining the latest row of each source."""
+        # Read the high-water marks and change version first: writes committed during the bulk query are
+        # re-applied by sync()
+        high_water = {
+            name: db.execute(select(func.coalesce(func.max(model.id), 0))).scalar()
+            for name, (model, _, _) in SOURCES.items()
+        }
+        change_version = _change_version()
+        rows = db.execute(self._latest_statement()).all()
+
+        with self._lock:
+            self.size = 0
+            self.index = {}
+            self.village_ids = np.zeros(0, dtype=np.int64)
+            self.columns = {}
+            self._allocate(len(rows))
+            if rows:
+                n = len(rows)
+                self._write(np.arange(n), rows)
+                self.index = {int(v): i for i, v in enumerate(self.village_ids[:n].tolist())}
+                self.size = n
+            self.high_water = high_water
+            self.change_version = change_version
+            self.loaded = True
+            self.version += 1
+            self._synced_at = time.monotonic()
+
+    def reload_villages(self, db, village_ids: Iterable[int]):
+        """Re-read the latest rows of some villages, e.g. after in-place updates or deletes."""
+        village_ids = sorted(village_ids)
+        with self._lock:
+            for start in range(0, len(village_ids), RELOAD_BATCH_SIZE):
+                rows = db.execute(self._latest_statement(village_ids[start:start + RELOAD_BATCH_SIZE])).all()
+                if rows:
+                    self._write(np.array([self._row_for(row[0]) for row in rows], dtype=np.int64), rows)
+            self.version += 1
+
+    def ensure_loaded(self, db):
+        if not self.loaded:
+            with self._lock:
+                if not self.loaded:
+                    self.load(db)
+        elif time.monotonic() - self._synced_at >= settings.VILLAGE_STORE_SYNC_SECONDS:
+            self.sync(db)
+
+    def sync(self, db):
+        """
+        Apply writes other processes made since the last load/sync: rows with ids
+        above the high-water mark, then every village the change log records as
+        changed (in-place updates and deletes), re-read from the database.
+        """
+        with self._lock:
+            self._synced_at = time.monotonic()
+            last_village = int(self.village_ids[:self.size].max()) if self.size else 0
+            for village in db.query(models.Village).filter(models.Village.id > last_village).order_by(models.Village.id):
+                self.add_village(village)
+            for name, (model, _, _) in SOURCES.items():
+                rows = db.query(model).filter(model.id > self.high_water[name]).order_by(model.id).all()
+                self.apply(rows)
+
+            if db.get_bind() is not engine:
+                changelog.drain(db.get_bind())
+            villages, change_version = changelog.villages_changed_after(self.change_version, SOURCES)
+            if villages is not None:
+                # The change log covers every shard: a bulk write to another shard's
+                # states must not count toward this store's full-reload threshold
+                villages = self._held(db, villages)
+            if villages is None or len(villages) > max(RELOAD_BATCH_SIZE, self.size // 2):
+                self.load(db)
+            else:
+                if villages:
+                    self.reload_villages(db, villages)
+                self.change_version = change_version
+
+    def _held(self, db, village_ids: Iterable[int]) -> Set[int]:
+        """The villages this store's database holds the data of."""
+        shard = router.shard_for_bind(db.get_bind())
+        return {v for v in village_ids
+                if v in self.index and (shard is None or router.shard_for_village(v) == shard)}
+
+    # --- Incremental updates ---
+
+    # Writes before the first load are skipped: the load will read them from the DB
+
+    def add_village(self, village: models.Village):
+        if not self.loaded:
+            return
+        state_id = village.district.state_id if village.district else 0
+        with self._lock:
+            row = self._row_for(village.id)
+            self.columns["district_id"][row] = village.district_id or 0
+            self.columns["state_id"][row] = state_id
+            self.columns["latitude"][row] = village.latitude if village.latitude is not None else np.nan
+            self.columns["longitude"][row] = village.longitude if village.longitude is not None else np.nan
+            self.version += 1
+
+    def apply(self, rows: Iterable):
+        """Fold newly written EnvironmentalData / SettlementData / RiskAssessment rows into the store."""
+        if not self.loaded:
+            return
+        with self._lock:
+            changed = False
+            for obj in rows:
+                for name, (model, prefix, value_columns) in SOURCES.items():
+                    if not isinstance(obj, model):
+                        continue
+                    self.high_water[name] = max(self.high_water[name], obj.id or 0)
+                    row = self._row_for(obj.village_id)
+                    day = _ordinal(obj.date)
+                    current_day = self.columns[f"{prefix}_date"][row]
+                    current_id = self.columns[f"{prefix}_id"][row]
+                    # Only a row for a later day (or a later row on the same day) replaces the latest
+                    if (day, obj.id or 0) < (current_day, current_id):
+                        continue
+                    self.columns[f"{prefix}_date"][row] = day
+                    self.columns[f"{prefix}_id"][row] = obj.id or 0
+                    for c in value_columns:
+                        value = getattr(obj, c)
+                        if value is None and self.columns[c].dtype != object:
+                            value = np.nan
+                        self.columns[c][row] = value
+                    changed = True
+            if changed:
+                self.version += 1
+
+    # --- Reads ---
+
+    def get(self, village_id: int) -> Optional[VillageRecord]:
+        row = self.index.get(village_id)
+        return VillageRecord(self, row) if row is not None else None
+
+    def select(self, state_id: Optional[int] = None, district_id: Optional[int] = None,
+               village_ids: Optional[List[int]] = None) -> np.ndarray:
+        """Row indices of the villages in a region (all villages when no filter is given)."""
+        n = self.size
+        mask = np.ones(n, dtype=bool)
+        if state_id is not None:
+            mask &= self.columns["state_id"][:n] == state_id
+        if district_id is not None:
+            mask &= self.columns["district_id"][:n] == district_id
+        if village_ids is not None:
+            mask &= np.isin(self.village_ids[:n], np.asarray(village_ids, dtype=np.int64))
+        return np.flatnonzero(mask)
+
+    def arrays(self, names, rows: np.ndarray) -> Dict[str, np.ndarray]:
+        return {name: self.columns[name][rows] for name in names}
+
+    def complete_rows(self, rows: np.ndarray) -> np.ndarray:
+        """Subset of rows that have both environmental and settlement data."""
+        values = np.column_stack([self.columns[c][rows] for c in ENVIRONMENTAL_COLUMNS + SETTLEMENT_COLUMNS])
+        return rows[~np.isnan(values).any(axis=1)] if len(rows) else rows
+
+    def score(self, rows: np.ndarray, executor=None) -> Dict[str, np.ndarray]:
+        """
+        Batch RiskCalculator scores for the given rows (rows lacking inputs are dropped),
+        computed on `executor` (e.g. the compute executor) when one is given.
+        """
+        from app.core.risk_calculator import RiskCalculator
+
+        rows = self.complete_rows(rows)
+        inputs = (self.arrays(ENVIRONMENTAL_COLUMNS, rows), self.arrays(SETTLEMENT_COLUMNS, rows))
+        if executor is not None:
+            result = executor.run("region_scores", RiskCalculator.calculate_risk_profiles_batch, *inputs)
+        else:
+            result = RiskCalculator.calculate_risk_profiles_batch(*inputs)
+        result["village_id"] = self.village_ids[rows]
+        return result
+
+
+village_store = VillageStore()
+
+# One store per database (the catalog and each shard), keyed by URL
+_stores: Dict[str, VillageStore] = {str(engine.url): village_store}
+_stores_lock = threading.Lock()
+
+
+def store_for(db) -> VillageStore:
+    """The process-wide store of the database `db` is bound to (not necessarily loaded)."""
+    key = str(db.get_bind().url)
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.setdefault(key, VillageStore())
+    return store
+
+
+def get_store(db) -> VillageStore:
+    """The store of `db`'s database, loaded on first use and kept in sync with other writers."""
+    store = store_for(db)
+    store.ensure_loaded(db)
+    return store
@@ -1,7 +1,14 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session, aliased
 from app import models, schemas
-from typing import List, Optional
+from app.core.forecast import FORECAST_COLUMNS, PackedForecast, pack_forecast, split_runs
+from app.core import changelog  # noqa: F401 - registers the change log session hooks
+from app.core import fast_json
+from app.core.shelters import planner_for
+from app.core.village_store import store_for
+from typing import Dict, List, Optional, Tuple
 from datetime import date, timedelta
+import json
 
 # --- Read Operations ---
 
@@ -37,6 +44,61 @@ def get_risk_history(db: Session, village_id: int, days: int = 30):
              .order_by(models.RiskAssessment.date.asc())\
              .all()
 
+# --- Row reads for the fast JSON path (SQL tuples in response-model field order) ---
+
+def _columns(model, schema):
+    return [getattr(model, name) for name in fast_json.fields(schema)]
+
+def get_state_rows(db: Session, skip: int = 0, limit: int = 100) -> List[Dict]:
+    return fast_json.rows(schemas.State, db.execute(
+        select(*_columns(models.State, schemas.State)).offset(skip).limit(limit)))
+
+def get_district_rows_by_state(db: Session, state_id: int) -> List[Dict]:
+    return fast_json.rows(schemas.District, db.execute(
+        select(*_columns(models.District, schemas.District)).where(models.District.state_id == state_id)))
+
+def get_village_rows_by_district(db: Session, district_id: int) -> List[Dict]:
+    return fast_json.rows(schemas.Village, db.execute(
+        select(*_columns(models.Village, schemas.Village)).where(models.Village.district_id == district_id)))
+
+def get_risk_history_rows(db: Session, village_id: int, days: int = 30) -> List[Dict]:
+    start_date = date.today() - timedelta(days=days)
+    return fast_json.rows(schemas.RiskAssessment, db.execute(
+        select(*_columns(models.RiskAssessment, schemas.RiskAssessment))
+        .where(models.RiskAssessment.village_id == village_id, models.RiskAssessment.date >= start_date)
+        .order_by(models.RiskAssessment.date.asc())))
+
+def get_village_profile_row(db: Session, village_id: int) -> Optional[Tuple[Dict, Optional[str], Optional[str]]]:
+    """(village row, district name, state name) from one join, or None if the village does not exist."""
+    row = db.execute(
+        select(*_columns(models.Village, schemas.Village), models.District.name, models.State.name)
+        .outerjoin(models.District, models.District.id == models.Village.district_id)
+        .outerjoin(models.State, models.State.id == models.District.state_id)
+        .where(models.Village.id == village_id)
+    ).first()
+    if row is None:
+        return None
+    *village, district, state = row
+    return fast_json.rows(schemas.Village, [village])[0], district, state
+
+def _latest_row(db: Session, model, schema, village_id: int) -> Optional[Dict]:
+    row = db.execute(
+        select(*_columns(model, schema))
+        .where(model.village_id == village_id)
+        .order_by(model.date.desc(), model.id.desc())
+        .limit(1)
+    ).first()
+    return fast_json.rows(schema, [row])[0] if row is not None else None
+
+def get_latest_risk_assessment_row(db: Session, village_id: int) -> Optional[Dict]:
+    return _latest_row(db, models.RiskAssessment, schemas.RiskAssessment, village_id)
+
+def get_latest_environmental_row(db: Session, village_id: int) -> Optional[Dict]:
+    return _latest_row(db, models.EnvironmentalData, schemas.EnvironmentalData, village_id)
+
+def get_latest_settlement_row(db: Session, village_id: int) -> Optional[Dict]:
+    return _latest_row(db, models.SettlementData, schemas.SettlementData, village_id)
+
 def get_latest_environmental_data(db: Session, village_id: int):
     return db.query(models.EnvironmentalData)\
              .filter(models.EnvironmentalData.village_id == village_id)\
@@ -57,6 +119,88 @@ def get_predictions(db: Session, village_id: int, start_date: date, end_date: da
              .order_by(models.Prediction.for_date.asc())\
              .all()
 
+def get_forecast_run(db: Session, village_id: int, start_date: date, end_date: date):
+    """Most recent packed forecast run of a village overlapping [start_date, end_date]."""
+    return db.query(models.ForecastRun)\
+             .filter(models.ForecastRun.village_id == village_id)\
+             .filter(models.ForecastRun.start_date <= end_date)\
+             .filter(models.ForecastRun.end_date >= start_date)\
+             .order_by(models.ForecastRun.prediction_date.desc(), models.ForecastRun.id.desc())\
+             .first()
+
+def get_forecast(db: Session, village_id: int, start_date: date, end_date: date) -> List:
+    """
+    Stored forecast points in [start_date, end_date]: decoded from the latest
+    packed run, or legacy Prediction rows for data not yet packed.
+    """
+    run = get_forecast_run(db, village_id, start_date, end_date)
+    if run is not None:
+        days = PackedForecast(run).days(start_date, end_date)
+        if days:
+            return days
+    return get_predictions(db, village_id, start_date, end_date)
+
+# --- Bulk Read Operations (one query for all villages) ---
+
+def _latest_rows(db: Session, model):
+    # Each village's row on its latest date (highest id wins on ties): one
+    # (village_id, date) index seek per village, streamed in village order
+    latest = aliased(model)
+    latest_id = select(latest.id)\
+        .where(latest.village_id == models.Village.id)\
+        .order_by(latest.date.desc(), latest.id.desc())\
+        .limit(1)\
+        .correlate(models.Village)\
+        .scalar_subquery()
+    return db.query(model)\
+             .select_from(models.Village)\
+             .join(model, model.id == latest_id)\
+             .order_by(models.Village.id)\
+             .all()
+
+def get_all_villages(db: Session):
+    return db.query(models.Village).order_by(models.Village.id).all()
+
+def get_location_tree(db: Session):
+    """Every state with its districts and their villages, from three queries."""
+    villages: Dict[int, List[Dict]] = {}
+    for village in fast_json.rows(schemas.Village, db.execute(
+            select(*_columns(models.Village, schemas.Village)).order_by(models.Village.id))):
+        villages.setdefault(village["district_id"], []).append(village)
+    districts: Dict[int, List[Dict]] = {}
+    for district in fast_json.rows(schemas.District, db.execute(
+            select(*_columns(models.District, schemas.District)).order_by(models.District.id))):
+        districts.setdefault(district["state_id"], []).append({**district, "villages": villages.get(district["id"], [])})
+    return [
+        {**state, "districts": districts.get(state["id"], [])}
+        for state in fast_json.rows(schemas.State, db.execute(
+            select(*_columns(models.State, schemas.State)).order_by(models.State.id)))
+    ]
+
+def get_latest_environmental_data_all(db: Session):
+    return _latest_rows(db, models.EnvironmentalData)
+
+def get_latest_settlement_data_all(db: Session):
+    return _latest_rows(db, models.SettlementData)
+
+def get_latest_risk_assessments_all(db: Session):
+    return _latest_rows(db, models.RiskAssessment)
+
+def get_forecast_village_ids(db: Session, start_date: date, end_date: date) -> set:
+    """Villages with a stored (packed or legacy) forecast overlapping [start_date, end_date]."""
+    runs = db.query(models.ForecastRun.village_id).distinct()\
+             .filter(models.ForecastRun.start_date <= end_date, models.ForecastRun.end_date >= start_date)
+    legacy = db.query(models.Prediction.village_id).distinct()\
+               .filter(models.Prediction.for_date >= start_date, models.Prediction.for_date <= end_date)
+    return {v for (v,) in runs} | {v for (v,) in legacy}
+
+def get_predictions_all(db: Session, start_date: date, end_date: date):
+    return db.query(models.Prediction)\
+             .filter(models.Prediction.for_date >= start_date)\
+             .filter(models.Prediction.for_date <= end_date)\
+             .order_by(models.Prediction.village_id, models.Prediction.for_date.asc())\
+             .all()
+
 # --- Create Operations ---
 
 def create_state(db: Session, state: schemas.StateCreate):
@@ -78,6 +222,7 @@ def create_village(db: Session, village: schemas.VillageCreate):
     db.add(db_village)
     db.commit()
     db.refresh(db_village)
+    store_for(db).add_village(db_village)
     return db_village
 
 def create_environmental_data(db: Session, data: schemas.EnvironmentalDataCreate):
@@ -85,6 +230,7 @@ def create_environmental_data(db: Session, data: schemas.EnvironmentalDataCreate
     db.add(db_data)
     db.commit()
     db.refresh(db_data)
+    store_for(db).apply([db_data])
     return db_data
 
 def create_settlement_data(db: Session, data: schemas.SettlementDataCreate):
@@ -92,6 +238,7 @@ def create_settlement_data(db: Session, data: schemas.SettlementDataCreate):
     db.add(db_data)
     db.commit()
     db.refresh(db_data)
+    store_for(db).apply([db_data])
     return db_data
 
 def create_risk_assessment(db: Session, risk: schemas.RiskAssessmentCreate):
@@ -99,6 +246,7 @@ def create_risk_assessment(db: Session, risk: schemas.RiskAssessmentCreate):
     db.add(db_risk)
     db.commit()
     db.refresh(db_risk)
+    store_for(db).apply([db_risk])
     return db_risk
 
 def create_prediction(db: Session, prediction: schemas.PredictionCreate):
@@ -107,3 +255,140 @@ def create_prediction(db: Session, prediction: schemas.PredictionCreate):
     db.commit()
     db.refresh(db_prediction)
     return db_prediction
+
+def get_shelters(db: Session, district_id: Optional[int] = None):
+    query = db.query(models.Shelter)
+    if district_id is not None:
+        query = query.filter(models.Shelter.district_id == district_id)
+    return query.order_by(models.Shelter.id).all()
+
+def get_shelter(db: Session, shelter_id: int):
+    return db.get(models.Shelter, shelter_id)
+
+def create_shelter(db: Session, shelter: schemas.ShelterCreate):
+    values = shelter.model_dump()
+    db_shelter = models.Shelter(**{**values, "facilities": json.dumps(values["facilities"])})
+    db.add(db_shelter)
+    db.commit()
+    db.refresh(db_shelter)
+    planner_for(db).invalidate()
+    return db_shelter
+
+def update_shelter(db: Session, shelter_id: int, shelter: schemas.ShelterCreate):
+    db_shelter = get_shelter(db, shelter_id)
+    if db_shelter is None:
+        return None
+    values = shelter.model_dump()
+    for name, value in {**values, "facilities": json.dumps(values["facilities"])}.items():
+        setattr(db_shelter, name, value)
+    db.commit()
+    db.refresh(db_shelter)
+    planner_for(db).invalidate()
+    return db_shelter
+
+def create_forecast_run(db: Session, village_id: int, prediction_date: date, days: List[Dict]):
+    """Store a daily forecast (rows shaped like simulate_forecast's) as one packed run."""
+    db_run = models.ForecastRun(**forecast_run_values(village_id, prediction_date, days))
+    db.add(db_run)
+    db.commit()
+    db.refresh(db_run)
+    return db_run
+
+def forecast_run_values(village_id: int, prediction_date: date, days: List[Dict], step: int = 1,
+                        step_unit: str = "day") -> Dict:
+    return {
+        "village_id": village_id,
+        "prediction_date": prediction_date,
+        "start_date": days[0]["for_date"],
+        "end_date": days[-1]["for_date"],
+        "step": step,
+        "step_unit": step_unit,
+        "days": len(days),
+        "values": pack_forecast(days),
+    }
+
+# --- Bulk Write Operations (bypass the village store hooks; callers reload or sync it) ---
+
+def upsert_rows(db: Session, model, rows: Dict[Tuple, Dict], key: Tuple[str, ...]):
+    """
+    Insert rows whose natural `key` (e.g. village_id, date) is new, update the
+    others in place. `rows` maps key values to row values. Returns (inserted, updated).
+    """
+    columns = [getattr(model, name) for name in key]
+    existing = {
+        tuple(row[1:]): row[0]
+        for row in db.execute(
+            select(model.id, *columns)
+            .where(*[column.in_({k[i] for k in rows}) for i, column in enumerate(columns)])
+        )
+    }
+    updates, inserts = [], []
+    for row_key, values in rows.items():
+        if row_key in existing:
+            updates.append({"id": existing[row_key], **values})
+        else:
+            inserts.append(values)
+    if updates:
+        db.execute(update(model), updates)
+    if inserts:
+        db.execute(insert(model), inserts)
+    return len(inserts), len(updates)
+
+def upsert_daily_rows(db: Session, model, rows: Dict[Tuple[int, date], Dict]):
+    """Insert rows whose (village_id, date) is new, update the others in place. Returns (inserted, updated)."""
+    return upsert_rows(db, model, rows, ("village_id", "date"))
+
+def pack_predictions(db: Session, delete_legacy: bool = False, batch_size: int = 200) -> Tuple[int, int]:
+    """
+    Migrate legacy Prediction rows into packed ForecastRun records: one run per
+    village, prediction date and constant-step stretch of forecast dates
+    (latest row wins on duplicate dates). Villages are read `batch_size` at a
+    time in id order and each batch is committed on its own, so the table is
+    never held in memory. Runs already packed are skipped, so re-running is
+    safe; `delete_legacy` deletes only the rows a batch read. Returns (rows
+    read, runs written).
+    """
+    read = written = 0
+    after = 0
+    while True:
+        village_ids = db.execute(
+            select(models.Prediction.village_id).distinct()
+            .where(models.Prediction.village_id > after)
+            .order_by(models.Prediction.village_id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not village_ids:
+            return read, written
+        in_batch = (models.Prediction.village_id > after, models.Prediction.village_id <= village_ids[-1])
+        packed = set(db.execute(
+            select(models.ForecastRun.village_id, models.ForecastRun.prediction_date, models.ForecastRun.start_date)
+            .where(models.ForecastRun.village_id > after, models.ForecastRun.village_id <= village_ids[-1])
+        ).all())
+        rows = db.execute(
+            select(models.Prediction.id, models.Prediction.village_id, models.Prediction.prediction_date,
+                   models.Prediction.for_date, *[getattr(models.Prediction, c) for c in FORECAST_COLUMNS])
+            .where(*in_batch)
+            .order_by(models.Prediction.village_id, models.Prediction.prediction_date,
+                      models.Prediction.for_date, models.Prediction.id)
+        ).all()
+        groups: Dict[Tuple[int, date], Dict[date, Dict]] = {}
+        for _, village_id, prediction_date, for_date, *values in rows:
+            groups.setdefault((village_id, prediction_date), {})[for_date] = dict(zip(FORECAST_COLUMNS, values),
+                                                                                  for_date=for_date)
+        runs = []
+        for (village_id, prediction_date), points in groups.items():
+            dates = sorted(points)
+            for start, end, step, unit in split_runs(dates):
+                if (village_id, prediction_date, dates[start]) in packed:
+                    continue
+                days = [points[d] for d in dates[start:end]]
+                runs.append(forecast_run_values(village_id, prediction_date, days, step, unit))
+        if runs:
+            db.execute(insert(models.ForecastRun), runs)
+        if delete_legacy and rows:
+            # Rows written since the read have higher ids and stay for the next run
+            db.execute(delete(models.Prediction).where(*in_batch, models.Prediction.id <= max(r.id for r in rows)))
+        db.commit()
+        read += len(rows)
+        written += len(runs)
+        after = village_ids[-1]
@@ -1,15 +1,49 @@
-from fastapi import FastAPI
+import time
+
+IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app import models
-from app.database import engine
-from app.api import villages, risk_assessment, predictions, locations, risk
+from app.api import predictions, locations, risk, metrics, analytics, reports, jobs, sync, shelters
+from app.core import profiling
+from app.core.admission import AdmissionMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.compute import ComputeSaturated, ComputeTimeout
+from app.core.config import settings
+from app.core.instrumentation import MetricsMiddleware, RouteTemplates, instrument_engine
+from app.core.lifecycle import LazyApp, build_lifespan
+from app.core.sharding import router as shard_router
+
+# Schema creation is a deploy step (`python manage.py migrate`), not a per-worker import side effect
+app = FastAPI(
+    title="Hydro Hub API",
+    description="Coastal Risk Assessment Platform Backend",
+    lifespan=build_lifespan(IMPORT_STARTED),
+)
+
+# Middleware added last runs outermost
+
+# gzip/brotli for large responses, negotiated from Accept-Encoding
+app.add_middleware(CompressionMiddleware)
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
+# Per-route priority classes; low-priority work is shed with 503 + Retry-After under surge
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware, router_app=app)
 
-app = FastAPI(title="Hydro Hub API", description="Coastal Risk Assessment Platform Backend")
+# Request/SQL instrumentation exposed at /metrics
+if settings.METRICS_ENABLED:
+    for engine in shard_router.engines.values():
+        instrument_engine(engine)
+    app.add_middleware(MetricsMiddleware, router_app=app)
 
-# CORS middleware configuration
+# Slow-query log and sampled request profiles, summarized at /debug/profiles
+if settings.PROFILING_ENABLED:
+    for engine in shard_router.engines.values():
+        profiling.instrument_engine(engine)
+    app.add_middleware(profiling.ProfilingMiddleware, route_resolver=RouteTemplates(app))
+
+# CORS middleware configuration; outermost, so 503s from admission and compute carry the CORS headers too
 origins = [
     "http://localhost:3000",
     "http://localhost:8000",
@@ -28,9 +62,31 @@ app.add_middleware(
 app.include_router(locations.router, prefix="/api", tags=["Locations"])
 app.include_router(risk.router, prefix="/api/risk", tags=["Risk Analysis"])
 app.include_router(predictions.router, prefix="/api/predictions", tags=["Predictions"])
+app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics"])
+app.include_router(reports.router, prefix="/api/reports", tags=["Reports"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
+app.include_router(sync.router, prefix="/api", tags=["Sync"])
+app.include_router(shelters.router, prefix="/api/shelters", tags=["Shelters"])
 
 # Legacy/Specific routers if needed, or deprecate/merge
-app.include_router(villages.router, prefix="/api/villages-legacy", tags=["Villages (Legacy)"]) 
+# Rarely used routers are imported on first request (docs at <prefix>/docs)
+app.mount("/api/villages-legacy", LazyApp("app.api.villages:router", title="Villages (Legacy)"))
+
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router, tags=["Monitoring"])
+
+if settings.PROFILING_ENABLED:
+    app.mount("/debug", LazyApp("app.api.debug:router", title="Debug"))
+
+@app.exception_handler(ComputeSaturated)
+def compute_saturated(request: Request, exc: ComputeSaturated):
+    return JSONResponse(status_code=503, content={"detail": "Server busy, retry shortly"},
+                        headers={"Retry-After": str(max(1, round(exc.retry_after)))})
+
+@app.exception_handler(ComputeTimeout)
+def compute_timeout(request: Request, exc: ComputeTimeout):
+    return JSONResponse(status_code=504, content={"detail": "Computation timed out, retry shortly"},
+                        headers={"Retry-After": str(max(1, round(settings.COMPUTE_RETRY_AFTER_SECONDS)))})
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,76 @@
+"""
+Versioned schema migrations.
+
+Each module mNNNN_<name>.py in this package is one migration. Its number is the
+schema version it brings a database to, the first line of its docstring
+describes it, and `upgrade(connection)` applies it. `upgrade(bind)` applies the
+pending migrations in order. Each runs in its own transaction together with its
+schema_migrations row, so a failed migration leaves the database at the previous
+version.
+
+Migration 1 is the baseline: the schema at version 1 as frozen DDL, never the
+models' current definitions, so every later migration applies to a known
+schema (a plain ALTER TABLE ... ADD COLUMN works on a fresh database).
+Databases created before migrations existed (by create_all or seed_db.py) hold
+some or all of its objects, so it only creates the missing ones. The models map
+the schema but declare no DDL of their own beyond the baseline; tests check
+that a migrated database matches them.
+"""
+import importlib
+import pkgutil
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import select
+
+from app import models
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    module: object
+
+
+def migrations() -> List[Migration]:
+    """Every migration in this package, oldest first."""
+    found = []
+    for info in pkgutil.iter_modules(__path__):
+        if info.name.startswith("m") and info.name[1:5].isdigit():
+            module = importlib.import_module(f"{__name__}.{info.name}")
+            name = (module.__doc__ or info.name).strip().splitlines()[0]
+            found.append(Migration(int(info.name[1:5]), name, module))
+    found.sort(key=lambda m: m.version)
+    if len({m.version for m in found}) != len(found):
+        raise RuntimeError("Two migrations share a version number")
+    return found
+
+
+def applied(bind) -> List[int]:
+    table = models.SchemaMigration.__table__
+    with bind.begin() as connection:
+        table.create(connection, checkfirst=True)
+        return sorted(connection.execute(select(table.c.version)).scalars())
+
+
+def current_version(bind) -> int:
+    versions = applied(bind)
+    return versions[-1] if versions else 0
+
+
+def pending(bind) -> List[Migration]:
+    done = set(applied(bind))
+    return [m for m in migrations() if m.version not in done]
+
+
+def upgrade(bind, target: Optional[int] = None) -> List[Migration]:
+    """Apply pending migrations (up to `target`, when given) in order; returns the ones applied."""
+    table = models.SchemaMigration.__table__
+    done = []
+    for migration in pending(bind):
+        if target is not None and migration.version > target:
+            break
+        with bind.begin() as connection:
+            migration.module.upgrade(connection)
+            connection.execute(table.insert().values(version=migration.version, name=migration.name))
+        done.append(migration)
+    return done
@@ -0,0 +1,216 @@
+"""Baseline schema (creates the tables a database does not have yet)"""
+from sqlalchemy import text
+
+# The schema at version 1, frozen: later migrations change it, never this list.
+# Databases created before migrations existed (by create_all or seed_db.py) hold
+# some or all of these objects, hence IF NOT EXISTS.
+STATEMENTS = (
+    """
+    CREATE TABLE IF NOT EXISTS change_log (
+        version INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+        village_id INTEGER,
+        kind VARCHAR,
+        changed_at DATETIME
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_change_log_changed_at ON change_log (changed_at)",
+    "CREATE INDEX IF NOT EXISTS ix_change_log_village_kind ON change_log (village_id, kind)",
+    """
+    CREATE TABLE IF NOT EXISTS change_log_state (
+        id INTEGER NOT NULL,
+        floor INTEGER,
+        compacted_at DATETIME,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS etl_state (
+        source VARCHAR NOT NULL,
+        high_water INTEGER,
+        bounds TEXT,
+        updated_at DATETIME,
+        PRIMARY KEY (source)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER NOT NULL,
+        type VARCHAR,
+        status VARCHAR,
+        params TEXT,
+        progress_done INTEGER,
+        progress_total INTEGER,
+        checkpoint TEXT,
+        result TEXT,
+        error TEXT,
+        cancel_requested BOOLEAN,
+        owner VARCHAR,
+        heartbeat_at DATETIME,
+        created_at DATETIME,
+        started_at DATETIME,
+        finished_at DATETIME,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_jobs_id ON jobs (id)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_type ON jobs (type)",
+    """
+    CREATE TABLE IF NOT EXISTS states (
+        id INTEGER NOT NULL,
+        name VARCHAR,
+        code VARCHAR,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_states_code ON states (code)",
+    "CREATE INDEX IF NOT EXISTS ix_states_id ON states (id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_states_name ON states (name)",
+    """
+    CREATE TABLE IF NOT EXISTS districts (
+        id INTEGER NOT NULL,
+        state_id INTEGER,
+        name VARCHAR,
+        code VARCHAR,
+        PRIMARY KEY (id),
+        FOREIGN KEY(state_id) REFERENCES states (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_districts_code ON districts (code)",
+    "CREATE INDEX IF NOT EXISTS ix_districts_id ON districts (id)",
+    "CREATE INDEX IF NOT EXISTS ix_districts_name ON districts (name)",
+    """
+    CREATE TABLE IF NOT EXISTS shelters (
+        id INTEGER NOT NULL,
+        district_id INTEGER,
+        name VARCHAR,
+        latitude FLOAT,
+        longitude FLOAT,
+        capacity INTEGER,
+        contact VARCHAR,
+        facilities TEXT,
+        updated_at DATETIME,
+        PRIMARY KEY (id),
+        FOREIGN KEY(district_id) REFERENCES districts (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_shelters_district_id ON shelters (district_id)",
+    "CREATE INDEX IF NOT EXISTS ix_shelters_id ON shelters (id)",
+    """
+    CREATE TABLE IF NOT EXISTS villages (
+        id INTEGER NOT NULL,
+        district_id INTEGER,
+        name VARCHAR,
+        code VARCHAR,
+        latitude FLOAT,
+        longitude FLOAT,
+        PRIMARY KEY (id),
+        FOREIGN KEY(district_id) REFERENCES districts (id)
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_villages_code ON villages (code)",
+    "CREATE INDEX IF NOT EXISTS ix_villages_id ON villages (id)",
+    "CREATE INDEX IF NOT EXISTS ix_villages_name ON villages (name)",
+    """
+    CREATE TABLE IF NOT EXISTS environmental_data (
+        id INTEGER NOT NULL,
+        village_id INTEGER,
+        date DATE,
+        sea_level_rise FLOAT,
+        cyclone_frequency FLOAT,
+        storm_surge_height FLOAT,
+        erosion_rate FLOAT,
+        extreme_rainfall FLOAT,
+        PRIMARY KEY (id),
+        FOREIGN KEY(village_id) REFERENCES villages (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_environmental_data_id ON environmental_data (id)",
+    """
+    CREATE TABLE IF NOT EXISTS forecast_params (
+        village_id INTEGER NOT NULL,
+        series VARCHAR NOT NULL,
+        transitions INTEGER,
+        first_date DATE,
+        last_date DATE,
+        last_value FLOAT,
+        stats BLOB,
+        alpha FLOAT,
+        beta FLOAT,
+        phi FLOAT,
+        residual_std FLOAT,
+        fitted_at DATETIME,
+        PRIMARY KEY (village_id, series),
+        FOREIGN KEY(village_id) REFERENCES villages (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS forecast_runs (
+        id INTEGER NOT NULL,
+        village_id INTEGER,
+        prediction_date DATE,
+        start_date DATE,
+        end_date DATE,
+        step INTEGER,
+        step_unit VARCHAR,
+        days INTEGER,
+        "values" BLOB,
+        created_at DATETIME,
+        PRIMARY KEY (id),
+        FOREIGN KEY(village_id) REFERENCES villages (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_forecast_runs_id ON forecast_runs (id)",
+    "CREATE INDEX IF NOT EXISTS ix_forecast_runs_village_id ON forecast_runs (village_id)",
+    """
+    CREATE TABLE IF NOT EXISTS predictions (
+        id INTEGER NOT NULL,
+        village_id INTEGER,
+        prediction_date DATE,
+        for_date DATE,
+        predicted_risk_score FLOAT,
+        flood_probability FLOAT,
+        cyclone_probability FLOAT,
+        rainfall_probability FLOAT,
+        erosion_probability FLOAT,
+        PRIMARY KEY (id),
+        FOREIGN KEY(village_id) REFERENCES villages (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_predictions_id ON predictions (id)",
+    """
+    CREATE TABLE IF NOT EXISTS risk_assessments (
+        id INTEGER NOT NULL,
+        village_id INTEGER,
+        date DATE,
+        overall_risk_score FLOAT,
+        flood_risk FLOAT,
+        cyclone_risk FLOAT,
+        rainfall_risk FLOAT,
+        erosion_risk FLOAT,
+        risk_category VARCHAR,
+        PRIMARY KEY (id),
+        FOREIGN KEY(village_id) REFERENCES villages (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_risk_assessments_id ON risk_assessments (id)",
+    """
+    CREATE TABLE IF NOT EXISTS settlement_data (
+        id INTEGER NOT NULL,
+        village_id INTEGER,
+        date DATE,
+        population_density FLOAT,
+        households INTEGER,
+        distance_from_shore FLOAT,
+        infrastructure_score FLOAT,
+        PRIMARY KEY (id),
+        FOREIGN KEY(village_id) REFERENCES villages (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_settlement_data_id ON settlement_data (id)",
+)
+
+
+def upgrade(connection):
+    for statement in STATEMENTS:
+        connection.execute(text(statement))
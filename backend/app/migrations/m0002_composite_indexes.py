@@ -0,0 +1,20 @@
+"""Composite indexes for per-village reads and location lookups"""
+from sqlalchemy import text
+
+# (index, table, columns): each hot read filters on the leading column(s) and sorts on the next
+INDEXES = (
+    ("ix_environmental_data_village_date", "environmental_data", ("village_id", "date")),
+    ("ix_settlement_data_village_date", "settlement_data", ("village_id", "date")),
+    ("ix_risk_assessments_village_date", "risk_assessments", ("village_id", "date")),
+    ("ix_predictions_village_for_date", "predictions", ("village_id", "for_date")),
+    ("ix_forecast_runs_village_prediction_date", "forecast_runs", ("village_id", "prediction_date")),
+    ("ix_villages_district_id", "villages", ("district_id",)),
+    ("ix_districts_state_id", "districts", ("state_id",)),
+)
+
+
+def upgrade(connection):
+    for name, table, columns in INDEXES:
+        connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+    # Superseded by ix_forecast_runs_village_prediction_date, which starts with village_id
+    connection.execute(text("DROP INDEX IF EXISTS ix_forecast_runs_village_id"))
@@ -0,0 +1,12 @@
+"""Change outbox: shard-local change log entries awaiting publication to the catalog"""
+from sqlalchemy import text
+
+
+def upgrade(connection):
+    connection.execute(text("""
+        CREATE TABLE IF NOT EXISTS change_outbox (
+            id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+            village_id INTEGER,
+            kind VARCHAR
+        )
+    """))
@@ -3,6 +3,7 @@ from datetime import date, timedelta
 from typing import List, Dict, Any
 from sqlalchemy.orm import Session
 from app import crud, models
+from app.core import forecaster
 
 class RiskPredictor:
     """
@@ -24,9 +25,19 @@ class RiskPredictor:
         village = crud.get_village(db, village_id=village_id)
         settlement = crud.get_latest_settlement_data(db, village_id=village_id)
         
+        current_date = date.today()
+
+        # Villages with enough history use their fitted trend/AR parameters
+        fitted = forecaster.forecast(db, village_id, current_date + timedelta(days=1), days_ahead)
+        if fitted is not None:
+            for pred in fitted:
+                del pred["id"], pred["village_id"]
+                pred["prediction_date"] = current_date
+                pred.update(RiskPredictor.calculate_impact_scores(pred["predicted_risk_score"], settlement))
+            return fitted
+
         predictions = []
         base_score = current_assessment.overall_risk_score
-        current_date = date.today()
 
         # Trend factor (simple simulation)
         # e.g., if we assume risk is increasing slightly
@@ -91,6 +102,7 @@ class RiskPredictor:
         
         # Factors
         pop_factor = min(10.0, settlement.population_density / 200.0) # approx scale
+        hh_factor = min(10.0, settlement.households / 100.0) # approx scale
         infra_resilience = settlement.infrastructure_score # 0-10
         
         # Risk Severity (0-1)
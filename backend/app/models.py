@@ -1,8 +1,19 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Date, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Date, DateTime, Text, Boolean, LargeBinary, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
 
+# The schema is created and changed by app/migrations, the one source of truth
+# for DDL. Indexes added after the baseline (e.g. the per-village composite
+# indexes of m0002) are declared there only.
+
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+
+    version = Column(Integer, primary_key=True) # app/migrations/mNNNN_*.py
+    name = Column(String)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
 class State(Base):
     __tablename__ = "states"
 
@@ -39,6 +50,19 @@ class Village(Base):
     risk_assessments = relationship("RiskAssessment", back_populates="village")
     predictions = relationship("Prediction", back_populates="village")
 
+class Shelter(Base):
+    __tablename__ = "shelters"
+
+    id = Column(Integer, primary_key=True, index=True)
+    district_id = Column(Integer, ForeignKey("districts.id"), index=True)
+    name = Column(String)
+    latitude = Column(Float)
+    longitude = Column(Float)
+    capacity = Column(Integer) # people
+    contact = Column(String)
+    facilities = Column(Text) # JSON list, e.g. ["Clean water", "Medical aid"]
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class EnvironmentalData(Base):
     __tablename__ = "environmental_data"
 
@@ -95,3 +119,88 @@ class Prediction(Base):
     erosion_probability = Column(Float)
 
     village = relationship("Village", back_populates="predictions")
+
+class ForecastRun(Base):
+    __tablename__ = "forecast_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    village_id = Column(Integer, ForeignKey("villages.id"))
+    prediction_date = Column(Date, default=datetime.utcnow)
+    start_date = Column(Date) # first forecast point
+    end_date = Column(Date) # last forecast point, for range filtering
+    step = Column(Integer, default=1)
+    step_unit = Column(String, default="day") # day or month
+    days = Column(Integer) # number of forecast points
+    values = Column(LargeBinary) # float32 [FORECAST_COLUMNS x days], one contiguous series per column
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    village = relationship("Village")
+
+class ForecastParam(Base):
+    __tablename__ = "forecast_params"
+
+    village_id = Column(Integer, ForeignKey("villages.id"), primary_key=True)
+    series = Column(String, primary_key=True) # environmental indicator or assessed risk score
+    transitions = Column(Integer, default=0) # consecutive observation pairs fitted
+    first_date = Column(Date)
+    last_date = Column(Date)
+    last_value = Column(Float)
+    stats = Column(LargeBinary) # float64[10] sufficient statistics of the regression
+    alpha = Column(Float) # long-run trend intercept at the fit epoch
+    beta = Column(Float) # long-run trend slope per year
+    phi = Column(Float) # daily autoregressive coefficient
+    residual_std = Column(Float)
+    fitted_at = Column(DateTime, default=datetime.utcnow)
+
+class EtlState(Base):
+    __tablename__ = "etl_state"
+
+    source = Column(String, primary_key=True) # e.g. coastal_risk.environmental_data
+    high_water = Column(Integer, default=0) # last source rowid loaded
+    bounds = Column(Text) # JSON {indicator: [min, max]} used for normalization
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class ChangeLog(Base):
+    __tablename__ = "change_log"
+    # AUTOINCREMENT: versions are never reused, even after the newest entries are compacted away
+    __table_args__ = (Index("ix_change_log_village_kind", "village_id", "kind"), {"sqlite_autoincrement": True})
+
+    version = Column(Integer, primary_key=True)
+    village_id = Column(Integer) # null for a reset entry (a write that could not be attributed)
+    kind = Column(String) # environmental, settlement, assessment, forecast or reset
+    changed_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class ChangeOutbox(Base):
+    __tablename__ = "change_outbox"
+    # Shard databases only: change log entries committed with the shard's writes, not yet in the catalog
+    __table_args__ = ({"sqlite_autoincrement": True},)
+
+    id = Column(Integer, primary_key=True)
+    village_id = Column(Integer) # null for a reset entry
+    kind = Column(String)
+
+class ChangeLogState(Base):
+    __tablename__ = "change_log_state"
+
+    id = Column(Integer, primary_key=True) # single row
+    floor = Column(Integer, default=0) # clients synced before this version must resync fully
+    compacted_at = Column(DateTime)
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    type = Column(String, index=True)
+    status = Column(String, index=True, default="queued") # queued, running, succeeded, failed, cancelled
+    params = Column(Text) # JSON
+    progress_done = Column(Integer, default=0)
+    progress_total = Column(Integer, default=0)
+    checkpoint = Column(Text) # JSON state to resume from after a restart
+    result = Column(Text) # JSON
+    error = Column(Text)
+    cancel_requested = Column(Boolean, default=False)
+    owner = Column(String) # worker process running the job
+    heartbeat_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
-from typing import List, Optional
-from datetime import date
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+from datetime import date, datetime
 
 # --- Base Models ---
 
@@ -125,6 +125,12 @@ class State(StateBase):
     class Config:
         from_attributes = True
 
+class DistrictTree(District):
+    villages: List[Village] = []
+
+class StateTree(State):
+    districts: List[DistrictTree] = []
+
 class DetailedRiskProfile(BaseModel):
     village: Village
     district: str
@@ -135,3 +141,150 @@ class DetailedRiskProfile(BaseModel):
     environmental: Optional[EnvironmentalData]
     settlement: Optional[SettlementData]
     last_updated: date
+
+class VillageChange(BaseModel):
+    village_id: int
+    version: int # latest change log version of this village in the page
+    changed: List[str] # environmental, settlement, assessment, forecast
+    profile: Optional[DetailedRiskProfile] # null when the village has no assessment
+
+class SyncPage(BaseModel):
+    since: int
+    version: int # pass as `since` on the next call
+    full_resync: bool # `since` predates the compacted log: refetch everything, then sync from `version`
+    more: bool
+    villages: List[VillageChange]
+
+class VillageRiskScore(BaseModel):
+    village_id: int
+    overall_risk_score: float
+    flood_risk: float
+    cyclone_risk: float
+    rainfall_risk: float
+    erosion_risk: float
+    risk_category: str
+
+class VillageSensitivity(BaseModel):
+    village_id: int
+    name: str
+    scores: Dict[str, float]
+    contributions: Dict[str, Dict[str, float]]
+    reductions: Dict[str, float]
+    total_reduction: float
+    best_indicator: Optional[str]
+
+class SensitivityReport(BaseModel):
+    target: str
+    actionable: List[str]
+    improvement: Optional[float]
+    marginal_effects: Dict[str, Dict[str, float]]
+    villages: List[VillageSensitivity]
+
+class PointRisk(BaseModel):
+    latitude: float
+    longitude: float
+    estimates: Dict[str, Optional[float]]
+    nearest_village_id: Optional[int]
+    nearest_distance_km: Optional[float]
+
+class TrendStatistics(BaseModel):
+    latest: Optional[float]
+    slope: Optional[float]
+    acceleration: Optional[float]
+    yoy_change: Optional[float]
+    yoy_pct: Optional[float]
+    zscore: Optional[float]
+
+class VillageTrend(BaseModel):
+    village_id: int
+    name: str
+    district: str
+    state: Optional[str]
+    trends: Dict[str, TrendStatistics]
+
+class DistrictTrend(BaseModel):
+    district: str
+    state: Optional[str]
+    village_count: int
+    trends: Dict[str, TrendStatistics]
+
+class ClusterCentroid(BaseModel):
+    cluster: int
+    size: int
+    dominant_hazard: str
+    centroid: Dict[str, float]
+
+class ClusterAssignment(BaseModel):
+    village_id: int
+    cluster: int
+    distance: float
+
+class ClusterReport(BaseModel):
+    k: int
+    features: List[str]
+    iterations: int
+    inertia: float
+    warm_start: bool
+    clusters: List[ClusterCentroid]
+    villages: List[ClusterAssignment]
+
+class ShelterBase(BaseModel):
+    name: str
+    latitude: float
+    longitude: float
+    capacity: int = Field(..., ge=0)
+    contact: Optional[str] = None
+    facilities: List[str] = []
+
+class ShelterCreate(ShelterBase):
+    district_id: int
+
+class Shelter(ShelterBase):
+    id: int
+    district_id: int
+    assigned: int
+
+class ShelterAllocation(BaseModel):
+    shelter_id: int
+    name: str
+    latitude: float
+    longitude: float
+    distance_km: float
+    evacuees: int
+    contact: Optional[str]
+    facilities: List[str]
+
+class VillageShelterPlan(BaseModel):
+    village_id: int
+    district_id: int
+    risk_category: Optional[str]
+    evacuees: int
+    unassigned: int
+    shelters: List[ShelterAllocation]
+
+class DistrictShelterPlan(BaseModel):
+    district_id: int
+    evacuees: int
+    unassigned: int
+    planned_at: datetime
+    shelters: List[Shelter]
+    villages: List[VillageShelterPlan]
+
+class JobCreate(BaseModel):
+    type: str
+    params: Dict[str, Any] = {}
+
+class Job(BaseModel):
+    id: int
+    type: str
+    status: str
+    params: Dict[str, Any]
+    progress_done: int
+    progress_total: int
+    progress_percent: float
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    cancel_requested: bool
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
@@ -0,0 +1,10 @@
+"""
+In-process benchmark suite for the Hydro Hub API.
+
+Run from the backend directory:
+    python -m benchmarks micro
+    python -m benchmarks load --users 50 --sessions 500
+    python -m benchmarks startup --startup-runs 10
+    python -m benchmarks all --save-baseline
+    python -m benchmarks all --compare
+"""
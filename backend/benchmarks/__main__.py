@@ -0,0 +1,68 @@
+import argparse
+import sys
+
+# Must run first: redirects the app to a temporary benchmark database
+from benchmarks import fixtures
+from benchmarks.stats import BASELINE_FILE, compare, format_table, load_baselines, save_baselines
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Hydro Hub benchmark suite")
+    parser.add_argument("suite", nargs="?", default="all", choices=["micro", "load", "startup", "all"])
+    parser.add_argument("--iterations", type=int, default=500, help="calls per microbenchmark")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users in the load scenario")
+    parser.add_argument("--sessions", type=int, default=400, help="page loads replayed in the load scenario")
+    parser.add_argument("--startup-runs", type=int, default=5, help="cold starts measured by the startup suite")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--synthetic", action="store_true",
+                        help="benchmark against a generated dataset instead of the standard seed data")
+    parser.add_argument("--states", type=int, default=4, help="synthetic states")
+    parser.add_argument("--districts", type=int, default=8, help="synthetic districts per state")
+    parser.add_argument("--villages", type=int, default=50, help="synthetic villages per district")
+    parser.add_argument("--years", type=float, default=0.25, help="synthetic years of daily history")
+    parser.add_argument("--baseline-file", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="fail if results regress against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed fractional regression")
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        fixtures.build_synthetic_dataset(args.states, args.districts, args.villages, args.years, seed=args.seed)
+    else:
+        fixtures.build_dataset(seed=args.seed)
+    ids = fixtures.sample_ids()
+
+    results = {}
+    if args.suite in ("micro", "all"):
+        from benchmarks.micro import run_micro
+        results.update(run_micro(ids, iterations=args.iterations, seed=args.seed))
+    if args.suite in ("load", "all"):
+        from benchmarks.load import run_load
+        results.update(run_load(ids, users=args.users, sessions=args.sessions, seed=args.seed))
+    if args.suite in ("startup", "all"):
+        from benchmarks.startup import run_startup
+        results.update(run_startup(runs=args.startup_runs))
+
+    print(format_table(results))
+
+    if args.save_baseline:
+        save_baselines(results, args.baseline_file)
+        print(f"\nBaseline written to {args.baseline_file}")
+
+    if args.compare:
+        baselines = load_baselines(args.baseline_file)
+        if not baselines:
+            print(f"\nNo baseline found at {args.baseline_file}")
+            return 1
+        regressions = compare(results, baselines, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"\nNo regressions beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
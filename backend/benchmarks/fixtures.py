@@ -0,0 +1,43 @@
+import contextlib
+import io
+import os
+import random
+import tempfile
+
+# Point the application at a throwaway database before anything imports app.database
+_DB_DIR = tempfile.mkdtemp(prefix="hydro_bench_")
+DATABASE_PATH = os.path.join(_DB_DIR, "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DATABASE_PATH}"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("PROFILE_SAMPLE_RATE", "0")
+
+
+def build_dataset(seed: int = 42):
+    """Seed the benchmark database deterministically with the standard location data."""
+    import seed_db
+
+    random.seed(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed_db.seed_data()
+
+
+def build_synthetic_dataset(states: int, districts: int, villages: int, years: float, seed: int = 42):
+    """Generate a production-sized synthetic dataset (see generate_dataset.py)."""
+    from generate_dataset import DatasetGenerator
+
+    return DatasetGenerator(os.environ["DATABASE_URL"], states, districts, villages, years, seed=seed).run(reset=True)
+
+
+def sample_ids():
+    """Return representative state, district and village rows for parameterising calls."""
+    from app import models
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        states = [(s.id, s.code) for s in db.query(models.State).all()]
+        districts = [(d.id, d.state_id) for d in db.query(models.District).all()]
+        villages = [(v.id, v.district_id, v.code, v.name) for v in db.query(models.Village).all()]
+    finally:
+        db.close()
+    return {"states": states, "districts": districts, "villages": villages}
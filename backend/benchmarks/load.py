@@ -0,0 +1,108 @@
+import asyncio
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from benchmarks.stats import summarize
+
+# Page journeys as issued by frontend/src/services/api.js, weighted by how often
+# each page is opened. Every step is (route template, path, query params).
+JOURNEY_WEIGHTS = {
+    "selection": 0.25,   # SelectionPage: states -> districts -> villages
+    "dashboard": 0.35,   # RiskDashboard: village risk profile
+    "prediction": 0.20,  # PredictionModule: forecast + risk profile
+    "simulation": 0.10,  # PredictionModule in what-if mode
+    "safety": 0.10,      # SafetyModule: village risk profile
+}
+
+
+def build_journey(kind: str, ids, rng: random.Random) -> List[Tuple[str, str, Dict]]:
+    state_id, _ = rng.choice(ids["states"])
+    district_id = rng.choice([d for d, s in ids["districts"] if s == state_id] or [ids["districts"][0][0]])
+    village_id = rng.choice(ids["villages"])[0]
+
+    if kind == "selection":
+        return [
+            ("/api/states", "/api/states", {}),
+            ("/api/districts/{state_id}", f"/api/districts/{state_id}", {}),
+            ("/api/villages/{district_id}", f"/api/villages/{district_id}", {}),
+        ]
+    if kind == "dashboard":
+        return [("/api/risk/village/{village_id}", f"/api/risk/village/{village_id}", {})]
+    if kind == "prediction":
+        return [
+            ("/api/predictions/village/{village_id}", f"/api/predictions/village/{village_id}", {}),
+            ("/api/risk/village/{village_id}", f"/api/risk/village/{village_id}", {}),
+        ]
+    if kind == "simulation":
+        params = {
+            "slr": round(rng.uniform(1, 10), 1),
+            "rainfall": round(rng.uniform(1, 10), 1),
+            "population": round(rng.uniform(1, 10), 1),
+            "surge": round(rng.uniform(1, 10), 1),
+        }
+        return [
+            ("/api/predictions/village/{village_id}", f"/api/predictions/village/{village_id}", params),
+            ("/api/risk/village/{village_id}", f"/api/risk/village/{village_id}", {}),
+        ]
+    return [("/api/risk/village/{village_id}", f"/api/risk/village/{village_id}", {})]
+
+
+async def _virtual_user(client, ids, sessions: List[str], seed: int, timings, errors):
+    rng = random.Random(seed)
+    for kind in sessions:
+        # Pages fire their requests concurrently, like the Promise.all in PredictionModule
+        steps = build_journey(kind, ids, rng)
+        if kind == "selection":
+            for step in steps:
+                await _request(client, step, timings, errors)
+        else:
+            await asyncio.gather(*(_request(client, step, timings, errors) for step in steps))
+
+
+async def _request(client, step, timings, errors):
+    route, path, params = step
+    t0 = time.perf_counter()
+    try:
+        response = await client.get(path, params=params)
+        ok = response.status_code == 200
+    except Exception:
+        ok = False
+    timings[route].append(time.perf_counter() - t0)
+    if not ok:
+        errors[route] += 1
+
+
+async def _run(ids, users: int, sessions: int, seed: int):
+    import httpx
+    from app.main import app
+
+    rng = random.Random(seed)
+    kinds, weights = zip(*JOURNEY_WEIGHTS.items())
+    plan = rng.choices(kinds, weights=weights, k=sessions)
+    per_user = [plan[i::users] for i in range(users)]
+
+    timings = defaultdict(list)
+    errors = defaultdict(int)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            _virtual_user(client, ids, user_plan, seed + i, timings, errors)
+            for i, user_plan in enumerate(per_user)
+        ))
+        wall = time.perf_counter() - started
+
+    results = {}
+    all_timings = []
+    for route, durations in sorted(timings.items()):
+        results[f"load.{route}"] = summarize(durations, wall, errors[route])
+        all_timings.extend(durations)
+    results["load.total"] = summarize(all_timings, wall, sum(errors.values()))
+    return results
+
+
+def run_load(ids, users: int = 20, sessions: int = 400, seed: int = 42) -> Dict[str, Dict[str, float]]:
+    """Replay a weighted mix of frontend page loads with `users` concurrent clients."""
+    return asyncio.run(_run(ids, users, sessions, seed))
@@ -0,0 +1,75 @@
+import random
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict
+
+from benchmarks.stats import summarize
+
+
+def bench(fn: Callable[[int], object], iterations: int, warmup: int = 20) -> Dict[str, float]:
+    """Time `iterations` calls of fn(i) individually after a short warmup."""
+    for i in range(warmup):
+        fn(i)
+    durations = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        fn(i)
+        durations.append(time.perf_counter() - t0)
+    return summarize(durations, time.perf_counter() - started)
+
+
+def run_micro(ids, iterations: int = 500, seed: int = 42) -> Dict[str, Dict[str, float]]:
+    """Microbenchmarks for the risk engine, forecast generation, the village store and every crud read."""
+    from app import crud
+    from app.api import predictions
+    from app.core.risk_calculator import RiskCalculator
+    from app.core.village_store import get_store
+    from app.database import SessionLocal
+
+    random.seed(seed)
+    states = [s[0] for s in ids["states"]]
+    districts = [d[0] for d in ids["districts"]]
+    villages = [v[0] for v in ids["villages"]]
+    codes = [v[2] for v in ids["villages"]]
+    names = [v[3] for v in ids["villages"]]
+    pick = lambda seq, i: seq[i % len(seq)]
+
+    env = {"sea_level_rise": 5, "cyclone_frequency": 2, "storm_surge_height": 3, "erosion_rate": 4, "extreme_rainfall": 6}
+    settlement = {"population_density": 8, "households": 7, "distance_from_shore": 9, "infrastructure_score": 5}
+    today = date.today()
+
+    db = SessionLocal()
+    try:
+        store = get_store(db)
+        cases = {
+            "risk_calculator.calculate_risk_profile": lambda i: RiskCalculator.calculate_risk_profile(env, settlement),
+            "forecast.baseline": lambda i: predictions.get_prediction_forecast(
+                pick(villages, i), db=db, slr=None, rainfall=None, population=None, surge=None),
+            "forecast.simulation": lambda i: predictions.get_prediction_forecast(
+                pick(villages, i), db=db, slr=6.5, rainfall=7.0, population=None, surge=None),
+            "village_store.get": lambda i: store.get(pick(villages, i)).environmental(),
+            "village_store.score_all": lambda i: store.score(store.select()),
+            "crud.get_states": lambda i: crud.get_states(db),
+            "crud.get_districts_by_state": lambda i: crud.get_districts_by_state(db, pick(states, i)),
+            "crud.get_villages_by_district": lambda i: crud.get_villages_by_district(db, pick(districts, i)),
+            "crud.get_village": lambda i: crud.get_village(db, pick(villages, i)),
+            "crud.get_village_by_code": lambda i: crud.get_village_by_code(db, pick(codes, i)),
+            "crud.get_village_by_name": lambda i: crud.get_village_by_name(db, pick(names, i)),
+            "crud.get_latest_risk_assessment": lambda i: crud.get_latest_risk_assessment(db, pick(villages, i)),
+            "crud.get_risk_history": lambda i: crud.get_risk_history(db, pick(villages, i), days=30),
+            "crud.get_latest_environmental_data": lambda i: crud.get_latest_environmental_data(db, pick(villages, i)),
+            "crud.get_latest_settlement_data": lambda i: crud.get_latest_settlement_data(db, pick(villages, i)),
+            "crud.get_predictions": lambda i: crud.get_predictions(
+                db, pick(villages, i), start_date=today, end_date=today + timedelta(days=14)),
+            "crud.get_forecast": lambda i: crud.get_forecast(
+                db, pick(villages, i), start_date=today, end_date=today + timedelta(days=14)),
+        }
+        results = {}
+        for name, fn in cases.items():
+            results[f"micro.{name}"] = bench(fn, iterations)
+            # Keep the identity map from growing across thousands of calls
+            db.expunge_all()
+        return results
+    finally:
+        db.close()
@@ -0,0 +1,42 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict
+
+from benchmarks.stats import summarize
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter: import the app, run its lifespan, report phase timings
+COLD_START_SCRIPT = """
+import asyncio, json
+from app.main import app
+async def boot():
+    async with app.router.lifespan_context(app):
+        pass
+asyncio.run(boot())
+print(json.dumps(app.state.startup_report.phases))
+"""
+
+
+def run_startup(runs: int = 10) -> Dict[str, Dict[str, float]]:
+    """Cold-start a worker `runs` times in subprocesses and report per-phase timings."""
+    phases: Dict[str, list] = {}
+    process_times = []
+    started = time.perf_counter()
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        out = subprocess.run(
+            [sys.executable, "-W", "ignore", "-c", COLD_START_SCRIPT],
+            cwd=BACKEND_DIR, env=os.environ.copy(), capture_output=True, text=True, check=True,
+        ).stdout
+        process_times.append(time.perf_counter() - t0)
+        for phase, seconds in json.loads(out.strip().splitlines()[-1]).items():
+            phases.setdefault(phase, []).append(seconds)
+    wall = time.perf_counter() - started
+
+    results = {f"startup.{phase}": summarize(values, wall) for phase, values in phases.items()}
+    results["startup.process"] = summarize(process_times, wall)
+    return results
@@ -0,0 +1,72 @@
+import json
+import math
+import os
+from typing import Dict, List
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(durations: List[float], wall_time: float, errors: int = 0) -> Dict[str, float]:
+    """Throughput and latency percentiles (milliseconds) for a set of timed calls."""
+    values = sorted(durations)
+    return {
+        "count": len(values),
+        "errors": errors,
+        "throughput": round(len(values) / wall_time, 2) if wall_time > 0 else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 4),
+        "p95_ms": round(percentile(values, 95) * 1000, 4),
+        "p99_ms": round(percentile(values, 99) * 1000, 4),
+    }
+
+
+def format_table(results: Dict[str, Dict[str, float]]) -> str:
+    header = f"{'Benchmark':<45} {'count':>7} {'err':>5} {'ops/s':>11} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    lines = [header, "-" * len(header)]
+    for name, r in results.items():
+        lines.append(
+            f"{name:<45} {r['count']:>7} {r['errors']:>5} {r['throughput']:>11.1f} "
+            f"{r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} {r['p99_ms']:>9.3f}"
+        )
+    return "\n".join(lines)
+
+
+def load_baselines(path: str = BASELINE_FILE) -> Dict[str, Dict[str, float]]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baselines(results: Dict[str, Dict[str, float]], path: str = BASELINE_FILE):
+    baselines = load_baselines(path)
+    baselines.update(results)
+    with open(path, "w") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+
+
+def compare(results: Dict[str, Dict[str, float]], baselines: Dict[str, Dict[str, float]],
+            tolerance: float) -> List[str]:
+    """
+    Return a description of every regression beyond `tolerance` (fractional).
+    A benchmark regresses when its p95 latency grows or its throughput drops.
+    """
+    regressions = []
+    for name, r in results.items():
+        base = baselines.get(name)
+        if not base:
+            continue
+        if r["errors"] > base.get("errors", 0):
+            regressions.append(f"{name}: errors {base.get('errors', 0)} -> {r['errors']}")
+        if base["p95_ms"] > 0 and r["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']:.3f} ms -> {r['p95_ms']:.3f} ms")
+        if base["throughput"] > 0 and r["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base['throughput']:.1f} -> {r['throughput']:.1f} ops/s")
+    return regressions
@@ -0,0 +1,269 @@
+"""
+Synthetic dataset generator for capacity testing.
+
+Builds N states, districts and villages placed along the Indian coastline and
+M years of daily environmental, settlement, risk assessment and prediction
+history. Random generation is vectorized with NumPy and rows are bulk inserted
+through the raw SQLite connection, so large datasets load in minutes.
+
+Usage (from the backend directory):
+    python generate_dataset.py --states 10 --districts 20 --villages 500 --years 2
+    python generate_dataset.py --villages 50 --years 1 --database-url sqlite:///./capacity.db --reset
+"""
+import argparse
+import math
+import time
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+import numpy as np
+from sqlalchemy import create_engine
+
+from app import migrations, models
+from app.core.risk_calculator import RiskCalculator
+
+# West coast (Kutch) round Kanyakumari to the Bengal delta, as (lat, lng)
+COASTLINE = np.array([
+    (23.00, 68.60), (21.60, 72.60), (19.00, 72.80), (15.50, 73.80), (12.90, 74.80),
+    (9.90, 76.20), (8.08, 77.54), (9.30, 79.30), (10.76, 79.84), (13.05, 80.28),
+    (15.90, 80.70), (17.70, 83.30), (19.81, 85.83), (21.49, 86.93), (21.90, 88.20),
+])
+KM_PER_DEGREE = 111.0
+
+ENV_INDICATORS = ("sea_level_rise", "cyclone_frequency", "storm_surge_height", "erosion_rate", "extreme_rainfall")
+
+
+def coastline_points(fractions: np.ndarray):
+    """Positions and inland unit normals at fractions (0-1) of the coastline's length."""
+    segments = np.diff(COASTLINE, axis=0)
+    lengths = np.hypot(segments[:, 0], segments[:, 1])
+    cumulative = np.concatenate([[0.0], np.cumsum(lengths)])
+    distance = fractions * cumulative[-1]
+    idx = np.clip(np.searchsorted(cumulative, distance, side="right") - 1, 0, len(segments) - 1)
+    t = (distance - cumulative[idx]) / lengths[idx]
+    points = COASTLINE[idx] + segments[idx] * t[:, None]
+    # Rotate the segment direction to point inland (the sea lies to the west/south/east)
+    direction = segments[idx] / lengths[idx, None]
+    normals = np.stack([direction[:, 1], -direction[:, 0]], axis=1)
+    return points, normals
+
+
+class DatasetGenerator:
+    """Generates and bulk-loads a reproducible synthetic dataset."""
+
+    def __init__(self, database_url: str, states: int, districts: int, villages: int,
+                 years: float, seed: int = 42, end_date: Optional[date] = None):
+        self.engine = create_engine(database_url)
+        self.n_states = states
+        self.districts_per_state = districts
+        self.villages_per_district = villages
+        self.days = max(1, int(round(years * 365)))
+        self.end_date = end_date or date.today()
+        self.rng = np.random.default_rng(seed)
+        self.row_counts: Dict[str, int] = {}
+
+    # --- Schema ---
+
+    def prepare_schema(self, reset: bool):
+        if reset:
+            models.Base.metadata.drop_all(bind=self.engine)
+        migrations.upgrade(self.engine)
+
+    def _insert(self, cursor, table: str, columns, rows):
+        if not rows:
+            return
+        placeholders = ", ".join("?" for _ in columns)
+        cursor.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+        self.row_counts[table] = self.row_counts.get(table, 0) + cursor.rowcount
+
+    @staticmethod
+    def _next_id(cursor, table: str) -> int:
+        return (cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0] or 0) + 1
+
+    # --- Location hierarchy ---
+
+    def generate_locations(self, cursor):
+        rng = self.rng
+        n_districts = self.n_states * self.districts_per_state
+        n_villages = n_districts * self.villages_per_district
+        state_id0 = self._next_id(cursor, "states")
+        district_id0 = self._next_id(cursor, "districts")
+        village_id0 = self._next_id(cursor, "villages")
+
+        self._insert(cursor, "states", ("id", "name", "code"), [
+            (state_id0 + s, f"Synthetic State {state_id0 + s}", f"SYN{state_id0 + s:03d}")
+            for s in range(self.n_states)
+        ])
+        district_state = np.repeat(np.arange(self.n_states), self.districts_per_state)
+        self._insert(cursor, "districts", ("id", "state_id", "name", "code"), [
+            (district_id0 + d, state_id0 + int(s), f"District {district_id0 + d}", f"SYN{state_id0 + int(s):03d}_D{district_id0 + d:05d}")
+            for d, s in enumerate(district_state)
+        ])
+
+        # Each district owns a contiguous stretch of coastline; villages sit inside it
+        village_district = np.repeat(np.arange(n_districts), self.villages_per_district)
+        fractions = (village_district + rng.random(n_villages)) / n_districts
+        points, normals = coastline_points(fractions)
+        inland_km = rng.exponential(3.0, n_villages)
+        coords = points + normals * (inland_km / KM_PER_DEGREE)[:, None]
+        coords += rng.normal(0, 0.002, coords.shape)
+
+        ids = village_id0 + np.arange(n_villages)
+        d_ids = district_id0 + village_district
+        lat = np.round(coords[:, 0], 5).tolist()
+        lng = np.round(coords[:, 1], 5).tolist()
+        self._insert(cursor, "villages", ("id", "district_id", "name", "code", "latitude", "longitude"), [
+            (int(v), int(d), f"Village {v}", f"SYNV{v:08d}", la, lo)
+            for v, d, la, lo in zip(ids.tolist(), d_ids.tolist(), lat, lng)
+        ])
+        return ids, inland_km
+
+    # --- Daily history ---
+
+    def generate_history(self, cursor, connection, village_ids: np.ndarray, inland_km: np.ndarray,
+                         batch_rows: int = 250_000):
+        rng = self.rng
+        n = len(village_ids)
+        start = self.end_date - timedelta(days=self.days - 1)
+
+        # Per-village baselines (0-10 scale); proximity to shore raises surge/erosion
+        proximity = 10.0 * np.exp(-inland_km / 3.0)
+        base = {
+            "sea_level_rise": rng.uniform(1.0, 7.0, n),
+            "cyclone_frequency": rng.uniform(0.0, 6.0, n),
+            "storm_surge_height": np.clip(rng.uniform(0.0, 4.0, n) + proximity * 0.4, 0, 10),
+            "erosion_rate": np.clip(rng.uniform(0.0, 4.0, n) + proximity * 0.3, 0, 10),
+            "extreme_rainfall": rng.uniform(1.0, 7.0, n),
+        }
+        noise = {k: np.zeros(n) for k in ENV_INDICATORS}
+        population = rng.uniform(1.0, 9.0, n)
+        households = np.clip(population * 0.8 + rng.normal(0, 1.0, n), 0, 10)
+        distance = np.clip(proximity + rng.normal(0, 0.5, n), 0, 10)
+        infrastructure = rng.uniform(1.0, 9.0, n)
+
+        vid_list = village_ids.tolist()
+        days_per_batch = max(1, batch_rows // max(1, n))
+        previous = None
+
+        for block_start in range(0, self.days + 1, days_per_batch):
+            # One extra day is simulated so each day's prediction can target the next day
+            block_days = range(block_start, min(self.days + 1, block_start + days_per_batch))
+            env_rows, settlement_rows, assessment_rows, prediction_rows = [], [], [], []
+            for day in block_days:
+                current = start + timedelta(days=day)
+                season = max(0.0, math.sin(2 * math.pi * (current.timetuple().tm_yday - 150) / 365.0))
+                years_elapsed = day / 365.0
+
+                env = {}
+                for key in ENV_INDICATORS:
+                    # AR(1) daily fluctuation around the village baseline
+                    noise[key] = 0.8 * noise[key] + rng.normal(0, 0.35, n)
+                    env[key] = base[key] + noise[key]
+                env["sea_level_rise"] += years_elapsed * 0.05
+                env["extreme_rainfall"] += season * 2.5
+                env["cyclone_frequency"] += season * 1.5
+                env = {k: np.round(np.clip(v, 0, 10), 2) for k, v in env.items()}
+
+                infra = np.clip(infrastructure - years_elapsed * 0.1, 0, 10)
+                pop = np.clip(population * (1 + years_elapsed * 0.015), 0, 10)
+                settlement = {
+                    "population_density": np.round(pop, 1),
+                    "households": np.round(households).astype(np.int64),
+                    "distance_from_shore": np.round(distance, 1),
+                    "infrastructure_score": np.round(infra, 1),
+                }
+                profile = RiskCalculator.calculate_risk_profiles_batch(env, settlement)
+
+                if previous is not None:
+                    # Yesterday's forecast for today: today's outcome plus forecast error
+                    score = np.clip(profile["overall_risk_score"] + rng.normal(0, 3.0, n), 0, 100)
+                    probs = [
+                        np.clip(profile[k] / 10.0 + rng.normal(0, 0.05, n), 0, 1)
+                        for k in ("flood_risk", "cyclone_risk", "rainfall_risk", "erosion_risk")
+                    ]
+                    prediction_rows.extend(zip(
+                        vid_list, [previous] * n, [current.isoformat()] * n,
+                        np.round(score, 1).tolist(), *(np.round(p, 2).tolist() for p in probs)
+                    ))
+
+                previous = current.isoformat()
+                if day == self.days:
+                    break
+
+                iso = [current.isoformat()] * n
+                env_rows.extend(zip(vid_list, iso, *(env[k].tolist() for k in ENV_INDICATORS)))
+                settlement_rows.extend(zip(
+                    vid_list, iso,
+                    settlement["population_density"].tolist(), settlement["households"].tolist(),
+                    settlement["distance_from_shore"].tolist(), settlement["infrastructure_score"].tolist()
+                ))
+                assessment_rows.extend(zip(
+                    vid_list, iso,
+                    *(np.round(profile[k], 1).tolist() for k in
+                      ("overall_risk_score", "flood_risk", "cyclone_risk", "rainfall_risk", "erosion_risk")),
+                    profile["risk_category"].tolist()
+                ))
+
+            self._insert(cursor, "environmental_data", ("village_id", "date") + ENV_INDICATORS, env_rows)
+            self._insert(cursor, "settlement_data", (
+                "village_id", "date", "population_density", "households", "distance_from_shore", "infrastructure_score"
+            ), settlement_rows)
+            self._insert(cursor, "risk_assessments", (
+                "village_id", "date", "overall_risk_score", "flood_risk", "cyclone_risk",
+                "rainfall_risk", "erosion_risk", "risk_category"
+            ), assessment_rows)
+            self._insert(cursor, "predictions", (
+                "village_id", "prediction_date", "for_date", "predicted_risk_score", "flood_probability",
+                "cyclone_probability", "rainfall_probability", "erosion_probability"
+            ), prediction_rows)
+            connection.commit()
+
+    # --- Entry point ---
+
+    def run(self, reset: bool = False) -> Dict[str, int]:
+        self.prepare_schema(reset)
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            # Bulk-load settings: durability is irrelevant for a generated dataset
+            cursor.execute("PRAGMA synchronous = OFF")
+            cursor.execute("PRAGMA journal_mode = MEMORY")
+            village_ids, inland_km = self.generate_locations(cursor)
+            connection.commit()
+            self.generate_history(cursor, connection, village_ids, inland_km)
+            cursor.execute("PRAGMA synchronous = FULL")
+        finally:
+            connection.close()
+        return self.row_counts
+
+
+def main(argv=None):
+    from app.core.config import settings
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic Hydro Hub dataset")
+    parser.add_argument("--states", type=int, default=4)
+    parser.add_argument("--districts", type=int, default=8, help="districts per state")
+    parser.add_argument("--villages", type=int, default=50, help="villages per district")
+    parser.add_argument("--years", type=float, default=1.0, help="years of daily history")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="last history day (default: today)")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--reset", action="store_true", help="drop all tables before generating")
+    args = parser.parse_args(argv)
+
+    generator = DatasetGenerator(
+        args.database_url, args.states, args.districts, args.villages, args.years,
+        seed=args.seed, end_date=args.end_date
+    )
+    started = time.perf_counter()
+    counts = generator.run(reset=args.reset)
+    elapsed = time.perf_counter() - started
+
+    total = sum(counts.values())
+    for table, count in counts.items():
+        print(f"{table:<20} {count:>12,} rows")
+    print(f"Generated {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Operational commands for the Hydro Hub backend.
+
+Usage (from the backend directory):
+    python manage.py migrate     # apply pending schema migrations (app/migrations); run once per deploy, not per worker
+    python manage.py shards      # copy sharded states' locations (and with --move-data, their rows) to SHARD_URLS
+    python manage.py snapshot    # rebuild and publish the shared read-only data snapshot
+    python manage.py bundle      # render changed public responses into the pre-compressed static bundle
+    python manage.py etl         # load new raw yearly rows from coastal_risk.db into the 0-10 tables
+    python manage.py fit         # refit the per-village forecaster on rows added since the last fit
+    python manage.py pack-predictions  # convert legacy per-day prediction rows into packed forecast runs
+    python manage.py compact-changes   # drop superseded and expired /api/sync change log entries
+"""
+import argparse
+import sys
+
+
+def migrate(database_url=None, target=None, status=False):
+    from sqlalchemy import create_engine
+    from app import migrations
+
+    if database_url:
+        binds = [create_engine(database_url)]
+    else:
+        from app.core.sharding import router
+        binds = list(router.engines.values())
+    for bind in binds:
+        if status:
+            done = set(migrations.applied(bind))
+            for migration in migrations.migrations():
+                print(f"{bind.url} [{'x' if migration.version in done else ' '}] "
+                      f"{migration.version:04d} {migration.name}")
+            continue
+        for migration in migrations.upgrade(bind, target):
+            print(f"{bind.url}: applied {migration.version:04d} {migration.name}")
+        print(f"Schema at version {migrations.current_version(bind)}: {bind.url}")
+
+
+def build_snapshot(directory):
+    import os
+    from app.core import snapshot
+    from app.database import SessionLocal
+
+    os.makedirs(directory, exist_ok=True)
+    db = SessionLocal()
+    try:
+        version = snapshot.build_snapshot(db, directory)
+    finally:
+        db.close()
+    print(f"Published snapshot {version} in {directory}")
+
+
+def build_bundle(directory, full):
+    import os
+    from app.core import static_bundle
+    from app.database import SessionLocal
+
+    os.makedirs(directory, exist_ok=True)
+    db = SessionLocal()
+    try:
+        summary = static_bundle.build_bundle(db, directory, full=full)
+    finally:
+        db.close()
+    print(f"Published bundle {summary['version']} in {directory}: {summary['files']} files, "
+          f"{summary['rendered']} rendered, {summary['reused']} unchanged")
+
+
+def etl(source_path, chunk_size, full):
+    from app.core import etl as pipeline
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        summaries = pipeline.run_etl(db, source_path, chunk_size=chunk_size, full=full)
+    finally:
+        db.close()
+    for s in summaries:
+        print(f"{s['source']}: read {s['read']}, inserted {s['inserted']}, updated {s['updated']}, "
+              f"skipped {s['skipped']}, high-water {s['high_water']}"
+              + (" (bounds changed: full refresh)" if s["full_refresh"] else ""))
+
+    # The ETL loads into the catalog; hand sharded states' rows over to their shards
+    from app.core.sharding import router
+    if router.sharded:
+        router.replicate_hierarchy()
+        for shard, count in router.move_data().items():
+            print(f"{shard}: moved {count} rows from the catalog")
+
+
+def shards(move_data):
+    from app.core.sharding import router
+
+    if not router.sharded:
+        print("No SHARD_URLS configured; everything lives in DATABASE_URL")
+        return
+    for shard, count in router.replicate_hierarchy().items():
+        print(f"{shard}: {count} location rows replicated")
+    if move_data:
+        for shard, count in router.move_data().items():
+            print(f"{shard}: moved {count} rows from the catalog")
+
+
+def fit(full):
+    from app.core import forecaster
+    from app.core.sharding import router
+
+    for shard, summary in zip(router.names(), router.scatter(lambda db: forecaster.fit(db, full=full))):
+        print(f"{shard}: {summary['mode']} fit read {summary['observations']} observations, "
+              f"refitted {summary['series_refitted']} village series")
+
+
+def pack_predictions(delete_legacy):
+    from app import crud
+    from app.core.sharding import router
+
+    results = router.scatter(lambda db: crud.pack_predictions(db, delete_legacy=delete_legacy))
+    for shard, (read, written) in zip(router.names(), results):
+        print(f"{shard}: packed {read} prediction rows into {written} forecast runs"
+              + (" (legacy rows deleted)" if delete_legacy else ""))
+
+
+def compact_changes(retention_days):
+    from app.core import changelog
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        summary = changelog.compact(db, retention_days)
+    finally:
+        db.close()
+    print(f"Dropped {summary['superseded']} superseded and {summary['expired']} expired change log entries; "
+          f"clients synced before version {summary['floor']} will resync fully")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Hydro Hub management commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_cmd = commands.add_parser("migrate", help="create or upgrade the database schema")
+    migrate_cmd.add_argument("--database-url", default=None, help="defaults to DATABASE_URL")
+    migrate_cmd.add_argument("--to", type=int, default=None, help="stop at this schema version")
+    migrate_cmd.add_argument("--status", action="store_true", help="list migrations and whether each is applied")
+
+    snapshot_cmd = commands.add_parser("snapshot", help="build and publish the shared data snapshot")
+    snapshot_cmd.add_argument("--snapshot-dir", default=None, help="defaults to SNAPSHOT_DIR or ./snapshot")
+
+    bundle_cmd = commands.add_parser("bundle", help="render the public read-only responses as static files")
+    bundle_cmd.add_argument("--bundle-dir", default=None, help="defaults to STATIC_BUNDLE_DIR")
+    bundle_cmd.add_argument("--full", action="store_true", help="re-render every file, even if unchanged")
+
+    etl_cmd = commands.add_parser("etl", help="normalize raw yearly measurements into the scoring tables")
+    etl_cmd.add_argument("--source", default=None, help="defaults to COASTAL_RISK_DB_PATH")
+    etl_cmd.add_argument("--chunk-size", type=int, default=5000)
+    etl_cmd.add_argument("--full", action="store_true", help="ignore the high-water mark and reload everything")
+
+    shards_cmd = commands.add_parser("shards", help="replicate locations into per-state shards")
+    shards_cmd.add_argument("--move-data", action="store_true",
+                            help="also move sharded states' rows out of DATABASE_URL")
+
+    fit_cmd = commands.add_parser("fit", help="fit the per-village forecaster from assessment and indicator history")
+    fit_cmd.add_argument("--full", action="store_true", help="discard stored statistics and refit from all history")
+
+    pack_cmd = commands.add_parser("pack-predictions", help="migrate legacy prediction rows to packed forecast runs")
+    pack_cmd.add_argument("--delete", action="store_true", help="delete the legacy rows once packed")
+
+    compact_cmd = commands.add_parser("compact-changes", help="compact the change log behind /api/sync")
+    compact_cmd.add_argument("--retention-days", type=int, default=None,
+                             help="defaults to CHANGE_LOG_RETENTION_DAYS")
+
+    args = parser.parse_args(argv)
+    if args.command == "migrate":
+        migrate(args.database_url, args.to, args.status)
+    elif args.command == "snapshot":
+        from app.core.config import settings
+        build_snapshot(args.snapshot_dir or settings.SNAPSHOT_DIR or "./snapshot")
+    elif args.command == "bundle":
+        from app.core.config import settings
+        build_bundle(args.bundle_dir or settings.STATIC_BUNDLE_DIR, args.full)
+    elif args.command == "etl":
+        from app.core.config import settings
+        etl(args.source or settings.COASTAL_RISK_DB_PATH, args.chunk_size, args.full)
+    elif args.command == "shards":
+        shards(args.move_data)
+    elif args.command == "fit":
+        fit(args.full)
+    elif args.command == "pack-predictions":
+        pack_predictions(args.delete)
+    elif args.command == "compact-changes":
+        compact_changes(args.retention_days)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,62 @@
+"""
+Hydro Hub server entry point.
+
+    python run.py                       # development: single process with auto-reload
+    python run.py --prod --workers 4    # production: N workers sharing one data snapshot
+
+In production mode the supervisor process builds the shared snapshot before
+spawning workers and republishes it every SNAPSHOT_REFRESH_SECONDS. Send
+SIGHUP to the supervisor for a graceful rolling restart of the workers.
+"""
+import argparse
+import os
+
 import uvicorn
+from manage import migrate
+
+
+def serve_production(host: str, port: int, workers: int, snapshot_dir: str):
+    # Workers are spawned fresh and read settings from the environment
+    os.environ["SNAPSHOT_DIR"] = os.path.abspath(snapshot_dir)
+    # Each worker sizes its compute and report pools to its share of the CPUs
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    os.makedirs(os.environ["SNAPSHOT_DIR"], exist_ok=True)
+
+    from app.core import snapshot
+    from app.core.config import settings
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        version = snapshot.build_snapshot(db, os.environ["SNAPSHOT_DIR"])
+        print(f"Published snapshot {version}")
+    finally:
+        db.close()
+
+    refresher = snapshot.SnapshotRefresher(os.environ["SNAPSHOT_DIR"], settings.SNAPSHOT_REFRESH_SECONDS)
+    refresher.start()
+    try:
+        uvicorn.run(
+            "app.main:app", host=host, port=port, workers=workers,
+            reload=False, proxy_headers=True, timeout_graceful_shutdown=30,
+        )
+    finally:
+        refresher.stop()
+
 
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
+    parser = argparse.ArgumentParser(description="Run the Hydro Hub API")
+    parser.add_argument("--prod", action="store_true", help="multi-process production mode")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--snapshot-dir", default=os.environ.get("SNAPSHOT_DIR", "./snapshot"))
+    args = parser.parse_args()
+
+    # Apply the schema once, before any worker starts
+    migrate()
+    if args.prod:
+        serve_production(args.host, args.port, args.workers, args.snapshot_dir)
+    else:
+        # Development entry point: serve with auto-reload
+        uvicorn.run("app.main:app", host=args.host, port=args.port, reload=True)
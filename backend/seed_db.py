@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
 from app.database import SessionLocal, engine
-from app import models, schemas, crud
+from app import migrations, models, schemas, crud
 from datetime import date, timedelta
 import random
 
@@ -45,10 +45,17 @@ LOCATION_DATA = {
     }
 }
 
+# Evacuation shelters registered in every district: (name, capacity in people, facilities)
+SHELTERS = [
+    ("Government High School", 3000, ["Clean water", "Medical aid", "Food supplies"]),
+    ("Community Hall", 2500, ["Generator", "Sanitation", "Communication"]),
+    ("District Collectorate", 5000, ["Full facilities", "Security", "Transport"]),
+]
+
 def seed_data():
     # Re-create tables
     models.Base.metadata.drop_all(bind=engine)
-    models.Base.metadata.create_all(bind=engine)
+    migrations.upgrade(engine)
 
     db = SessionLocal()
     
@@ -170,6 +177,19 @@ def seed_data():
                     )
                     crud.create_prediction(db, pred_in)
 
+            # Evacuation shelters around the district's villages
+            for s_idx, (s_name, capacity, facilities) in enumerate(SHELTERS):
+                shelter_in = schemas.ShelterCreate(
+                    name=s_name,
+                    district_id=district.id,
+                    latitude=round(base_coords[0] + random.uniform(-0.04, 0.04), 4),
+                    longitude=round(base_coords[1] + random.uniform(-0.04, 0.04), 4),
+                    capacity=capacity,
+                    contact=f"044-1234-{5678 + s_idx}",
+                    facilities=facilities
+                )
+                crud.create_shelter(db, shelter_in)
+
     db.close()
     print("Database seeding complete!")
 
@@ -0,0 +1,75 @@
+"""
+The tests run the app against a throwaway copy of hydro_hub.db, migrated to the
+current schema. The environment is set before anything imports app.core.config.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_db_dir = tempfile.mkdtemp(prefix="hydro-hub-tests-")
+shutil.copy(os.path.join(BACKEND_DIR, "hydro_hub.db"), os.path.join(_db_dir, "hydro_hub.db"))
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_db_dir, "hydro_hub.db")
+os.environ["JOBS_ENABLED"] = "false"
+os.environ["SHARD_URLS"] = "{}"
+os.environ["COMPUTE_MODE"] = "inline"
+os.environ.pop("SNAPSHOT_DIR", None)
+
+
+@pytest.fixture(scope="session")
+def engine():
+    from app import migrations
+    from app.database import engine
+
+    migrations.upgrade(engine)
+    yield engine
+    shutil.rmtree(_db_dir, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def client(engine):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def db(engine):
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def fitted_village(db):
+    """A village with usable fitted parameters for every risk score; removed afterwards."""
+    from datetime import date
+
+    from sqlalchemy import delete
+
+    from app import models
+    from app.core import forecaster
+    from app.core.village_store import ASSESSMENT_COLUMNS
+
+    village_id = db.query(models.EnvironmentalData.village_id).order_by(models.EnvironmentalData.village_id).first()[0]
+    db.add_all(models.ForecastParam(
+        village_id=village_id, series=name, transitions=forecaster.MIN_TRANSITIONS, first_date=date(2020, 1, 1),
+        last_date=date(2025, 1, 1), last_value=8.0, alpha=4.0, beta=0.1, phi=0.99,
+    ) for name in ASSESSMENT_COLUMNS)
+    db.commit()
+    forecaster.parameters_for(db).load(db)
+    yield village_id
+    db.execute(delete(models.ForecastParam).where(models.ForecastParam.village_id == village_id))
+    db.commit()
+    forecaster.parameters_for(db).load(db)
@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+
+from app.core.admission import AdmissionController, AdmissionMiddleware, Shed
+
+
+def _controller(**limits):
+    limits = {"critical": 2, "normal": 2, "low": 1, **limits}
+    return AdmissionController(limits=limits, queue_limits={"critical": 4, "normal": 4, "low": 1}, routes={})
+
+
+@pytest.mark.parametrize("route, priority", [
+    ("/api/risk/village/{village_id}", "critical"),
+    ("/api/shelters/village/{village_id}", "critical"),
+    ("/api/villages/{district_id}", "critical"),
+    ("/api/risk/village/{village_id}/history", "normal"),
+    ("/api/jobs/{job_id}", "normal"),
+    ("/api/predictions/village/{village_id}", "low"),
+    ("/api/risk/scores", "low"),
+    ("/debug/{path}", "low"),
+])
+def test_routes_are_classified_by_template(route, priority):
+    assert _controller().priority(route) == priority
+
+
+def test_configured_patterns_override_the_defaults():
+    controller = AdmissionController(routes={"/api/risk/scores": "critical"})
+    assert controller.priority("/api/risk/scores") == "critical"
+
+
+def test_low_priority_is_shed_when_its_queue_is_full():
+    async def run():
+        controller = _controller()
+        assert await controller.acquire("low") == "admitted"
+        queued = asyncio.ensure_future(controller.acquire("low"))
+        await asyncio.sleep(0)
+        with pytest.raises(Shed) as shed:
+            await controller.acquire("low")
+        assert shed.value.reason == "queue_full"
+        controller.release("low")
+        assert await queued == "queued"
+        controller.release("low")
+        assert controller.classes["low"].in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_lower_classes_are_shed_while_critical_is_overloaded(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "ADMISSION_TARGET_DELAY_MS", 1.0)
+    monkeypatch.setattr(settings, "ADMISSION_INTERVAL_MS", 1.0)
+
+    async def run():
+        controller = _controller(critical=1)
+        # First interval: admitted without waiting; second: the only sample waited 20ms
+        await asyncio.sleep(0.01)
+        await controller.acquire("critical")
+        waiting = asyncio.ensure_future(controller.acquire("critical"))
+        await asyncio.sleep(0.02)
+        controller.release("critical")
+        assert await waiting == "queued"
+        assert controller.classes["critical"].overloaded
+        with pytest.raises(Shed) as shed:
+            await controller.acquire("low")
+        assert shed.value.reason == "priority"
+        # Critical requests are still admitted in order
+        follower = asyncio.ensure_future(controller.acquire("critical"))
+        await asyncio.sleep(0)
+        controller.release("critical")
+        assert await follower == "queued"
+        controller.release("critical")
+        # Once critical drains and stays idle for an interval, low work is admitted again
+        await asyncio.sleep(0.01)
+        assert await controller.acquire("low") == "admitted"
+
+    asyncio.run(run())
+
+
+def test_saturated_low_priority_route_gets_503_with_retry_after():
+    app = FastAPI()
+    started, release = asyncio.Event(), asyncio.Event()
+
+    @app.get("/api/risk/scores")
+    async def scores():
+        started.set()
+        await release.wait()
+        return {"ok": True}
+
+    middleware = AdmissionMiddleware(app, controller=_controller())
+
+    async def request(path):
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": path, "raw_path": path.encode(), "root_path": "",
+                 "query_string": b"", "headers": [], "scheme": "http", "server": ("test", 80), "app": app}
+        await middleware(scope, receive, send)
+        return messages[0]["status"], dict(messages[0]["headers"])
+
+    async def run():
+        busy = asyncio.ensure_future(request("/api/risk/scores"))
+        await started.wait()
+        queued = asyncio.ensure_future(request("/api/risk/scores"))
+        await asyncio.sleep(0)
+        status, headers = await request("/api/risk/scores")
+        release.set()
+        assert (await busy)[0] == 200
+        assert (await queued)[0] == 200
+        return status, headers
+
+    status, headers = asyncio.run(run())
+    assert status == 503
+    assert headers[b"retry-after"] == b"2"
+
+
+def test_shed_request_from_an_allowed_origin_carries_cors_headers(client, monkeypatch):
+    async def shed(self, priority):
+        raise Shed("queue_full")
+
+    monkeypatch.setattr(AdmissionController, "acquire", shed)
+    response = client.get("/api/risk/scores", headers={"Origin": "http://localhost:3000"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "2"
+    assert response.headers["access-control-allow-origin"] == "http://localhost:3000"
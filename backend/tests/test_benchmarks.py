@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+
+from benchmarks.stats import compare, load_baselines, percentile, save_baselines, summarize
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _result(p95_ms=1.0, throughput=100.0, errors=0):
+    return {"count": 10, "errors": errors, "throughput": throughput, "p50_ms": 0.5, "p95_ms": p95_ms, "p99_ms": 2.0}
+
+
+def test_percentiles_use_the_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert (percentile(values, 50), percentile(values, 95), percentile(values, 100)) == (50.0, 95.0, 100.0)
+    assert percentile([], 95) == 0.0
+    summary = summarize([0.002, 0.001, 0.003], wall_time=0.5, errors=1)
+    assert (summary["count"], summary["throughput"], summary["p50_ms"], summary["errors"]) == (3, 6.0, 2.0, 1)
+
+
+def test_compare_flags_only_regressions_beyond_the_tolerance():
+    baselines = {"a": _result(), "b": _result(), "c": _result(), "d": _result()}
+    results = {
+        "a": _result(p95_ms=1.2, throughput=85.0),
+        "b": _result(p95_ms=1.5),
+        "c": _result(throughput=50.0, errors=1),
+        "new": _result(),
+    }
+    regressions = compare(results, baselines, tolerance=0.25)
+    assert [r.split(":")[0] for r in regressions] == ["b", "c", "c"]
+
+
+def test_saving_merges_into_existing_baselines(tmp_path):
+    path = str(tmp_path / "baselines.json")
+    save_baselines({"a": _result()}, path)
+    save_baselines({"b": _result(p95_ms=3.0)}, path)
+    assert load_baselines(path) == {"a": _result(), "b": _result(p95_ms=3.0)}
+
+
+def test_micro_suite_runs_against_its_own_database(tmp_path):
+    env = {**os.environ, "PYTHONPATH": BACKEND_DIR}
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks", "micro", "--iterations", "2",
+         "--baseline-file", str(tmp_path / "baselines.json"), "--save-baseline"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=300)
+    assert completed.returncode == 0, completed.stderr
+    assert any(name.startswith("micro.") for name in load_baselines(str(tmp_path / "baselines.json")))
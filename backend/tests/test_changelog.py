@@ -0,0 +1,103 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, migrations, models
+from app.core import changelog
+
+
+@pytest.fixture
+def shard(tmp_path, engine):
+    shard_engine = create_engine(f"sqlite:///{tmp_path / 'shard.db'}")
+    migrations.upgrade(shard_engine)
+    yield sessionmaker(bind=shard_engine)
+    shard_engine.dispose()
+
+
+def _entries_after(db, version):
+    db.rollback()
+    return db.execute(select(models.ChangeLog.village_id, models.ChangeLog.kind)
+                      .where(models.ChangeLog.version > version).order_by(models.ChangeLog.version)).all()
+
+
+def _outbox(session):
+    return session.execute(select(func.count()).select_from(models.ChangeOutbox)).scalar()
+
+
+def _environmental(village_id):
+    return models.EnvironmentalData(village_id=village_id, date=date(2001, 1, 1), sea_level_rise=1.0,
+                                    cyclone_frequency=1.0, storm_surge_height=1.0, erosion_rate=1.0,
+                                    extreme_rainfall=1.0)
+
+
+def test_entries_are_versioned_in_commit_order(db):
+    version = changelog.current_version(db)
+    latest = crud.get_latest_environmental_row(db, 1)
+    for value in (latest["sea_level_rise"], latest["sea_level_rise"]):
+        crud.upsert_daily_rows(db, models.EnvironmentalData, {(1, latest["date"]): {"sea_level_rise": value}})
+        db.commit()
+    assert _entries_after(db, version) == [(1, "environmental"), (1, "environmental")]
+    changed, read_to, more = changelog.changes_since(db, version, limit=10)
+    assert [(v, kinds) for v, _, kinds in changed] == [(1, ["environmental"])]
+    assert read_to == changelog.current_version(db) and not more
+
+
+def test_shard_entries_are_published_after_the_shard_commit(db, shard):
+    version = changelog.current_version(db)
+    session = shard()
+    session.add(_environmental(7))
+    session.commit()
+    assert _outbox(session) == 0
+    session.close()
+    assert _entries_after(db, version) == [(7, "environmental")]
+
+
+def test_rolled_back_shard_write_records_nothing(db, shard):
+    version = changelog.current_version(db)
+    session = shard()
+    session.add(_environmental(8))
+    session.flush()
+    session.rollback()
+    assert _outbox(session) == 0
+    session.close()
+    assert _entries_after(db, version) == []
+
+
+def test_failed_publication_stays_in_the_outbox(db, shard, monkeypatch):
+    version = changelog.current_version(db)
+    session = shard()
+
+    def unavailable(*args, **kwargs):
+        raise RuntimeError("catalog unavailable")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(changelog, "append", unavailable)
+        session.add(_environmental(9))
+        session.commit()
+    assert _outbox(session) == 1
+    assert _entries_after(db, version) == []
+
+    assert changelog.drain(session.get_bind()) == 1
+    assert _outbox(session) == 0
+    session.close()
+    assert _entries_after(db, version) == [(9, "environmental")]
+
+
+def test_sync_returns_changed_villages_with_fresh_profiles(client, db):
+    start = client.get("/api/sync").json()
+    assert start["full_resync"] and start["villages"] == []
+    latest = crud.get_latest_risk_assessment_row(db, 1)
+    crud.upsert_daily_rows(db, models.RiskAssessment, {(1, latest["date"]): {"overall_risk_score": 97.5}})
+    db.commit()
+    try:
+        page = client.get("/api/sync", params={"since": start["version"]}).json()
+        assert not page["full_resync"] and page["version"] > start["version"]
+        (village,) = page["villages"]
+        assert village["village_id"] == 1 and village["changed"] == ["assessment"]
+        assert village["profile"]["overall_risk_score"] == 97.5
+    finally:
+        crud.upsert_daily_rows(db, models.RiskAssessment,
+                               {(1, latest["date"]): {"overall_risk_score": latest["overall_risk_score"]}})
+        db.commit()
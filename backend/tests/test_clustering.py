@@ -0,0 +1,33 @@
+import numpy as np
+
+from app.core.clustering import kmeans
+
+
+def _blobs(n, centres, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.concatenate([rng.normal(centre, 0.1, (n, 3)) for centre in centres])
+
+
+def test_lloyd_and_minibatch_recover_separated_groups():
+    x = _blobs(500, [0.0, 5.0, 10.0])
+    for threshold in (10 ** 9, 100):
+        result = kmeans(x, 3, minibatch_threshold=threshold, batch_size=256)
+        labels = result["labels"].reshape(3, 500)
+        assert all(len(set(group)) == 1 for group in labels.tolist())
+        assert len({group[0] for group in labels.tolist()}) == 3
+
+
+def test_warm_start_keeps_cluster_numbers():
+    x = _blobs(500, [0.0, 5.0, 10.0])
+    first = kmeans(x, 3, minibatch_threshold=10 ** 9)
+    moved = _blobs(500, [0.2, 5.2, 10.2], seed=1)
+    second = kmeans(moved, 3, init=first["centroids"], minibatch_threshold=10 ** 9)
+    assert np.array_equal(first["labels"], second["labels"])
+    assert second["iterations"] <= 2
+
+
+def test_clusters_endpoint(client):
+    report = client.get("/api/analytics/clusters", params={"k": 3}).json()
+    assert report["k"] == 3 and len(report["clusters"]) == 3
+    assert sum(c["size"] for c in report["clusters"]) == len(report["villages"])
+    assert client.get("/api/analytics/clusters", params={"k": 0}).status_code == 422
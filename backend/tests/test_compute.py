@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+from app.core.compute import ComputeExecutor, ComputeSaturated, ComputeTimeout, default_workers
+
+
+def test_saturated_executor_rejects_instead_of_queueing():
+    executor = ComputeExecutor(mode="thread", workers=1, queue_size=0)
+    started, release = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        release.wait()
+
+    busy = threading.Thread(target=executor.run, args=("test", block))
+    busy.start()
+    try:
+        started.wait()
+        with pytest.raises(ComputeSaturated):
+            executor.run("test", sum, [1, 2])
+    finally:
+        release.set()
+        busy.join()
+    assert executor.run("test", sum, [1, 2]) == 3
+    executor.shutdown()
+
+
+def test_saturated_request_gets_503_with_retry_after(client, monkeypatch):
+    from app.core import compute
+
+    def saturated(task, fn, *args, **kwargs):
+        raise ComputeSaturated(task, 2.0)
+
+    monkeypatch.setattr(compute.executor, "run", saturated)
+    response = client.get("/api/risk/scores", params={"state_id": 1})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+
+
+def test_late_result_raises_compute_timeout():
+    executor = ComputeExecutor(mode="thread", workers=1, queue_size=1)
+    release = threading.Event()
+    try:
+        with pytest.raises(ComputeTimeout):
+            executor.run("test", release.wait, timeout=0.01)
+    finally:
+        release.set()
+    assert executor.run("test", sum, [1, 2]) == 3
+    executor.shutdown()
+
+
+def test_timed_out_request_gets_504(client, monkeypatch):
+    from app.core import compute
+
+    def timed_out(task, fn, *args, **kwargs):
+        raise ComputeTimeout(task, 30.0)
+
+    monkeypatch.setattr(compute.executor, "run", timed_out)
+    response = client.get("/api/risk/scores", params={"state_id": 1})
+    assert response.status_code == 504
+    assert "Retry-After" in response.headers
+
+
+def test_default_workers_split_the_cpus_between_server_workers(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr("os.cpu_count", lambda: 8)
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+    assert default_workers() == 2
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 16)
+    assert default_workers() == 1
@@ -0,0 +1,99 @@
+import os
+import shutil
+import sqlite3
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.core import etl
+from app.core.sharding import ShardRouter
+
+SOURCE_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                         "coastal_risk.db")
+
+pytestmark = pytest.mark.skipif(not os.path.exists(SOURCE_DB), reason="coastal_risk.db not available")
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "coastal_risk.db"
+    shutil.copy(SOURCE_DB, path)
+    return str(path)
+
+
+@pytest.fixture
+def catalog(tmp_path, engine, monkeypatch):
+    """Unsharded router over a throwaway copy of the catalog; yields a session factory."""
+    shutil.copy(engine.url.database, tmp_path / "catalog.db")
+    catalog = create_engine(f"sqlite:///{tmp_path / 'catalog.db'}")
+    sessions = sessionmaker(bind=catalog)
+    monkeypatch.setattr(etl, "router", ShardRouter(catalog, sessions, {}))
+    yield sessions
+    catalog.dispose()
+
+
+def _run(sessions, source, **kwargs):
+    db = sessions()
+    try:
+        return {s["source"]: s for s in etl.run_etl(db, source, **kwargs)}
+    finally:
+        db.close()
+
+
+def _duplicates(sessions):
+    db = sessions()
+    try:
+        counts = select(func.count()).select_from(models.EnvironmentalData).group_by(
+            models.EnvironmentalData.village_id, models.EnvironmentalData.date)
+        return [n for (n,) in db.execute(counts) if n > 1]
+    finally:
+        db.close()
+
+
+def _append(source, year, scale=1.0):
+    conn = sqlite3.connect(source)
+    try:
+        columns = [c for c, _ in etl.ENVIRONMENTAL_INDICATORS.values()]
+        conn.execute(
+            f"INSERT INTO environmental_data (village_id, year, {', '.join(columns)}) "
+            f"SELECT village_id, ?, {', '.join(f'{c} * ?' for c in columns)} FROM environmental_data WHERE rowid = 1",
+            (year, *[scale] * len(columns)))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_bounds_are_computed_in_one_pass_and_merged():
+    chunks = iter([np.array([[1, 1, 2020, 3.0, np.nan]]), np.array([[2, 1, 2021, 1.0, np.nan]])])
+    assert etl.compute_bounds(chunks, ["a", "b"]) == {"a": (1.0, 3.0)}
+    assert etl.merge_bounds({"a": (0.0, 2.0)}, {"a": (1.0, 3.0), "b": (5.0, 6.0)}) == \
+        {"a": (0.0, 3.0), "b": (5.0, 6.0)}
+
+
+def test_rerun_reads_only_new_rows(catalog, source):
+    first = _run(catalog, source)["coastal_risk.environmental_data"]
+    assert first["read"] > 0 and first["high_water"] == first["read"]
+
+    again = _run(catalog, source)["coastal_risk.environmental_data"]
+    assert (again["read"], again["inserted"], again["updated"]) == (0, 0, 0)
+    assert again["high_water"] == first["high_water"]
+
+    # A row within the stored bounds is loaded on its own
+    _append(source, 2099)
+    appended = _run(catalog, source)["coastal_risk.environmental_data"]
+    assert (appended["read"], appended["inserted"], appended["full_refresh"]) == (1, 1, False)
+    assert appended["high_water"] == first["high_water"] + 1
+    assert _duplicates(catalog) == []
+
+
+def test_widened_bounds_renormalize_every_row(catalog, source):
+    first = _run(catalog, source)["coastal_risk.environmental_data"]
+    _append(source, 2099, scale=100.0)
+    widened = _run(catalog, source)["coastal_risk.environmental_data"]
+    assert widened["full_refresh"]
+    assert widened["read"] == first["read"] + 1
+    assert widened["inserted"] == 1 and widened["updated"] == first["inserted"]
+    assert _duplicates(catalog) == []
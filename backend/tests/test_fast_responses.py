@@ -0,0 +1,104 @@
+from datetime import date
+
+import pytest
+from pydantic import TypeAdapter
+
+from app import crud, models, schemas
+from app.core import fast_json
+from app.core.compression import choose_encoding
+from app.core.config import settings
+from app.core.forecast import simulate_forecast
+
+
+@pytest.fixture(scope="module")
+def village(engine):
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        village = db.query(models.Village).order_by(models.Village.id).first()
+        # A stored forecast makes the baseline deterministic across the two requests
+        record = crud.get_latest_environmental_data(db, village.id), crud.get_latest_settlement_data(db, village.id)
+        env = {c: getattr(record[0], c) for c in ("sea_level_rise", "cyclone_frequency", "storm_surge_height",
+                                                  "erosion_rate", "extreme_rainfall")}
+        settlement = {c: getattr(record[1], c) for c in ("population_density", "households",
+                                                         "distance_from_shore", "infrastructure_score")}
+        crud.create_forecast_run(db, village.id, date.today(), simulate_forecast(village.id, env, settlement, date.today()))
+        return {"id": village.id, "name": village.name, "district_id": village.district_id,
+                "state_id": village.district.state_id}
+    finally:
+        db.close()
+
+
+def _paths(village):
+    return [
+        "/api/states",
+        f"/api/districts/{village['state_id']}",
+        f"/api/villages/{village['district_id']}",
+        f"/api/villages/search?name={village['name']}",
+        "/api/locations/tree",
+        f"/api/risk/village/{village['id']}",
+        f"/api/risk/village/{village['id']}/history",
+        f"/api/predictions/village/{village['id']}",
+    ]
+
+
+def test_fast_path_is_byte_for_byte_equivalent(client, village, monkeypatch):
+    for path in _paths(village):
+        monkeypatch.setattr(settings, "FAST_RESPONSES", True)
+        fast = client.get(path, headers={"Accept-Encoding": "identity"})
+        monkeypatch.setattr(settings, "FAST_RESPONSES", False)
+        validated = client.get(path, headers={"Accept-Encoding": "identity"})
+        assert fast.status_code == validated.status_code == 200, path
+        assert fast.headers["content-type"] == validated.headers["content-type"], path
+        assert fast.content == validated.content, path
+
+
+def test_shape_matches_pydantic_serialization():
+    payload = {
+        "district_id": 3, "id": 7, "longitude": 80, "latitude": 13.0827,
+        "code": "TN_CHE_KOV", "name": "Kōvalam — கோவளம்", "extra": "dropped",
+    }
+    adapter = TypeAdapter(schemas.Village)
+    expected = adapter.dump_json(adapter.validate_python(payload))
+    assert fast_json.dumps(fast_json.shape(schemas.Village, payload)) == expected
+
+
+def test_openapi_keeps_response_models(client):
+    paths = client.get("/openapi.json").json()["paths"]
+    schema = paths["/api/risk/village/{village_id}"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert schema["$ref"].endswith("/DetailedRiskProfile")
+    schema = paths["/api/predictions/village/{village_id}"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert schema["$ref"].endswith("/PredictionForecast")
+
+
+def test_large_responses_are_compressed_when_accepted(client):
+    identity = client.get("/api/locations/tree", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert len(identity.content) >= settings.COMPRESSION_MIN_BYTES
+
+    compressed = client.get("/api/locations/tree", headers={"Accept-Encoding": "gzip;q=0.5, deflate"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["vary"]
+    assert compressed.content == identity.content
+
+    small = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+@pytest.mark.parametrize("header, encoding", [
+    ("gzip, deflate, br", "br"),
+    ("br;q=0.9, gzip;q=0.5", "br"),
+    ("br;q=0.4, gzip", "gzip"),
+    ("*", "br"),
+    ("br;q=0, gzip;q=0", None),
+])
+def test_brotli_is_preferred_unless_the_client_ranks_gzip_higher(header, encoding):
+    assert choose_encoding(header) == encoding
+
+
+def test_brotli_responses_decode_to_the_same_body(client):
+    identity = client.get("/api/locations/tree", headers={"Accept-Encoding": "identity"})
+    compressed = client.get("/api/locations/tree", headers={"Accept-Encoding": "gzip, br"})
+    assert compressed.headers["content-encoding"] == "br"
+    assert compressed.content == identity.content
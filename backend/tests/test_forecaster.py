@@ -0,0 +1,46 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app import models
+from app.core import forecaster
+
+
+def _series(n=24, step=30, c=1.5, b=0.2, phi=0.6, y0=9.0):
+    ordinals = date(2015, 1, 1).toordinal() + step * np.arange(n)
+    t = forecaster._years(ordinals)
+    values = [y0]
+    for k in range(1, n):
+        values.append(c + b * t[k] + phi * values[-1])
+    return ordinals, np.array(values)
+
+
+def _fold(ordinals, values, stored=None):
+    village_ids = np.full(len(ordinals), 7, dtype=np.int64)
+    return forecaster._fold_series("flood_risk", stored or {}, village_ids, ordinals, values)
+
+
+def test_fit_recovers_trend_and_autoregression():
+    ordinals, values = _series()
+    (row,) = _fold(ordinals, values)
+    assert row["transitions"] == len(values) - 1
+    assert row["phi"] == pytest.approx(0.6 ** (1 / 30), rel=1e-6)
+    assert row["beta"] == pytest.approx(0.2 / (1 - 0.6), rel=1e-6)
+    assert row["last_value"] == values[-1]
+
+
+def test_incremental_fold_matches_a_full_fit():
+    ordinals, values = _series()
+    (full,) = _fold(ordinals, values)
+    (head,) = _fold(ordinals[:10], values[:10])
+    (folded,) = _fold(ordinals, values, stored={7: models.ForecastParam(**head)})
+    assert folded["transitions"] == full["transitions"]
+    for field in ("alpha", "beta", "phi"):
+        assert folded[field] == pytest.approx(full[field], rel=1e-6)
+
+
+def test_short_series_persist_their_last_value():
+    ordinals, values = _series(n=forecaster.MIN_TRANSITIONS)
+    (row,) = _fold(ordinals, values)
+    assert (row["alpha"], row["beta"], row["phi"]) == (values[-1], 0.0, 1.0)
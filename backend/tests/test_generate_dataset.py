@@ -0,0 +1,74 @@
+import sqlite3
+from datetime import date
+
+import numpy as np
+
+from generate_dataset import COASTLINE, DatasetGenerator
+
+END = date(2026, 1, 10)
+
+
+def _generate(path, seed=7):
+    generator = DatasetGenerator(f"sqlite:///{path}", states=2, districts=2, villages=3, years=10 / 365,
+                                 seed=seed, end_date=END)
+    counts = generator.run()
+    generator.engine.dispose()
+    return counts
+
+
+def _rows(path, sql):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def test_generates_the_requested_shape(tmp_path):
+    path = tmp_path / "synthetic.db"
+    counts = _generate(path)
+    villages, days = 2 * 2 * 3, 10
+    assert counts["states"] == 2 and counts["districts"] == 4 and counts["villages"] == villages
+    for table in ("environmental_data", "settlement_data", "risk_assessments", "predictions"):
+        assert counts[table] == villages * days
+    assert _rows(path, "SELECT MIN(date), MAX(date) FROM environmental_data") == [("2026-01-01", "2026-01-10")]
+    # Each day's prediction targets the next day
+    assert _rows(path, "SELECT COUNT(*) FROM predictions WHERE julianday(for_date) - julianday(prediction_date) != 1") \
+        == [(0,)]
+
+
+def test_villages_lie_along_the_coastline(tmp_path):
+    path = tmp_path / "synthetic.db"
+    _generate(path)
+    coords = np.array(_rows(path, "SELECT latitude, longitude FROM villages"))
+    lo, hi = COASTLINE.min(axis=0) - 0.5, COASTLINE.max(axis=0) + 0.5
+    assert ((coords >= lo) & (coords <= hi)).all()
+
+
+def test_assessments_follow_the_risk_calculator(tmp_path):
+    from app.core.risk_calculator import RiskCalculator
+
+    path = tmp_path / "synthetic.db"
+    _generate(path)
+    rows = _rows(path, """
+        SELECT e.sea_level_rise, e.cyclone_frequency, e.storm_surge_height, e.erosion_rate, e.extreme_rainfall,
+               s.population_density, s.households, s.distance_from_shore, s.infrastructure_score,
+               r.overall_risk_score
+        FROM environmental_data e
+        JOIN settlement_data s ON s.village_id = e.village_id AND s.date = e.date
+        JOIN risk_assessments r ON r.village_id = e.village_id AND r.date = e.date""")
+    data = np.array(rows, dtype=float)
+    columns = dict(zip(RiskCalculator.INDICATORS, data[:, :-1].T))
+    profile = RiskCalculator.calculate_risk_profiles_batch(
+        {k: columns[k] for k in RiskCalculator.ENVIRONMENTAL_INDICATORS},
+        {k: columns[k] for k in RiskCalculator.SETTLEMENT_INDICATORS})
+    np.testing.assert_allclose(data[:, -1], profile["overall_risk_score"], atol=0.051)
+
+
+def test_same_seed_generates_the_same_data(tmp_path):
+    _generate(tmp_path / "a.db")
+    _generate(tmp_path / "b.db")
+    _generate(tmp_path / "c.db", seed=8)
+    query = "SELECT * FROM environmental_data ORDER BY id"
+    assert _rows(tmp_path / "a.db", query) == _rows(tmp_path / "b.db", query)
+    assert _rows(tmp_path / "a.db", query) != _rows(tmp_path / "c.db", query)
@@ -0,0 +1,182 @@
+import json
+import threading
+import time
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import migrations, models
+from app.core import jobs
+
+
+class CountParams(BaseModel):
+    total: int = 5
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    migrations.upgrade(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def runners(sessions):
+    started = []
+
+    def make(start=True):
+        runner = jobs.JobRunner(sessions, max_workers=2, poll_seconds=0.01, lease_seconds=60)
+        if start:
+            runner.start()
+        started.append(runner)
+        return runner
+
+    yield make
+    for runner in started:
+        runner.stop()
+
+
+@pytest.fixture
+def job_type(monkeypatch):
+    """`count` job: counts from its checkpoint to `total`, reporting after each step."""
+    seen, gate = [], threading.Event()
+    gate.set()
+
+    def count(ctx, params):
+        seen.append(dict(ctx.checkpoint))
+        for i in range(ctx.checkpoint.get("next", 0), params.total):
+            gate.wait(5)
+            ctx.report(i + 1, params.total, {"next": i + 1})
+        return {"counted": params.total}
+
+    monkeypatch.setitem(jobs.JOB_TYPES, "count", jobs.JobType("count", count, CountParams, max_concurrency=1))
+    return seen, gate
+
+
+def _wait(sessions, job_id, statuses, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        db = sessions()
+        try:
+            job = db.get(models.Job, job_id)
+            if job.status in statuses:
+                return job
+        finally:
+            db.close()
+        assert time.monotonic() < deadline, f"job {job_id} still {job.status}"
+        time.sleep(0.01)
+
+
+def test_job_runs_to_completion(sessions, runners, job_type):
+    runner = runners()
+    db = sessions()
+    try:
+        job_id = runner.submit(db, "count", {"total": 3}).id
+    finally:
+        db.close()
+    job = _wait(sessions, job_id, jobs.TERMINAL_STATUSES)
+    assert job.status == jobs.SUCCEEDED
+    assert json.loads(job.result) == {"counted": 3}
+    assert (job.progress_done, job.progress_total) == (3, 3)
+
+
+def test_claim_enforces_the_type_limit_across_runners(sessions, runners, job_type):
+    first, second = runners(start=False), runners(start=False)
+    spec = jobs.JOB_TYPES["count"]
+    db = sessions()
+    try:
+        a, b = (first.submit(db, "count", {}).id for _ in range(2))
+        assert first._claim(db, a, spec)
+        assert not first._claim(db, a, spec)
+        assert not second._claim(db, b, spec)
+        db.get(models.Job, a).status = jobs.SUCCEEDED
+        db.commit()
+        assert second._claim(db, b, spec)
+        assert db.get(models.Job, b).owner == second.owner
+    finally:
+        db.close()
+
+
+def test_expired_lease_is_requeued_and_resumes_from_its_checkpoint(sessions, runners, job_type):
+    seen, _ = job_type
+    db = sessions()
+    try:
+        job = models.Job(type="count", status=jobs.RUNNING, params=json.dumps({"total": 5}), owner="dead:1",
+                         heartbeat_at=datetime.utcnow() - timedelta(hours=1), checkpoint=json.dumps({"next": 3}),
+                         progress_done=3, progress_total=5, cancel_requested=False)
+        db.add(job)
+        db.commit()
+        job_id = job.id
+    finally:
+        db.close()
+    runner = runners()
+    job = _wait(sessions, job_id, jobs.TERMINAL_STATUSES)
+    assert job.status == jobs.SUCCEEDED
+    assert job.owner == runner.owner
+    assert seen == [{"next": 3}]
+
+
+def test_cancellation(sessions, runners, job_type):
+    _, gate = job_type
+    gate.clear()
+    runner = runners()
+    db = sessions()
+    try:
+        running = runner.submit(db, "count", {}).id
+        _wait(sessions, running, (jobs.RUNNING,))
+        # The type allows one running job, so the second stays queued and is cancelled outright
+        queued = runner.submit(db, "count", {}).id
+        assert runner.cancel(db, queued).status == jobs.CANCELLED
+        assert runner.cancel(db, running).cancel_requested
+    finally:
+        db.close()
+    gate.set()
+    assert _wait(sessions, running, jobs.TERMINAL_STATUSES).status == jobs.CANCELLED
+
+
+def test_shutdown_requeues_running_jobs(sessions, runners, job_type):
+    _, gate = job_type
+    gate.clear()
+    runner = runners()
+    db = sessions()
+    try:
+        job_id = runner.submit(db, "count", {}).id
+    finally:
+        db.close()
+    _wait(sessions, job_id, (jobs.RUNNING,))
+    threading.Timer(0.05, gate.set).start()
+    runner.stop()
+    job = _wait(sessions, job_id, (jobs.QUEUED,))
+    assert job.owner is None and job.finished_at is None
+
+
+def test_regenerated_forecasts_use_the_fitted_parameters(db, fitted_village):
+    import numpy as np
+    from sqlalchemy import delete
+
+    from app import crud
+    from app.core import forecaster, job_types
+    from app.core.forecast import FORECAST_COLUMNS
+
+    district_id = db.get(models.Village, fitted_village).district_id
+    ctx = SimpleNamespace(db=db, checkpoint={}, report=lambda *args, **kwargs: None)
+    params = job_types.ForecastParams(district_id=district_id, days=7, seed=1)
+    start = date.today()
+    try:
+        summary = job_types.regenerate_forecasts(ctx, params)
+        assert summary["forecasts"] > 0
+        stored = crud.get_forecast(db, fitted_village, start, start + timedelta(days=6))
+        expected = forecaster.forecast(db, fitted_village, start, 7)
+        assert len(stored) == 7
+        for column in FORECAST_COLUMNS:
+            np.testing.assert_allclose([d[column] for d in stored], [d[column] for d in expected], atol=1e-4)
+    finally:
+        village_ids = job_types.region_village_ids(db, params)
+        db.execute(delete(models.ForecastRun).where(
+            models.ForecastRun.village_id.in_(village_ids), models.ForecastRun.prediction_date == start))
+        db.commit()
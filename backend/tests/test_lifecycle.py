@@ -0,0 +1,54 @@
+import asyncio
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import lifecycle
+from app.core.lifecycle import LazyApp, StartupReport
+
+router = APIRouter()
+
+
+@router.get("/ping")
+def ping():
+    return {"pong": True}
+
+
+def test_startup_report_lists_import_and_every_warmup_step(client):
+    report = client.get("/debug/startup").json()
+    expected = ["import"] + [name for name, _ in lifecycle._warmup_steps]
+    assert list(report["phases_ms"]) == expected
+    assert report["errors"] == {}
+    assert report["total_ms"] >= max(report["phases_ms"].values())
+
+
+def test_failed_steps_are_recorded_and_do_not_stop_the_others(monkeypatch):
+    calls = []
+
+    def failing(app):
+        calls.append("failing")
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(lifecycle, "_warmup_steps", [("failing", failing), ("ok", lambda app: calls.append("ok"))])
+    monkeypatch.setattr(lifecycle, "_shutdown_steps", [("ok", lambda app: calls.append("stop ok")),
+                                                      ("failing", failing)])
+    report = StartupReport(0.0)
+    asyncio.run(lifecycle.run_warmup(FastAPI(), report))
+    asyncio.run(lifecycle.run_shutdown(FastAPI()))
+    assert calls == ["failing", "ok", "failing", "stop ok"]
+    assert report.errors == {"failing": "RuntimeError: boom"}
+    assert list(report.phases) == ["import", "failing", "ok"]
+
+
+def test_lazy_app_imports_its_router_on_the_first_request():
+    lazy = LazyApp(f"{__name__}:router")
+    app = FastAPI()
+    app.mount("/lazy", lazy)
+    assert lazy._app is None
+    with TestClient(app) as client:
+        assert client.get("/lazy/ping").json() == {"pong": True}
+    loaded = lazy._app
+    assert loaded is not None
+    with TestClient(app) as client:
+        client.get("/lazy/ping")
+    assert lazy._app is loaded
@@ -0,0 +1,54 @@
+import pytest
+
+from app.core import metrics
+from app.core.instrumentation import UNMATCHED_ROUTE, RouteTemplates
+from app.core.metrics import Registry
+
+
+def test_histogram_buckets_are_cumulative_in_the_exposition():
+    registry = Registry()
+    histogram = registry.histogram("test_seconds", "Test latency.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, route="/a")
+    assert histogram.snapshot(route="/a") == {"buckets": [(0.1, 1), (1.0, 3)], "sum": 6.05, "count": 4}
+    text = registry.render()
+    assert 'test_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{route="/a",le="1"} 3' in text
+    assert 'test_seconds_bucket{route="/a",le="+Inf"} 4' in text
+    assert 'test_seconds_count{route="/a"} 4' in text
+
+
+def test_registry_returns_the_existing_metric_and_escapes_labels():
+    registry = Registry()
+    counter = registry.counter("test_total", "Test counter.", ("path",))
+    assert registry.counter("test_total", "Again.", ("path",)) is counter
+    counter.inc(path='a"b\\c')
+    counter.inc(2, path='a"b\\c')
+    assert counter.value(path='a"b\\c') == 3
+    assert 'test_total{path="a\\"b\\\\c"} 3' in registry.render()
+
+
+@pytest.mark.parametrize("path, template", [
+    ("/api/risk/village/7", "/api/risk/village/{village_id}"),
+    ("/api/risk/scores", "/api/risk/scores"),
+    ("/api/villages-legacy/anything/here", "/api/villages-legacy/{path}"),
+    ("/nope", UNMATCHED_ROUTE),
+])
+def test_paths_resolve_to_bounded_route_templates(path, template):
+    from app.main import app
+
+    assert RouteTemplates(app).resolve(path) == template
+
+
+def test_requests_are_counted_per_route_template(client):
+    labels = {"method": "GET", "route": "/api/risk/village/{village_id}"}
+    before = metrics.HTTP_REQUESTS.value(status=200, **labels)
+    statements = metrics.DB_STATEMENTS.value(route=labels["route"])
+    village_id = client.get("/api/villages/1").json()[0]["id"]
+    assert client.get(f"/api/risk/village/{village_id}").status_code == 200
+    assert metrics.HTTP_REQUESTS.value(status=200, **labels) == before + 1
+    assert metrics.DB_STATEMENTS.value(route=labels["route"]) > statements
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert '# TYPE hydro_http_request_duration_seconds histogram' in response.text
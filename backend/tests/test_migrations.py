@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app import migrations, models
+
+
+@pytest.fixture
+def fresh_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_fresh_database_matches_the_models(fresh_engine):
+    migrations.upgrade(fresh_engine)
+    inspector = inspect(fresh_engine)
+    for table in models.Base.metadata.sorted_tables:
+        columns = {c["name"] for c in inspector.get_columns(table.name)}
+        assert columns == set(table.c.keys()), table.name
+        indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+        assert {i.name for i in table.indexes} <= indexes, table.name
+
+
+def test_upgrade_is_idempotent_and_recorded(fresh_engine):
+    applied = migrations.upgrade(fresh_engine)
+    assert [m.version for m in applied] == [m.version for m in migrations.migrations()]
+    assert migrations.upgrade(fresh_engine) == []
+    assert migrations.current_version(fresh_engine) == migrations.migrations()[-1].version
+
+
+def test_baseline_is_frozen(fresh_engine):
+    # A later migration adding a column must find the version-1 schema, not the models' current one
+    migrations.upgrade(fresh_engine, target=1)
+    indexes = {i["name"] for i in inspect(fresh_engine).get_indexes("forecast_runs")}
+    assert "ix_forecast_runs_village_id" in indexes
+    assert "ix_forecast_runs_village_prediction_date" not in indexes
+    with fresh_engine.begin() as connection:
+        connection.execute(text("ALTER TABLE shelters ADD COLUMN notes TEXT"))
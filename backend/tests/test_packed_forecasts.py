@@ -0,0 +1,100 @@
+import shutil
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, delete, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models
+from app.core.forecast import FORECAST_COLUMNS, PackedForecast, split_runs, step_date
+
+
+def _days(start, count, step=timedelta(days=1)):
+    return [
+        {"for_date": start + i * step, **{c: round(0.1 * (i + 1) + j, 3) for j, c in enumerate(FORECAST_COLUMNS)}}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def db(tmp_path, engine):
+    """Session on a throwaway copy of the catalog with no stored forecasts."""
+    shutil.copy(engine.url.database, tmp_path / "catalog.db")
+    copy = create_engine(f"sqlite:///{tmp_path / 'catalog.db'}")
+    session = sessionmaker(bind=copy)()
+    session.execute(delete(models.ForecastRun))
+    session.execute(delete(models.Prediction))
+    session.commit()
+    yield session
+    session.close()
+    copy.dispose()
+
+
+def test_packed_run_round_trips_its_values(db):
+    days = _days(date(2026, 3, 1), 14)
+    run = crud.create_forecast_run(db, 1, date(2026, 3, 1), days)
+    assert len(run.values) == 4 * len(FORECAST_COLUMNS) * len(days)
+
+    decoded = crud.get_forecast(db, 1, date(2026, 3, 1), date(2026, 3, 14))
+    assert [d["for_date"] for d in decoded] == [d["for_date"] for d in days]
+    for got, want in zip(decoded, days):
+        for column in FORECAST_COLUMNS:
+            assert got[column] == pytest.approx(want[column], abs=1e-4)
+    # Range reads decode only the requested points
+    assert [d["for_date"] for d in crud.get_forecast(db, 1, date(2026, 3, 5), date(2026, 3, 6))] == \
+        [date(2026, 3, 5), date(2026, 3, 6)]
+
+
+@pytest.mark.parametrize("dates, runs", [
+    ([date(2026, 1, 1) + timedelta(days=i) for i in range(5)], [(0, 5, 1, "day")]),
+    ([date(2020 + i, 1, 1) for i in range(4)], [(0, 4, 12, "month")]),
+    # Monthly steps clamp to the end of shorter months
+    ([date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 31)], [(0, 3, 1, "month")]),
+    ([date(2026, 1, 1), date(2026, 1, 2), date(2026, 1, 10), date(2026, 1, 18)], [(0, 2, 1, "day"), (2, 4, 8, "day")]),
+])
+def test_split_runs(dates, runs):
+    assert split_runs(dates) == runs
+    for start, end, step, unit in runs:
+        assert [step_date(dates[start], i, step, unit) for i in range(end - start)] == dates[start:end]
+
+
+def test_pack_predictions_is_idempotent_and_lossless(db):
+    daily = _days(date(2026, 3, 1), 7)
+    # Across a leap year only a 12-month step fits the yearly points
+    yearly = [{**d, "for_date": date(2027 + i, 1, 1)} for i, d in enumerate(_days(date(2027, 1, 1), 3))]
+    db.add_all(models.Prediction(village_id=2, prediction_date=date(2026, 3, 1), **d) for d in daily + yearly)
+    db.commit()
+    legacy = {(p.for_date, c): getattr(p, c) for p in db.query(models.Prediction) for c in FORECAST_COLUMNS}
+
+    assert crud.pack_predictions(db) == (10, 2)
+    assert crud.pack_predictions(db) == (10, 0)
+    crud.pack_predictions(db, delete_legacy=True)
+    assert db.execute(select(func.count()).select_from(models.Prediction)).scalar() == 0
+
+    runs = [PackedForecast(run) for run in db.query(models.ForecastRun).order_by(models.ForecastRun.start_date)]
+    assert [(r.step, r.step_unit) for r in runs] == [(1, "day"), (12, "month")]
+    unpacked = {(d["for_date"], c): d[c] for r in runs for d in r.days() for c in FORECAST_COLUMNS}
+    assert unpacked.keys() == legacy.keys()
+    assert all(unpacked[k] == pytest.approx(legacy[k], abs=1e-4) for k in legacy)
+
+
+def test_pack_predictions_batches_villages_and_keeps_rows_written_meanwhile(db, monkeypatch):
+    for village_id in (1, 2, 3):
+        db.add_all(models.Prediction(village_id=village_id, prediction_date=date(2026, 3, 1), **d)
+                   for d in _days(date(2026, 3, 1), 4))
+    db.commit()
+    split, late = crud.split_runs, _days(date(2026, 4, 1), 1)
+
+    def split_and_write(dates):
+        # A writer adds a row to the current batch after its rows were read
+        if late:
+            db.add(models.Prediction(village_id=1, prediction_date=date(2026, 4, 1), **late.pop()))
+            db.flush()
+        return split(dates)
+
+    monkeypatch.setattr(crud, "split_runs", split_and_write)
+    assert crud.pack_predictions(db, delete_legacy=True, batch_size=2) == (12, 3)
+    remaining = db.query(models.Prediction).all()
+    assert [(p.village_id, p.prediction_date) for p in remaining] == [(1, date(2026, 4, 1))]
+    assert crud.pack_predictions(db, delete_legacy=True) == (1, 1)
+    assert db.execute(select(func.count()).select_from(models.ForecastRun)).scalar() == 4
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+from app.core import profiling
+from app.core.config import settings
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_RATE", 0.0)
+    return tmp_path
+
+
+def _scope(headers):
+    return {"type": "http", "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()]}
+
+
+def test_normalize_statement_groups_query_shapes():
+    assert profiling.normalize_statement("SELECT *\n  FROM villages WHERE id = 42 AND name = 'x'") == \
+        profiling.normalize_statement("SELECT * FROM villages WHERE id = 7 AND name = 'y'")
+
+
+def test_profile_header_is_ignored_without_a_configured_token(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_HEADER_TOKEN", None)
+    middleware = profiling.ProfilingMiddleware(app=None)
+    assert not middleware._requested(_scope({settings.PROFILE_HEADER: ""}))
+    assert not middleware._requested(_scope({settings.PROFILE_HEADER: "anything"}))
+
+
+def test_profile_header_requires_the_token(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_HEADER_TOKEN", "s3cret")
+    middleware = profiling.ProfilingMiddleware(app=None)
+    assert middleware._requested(_scope({settings.PROFILE_HEADER: "s3cret"}))
+    assert not middleware._requested(_scope({settings.PROFILE_HEADER: "guess"}))
+    assert not middleware._requested(_scope({}))
+
+
+def test_anonymous_header_does_not_write_a_profile(client, profile_dir, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_HEADER_TOKEN", None)
+    assert client.get("/api/states", headers={settings.PROFILE_HEADER: "1"}).status_code == 200
+    assert os.listdir(profile_dir) == []
+
+
+def test_profiles_are_written_and_served_only_with_the_token(client, profile_dir, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_HEADER_TOKEN", "s3cret")
+    auth = {settings.PROFILE_HEADER: "s3cret"}
+    assert client.get("/api/states", headers=auth).status_code == 200
+    assert len(os.listdir(profile_dir)) == 1
+
+    assert client.get("/debug/profiles").status_code == 403
+    assert client.get("/debug/profiles", headers={settings.PROFILE_HEADER: "guess"}).status_code == 403
+    summaries = client.get("/debug/profiles", headers=auth).json()
+    assert [s["route"] for s in summaries] == ["/api/states"]
+    assert client.get(f"/debug/profiles/{summaries[0]['name']}").status_code == 403
+    profile = client.get(f"/debug/profiles/{summaries[0]['name']}", headers=auth).json()
+    assert profile["sql"]["count"] >= 1
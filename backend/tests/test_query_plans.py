@@ -0,0 +1,112 @@
+"""
+EXPLAIN QUERY PLAN of every crud read, as executed.
+
+Hot per-request queries (one village, district or state) must be answered
+from indexes: no full table scan and no temporary B-tree for ORDER BY /
+GROUP BY / DISTINCT. Bulk reads (every village) necessarily visit every row,
+so they may scan, but must still avoid temporary B-trees so that they stream
+instead of sorting the whole table.
+"""
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event, text
+
+from app import crud
+
+TODAY = date.today()
+VILLAGE, DISTRICT, STATE = 1, 1, 1
+
+HOT = {
+    "get_districts_by_state": lambda db: crud.get_districts_by_state(db, STATE),
+    "get_villages_by_district": lambda db: crud.get_villages_by_district(db, DISTRICT),
+    "get_village": lambda db: crud.get_village(db, VILLAGE),
+    "get_village_by_code": lambda db: crud.get_village_by_code(db, "TN_CHE_KAS"),
+    "get_village_by_name": lambda db: crud.get_village_by_name(db, "Kasimedu"),
+    "get_latest_risk_assessment": lambda db: crud.get_latest_risk_assessment(db, VILLAGE),
+    "get_risk_history": lambda db: crud.get_risk_history(db, VILLAGE),
+    "get_district_rows_by_state": lambda db: crud.get_district_rows_by_state(db, STATE),
+    "get_village_rows_by_district": lambda db: crud.get_village_rows_by_district(db, DISTRICT),
+    "get_risk_history_rows": lambda db: crud.get_risk_history_rows(db, VILLAGE),
+    "get_village_profile_row": lambda db: crud.get_village_profile_row(db, VILLAGE),
+    "get_latest_risk_assessment_row": lambda db: crud.get_latest_risk_assessment_row(db, VILLAGE),
+    "get_latest_environmental_row": lambda db: crud.get_latest_environmental_row(db, VILLAGE),
+    "get_latest_settlement_row": lambda db: crud.get_latest_settlement_row(db, VILLAGE),
+    "get_latest_environmental_data": lambda db: crud.get_latest_environmental_data(db, VILLAGE),
+    "get_latest_settlement_data": lambda db: crud.get_latest_settlement_data(db, VILLAGE),
+    "get_predictions": lambda db: crud.get_predictions(db, VILLAGE, TODAY, TODAY + timedelta(days=30)),
+    "get_forecast_run": lambda db: crud.get_forecast_run(db, VILLAGE, TODAY, TODAY + timedelta(days=30)),
+    "get_shelters": lambda db: crud.get_shelters(db, DISTRICT),
+}
+
+BULK = {
+    "get_states": lambda db: crud.get_states(db),
+    "get_state_rows": lambda db: crud.get_state_rows(db),
+    "get_all_villages": lambda db: crud.get_all_villages(db),
+    "get_location_tree": lambda db: crud.get_location_tree(db),
+    "get_latest_environmental_data_all": lambda db: crud.get_latest_environmental_data_all(db),
+    "get_latest_settlement_data_all": lambda db: crud.get_latest_settlement_data_all(db),
+    "get_latest_risk_assessments_all": lambda db: crud.get_latest_risk_assessments_all(db),
+    "get_forecast_village_ids": lambda db: crud.get_forecast_village_ids(db, TODAY, TODAY + timedelta(days=30)),
+    "get_predictions_all": lambda db: crud.get_predictions_all(db, TODAY, TODAY + timedelta(days=30)),
+}
+
+
+@contextmanager
+def _captured(db):
+    """SELECT statements (with their parameters) executed on db's connection."""
+    statements = []
+    connection = db.connection()
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(connection, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(connection, "before_cursor_execute", capture)
+
+
+def _plans(db, query):
+    with _captured(db) as statements:
+        query(db)
+    assert statements, "query executed no SELECT"
+    raw = db.connection().connection.driver_connection
+    return [
+        (statement, [row[3] for row in raw.execute("EXPLAIN QUERY PLAN " + statement, parameters)])
+        for statement, parameters in statements
+    ]
+
+
+def _full_scans(details):
+    # "SCAN t" reads the whole table; "SCAN t USING [COVERING] INDEX" is an ordered index walk
+    return [d for d in details if d.startswith("SCAN ") and " USING " not in d and "CONSTANT ROW" not in d]
+
+
+def _temp_sorts(details):
+    return [d for d in details if "USE TEMP B-TREE" in d]
+
+
+@pytest.mark.parametrize("name", sorted(HOT))
+def test_hot_query_uses_indexes(db, name):
+    for statement, details in _plans(db, HOT[name]):
+        scans = [d for d in details if d.startswith("SCAN ")]
+        assert not scans, f"{name} scans instead of searching: {details}\n{statement}"
+        assert not _temp_sorts(details), f"{name} sorts in a temp B-tree: {details}\n{statement}"
+
+
+@pytest.mark.parametrize("name", sorted(BULK))
+def test_bulk_query_streams_without_sorting(db, name):
+    for statement, details in _plans(db, BULK[name]):
+        assert not _temp_sorts(details), f"{name} sorts in a temp B-tree: {details}\n{statement}"
+
+
+def test_migrations_created_the_composite_indexes(db):
+    names = set(db.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars())
+    assert {
+        "ix_environmental_data_village_date", "ix_settlement_data_village_date", "ix_risk_assessments_village_date",
+        "ix_predictions_village_for_date", "ix_forecast_runs_village_prediction_date",
+    } <= names
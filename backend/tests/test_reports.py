@@ -0,0 +1,65 @@
+import copy
+import io
+import os
+import zipfile
+
+import pytest
+
+from app import models
+from app.core import reports
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = reports.ReportCache(str(tmp_path))
+    monkeypatch.setattr(reports, "cache", cache)
+    return cache
+
+
+@pytest.fixture
+def profile(db):
+    return reports.load_profiles(db)[0]
+
+
+def test_cache_key_changes_when_a_value_is_updated_in_place(profile):
+    updated = copy.deepcopy(profile)
+    updated["assessment"]["overall_risk_score"] += 1.0
+    assert reports.ReportCache.key(updated) != reports.ReportCache.key(profile)
+    assert reports.ReportCache.key(copy.deepcopy(profile)) == reports.ReportCache.key(profile)
+
+
+def test_put_replaces_only_the_same_villages_report(cache):
+    cache.put("1-2025-01-01-aaa", b"old")
+    cache.put("2-2025-01-01-bbb", b"other")
+    cache.put("1-2025-02-01-ccc", b"new")
+    assert cache.get("1-2025-01-01-aaa") is None
+    assert cache.get("1-2025-02-01-ccc") == b"new"
+    assert cache.get("2-2025-01-01-bbb") == b"other"
+    assert os.listdir(os.path.join(cache.directory, "1")) == ["1-2025-02-01-ccc.html"]
+
+
+def test_reports_are_rendered_once_then_served_from_the_cache(cache, profile, monkeypatch):
+    rendered = []
+    monkeypatch.setattr(reports, "render_report", lambda p: rendered.append(p) or b"<html/>")
+    assert [data for _, data in reports.iter_reports([profile])] == [b"<html/>"]
+    assert [data for _, data in reports.iter_reports([profile])] == [b"<html/>"]
+    assert len(rendered) == 1
+
+
+def test_shutdown_stops_the_render_pool():
+    pool = reports._executor()
+    reports.shutdown()
+    assert reports._pool is None
+    with pytest.raises(RuntimeError):
+        pool.submit(int)
+
+
+def test_district_zip_lists_every_assessed_village(client, db, cache):
+    district_id = db.query(models.Village.district_id).first()[0]
+    expected = reports.load_profiles(db, district_id=district_id)
+    response = client.get(f"/api/reports/district/{district_id}")
+    assert response.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    names = archive.namelist()
+    assert names[-1] == "index.csv"
+    assert sorted(names[:-1]) == sorted(reports.report_filename(p) for p in expected)
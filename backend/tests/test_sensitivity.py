@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from app.core import sensitivity
+from app.core.risk_calculator import RiskCalculator
+
+INDICATORS = RiskCalculator.INDICATORS
+
+
+def _inputs(n=20, seed=0):
+    return np.random.default_rng(seed).uniform(0.0, 10.0, size=(n, len(INDICATORS)))
+
+
+def test_contributions_sum_to_the_calculator_scores():
+    x = _inputs()
+    result = sensitivity.analyze_inputs(x, "overall_risk_score", sensitivity.DEFAULT_ACTIONABLE, None)
+    columns = dict(zip(INDICATORS, x.T))
+    profiles = RiskCalculator.calculate_risk_profiles_batch(
+        {k: columns[k] for k in RiskCalculator.ENVIRONMENTAL_INDICATORS},
+        {k: columns[k] for k in RiskCalculator.SETTLEMENT_INDICATORS})
+    for s, score in enumerate(RiskCalculator.SCORES):
+        np.testing.assert_allclose(result["contributions"][:, s, :].sum(axis=1), profiles[score])
+        np.testing.assert_allclose(result["scores"][:, s], profiles[score])
+
+
+def test_reduction_is_capped_by_the_improvement_and_limited_to_actionable_indicators():
+    x = _inputs()
+    actionable = ("erosion_rate",)
+    result = sensitivity.analyze_inputs(x, "erosion_risk", actionable, 2.0)
+    j = INDICATORS.index("erosion_rate")
+    weight = RiskCalculator.jacobian()[RiskCalculator.SCORES.index("erosion_risk"), j]
+    np.testing.assert_allclose(result["reduction"][:, j], weight * np.minimum(x[:, j], 2.0))
+    assert not np.delete(result["reduction"], j, axis=1).any()
+    np.testing.assert_allclose(result["total_reduction"], result["reduction"][:, j])
+
+
+def test_region_sensitivity_endpoint(client):
+    response = client.get("/api/risk/sensitivity", params={"state_id": 1, "limit": 3})
+    assert response.status_code == 200
+    report = response.json()
+    reductions = [v["total_reduction"] for v in report["villages"]]
+    assert 0 < len(reductions) <= 3 and reductions == sorted(reductions, reverse=True)
+    assert report["marginal_effects"]["overall_risk_score"]["sea_level_rise"] == pytest.approx(1.2)
+
+
+@pytest.mark.parametrize("params", [{"target": "nope"}, {"actionable": ["nope"]}])
+def test_region_sensitivity_rejects_unknown_names(client, params):
+    assert client.get("/api/risk/sensitivity", params=params).status_code == 422
@@ -0,0 +1,160 @@
+import os
+import shutil
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app import migrations, models
+from app.core import etl
+from app.core.sharding import CATALOG, ShardRouter
+
+SOURCE_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                         "coastal_risk.db")
+
+
+@pytest.fixture
+def router(tmp_path, engine):
+    shutil.copy(engine.url.database, tmp_path / "catalog.db")
+    catalog = create_engine(f"sqlite:///{tmp_path / 'catalog.db'}")
+    shard_url = f"sqlite:///{tmp_path / 'tn.db'}"
+    migrations.upgrade(create_engine(shard_url))
+    router = ShardRouter(catalog, sessionmaker(bind=catalog), {"TN": shard_url})
+    yield router
+    for shard_engine in router.engines.values():
+        shard_engine.dispose()
+
+
+def _village_ids(router, state_code):
+    db = router.session(CATALOG)
+    try:
+        return set(db.execute(
+            select(models.Village.id).join(models.District).join(models.State).where(models.State.code == state_code)
+        ).scalars())
+    finally:
+        db.close()
+
+
+def _rows(router, shard, village_ids):
+    db = router.session(shard)
+    try:
+        return db.execute(
+            select(models.EnvironmentalData.village_id, models.EnvironmentalData.date, func.count())
+            .where(models.EnvironmentalData.village_id.in_(village_ids))
+            .group_by(models.EnvironmentalData.village_id, models.EnvironmentalData.date)
+        ).all()
+    finally:
+        db.close()
+
+
+def test_requests_are_routed_by_state(router, monkeypatch):
+    tn, kl = _village_ids(router, "TN"), _village_ids(router, "KL")
+    assert {router.shard_for_village(v) for v in tn} == {"TN"}
+    assert {router.shard_for_village(v) for v in kl} == {CATALOG}
+    assert router.group_villages([min(tn), min(kl)]) == {"TN": [min(tn)], CATALOG: [min(kl)]}
+
+
+def test_unknown_ids_do_not_reload_the_catalog(router, monkeypatch):
+    router.refresh()
+
+    def reload():
+        raise AssertionError("full catalog reload for an unknown id")
+
+    monkeypatch.setattr(router, "refresh", reload)
+    for _ in range(3):
+        assert router.shard_for_village(10 ** 9) == CATALOG
+        assert router.shard_for_district(10 ** 9) == CATALOG
+        assert router.shard_for_state(10 ** 9) == CATALOG
+
+
+def test_moving_data_again_does_not_duplicate_rows(router):
+    tn = _village_ids(router, "TN")
+    router.replicate_hierarchy()
+    before = _rows(router, CATALOG, tn)
+    assert before
+    router.move_data()
+    assert _rows(router, CATALOG, tn) == []
+    moved = _rows(router, "TN", tn)
+    assert sorted(moved) == sorted(before)
+
+    # The same rows reach the catalog again (e.g. reloaded there), then are moved once more
+    shard_db, catalog = router.session("TN"), router.session(CATALOG)
+    try:
+        table = models.EnvironmentalData.__table__
+        rows = [dict(r._mapping) for r in shard_db.execute(
+            select(*[c for c in table.columns if c.name != "id"]).where(table.c.village_id.in_(tn)))]
+        catalog.execute(table.insert(), rows)
+        catalog.commit()
+    finally:
+        shard_db.close()
+        catalog.close()
+    router.move_data()
+    assert sorted(_rows(router, "TN", tn)) == sorted(before)
+
+
+@pytest.mark.skipif(not os.path.exists(SOURCE_DB), reason="coastal_risk.db not available")
+def test_etl_loads_sharded_states_into_their_shard(router, monkeypatch):
+    monkeypatch.setattr(etl, "router", router)
+    tn = _village_ids(router, "TN")
+    router.replicate_hierarchy()
+    router.move_data()
+    for full in (False, True):
+        db = router.session(CATALOG)
+        try:
+            etl.run_etl(db, SOURCE_DB, full=full)
+        finally:
+            db.close()
+    tn = _village_ids(router, "TN")
+    assert _rows(router, CATALOG, tn) == []
+    assert all(count == 1 for _, _, count in _rows(router, "TN", tn))
+    assert router.move_data()["TN"] == 0
+
+
+def test_shelters_cannot_be_moved_to_another_shards_district(router, monkeypatch, client):
+    from app.api import shelters
+
+    router.replicate_hierarchy()
+    monkeypatch.setattr(shelters, "shard_router", router)
+    db = router.session(CATALOG)
+    try:
+        tn_district, kl_district = (db.execute(
+            select(models.District.id).join(models.State).where(models.State.code == code)).scalars().first()
+            for code in ("TN", "KL"))
+    finally:
+        db.close()
+
+    shelter = {"name": "Moved shelter", "district_id": kl_district, "latitude": 10.0, "longitude": 76.0,
+               "capacity": 50}
+    created = client.post("/api/shelters/", json=shelter)
+    assert created.status_code == 200
+    shelter_id = created.json()["id"]
+    assert client.put(f"/api/shelters/{shelter_id}", json={**shelter, "capacity": 80}).json()["capacity"] == 80
+
+    moved = client.put(f"/api/shelters/{shelter_id}", json={**shelter, "district_id": tn_district})
+    assert moved.status_code == 409
+    assert client.put("/api/shelters/999999", json={**shelter, "district_id": tn_district}).status_code == 404
+
+
+def test_other_shards_changes_do_not_force_a_full_reload(router, monkeypatch):
+    from app.core import changelog, village_store
+
+    monkeypatch.setattr(village_store, "router", router)
+    monkeypatch.setattr(village_store, "RELOAD_BATCH_SIZE", 1)
+    monkeypatch.setattr(changelog, "drain", lambda bind: None)
+    tn = _village_ids(router, "TN")
+    router.replicate_hierarchy()
+    router.move_data()
+    # A bulk write touched every TN village
+    monkeypatch.setattr(changelog, "villages_changed_after", lambda since, kinds: (set(tn), since + 1))
+
+    for shard, reloads in ((CATALOG, 0), ("TN", 1)):
+        db = router.session(shard)
+        try:
+            store = village_store.VillageStore()
+            store.load(db)
+            loads = []
+            monkeypatch.setattr(store, "load", loads.append)
+            store.sync(db)
+            assert len(loads) == reloads, shard
+        finally:
+            db.close()
@@ -0,0 +1,54 @@
+import numpy as np
+
+from app.core.shelters import assign
+
+
+def _inputs(evacuees, priority, latitudes):
+    n = len(evacuees)
+    return {
+        "village_id": np.arange(1, n + 1),
+        "latitude": np.array(latitudes, dtype=float),
+        "longitude": np.zeros(n),
+        "evacuees": np.array(evacuees),
+        "score": np.zeros(n),
+        "priority": np.array(priority),
+    }
+
+
+def _shelters(capacities, latitudes):
+    return {
+        "id": np.arange(1, len(capacities) + 1),
+        "latitude": np.array(latitudes, dtype=float),
+        "longitude": np.zeros(len(capacities)),
+        "capacity": np.array(capacities),
+    }
+
+
+def test_highest_risk_villages_are_served_first():
+    # Both villages want the same nearby shelter; the Extreme one (priority 3) gets it
+    result = assign(_inputs([80, 80], [0, 3], [0.0, 0.001]), _shelters([100, 100], [0.0, 0.1]))
+    assert result["allocations"][1][0][0] == 0
+    assert result["allocations"][0][0][0] == 1
+    assert result["unassigned"].tolist() == [0, 0]
+
+
+def test_village_is_split_only_when_no_shelter_fits_it_whole():
+    result = assign(_inputs([150], [2], [0.0]), _shelters([100, 100, 500], [0.0, 0.01, 0.05]))
+    assert [row for row, _, _ in result["allocations"][0]] == [2]
+
+    result = assign(_inputs([150], [2], [0.0]), _shelters([100, 100], [0.0, 0.01]))
+    assert [(row, take) for row, take, _ in result["allocations"][0]] == [(0, 100), (1, 50)]
+    assert result["load"].tolist() == [100, 50]
+
+
+def test_shelter_plan_follows_registry_changes(client):
+    village = client.get("/api/villages/1").json()[0]
+    shelter = {"name": "Test shelter", "district_id": 1, "latitude": village["latitude"],
+               "longitude": village["longitude"], "capacity": 0}
+    created = client.post("/api/shelters/", json=shelter).json()
+    assert client.get(f"/api/shelters/village/{village['id']}").json()["shelters"] == []
+
+    client.put(f"/api/shelters/{created['id']}", json={**shelter, "capacity": 100000})
+    plan = client.get(f"/api/shelters/village/{village['id']}").json()
+    assert plan["unassigned"] == 0
+    assert plan["shelters"][0]["shelter_id"] == created["id"]
@@ -0,0 +1,78 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.singleflight import SingleFlight, normalize_param
+
+
+def _concurrently(n, fn):
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        futures = [pool.submit(fn) for _ in range(n)]
+        return [f.exception() or f.result() for f in futures]
+
+
+def _blocking(calls, release, result=None, error=None):
+    def compute():
+        calls.append(threading.get_ident())
+        release.wait(5)
+        if error is not None:
+            raise error
+        return result
+    return compute
+
+
+def _wait_for_waiters(flight, key, n):
+    deadline = time.monotonic() + 5
+    while flight._flights.get(key) is None or flight._flights[key].waiters < n:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_concurrent_callers_share_one_execution():
+    flight, calls, release = SingleFlight("test"), [], threading.Event()
+    compute = _blocking(calls, release, result={"score": 1})
+
+    def caller():
+        return flight.do("v1", compute)
+
+    threading.Timer(0, lambda: (_wait_for_waiters(flight, "v1", 3), release.set())).start()
+    results = _concurrently(4, caller)
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert flight.in_flight() == 0
+
+
+def test_followers_receive_the_leaders_exception():
+    flight, calls, release = SingleFlight("test"), [], threading.Event()
+    compute = _blocking(calls, release, error=ValueError("boom"))
+    threading.Timer(0, lambda: (_wait_for_waiters(flight, "v1", 2), release.set())).start()
+    results = _concurrently(3, lambda: flight.do("v1", compute))
+    assert len(calls) == 1
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_finished_flights_are_not_cached():
+    flight, calls = SingleFlight("test"), []
+    assert flight.do("v1", lambda: calls.append(1) or len(calls)) == 1
+    assert flight.do("v1", lambda: calls.append(1) or len(calls)) == 2
+
+
+def test_waiters_past_the_deadline_compute_themselves():
+    flight, release = SingleFlight("test", timeout=0.05), threading.Event()
+    leader = threading.Thread(target=flight.do, args=("v1", lambda: release.wait(5)))
+    leader.start()
+    try:
+        _wait_for_waiters(flight, "v1", 0)
+        assert flight.do("v1", lambda: "fresh") == "fresh"
+        # The stale flight was evicted, so the next caller does not wait on it either
+        assert flight.in_flight() == 0
+    finally:
+        release.set()
+        leader.join()
+
+
+@pytest.mark.parametrize("value, expected", [(0.1 + 0.2, 0.3), (3, 3), ("x", "x"), (None, None)])
+def test_normalize_param(value, expected):
+    assert normalize_param(value) == expected
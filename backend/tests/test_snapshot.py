@@ -0,0 +1,72 @@
+import shutil
+from datetime import date
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, migrations
+from app.core import forecaster, snapshot
+from app.core.forecast import FORECAST_COLUMNS, FORECAST_DAYS
+from app.core.sharding import CATALOG, ShardRouter
+
+
+def test_snapshot_round_trips_locations_and_indicators(db, tmp_path):
+    version = snapshot.build_snapshot(db, str(tmp_path), forecast_start=date(2026, 1, 1))
+    assert (tmp_path / snapshot.POINTER_FILE).read_text() == version
+    current = snapshot.Snapshot(str(tmp_path / version))
+    assert current.location_json("states") is not None
+    assert list(current.village_ids) == sorted(current.village_ids)
+    assert current.forecast(int(current.village_ids[0]), date(2026, 1, 2)) is None
+
+
+def test_snapshot_serves_the_fitted_forecast(db, tmp_path, fitted_village):
+    start = date(2026, 1, 1)
+    version = snapshot.build_snapshot(db, str(tmp_path), forecast_start=start)
+    served = snapshot.Snapshot(str(tmp_path / version)).forecast(fitted_village, start)
+
+    expected = forecaster.forecast(db, fitted_village, start, FORECAST_DAYS)
+    assert len(served) == FORECAST_DAYS
+    for column in FORECAST_COLUMNS:
+        np.testing.assert_allclose([d[column] for d in served], [d[column] for d in expected], rtol=1e-4, atol=1e-4)
+
+
+def test_reader_follows_the_pointer_and_keeps_the_last_good_version(db, tmp_path):
+    reader = snapshot.SnapshotReader(str(tmp_path), check_seconds=0)
+    assert reader.current() is None
+
+    first = snapshot.build_snapshot(db, str(tmp_path), forecast_start=date(2026, 1, 1))
+    assert reader.current().version == first
+    second = snapshot.build_snapshot(db, str(tmp_path), forecast_start=date(2026, 1, 1))
+    assert reader.current().version == second
+
+    snapshot.publish(str(tmp_path), "missing")
+    assert reader.current().version == second
+    snapshot.publish(str(tmp_path), first)
+    assert reader.current().version == first
+
+
+def test_sharded_villages_are_read_from_their_shard(engine, tmp_path, monkeypatch):
+    shutil.copy(engine.url.database, tmp_path / "catalog.db")
+    catalog = create_engine(f"sqlite:///{tmp_path / 'catalog.db'}")
+    shard_url = f"sqlite:///{tmp_path / 'tn.db'}"
+    migrations.upgrade(create_engine(shard_url))
+    router = ShardRouter(catalog, sessionmaker(bind=catalog), {"TN": shard_url})
+    monkeypatch.setattr(snapshot, "router", router)
+    router.replicate_hierarchy()
+    router.move_data()
+
+    db = router.session(CATALOG)
+    try:
+        version = snapshot.build_snapshot(db, str(tmp_path / "snapshot"), forecast_start=date(2026, 1, 1))
+        tn = router.group_villages([v.id for v in crud.get_all_villages(db)])["TN"]
+    finally:
+        db.close()
+        for shard_engine in router.engines.values():
+            shard_engine.dispose()
+    built = snapshot.Snapshot(str(tmp_path / "snapshot" / version))
+    assert list(built.village_ids) == sorted(built.village_ids)
+    rows = [built.row(v) for v in tn]
+    assert None not in rows
+    assert not np.isnan(built.indicators[rows]).all(axis=1).any()
+    assert not np.isnan(built.forecasts[rows, 0, 0]).any()
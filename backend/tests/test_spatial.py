@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from app.core import spatial
+from app.core.spatial import SpatialIndex
+
+
+@pytest.fixture
+def index():
+    rng = np.random.default_rng(3)
+    n = 500
+    lat, lng = rng.uniform(8.0, 14.0, n), rng.uniform(76.0, 81.0, n)
+    index = SpatialIndex(lat, lng, {"overall_risk_score": rng.uniform(0, 100, n)}, np.arange(n))
+    index._tree = None  # exercise the brute-force search whether or not scipy is installed
+    return index
+
+
+def test_brute_force_nearest_matches_a_direct_search(index, monkeypatch):
+    # Several blocks of queries
+    monkeypatch.setattr(spatial, "_BRUTE_FORCE_CELLS", 500 * 7)
+    rng = np.random.default_rng(4)
+    queries = index.project(rng.uniform(8.0, 14.0, 50), rng.uniform(76.0, 81.0, 50))
+    distances, indices = index.nearest(queries, 5)
+
+    direct = np.sqrt(((queries[:, None, :] - index.points[None, :, :]) ** 2).sum(axis=2))
+    expected = np.argsort(direct, axis=1)[:, :5]
+    assert (indices == expected).all()
+    np.testing.assert_allclose(distances, np.take_along_axis(direct, expected, axis=1))
+
+
+def test_query_on_a_village_takes_its_value(index):
+    lat = index.points[:3, 1] / spatial.KM_PER_DEGREE_LAT
+    lng = index.points[:3, 0] / index._lng_scale
+    estimate = index.interpolate(lat, lng, "overall_risk_score")
+    np.testing.assert_allclose(estimate, index.values["overall_risk_score"][:3])
+
+
+def test_locations_out_of_range_have_no_estimate(index):
+    estimate = index.interpolate(np.array([40.0]), np.array([10.0]), "overall_risk_score", max_distance_km=50)
+    assert np.isnan(estimate).all()
@@ -0,0 +1,44 @@
+import gzip
+import json
+import os
+from datetime import date
+
+import brotli
+
+from app.core import static_bundle
+from app.core.snapshot import POINTER_FILE
+
+START = date(2026, 1, 1)
+
+
+def _build(db, directory, **kwargs):
+    return static_bundle.build_bundle(db, str(directory), start_date=START, **kwargs)
+
+
+def test_bundle_files_match_the_api(client, db, tmp_path):
+    summary = _build(db, tmp_path)
+    version = tmp_path / summary["version"]
+    assert (tmp_path / POINTER_FILE).read_text() == summary["version"]
+    manifest = json.loads((version / static_bundle.MANIFEST_FILE).read_text())["files"]
+    assert summary["files"] == len(manifest) == summary["rendered"]
+
+    tree = (version / "locations/tree.json").read_bytes()
+    assert json.loads(tree) == client.get("/api/locations/tree").json()
+    assert gzip.decompress((version / "locations/tree.json.gz").read_bytes()) == tree
+    assert brotli.decompress((version / "locations/tree.json.br").read_bytes()) == tree
+
+    village_id = json.loads(tree)[0]["districts"][0]["villages"][0]["id"]
+    profile = version / f"risk/village/{village_id}.json"
+    assert json.loads(profile.read_bytes()) == client.get(f"/api/risk/village/{village_id}").json()
+    assert (version / f"predictions/village/{village_id}.json").exists()
+
+
+def test_unchanged_files_are_reused_from_the_previous_version(db, tmp_path):
+    first = _build(db, tmp_path)
+    second = _build(db, tmp_path)
+    assert (second["rendered"], second["reused"]) == (0, first["files"])
+    old, new = (tmp_path / v / "locations/tree.json" for v in (first["version"], second["version"]))
+    assert os.path.samefile(old, new) or old.read_bytes() == new.read_bytes()
+
+    full = _build(db, tmp_path, full=True)
+    assert (full["rendered"], full["reused"]) == (first["files"], 0)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from app.core.trends import METRICS, TrendReport, compute_statistics
+
+
+def test_statistics_of_a_quadratic_series():
+    years = np.arange(2015, 2025)
+    x = years - years.mean()
+    cube = np.repeat((3.0 + 2.0 * x + 0.5 * x ** 2)[None, :, None], len(METRICS), axis=2)
+    stats = compute_statistics(years, cube)
+    assert stats["acceleration"][0, 0] == pytest.approx(1.0)
+    assert stats["slope"][0, 0] == pytest.approx(2.0)
+    assert stats["yoy_change"][0, 0] == pytest.approx(cube[0, -1, 0] - cube[0, -2, 0])
+
+
+def test_missing_years_are_skipped():
+    years = np.arange(2020, 2025)
+    cube = np.full((1, len(years), len(METRICS)), np.nan)
+    cube[0, [0, 1, 3], :] = [[1.0], [2.0], [4.0]]
+    stats = compute_statistics(years, cube)
+    assert stats["latest"][0, 0] == 4.0
+    assert stats["yoy_change"][0, 0] == 2.0
+    assert stats["slope"][0, 0] == pytest.approx(1.0)
+
+
+def test_districts_are_grouped_per_state():
+    villages = [(1, "A", "Central", "Kerala"), (2, "B", "Central", "Kerala"), (3, "C", "Central", "Odisha"),
+                (4, "D", "Coast", "Odisha")]
+    years = np.arange(2020, 2022)
+    cube = np.zeros((len(villages), len(years), len(METRICS)))
+    cube[:, :, 0] = [[1.0, 1.0], [3.0, 3.0], [10.0, 10.0], [5.0, 5.0]]
+    report = TrendReport(villages, years, cube)
+    summary = [(d["state"], d["district"], d["village_count"], d["trends"][METRICS[0]]["latest"])
+               for d in report.districts]
+    assert summary == [("Kerala", "Central", 2, 2.0), ("Odisha", "Central", 1, 10.0), ("Odisha", "Coast", 1, 5.0)]
+    assert report.village(3)["trends"][METRICS[0]]["latest"] == 10.0
+
+
+def test_district_trends_endpoint(client):
+    response = client.get("/api/analytics/trends/districts")
+    assert response.status_code == 200
+    districts = response.json()
+    assert sum(d["village_count"] for d in districts) == len(client.get("/api/analytics/trends/villages").json())
@@ -0,0 +1,44 @@
+from contextlib import contextmanager
+
+from app import crud, models
+from app.core.village_store import VillageStore
+
+
+@contextmanager
+def _updated_in_place(db, overall_risk_score):
+    """Update a village's latest assessment the way ETL does (bulk UPDATE by id, bypassing the store)."""
+    latest = db.query(models.RiskAssessment).order_by(models.RiskAssessment.date.desc(),
+                                                      models.RiskAssessment.id.desc()).first()
+    key, original = (latest.village_id, latest.date), latest.overall_risk_score
+    crud.upsert_daily_rows(db, models.RiskAssessment, {key: {"overall_risk_score": overall_risk_score}})
+    db.commit()
+    try:
+        yield latest.village_id
+    finally:
+        crud.upsert_daily_rows(db, models.RiskAssessment, {key: {"overall_risk_score": original}})
+        db.commit()
+
+
+def test_load_matches_the_latest_rows(db):
+    store = VillageStore()
+    store.load(db)
+    village_id = db.query(models.RiskAssessment.village_id).first()[0]
+    expected = crud.get_latest_risk_assessment_row(db, village_id)
+    assert store.get(village_id).assessment_row() == expected
+
+
+def test_sync_picks_up_in_place_updates(db):
+    store = VillageStore()
+    store.load(db)
+    with _updated_in_place(db, 99.5) as village_id:
+        assert store.get(village_id).overall_risk_score != 99.5
+        version = store.version
+        store.sync(db)
+        assert store.get(village_id).overall_risk_score == 99.5
+        assert store.version > version
+
+
+def test_risk_profile_is_never_stale(client, db):
+    with _updated_in_place(db, 98.5) as village_id:
+        profile = client.get(f"/api/risk/village/{village_id}").json()
+        assert profile["overall_risk_score"] == 98.5
@@ -7,7 +7,7 @@ import {
     Phone, MapPin, Building, Users, FileText, Home, TrendingUp
 } from 'lucide-react';
 import Navbar from '../components/Navbar';
-import { getVillageRisk } from '../services/api';
+import { getVillageRisk, getVillageShelters } from '../services/api';
 import { getRiskColor, getRiskCategory } from '../utils/riskColors';
 import LoadingSpinner from '../components/LoadingSpinner';
 import ErrorMessage from '../components/ErrorMessage';
@@ -18,6 +18,7 @@ const SafetyModule = () => {
     const navigate = useNavigate();
 
     const [villageData, setVillageData] = useState(null);
+    const [shelterPlan, setShelterPlan] = useState(null);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
     const [activeTab, setActiveTab] = useState('preparedness');
@@ -32,6 +33,10 @@ const SafetyModule = () => {
             setError(null);
             const response = await getVillageRisk(villageId);
             setVillageData(response.data);
+            // Shelter assignments are optional; the guide still renders without them
+            getVillageShelters(villageId)
+                .then((shelters) => setShelterPlan(shelters.data))
+                .catch((err) => console.error('Error fetching shelter plan:', err));
         } catch (err) {
             console.error('Error fetching village data:', err);
             setError('Failed to load safety information. Please check your connection and try again.');
@@ -508,29 +513,19 @@ const SafetyModule = () => {
                                     </div>
 
                                     <div className="space-y-4">
-                                        {[
-                                            {
-                                                name: 'Government High School',
-                                                distance: '2.5 km',
-                                                capacity: '3,000',
-                                                contact: '044-1234-5678',
-                                                facilities: ['Clean water', 'Medical aid', 'Food supplies']
-                                            },
-                                            {
-                                                name: 'Community Hall',
-                                                distance: '3.1 km',
-                                                capacity: '2,500',
-                                                contact: '044-1234-5679',
-                                                facilities: ['Generator', 'Sanitation', 'Communication']
-                                            },
-                                            {
-                                                name: 'District Collectorate',
-                                                distance: '8.2 km',
-                                                capacity: '5,000',
-                                                contact: '044-1234-5680',
-                                                facilities: ['Full facilities', 'Security', 'Transport']
-                                            }
-                                        ].map((center, index) => (
+                                        {shelterPlan && shelterPlan.shelters.length === 0 && (
+                                            <p className="text-gray-600">No evacuation center with free capacity is registered near this village yet. Follow instructions from local authorities.</p>
+                                        )}
+                                        {shelterPlan && shelterPlan.unassigned > 0 && shelterPlan.shelters.length > 0 && (
+                                            <p className="text-sm text-orange-700">{shelterPlan.unassigned.toLocaleString()} residents could not be assigned a center with free capacity.</p>
+                                        )}
+                                        {(shelterPlan ? shelterPlan.shelters : []).map((shelter) => ({
+                                            name: shelter.name,
+                                            distance: `${shelter.distance_km} km`,
+                                            assigned: shelter.evacuees.toLocaleString(),
+                                            contact: shelter.contact || 'N/A',
+                                            facilities: shelter.facilities
+                                        })).map((center, index) => (
                                             <motion.div
                                                 key={index}
                                                 initial={{ opacity: 0, x: -10 }}
@@ -545,7 +540,7 @@ const SafetyModule = () => {
                                                     </span>
                                                 </div>
                                                 <div className="grid grid-cols-2 gap-2 text-sm text-gray-700 mb-2">
-                                                    <p><span className="font-semibold">Capacity:</span> {center.capacity} people</p>
+                                                    <p><span className="font-semibold">Assigned:</span> {center.assigned} people</p>
                                                     <p><span className="font-semibold">Contact:</span> {center.contact}</p>
                                                 </div>
                                                 <div className="flex flex-wrap gap-2">
@@ -14,6 +14,9 @@ export const getDistricts = (stateId) => api.get(`/districts/${stateId}`);
 export const getVillages = (districtId) => api.get(`/villages/${districtId}`);
 export const getVillageRisk = (villageId) => api.get(`/risk/village/${villageId}`);
 export const getRiskHistory = (villageId) => api.get(`/risk/village/${villageId}/history`);
+export const getPointRisk = (lat, lng) => api.get('/risk/point', { params: { lat, lng } });
+export const getRiskRaster = (bounds, params = {}) => api.get('/risk/raster', { params: { ...bounds, ...params }, responseType: 'arraybuffer' });
+export const getVillageShelters = (villageId) => api.get(`/shelters/village/${villageId}`);
 export const getPredictions = (villageId, params = {}) => api.get(`/predictions/village/${villageId}`, { params });
 
 export default api;